@@ -0,0 +1,87 @@
+# Arquivo: benchmarks/bench_startup.py
+
+"""
+Benchmark de inicialização: mede o tempo de importação dos módulos principais
+em processos Python novos (como um worker ou o CLI) e o tempo de subir um
+pool de workers da otimização.
+
+Uso: python benchmarks/bench_startup.py [--repeat N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+MODULES = [
+    'utils.config',
+    'utils.logger',
+    'mt5.mt5_connector',
+    'mt5.order_handler',
+    'core.indicators',
+    'core.backtester',
+    'core.optimizer',
+    'core.trade_executor',
+    'main',
+]
+
+
+def time_import(module: str, repeat: int) -> float:
+    """Mediana (ms) do tempo de ``import module`` em um interpretador novo."""
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def _noop(_):
+    return os.getpid()
+
+
+def time_worker_spinup(workers: int) -> float:
+    """Tempo (ms) para subir o pool da otimização e cada worker executar uma tarefa vazia."""
+    from concurrent.futures import ProcessPoolExecutor
+    from core.optimizer import _init_worker
+    from core.data_loader import MarketData
+    import numpy as np
+
+    empty = MarketData(*(np.empty(0, dtype=np.int64) for _ in range(6)))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(empty, {})) as pool:
+        list(pool.map(_noop, range(workers)))
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='Execuções por módulo (usa a mediana)')
+    parser.add_argument('--workers', type=int, default=4, help='Workers para o teste de spin-up')
+    args = parser.parse_args()
+
+    print(f"{'Módulo':<24} {'Import (ms)':>12}")
+    print('-' * 37)
+    for module in MODULES:
+        try:
+            print(f"{module:<24} {time_import(module, args.repeat):>12.1f}")
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<24} {'ERRO':>12}  {e.stderr.strip().splitlines()[-1]}")
+
+    print('-' * 37)
+    print(f"Spin-up de {args.workers} workers: {time_worker_spinup(args.workers):.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
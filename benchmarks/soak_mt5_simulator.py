@@ -0,0 +1,82 @@
+# Arquivo: benchmarks/soak_mt5_simulator.py
+
+"""
+Soak test da pilha ao vivo (MT5Connector -> OrderHandler -> TradeExecutor) sobre o
+simulador do MetaTrader 5: reexecuta um histórico sem esperas e mede a vazão.
+
+Uso: python benchmarks/soak_mt5_simulator.py [--bars N] [--csv arquivo.csv]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from utils.config import CONFIG
+from core.data_loader import MarketData, load_csv
+from mt5.simulator import SimulatedMT5, install, uninstall
+from mt5.mt5_connector import MT5Connector
+from mt5.broker import MT5Broker
+from core.trade_executor import TradeExecutor
+
+
+def random_walk(bars: int, seed: int = 42) -> MarketData:
+    """Histórico sintético de candles de 5 minutos."""
+    rng = np.random.default_rng(seed)
+    close = 120000 + np.cumsum(rng.normal(0, 25, bars))
+    open_ = close + rng.uniform(-15, 15, bars)
+    data = pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.uniform(0, 20, bars),
+        'low': np.minimum(open_, close) - rng.uniform(0, 20, bars),
+        'close': close,
+        'tick_volume': rng.integers(1000, 5000, bars),
+    }, index=pd.date_range('2025-01-02 09:00', periods=bars, freq='5min', name='time'))
+    return MarketData.from_dataframe(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bars', type=int, default=20000, help='Candles do histórico sintético')
+    parser.add_argument('--csv', help='Histórico OHLCV gravado (em vez do sintético)')
+    parser.add_argument('--window', type=int, default=300, help='Candles buscados por ciclo')
+    args = parser.parse_args()
+
+    symbol = CONFIG.global_.symbol
+    history = load_csv(args.csv, symbol=symbol) if args.csv else random_walk(args.bars)
+
+    sim = install(SimulatedMT5(login=1, password='sim', server='SIM'))
+    sim.add_symbol(symbol, history, timeframe=sim.TIMEFRAME_M5, start=args.window)
+    connector = MT5Connector(login=1, password='sim', server='SIM')
+    connector.retry_delay = 0
+
+    executor = TradeExecutor(symbol=symbol, timeframe=CONFIG.global_.timeframe, broker=MT5Broker(connector))
+    executor.connect()
+
+    cycles = 0
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    while True:
+        executor.run_cycle(args.window)
+        cycles += 1
+        if not sim.advance():
+            break
+    wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+    uninstall()
+
+    simulated = (len(history) - args.window) * 5 * 60
+    closed = [d for d in sim.deals if d.entry == sim.DEAL_ENTRY_OUT]
+    print(f"Ciclos:            {cycles}")
+    print(f"Tempo de parede:   {wall:.2f} s ({cycles / wall:.0f} ciclos/s)")
+    print(f"CPU por ciclo:     {cpu / cycles * 1000:.3f} ms")
+    print(f"Chamadas à API:    {sim.calls} ({sim.calls / cycles:.1f} por ciclo)")
+    print(f"Aceleração:        {simulated / wall:.0f}x o tempo real")
+    print(f"Trades fechados:   {len(closed)} | Saldo final: R$ {sim.balance:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# Arquivo: benchmarks/streaming_backtest.py
+
+"""
+Backtest em streaming sobre um histórico M1 sintético salvo em colunas .npy e lido com
+memory-map, um dia por vez. Rode com --months diferentes: o pico de memória acompanha o
+tamanho do bloco (um dia), não o do histórico.
+
+Uso: python benchmarks/streaming_backtest.py [--months 12] [--period D] [--dir stream_bench]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from core.data_loader import MarketData, iter_periods
+from core.streaming_backtest import StreamingBacktester
+from utils.perf import peak_rss_mb
+
+
+def write_history(directory: str, months: int, rng, block_days: int = 10):
+    """Grava o histórico em disco em blocos de ``block_days`` dias (nunca inteiro na memória)."""
+    os.makedirs(directory, exist_ok=True)
+    start = pd.Timestamp('2024-01-01')
+    days = (start + pd.DateOffset(months=months) - start).days
+    columns = {name: [] for name in ('time', 'open', 'high', 'low', 'close', 'tick_volume')}
+    price = 120000.0
+    for offset in range(0, days, block_days):
+        n = min(block_days, days - offset) * 1440
+        time_ = int(start.timestamp()) + offset * 86400 + np.arange(n, dtype=np.int64) * 60
+        close = price + 5 * np.cumsum(rng.integers(-3, 4, n))
+        price = float(close[-1])
+        open_ = np.concatenate([[close[0]], close[:-1]])
+        spread = 5 * rng.integers(0, 4, n)
+        block = {'time': time_, 'open': open_, 'high': np.maximum(open_, close) + spread,
+                 'low': np.minimum(open_, close) - spread, 'close': close,
+                 'tick_volume': rng.integers(100, 5000, n)}
+        for name, values in block.items():
+            path = os.path.join(directory, f'{name}_{offset:05d}.npy')
+            np.save(path, values)
+            columns[name].append(path)
+
+    # Junta os blocos num único .npy por coluna via memory-map de saída
+    total = days * 1440
+    for name, paths in columns.items():
+        first = np.load(paths[0])
+        out = np.lib.format.open_memmap(os.path.join(directory, f'{name}.npy'), mode='w+', dtype=first.dtype, shape=(total,))
+        position = 0
+        for path in paths:
+            values = np.load(path)
+            out[position:position + len(values)] = values
+            position += len(values)
+            os.remove(path)
+        out.flush()
+        del out
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--period', choices=('D', 'M'), default='D')
+    parser.add_argument('--dir', default=os.path.join(ROOT, 'stream_bench'))
+    args = parser.parse_args()
+
+    shutil.rmtree(args.dir, ignore_errors=True)
+    bars = write_history(args.dir, args.months, np.random.default_rng(1))
+    print(f"Histórico: {bars:,} candles M1 ({args.months} meses)")
+
+    data = MarketData.load(args.dir, mmap=True)
+    tester = StreamingBacktester(sl_points=150, tp_points=300, ema_fast=9, ema_slow=21,
+                                 trades_path=os.path.join(args.dir, 'trades.csv'))
+    start = time.perf_counter()
+    metrics = tester.run(iter_periods(data, args.period))
+    seconds = time.perf_counter() - start
+
+    print(f"Backtest: {metrics['chunks']} blocos em {seconds:.1f} s ({bars / seconds / 1e6:.2f} M candles/s), "
+          f"{metrics['total_trades']} trades, lucro líquido {metrics['net_profit']:.2f}")
+    print(f"Pico de memória (RSS): {peak_rss_mb():.0f} MB")
+    shutil.rmtree(args.dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
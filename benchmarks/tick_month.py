@@ -0,0 +1,81 @@
+# Arquivo: benchmarks/tick_month.py
+
+"""
+Ingestão de um mês de ticks sintéticos de WIN no TickStore e construção de candles de
+tempo, volume e range em streaming. Mostra que o pico de memória não cresce com o
+tamanho do histórico (os ticks nunca são carregados de uma vez).
+
+Uso: python benchmarks/tick_month.py [--days 21] [--ticks-per-day 2000000] [--dir ticks_bench]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from core.tick_store import TickStore
+from core.bar_builder import TimeBarBuilder, VolumeBarBuilder, RangeBarBuilder, TICK_FLAG_LAST
+from mt5.simulator import TICK_DTYPE
+from utils.perf import peak_rss_mb
+
+
+def synthetic_day(day: int, ticks: int, chunk: int, rng):
+    """Blocos de ticks de um pregão (09:00-18:00), gerados sob demanda."""
+    start_ms = int(pd.Timestamp('2025-03-03 09:00').timestamp() * 1000) + day * 86_400_000
+    step = 9 * 3600 * 1000 / ticks
+    price = 120000.0
+    for offset in range(0, ticks, chunk):
+        n = min(chunk, ticks - offset)
+        block = np.zeros(n, dtype=TICK_DTYPE)
+        block['time_msc'] = start_ms + ((offset + np.arange(n)) * step).astype(np.int64)
+        block['time'] = block['time_msc'] // 1000
+        last = price + 5 * np.cumsum(rng.integers(-1, 2, n))
+        price = float(last[-1])
+        block['last'], block['bid'], block['ask'] = last, last - 5, last
+        block['volume'] = rng.integers(1, 20, n)
+        block['volume_real'] = block['volume']
+        block['flags'] = TICK_FLAG_LAST
+        yield block
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=21)
+    parser.add_argument('--ticks-per-day', type=int, default=2_000_000)
+    parser.add_argument('--chunk', type=int, default=1_000_000)
+    parser.add_argument('--dir', default=os.path.join(ROOT, 'ticks_bench'))
+    args = parser.parse_args()
+
+    shutil.rmtree(args.dir, ignore_errors=True)
+    store = TickStore(args.dir, compact=True)
+    rng = np.random.default_rng(1)
+
+    start = time.perf_counter()
+    total = sum(store.ingest('WIN', synthetic_day(day, args.ticks_per_day, args.chunk, rng)) for day in range(args.days))
+    ingest_seconds = time.perf_counter() - start
+    print(f"Ingestão: {total:,} ticks em {ingest_seconds:.1f} s ({total / ingest_seconds / 1e6:.1f} M ticks/s)")
+
+    builders = {'M1': TimeBarBuilder('M1'), 'volume 5000': VolumeBarBuilder(5000), 'range 100': RangeBarBuilder(100)}
+    counts = dict.fromkeys(builders, 0)
+    start = time.perf_counter()
+    for chunk in store.iter_chunks('WIN', chunk_size=args.chunk):
+        for name, builder in builders.items():
+            counts[name] += len(builder.update(chunk))
+    for name, builder in builders.items():
+        counts[name] += len(builder.flush())
+    build_seconds = time.perf_counter() - start
+
+    print(f"Candles em {build_seconds:.1f} s ({total / build_seconds / 1e6:.1f} M ticks/s): "
+          + ", ".join(f"{name}={count:,}" for name, count in counts.items()))
+    print(f"Pico de memória (RSS): {peak_rss_mb():.0f} MB")
+    shutil.rmtree(args.dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
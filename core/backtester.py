@@ -1,24 +1,76 @@
 # Arquivo: core/backtester.py
 
+import numpy as np
 import pandas as pd
+from typing import Union
 from utils.logger import logger
 from strategies.ema_cross import EMACrossStrategy
-from core.signal_confirmer import SignalConfirmer
+from core.signal_confirmer import SignalConfirmer, RejectionStats, describe_rejection
+from core.data_loader import MarketData
+from core.indicator_store import IndicatorStore
+from core.indicators import TechnicalIndicators
+from core.risk_engine import RiskEngine
+from core.session_calendar import SessionCalendar, SessionIndex
+from core.filters import REJECT_HOURS, REJECT_NO_DATA
+from core.signal_index import SignalIndex
+from core.position_manager import PositionManager
 
 class Backtester:
     """
     Simula a execução da estratégia com filtros em dados históricos para otimizar parâmetros.
+
+    Aceita um DataFrame OHLCV ou um MarketData. Os dados não são copiados: o loop
+    trabalha sobre arrays (views) e os indicadores são escritos em arrays pré-alocados
+    no mesmo dtype dos preços (float32 quando compact=True).
+
+    Com ``risk_engine`` os stops podem vir do ATR e o volume de cada trade é calculado
+    depois do loop, de uma vez para todos os trades (``RiskEngine.size_trades``), com o
+    limite de perda diária aplicado.
+
+    ``filters`` troca a composição dos filtros de confirmação (ver ``SignalConfirmer``): no
+    backtest cada filtro vira uma máscara booleana avaliada uma vez sobre todos os candles.
+
+    ``session`` (SessionCalendar ou um SessionIndex já calculado para estes dados) limita as
+    entradas à janela do pregão e zera a posição na hora da zeragem do day trade
+    (motivo "FIM_DO_PREGAO"), em vez de carregá-la até o último candle.
+
+    Os sinais ficam num ``SignalIndex`` esparso e o loop salta de um evento ao próximo (sem
+    posição) ou procura a saída por blocos vetorizados (com posição), sem visitar cada
+    candle. ``signal_index`` reaproveita um índice já calculado para estes dados e EMAs
+    (ex.: combinações de SL/TP da mesma grade): indicadores e filtros não são recalculados.
+
+    ``management`` (``PositionManager``) aplica break-even, trailing stop e saída parcial com as
+    mesmas regras do robô: o stop de cada bloco vem do máximo acumulado dos preços. A parcial
+    vira um trade próprio (motivo "PARCIAL") com a fração do volume em ``fraction``.
     """
-    def __init__(self, data: pd.DataFrame, sl_points: int, tp_points: int, ema_fast: int, ema_slow: int):
-        self.data = data.copy().reset_index()  # ⚠️ NOVIDADE: Resetar o índice para garantir índice numérico
+    def __init__(self, data: Union[pd.DataFrame, MarketData], sl_points: int, tp_points: int, ema_fast: int, ema_slow: int,
+                 compact: bool = False, backend: str = None, risk_engine: RiskEngine = None,
+                 trend_timeframe: str = None, filters=None, session: Union[SessionCalendar, SessionIndex] = None,
+                 signal_index: SignalIndex = None, management: PositionManager = None):
+        if isinstance(data, MarketData):
+            self.data = data
+        else:
+            self.data = MarketData.from_dataframe(data, compact=compact)
         self.sl_points = sl_points
         self.tp_points = tp_points
         self.ema_fast = ema_fast
         self.ema_slow = ema_slow
-        self.strategy = EMACrossStrategy(ema_fast=ema_fast, ema_slow=ema_slow)
-        self.confirmer = SignalConfirmer() 
+        self.backend = backend
+        self.risk_engine = risk_engine
+        self.session = session
+        # Gestão da posição só quando alguma regra está ligada (senão, SL/TP fixos)
+        self.management = management if management is not None and management.enabled else None
+        self._sl = self._tp = None  # SL/TP por candle (stops pelo ATR)
+        self.strategy = EMACrossStrategy(fast_period=ema_fast, slow_period=ema_slow)
+        self.confirmer = SignalConfirmer(trend_timeframe=trend_timeframe, filters=filters)
+        self.indicators = IndicatorStore(len(self.data), dtype=self.data.price_dtype)
+        self.signal_index = signal_index
+        self._shared_index = signal_index is not None
+        self._force_flat = None
         
         self.trades = []
+        self.signals = np.zeros(0, dtype=np.int8)
+        self.rejections = np.zeros(0, dtype=np.uint8)
         self.position = None
         self.initial_balance = 1000.0
         self.current_balance = self.initial_balance
@@ -33,36 +85,54 @@ class Backtester:
             return
 
         # Agora, 'index' é o índice numérico sequencial
-        current_price = self.data['close'].iloc[index]
+        current_price = float(self.data.close[index])
+        if self._sl is not None:
+            sl_points, tp_points = int(self._sl[index]), int(self._tp[index])
+        else:
+            sl_points, tp_points = self.sl_points, self.tp_points
         
         if signal == "BUY":
             trade_type = "BUY"
-            sl_price = current_price - self.sl_points * self.point_value
-            tp_price = current_price + self.tp_points * self.point_value
+            sl_price = current_price - sl_points * self.point_value
+            tp_price = current_price + tp_points * self.point_value
         elif signal == "SELL":
             trade_type = "SELL"
-            sl_price = current_price + self.sl_points * self.point_value
-            tp_price = current_price - self.tp_points * self.point_value
+            sl_price = current_price + sl_points * self.point_value
+            tp_price = current_price - tp_points * self.point_value
         else:
             return
 
         self.position = {
             # ⚠️ NOVIDADE: Armazena o índice numérico (i) que está sendo iterado no loop
             'entry_index': index, 
+            # Horário da entrada: a posição pode continuar no bloco seguinte (backtest em streaming)
+            'entry_time': int(self.data.time[index]),
             'entry_price': current_price,
             'type': trade_type,
             'volume': self.volume,
+            'sl_points': sl_points,
             'sl_price': sl_price,
-            'tp_price': tp_price
+            'tp_price': tp_price,
+            'fraction': 1.0
         }
+        if self.management is not None:
+            # Estado da gestão em preços normalizados pela direção (ver ``PositionManager``)
+            direction = 1 if trade_type == "BUY" else -1
+            self.position.update(best=direction * current_price, stop=direction * sl_price, moved=False,
+                                 partial_done=False)
 
-    def _close_position(self, current_index, reason):
-        """Simula o fechamento de uma posição e calcula o P&L (Lucro/Prejuízo)."""
+    def _close_position(self, current_index, reason, fraction: float = None):
+        """
+        Simula o fechamento de uma posição e calcula o P&L (Lucro/Prejuízo). Com ``fraction``,
+        fecha só essa fração do volume original (saída parcial) e a posição continua.
+        """
         if not self.position:
             return
+        remaining = self.position['fraction']
+        fraction = remaining if fraction is None else fraction
 
         entry_price = self.position['entry_price']
-        exit_price = self.data['close'].iloc[current_index]
+        exit_price = float(self.data.close[current_index])
         trade_type = self.position['type']
         
         # Cálculo do lucro/prejuízo
@@ -71,83 +141,273 @@ class Backtester:
         else: # SELL
             pnl_points = entry_price - exit_price
             
-        pnl_real = pnl_points * self.point_value * self.volume
+        pnl_real = pnl_points * self.point_value * self.volume * fraction
         
         self.current_balance += pnl_real
         
         self.trades.append({
-            # ⚠️ NOVIDADE: Acessando a coluna 'time' usando .iloc para obter a data/hora correta
-            'entry_time': self.data['time'].iloc[self.position['entry_index']],
-            'exit_time': self.data['time'].iloc[current_index],
+            'entry_time': pd.Timestamp(self.position['entry_time'], unit='s'),
+            'exit_time': pd.Timestamp(int(self.data.time[current_index]), unit='s'),
             'type': trade_type,
             'entry_price': entry_price,
             'exit_price': exit_price,
             'pnl_points': pnl_points,
             'pnl_real': pnl_real,
-            'reason': reason
+            'reason': reason,
+            'sl_points': self.position['sl_points'],
+            'volume': self.volume,
+            'fraction': fraction
         })
         
+        if fraction < remaining:
+            self.position['fraction'] = remaining - fraction
+            return
         # Limpa a posição
         self.position = None
 
-    def _monitor_and_close(self, current_index):
-        """Monitora SL/TP da posição ativa."""
-        if not self.position:
+    def _calculate_indicators(self) -> IndicatorStore:
+        """Calcula EMAs e filtros direto nos arrays de saída pré-alocados (os dados não são alterados)."""
+        self.indicators.reset(len(self.data), dtype=self.data.price_dtype)
+        self.strategy.calculate_indicators(self.data, self.indicators, backend=self.backend)
+        self.confirmer.calculate_confirmation_indicators(self.data, self.indicators, backend=self.backend)
+        return self.indicators
+
+    def _calculate_stops(self):
+        """SL/TP do RiskEngine para todos os candles de uma vez (ATR vetorizado)."""
+        if self.risk_engine is None or not self.risk_engine.uses_atr:
             return
+        period = self.risk_engine.atr_period
+        indicators = TechnicalIndicators(self.data, backend=self.backend or 'auto')
+        indicators.add_atr(period)
+        self._sl, self._tp = self.risk_engine.stops_array(indicators.store[f'ATR_{period}'])
 
-        current_price = self.data['close'].iloc[current_index]
-        pos = self.position
+    def _session_index(self) -> SessionIndex:
+        """Índice do calendário sobre os candles (reaproveitado se já vier pré-calculado)."""
+        if self.session is None or isinstance(self.session, SessionIndex):
+            return self.session
+        return self.session.index(self.data.time)
 
-        # Fechamento por SL ou TP
-        if pos['type'] == "BUY":
-            if current_price <= pos['sl_price']:
-                self._close_position(current_index, "SL")
-            elif current_price >= pos['tp_price']:
-                self._close_position(current_index, "TP")
-        elif pos['type'] == "SELL":
-            if current_price >= pos['sl_price']:
-                self._close_position(current_index, "SL")
-            elif current_price <= pos['tp_price']:
-                self._close_position(current_index, "TP")
+    def _size_trades(self):
+        """Volume e P&L de todos os trades numa única operação vetorizada; trades bloqueados saem."""
+        if self.risk_engine is None or not self.trades:
+            return
+        df = pd.DataFrame(self.trades)
+        volume = self.risk_engine.size_trades(df['sl_points'], df['entry_time'].dt.date, df['pnl_points'])
+        pnl_real = df['pnl_points'].to_numpy() * self.risk_engine.point_value * volume * df['fraction'].to_numpy()
+        self.trades = [
+            dict(trade, volume=int(v), pnl_real=float(pnl))
+            for trade, v, pnl in zip(self.trades, volume, pnl_real) if v > 0
+        ]
+        self.current_balance = self.initial_balance + float(pnl_real.sum())
 
+    def load(self, data: MarketData):
+        """
+        Troca os dados mantendo parâmetros, posição aberta e trades (usado pelo backtest em
+        streaming para passar ao bloco seguinte sem recriar estratégia e filtros).
+        """
+        self.data = data
+        self._sl = self._tp = None
+        self._shared_index = False  # O índice de sinais recebido valia para os dados anteriores
 
-    def run(self) -> dict:
-        """Executa o backtest em todo o conjunto de dados."""
-        
-        # 1. Pré-cálculo dos Indicadores
-        self.data = self.strategy.calculate_indicators(self.data)
-        self.data = self.confirmer.calculate_confirmation_indicators(self.data)
+    def use_signal_index(self, signal_index: SignalIndex):
+        """Reaproveita um índice de sinais já calculado para estes dados, EMAs e filtros."""
+        self.signal_index = signal_index
+        self._shared_index = True
+
+    def _build_signal_index(self) -> SignalIndex:
+        """Indicadores, sinais primários e filtros de todos os candles, reduzidos aos eventos."""
+        ind = self._calculate_indicators()
+        ema_fast, ema_slow = ind['EMA_FAST'], ind['EMA_SLOW']
         
         # O backtest só pode começar após as EMAs e filtros de longo prazo estarem preenchidos
-        start_index = max(self.strategy.ema_slow, self.confirmer.long_trend_period) 
+        start_index = max(self.strategy.slow_period, self.confirmer.pipeline.min_bars(), ind.start_index)
         
-        # 2. Loop principal de Backtest
-        # Itera sobre o índice numérico
-        for i in range(start_index, len(self.data)):
+        # Sinais primários e filtros de confirmação de todos os candles de uma vez (máscaras
+        # combinadas em bits)
+        primary = self.strategy.signals(ema_fast, ema_slow)
+        primary[:start_index] = 0
+        flags = self.confirmer.rejection_flags(primary)
+        session = self._session_index()
+        if session is not None:
+            # Fora da janela de entradas do pregão o sinal é rejeitado por horário
+            flags[(primary != 0) & ~session.entry_allowed & (flags != REJECT_NO_DATA)] |= REJECT_HOURS
+        return SignalIndex.from_signals(primary, flags, start_index)
+
+    def prepare(self) -> int:
+        """
+        Pré-cálculo vetorizado de stops, sinais primários e filtros de todos os candles (o
+        ``SignalIndex``). Retorna o primeiro índice em que o backtest pode operar.
+        """
+        # 1. Pré-cálculo dos Indicadores (ou índice de sinais já pronto)
+        self._calculate_stops()
+        if not self._shared_index:
+            self.signal_index = self._build_signal_index()
+        session = self._session_index()
+        self._force_flat = session.force_flat if session is not None else None
+        
+        # Diagnóstico por candle (1 byte cada): sinal primário e bits de rejeição dos filtros,
+        # registrados apenas nos candles em que o sinal foi de fato avaliado (sem posição)
+        self.signals = np.zeros(len(self.data), dtype=np.int8)
+        self.rejections = np.zeros(len(self.data), dtype=np.uint8)
+        self.confirmer.stats = RejectionStats()
+        return self.signal_index.start
+
+    def _find_exit(self, start: int, stop: int) -> tuple:
+        """
+        Primeiro candle em [start, stop) em que a posição sai (SL, TP ou zeragem do pregão),
+        por blocos vetorizados que dobram de tamanho. (None, None) se ela continua aberta.
+        """
+        if self.management is not None:
+            return self._find_managed_exit(start, stop)
+        pos = self.position
+        close, force_flat = self.data.close, self._force_flat
+        block = 64
+        k = start
+        while k < stop:
+            end = min(stop, k + block)
+            prices = close[k:end]
+            if pos['type'] == "BUY":
+                sl_hit, tp_hit = prices <= pos['sl_price'], prices >= pos['tp_price']
+            else:
+                sl_hit, tp_hit = prices >= pos['sl_price'], prices <= pos['tp_price']
+            hit = sl_hit | tp_hit
+            if force_flat is not None:
+                hit |= force_flat[k:end]
+            found = np.flatnonzero(hit)
+            if found.size:
+                j = int(found[0])
+                # Mesma prioridade do loop candle a candle: SL, depois TP, depois a zeragem
+                reason = "SL" if sl_hit[j] else "TP" if tp_hit[j] else "FIM_DO_PREGAO"
+                return k + j, reason
+            k = end
+            block *= 2
+        return None, None
+
+    def _find_managed_exit(self, start: int, stop: int) -> tuple:
+        """
+        ``_find_exit`` com break-even, trailing e parcial. Em cada bloco, o stop vigente em
+        cada candle vem do melhor preço até o candle anterior (máximo acumulado), como no
+        ``PositionManager.update`` candle a candle. A parcial é registrada no caminho e a busca
+        continua a partir do candle seguinte.
+        """
+        pos, manager = self.position, self.management
+        close, force_flat = self.data.close, self._force_flat
+        direction = 1 if pos['type'] == "BUY" else -1
+        entry, target = direction * pos['entry_price'], direction * pos['tp_price']
+        block = 64
+        k = start
+        while k < stop:
+            end = min(stop, k + block)
+            prices = direction * close[k:end].astype(np.float64)
+            best = np.maximum.accumulate(np.maximum(prices, pos['best']))
+            stops = manager.stop_curve(entry, pos['stop'], np.concatenate(([pos['best']], best[:-1])))
+            sl_hit, tp_hit = prices <= stops, prices >= target
+            hit = sl_hit | tp_hit
+            if force_flat is not None:
+                hit |= force_flat[k:end]
+            found = np.flatnonzero(hit)
+            j = int(found[0]) if found.size else len(prices)
+            
+            if manager.partial and not pos['partial_done']:
+                reached = np.flatnonzero(best[:j] - entry >= manager.partial)
+                if reached.size:
+                    # Parcial antes da saída: estado até o candle dela e busca a partir do seguinte
+                    last = int(reached[0])
+                    self._advance_management(entry, best[last], stops[last])
+                    pos['partial_done'] = True
+                    self._close_position(k + last, "PARCIAL", fraction=manager.partial_fraction)
+                    k += last + 1
+                    continue
             
+            if j < len(prices):
+                # Mesma prioridade do loop candle a candle: SL, depois TP, depois a zeragem
+                if sl_hit[j]:
+                    reason = "STOP_MOVEL" if pos['moved'] or stops[j] > pos['stop'] else "SL"
+                else:
+                    reason = "TP" if tp_hit[j] else "FIM_DO_PREGAO"
+                return k + j, reason
+            self._advance_management(entry, best[-1], stops[-1])
+            k = end
+            block *= 2
+        return None, None
+
+    def _advance_management(self, entry: float, best: float, stop: float):
+        """Melhor preço e stop da posição gerida após um candle (``stop``: o vigente nele)."""
+        pos = self.position
+        level = float(self.management.stop_curve(entry, stop, np.array([best]))[0])
+        pos['moved'] = pos['moved'] or level > pos['stop']
+        pos['best'], pos['stop'] = float(best), level
+
+    def _evaluate_signals(self, lo: int, hi: int):
+        """Registra os sinais dos eventos [lo, hi) do índice, avaliados sem posição aberta."""
+        if hi <= lo:
+            return
+        index = self.signal_index
+        bars = index.bars[lo:hi]
+        self.signals[bars] = index.direction[lo:hi]
+        self.rejections[bars] = index.flags[lo:hi]
+        self.confirmer.stats.add_many(index.flags[lo:hi])
+
+    def simulate(self, start: int, stop: int = None):
+        """
+        Simula [start, stop) sobre o índice de sinais (a posição aberta continua entre
+        chamadas). Sem posição, salta para o próximo sinal confirmado, registrando os
+        rejeitados no caminho; com posição, procura a saída por blocos.
+        """
+        index = self.signal_index
+        stop = len(self.data) if stop is None else stop
+        i = start
+        
+        while i < stop:
             # A. Monitorar e Fechar
             if self.position:
-                self._monitor_and_close(i) # ⚠️ Passa o índice numérico 'i'
+                exit_index, reason = self._find_exit(i, stop)
+                if exit_index is None:
+                    return
+                self._close_position(exit_index, reason)
+                # Na zeragem do pregão não há nova entrada no mesmo candle; no SL/TP pode haver
+                i = exit_index + 1 if reason == "FIM_DO_PREGAO" else exit_index
+                continue
+            
+            # B. Próximo sinal confirmado (os rejeitados até ele foram avaliados sem posição)
+            lo, hi = index.span(i, stop)
+            entry = min(index.next_confirmed(lo), hi)
+            if entry >= hi:
+                self._evaluate_signals(lo, hi)
+                return
+            self._evaluate_signals(lo, entry + 1)
             
-            # B. Gerar Sinal e Executar (apenas se a posição estiver fechada)
-            if not self.position:
-                # Gerar o sinal Primário no índice atual
-                primary_signal = self.strategy.generate_signal(self.data.iloc[:i+1])
-                
-                # Aplicar o Filtro de Confirmação (usando o subconjunto de dados até o ponto i)
-                final_signal = self.confirmer.confirm_signal(self.data.iloc[:i+1], primary_signal)
-                
-                # Executar
-                if final_signal != "HOLD":
-                    self._execute_trade(i, final_signal) # ⚠️ Passa o índice numérico 'i'
+            # Executar
+            i = int(index.bars[entry])
+            self._execute_trade(i, "BUY" if index.direction[entry] > 0 else "SELL")
+            i += 1
+
+    def run(self) -> dict:
+        """Executa o backtest em todo o conjunto de dados."""
+        start_index = self.prepare()
+        
+        # 2. Loop principal de Backtest
+        self.simulate(start_index)
         
         # 3. Fechar posição remanescente, se houver
         if self.position:
             self._close_position(len(self.data) - 1, "ENCERRAMENTO")
+        self._size_trades()
 
         # 4. Calcular Métricas de Performance
         return self._calculate_metrics()
 
+    def rejection_report(self) -> pd.DataFrame:
+        """Candles com sinal primário e o motivo de cada rejeição (o texto só é montado aqui)."""
+        index = np.flatnonzero(self.signals)
+        flags = self.rejections[index]
+        return pd.DataFrame({
+            'time': pd.to_datetime(self.data.time[index], unit='s'),
+            'signal': np.where(self.signals[index] > 0, 'BUY', 'SELL'),
+            'flags': flags,
+            'reason': [describe_rejection(int(f)) for f in flags],
+        })
+
     def _calculate_metrics(self) -> dict:
         # ... (O restante da função _calculate_metrics permanece o mesmo, pois usa df_trades)
         
@@ -159,7 +419,8 @@ class Backtester:
                 'net_profit': 0.0,
                 'win_rate': 0.0,
                 'profit_factor': 0.0,
-                'params': {'EMA': f"{self.ema_fast}/{self.ema_slow}", 'SL/TP': f"{self.sl_points}/{self.tp_points}"}
+                'params': {'EMA': f"{self.ema_fast}/{self.ema_slow}", 'SL/TP': f"{self.sl_points}/{self.tp_points}"},
+                **self.confirmer.stats.as_dict()
             }
 
         total_trades = len(df_trades)
@@ -181,5 +442,6 @@ class Backtester:
             'net_profit': net_profit,
             'win_rate': win_rate * 100, # Em porcentagem
             'profit_factor': profit_factor,
-            'params': {'EMA': f"{self.ema_fast}/{self.ema_slow}", 'SL/TP': f"{self.sl_points}/{self.tp_points}"}
+            'params': {'EMA': f"{self.ema_fast}/{self.ema_slow}", 'SL/TP': f"{self.sl_points}/{self.tp_points}"},
+            **self.confirmer.stats.as_dict()
         }
\ No newline at end of file
@@ -0,0 +1,164 @@
+# Arquivo: core/bar_builder.py
+
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Iterable
+from core import kernels
+from core.data_loader import MarketData
+from core.resampler import timeframe_seconds
+
+# Flag do MT5 para ticks com negócio (campo ``last`` atualizado)
+TICK_FLAG_LAST = 8
+
+
+class BarBuilder(ABC):
+    """
+    Agregação de ticks em candles por blocos, com memória limitada: entre um bloco e o
+    seguinte só o candle em formação é guardado (uma linha), nunca os ticks.
+
+    ``update(chunk)`` devolve os candles FECHADOS no bloco (MarketData; tick_volume = volume
+    negociado) e ``flush()`` fecha o candle em formação no fim do fluxo. Por padrão os
+    candles usam o preço ``last`` e apenas os ticks com negócio.
+    """
+
+    def __init__(self, price: str = 'last', backend: str = None):
+        self.price = price
+        self.backend = backend
+        self._open = None   # Candle em formação: [time, open, high, low, close, volume]
+
+    @abstractmethod
+    def _segments(self, time: np.ndarray, prices: np.ndarray, volume: np.ndarray) -> tuple:
+        """
+        Retorna (inícios dos segmentos, horário de cada segmento, o 1º segmento continua o
+        candle em formação?, o último segmento já fechou?).
+        """
+
+    def _select(self, chunk) -> tuple:
+        prices = np.asarray(chunk[self.price], dtype=np.float64)
+        time = np.asarray(chunk['time_msc'], dtype=np.int64) // 1000
+        volume = np.asarray(chunk['volume'], dtype=np.float64)
+        if self.price == 'last':
+            # Ticks só de bid/ask não têm negócio: ficam fora dos candles de 'last'
+            if 'flags' in _names(chunk):
+                trades = (np.asarray(chunk['flags']) & TICK_FLAG_LAST) != 0
+            else:
+                trades = prices > 0
+            if not trades.all():
+                prices, time, volume = prices[trades], time[trades], volume[trades]
+        return time, prices, volume
+
+    def update(self, chunk) -> MarketData:
+        time, prices, volume = self._select(chunk)
+        if prices.size == 0:
+            return _bars([], [], [], [], [], [])
+
+        starts, bar_time, continues, last_closed = self._segments(time, prices, volume)
+        ends = np.r_[starts[1:], prices.size] - 1
+        rows = [
+            bar_time,
+            prices[starts],
+            np.maximum.reduceat(prices, starts),
+            np.minimum.reduceat(prices, starts),
+            prices[ends],
+            np.add.reduceat(volume, starts),
+        ]
+
+        current = self._open
+        if current is not None:
+            if continues:
+                # O primeiro segmento é a continuação do candle em formação
+                rows[0][0], rows[1][0] = current[0], current[1]
+                rows[2][0] = max(rows[2][0], current[2])
+                rows[3][0] = min(rows[3][0], current[3])
+                rows[5][0] += current[5]
+            else:
+                rows = [np.r_[value, column] for value, column in zip(current, rows)]
+
+        if last_closed:
+            self._open = None
+        else:
+            self._open = [column[-1].item() for column in rows]
+            rows = [column[:-1] for column in rows]
+        return _bars(*rows)
+
+    def flush(self) -> MarketData:
+        """Fecha o candle em formação (fim do fluxo)."""
+        current, self._open = self._open, None
+        if current is None:
+            return _bars([], [], [], [], [], [])
+        return _bars(*([value] for value in current))
+
+
+class TimeBarBuilder(BarBuilder):
+    """Candles de tempo (M1, M5, H1...): o candle fecha quando chega um tick do período seguinte."""
+
+    def __init__(self, timeframe='M1', price: str = 'last', backend: str = None):
+        super().__init__(price, backend)
+        self.seconds = timeframe_seconds(timeframe)
+
+    def _segments(self, time, prices, volume):
+        bucket = (time // self.seconds) * self.seconds
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        continues = self._open is not None and bucket[0] == self._open[0]
+        return starts, bucket[starts], continues, False
+
+
+class VolumeBarBuilder(BarBuilder):
+    """Candles de volume: cada candle fecha no tick em que o volume negociado atinge ``size``."""
+
+    def __init__(self, size: float, price: str = 'last', backend: str = None):
+        super().__init__(price, backend)
+        self.size = size
+
+    def _segments(self, time, prices, volume):
+        acc = self._open[5] if self._open is not None else 0.0
+        breaks, _ = kernels.volume_breaks(volume, self.size, acc, backend=self.backend)
+        return _break_segments(breaks, time, self._open is not None)
+
+
+class RangeBarBuilder(BarBuilder):
+    """Candles de range: cada candle fecha no tick em que máxima - mínima atinge ``size`` (em preço)."""
+
+    def __init__(self, size: float, price: str = 'last', backend: str = None):
+        super().__init__(price, backend)
+        self.size = size
+
+    def _segments(self, time, prices, volume):
+        state = (self._open[2], self._open[3]) if self._open is not None else (np.nan, np.nan)
+        breaks, _ = kernels.range_breaks(prices, self.size, state, backend=self.backend)
+        return _break_segments(breaks, time, self._open is not None)
+
+
+def _break_segments(breaks: np.ndarray, time: np.ndarray, has_open: bool) -> tuple:
+    """Segmentos a partir das marcas de fechamento (o tick marcado é o último do candle)."""
+    closing = np.flatnonzero(breaks)
+    starts = np.r_[0, closing + 1]
+    last_closed = starts[-1] == breaks.size
+    if last_closed:
+        starts = starts[:-1]
+    return starts, time[starts], has_open, bool(last_closed)
+
+
+def build_bars(chunks: Iterable, builder: BarBuilder) -> MarketData:
+    """Consome um fluxo de blocos de ticks e devolve todos os candles (inclusive o último, em formação)."""
+    parts = [builder.update(chunk) for chunk in chunks]
+    parts.append(builder.flush())
+    return _bars(*(np.concatenate([getattr(part, column) for part in parts])
+                   for column in ('time', 'open', 'high', 'low', 'close', 'tick_volume')))
+
+
+def _bars(time, open, high, low, close, volume) -> MarketData:
+    return MarketData(
+        time=np.asarray(time, dtype=np.int64),
+        open=np.asarray(open, dtype=np.float64),
+        high=np.asarray(high, dtype=np.float64),
+        low=np.asarray(low, dtype=np.float64),
+        close=np.asarray(close, dtype=np.float64),
+        tick_volume=np.asarray(volume, dtype=np.float64),
+    )
+
+
+def _names(chunk) -> tuple:
+    if isinstance(chunk, np.ndarray):
+        return chunk.dtype.names or ()
+    return tuple(chunk.keys())
@@ -0,0 +1,234 @@
+# Arquivo: core/data_loader.py
+
+import os
+import numpy as np
+import pandas as pd
+from utils.logger import logger
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+COLUMNS = ('time',) + PRICE_COLUMNS + ('tick_volume',)
+
+
+class MarketData:
+    """
+    Histórico OHLCV em arrays NumPy contíguos, sem o overhead de um DataFrame.
+
+    - time: int64 (epoch em segundos)
+    - open/high/low/close: float64, ou float32 no modo compacto
+    - tick_volume: int64, ou int32 no modo compacto
+    """
+
+    def __init__(self, time, open, high, low, close, tick_volume, symbol: str = None):
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.tick_volume = tick_volume
+        self.symbol = symbol
+
+    @staticmethod
+    def dtypes(compact: bool = False) -> tuple:
+        """Retorna (dtype dos preços, dtype do volume) para o modo pedido."""
+        if compact:
+            return np.float32, np.int32
+        return np.float64, np.int64
+
+    @classmethod
+    def from_dataframe(cls, data: pd.DataFrame, compact: bool = False, symbol: str = None) -> 'MarketData':
+        """
+        Converte um DataFrame OHLCV (índice ou coluna 'time') em arrays.
+        Quando o dtype da coluna já é o desejado, o array é uma view (sem cópia).
+        """
+        price_dtype, volume_dtype = cls.dtypes(compact)
+
+        if 'time' in data.columns:
+            time_values = data['time'].to_numpy()
+        else:
+            time_values = data.index.to_numpy()
+
+        return cls(
+            time=_to_epoch_seconds(time_values),
+            open=data['open'].to_numpy(dtype=price_dtype),
+            high=data['high'].to_numpy(dtype=price_dtype),
+            low=data['low'].to_numpy(dtype=price_dtype),
+            close=data['close'].to_numpy(dtype=price_dtype),
+            tick_volume=data['tick_volume'].to_numpy(dtype=volume_dtype),
+            symbol=symbol,
+        )
+
+    @classmethod
+    def from_rates(cls, rates: np.ndarray, compact: bool = False, symbol: str = None) -> 'MarketData':
+        """Converte o array estruturado de ``mt5.copy_rates_*`` sem passar por DataFrame."""
+        price_dtype, volume_dtype = cls.dtypes(compact)
+        return cls(
+            time=np.ascontiguousarray(rates['time'], dtype=np.int64),
+            open=np.ascontiguousarray(rates['open'], dtype=price_dtype),
+            high=np.ascontiguousarray(rates['high'], dtype=price_dtype),
+            low=np.ascontiguousarray(rates['low'], dtype=price_dtype),
+            close=np.ascontiguousarray(rates['close'], dtype=price_dtype),
+            tick_volume=np.ascontiguousarray(rates['tick_volume'], dtype=volume_dtype),
+            symbol=symbol,
+        )
+
+    def __len__(self) -> int:
+        return self.close.shape[0]
+
+    @property
+    def price_dtype(self):
+        return self.close.dtype
+
+    @property
+    def is_compact(self) -> bool:
+        return self.close.dtype == np.float32
+
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelas colunas OHLCV em bytes."""
+        return sum(getattr(self, column).nbytes for column in COLUMNS)
+
+    def allocate(self, dtype=None) -> np.ndarray:
+        """Pré-aloca um array de saída (por padrão no mesmo dtype dos preços)."""
+        return np.empty(len(self), dtype=dtype or self.price_dtype)
+
+    def slice(self, start: int, stop: int = None) -> 'MarketData':
+        """Retorna um recorte [start:stop) que compartilha a memória original (views)."""
+        return MarketData(*(getattr(self, column)[start:stop] for column in COLUMNS), symbol=self.symbol)
+
+    @classmethod
+    def concat(cls, parts) -> 'MarketData':
+        """Junta blocos consecutivos (cópia: o resultado não depende dos arrays de origem)."""
+        parts = [part for part in parts if len(part)]
+        return cls(*(np.concatenate([getattr(part, column) for part in parts]) for column in COLUMNS),
+                   symbol=parts[0].symbol if parts else None)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Reconstrói o DataFrame indexado por 'time' (formato usado pelas estratégias)."""
+        data = pd.DataFrame({column: getattr(self, column) for column in COLUMNS[1:]})
+        data.index = pd.DatetimeIndex(pd.to_datetime(self.time, unit='s'), name='time')
+        return data
+
+    def save(self, directory: str):
+        """Salva cada coluna em um arquivo .npy (permite leitura com memory-map)."""
+        os.makedirs(directory, exist_ok=True)
+        for column in COLUMNS:
+            np.save(os.path.join(directory, f'{column}.npy'), getattr(self, column))
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True, symbol: str = None) -> 'MarketData':
+        """Carrega colunas .npy salvas por ``save``; com mmap=True nada é lido para a RAM até ser usado."""
+        mmap_mode = 'r' if mmap else None
+        columns = [np.load(os.path.join(directory, f'{column}.npy'), mmap_mode=mmap_mode) for column in COLUMNS]
+        return cls(*columns, symbol=symbol)
+
+
+def _to_epoch_seconds(values: np.ndarray) -> np.ndarray:
+    """Converte datetimes (ou inteiros já em epoch) para int64 em segundos."""
+    if np.issubdtype(values.dtype, np.integer):
+        return np.ascontiguousarray(values, dtype=np.int64)
+    return values.astype('datetime64[s]').astype(np.int64)
+
+
+def load_csv(path: str, compact: bool = False, symbol: str = None) -> MarketData:
+    """
+    Lê um CSV OHLCV (colunas: time, open, high, low, close, tick_volume) já
+    nos dtypes finais, evitando a passagem por float64/int64 no modo compacto.
+    """
+    price_dtype, volume_dtype = MarketData.dtypes(compact)
+    dtype = {column: price_dtype for column in PRICE_COLUMNS}
+    dtype['tick_volume'] = volume_dtype
+
+    data = pd.read_csv(path, usecols=list(COLUMNS), dtype=dtype, parse_dates=['time'])
+    market_data = MarketData.from_dataframe(data, compact=compact, symbol=symbol)
+    logger.info(f"Histórico carregado de {path}: {len(market_data)} candles ({market_data.nbytes / 1e6:.1f} MB).")
+    return market_data
+
+
+def select_range(data: MarketData, start: str = None, end: str = None) -> MarketData:
+    """
+    Recorte (view) dos candles entre ``start`` e ``end`` (AAAA-MM-DD ou data e hora). Uma data
+    sem hora em ``end`` inclui o dia inteiro.
+    """
+    lo, hi = 0, len(data)
+    if start:
+        lo = int(np.searchsorted(data.time, pd.Timestamp(start).timestamp(), side='left'))
+    if end:
+        stamp = pd.Timestamp(end)
+        if len(str(end).strip()) <= 10:
+            hi = int(np.searchsorted(data.time, (stamp + pd.Timedelta(days=1)).timestamp(), side='left'))
+        else:
+            hi = int(np.searchsorted(data.time, stamp.timestamp(), side='right'))
+    return data.slice(lo, max(lo, hi))
+
+
+def iter_periods(data: MarketData, period: str = 'D'):
+    """
+    Recortes consecutivos de ``data`` por dia ('D') ou mês ('M'), como views. Com um
+    MarketData carregado em memory-map (``MarketData.load``) só o bloco em uso é lido do disco.
+    """
+    time = data.time
+    if len(time) == 0:
+        return
+    unit = {'D': 'datetime64[D]', 'M': 'datetime64[M]'}[period]
+    # Limites de período por busca binária: não cria um array de períodos do tamanho do histórico
+    current = np.datetime64(int(time[0]), 's').astype(unit)
+    start = 0
+    while start < len(time):
+        boundary = (current + 1).astype('datetime64[s]').astype(np.int64)
+        stop = int(np.searchsorted(time, boundary, side='left'))
+        if stop > start:
+            yield data.slice(start, stop)
+        start = stop
+        if start < len(time):
+            current = np.datetime64(int(time[start]), 's').astype(unit)
+
+
+def iter_csv_chunks(path: str, chunk_rows: int = 500_000, compact: bool = False, symbol: str = None):
+    """Lê um CSV OHLCV em blocos de ``chunk_rows`` candles (MarketData por bloco), sem carregar o arquivo todo."""
+    price_dtype, volume_dtype = MarketData.dtypes(compact)
+    dtype = {column: price_dtype for column in PRICE_COLUMNS}
+    dtype['tick_volume'] = volume_dtype
+    with pd.read_csv(path, usecols=list(COLUMNS), dtype=dtype, parse_dates=['time'], chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield MarketData.from_dataframe(chunk, compact=compact, symbol=symbol)
+
+
+def ingest_csv(path: str, directory: str, chunk_rows: int = 500_000, compact: bool = False, symbol: str = None) -> int:
+    """
+    Converte um CSV OHLCV no formato de ``MarketData.save`` (um .npy por coluna, lido depois
+    com memory-map), em blocos: o arquivo nunca é carregado inteiro. Retorna o total de candles.
+    """
+    os.makedirs(directory, exist_ok=True)
+    raw = {column: os.path.join(directory, f'{column}.bin') for column in COLUMNS}
+    dtypes = {}
+    rows = 0
+    last_time = None
+    files = {column: open(raw_path, 'wb') for column, raw_path in raw.items()}
+    try:
+        for chunk in iter_csv_chunks(path, chunk_rows, compact, symbol):
+            if last_time is not None and len(chunk) and chunk.time[0] <= last_time:
+                raise ValueError(f"{path}: candles fora de ordem ou repetidos perto da linha {rows + 1}.")
+            for column in COLUMNS:
+                values = np.ascontiguousarray(getattr(chunk, column))
+                dtypes[column] = values.dtype
+                files[column].write(values.tobytes())
+            rows += len(chunk)
+            last_time = chunk.time[-1] if len(chunk) else last_time
+    finally:
+        for f in files.values():
+            f.close()
+
+    # Bytes crus -> .npy com cabeçalho (cópia em blocos, via memory-map dos dois lados)
+    for column, raw_path in raw.items():
+        dtype = dtypes.get(column, np.int64 if column == 'time' else MarketData.dtypes(compact)[column == 'tick_volume'])
+        out = np.lib.format.open_memmap(os.path.join(directory, f'{column}.npy'), mode='w+', dtype=dtype, shape=(rows,))
+        if rows:
+            source = np.memmap(raw_path, dtype=dtype, mode='r', shape=(rows,))
+            for start in range(0, rows, chunk_rows):
+                out[start:start + chunk_rows] = source[start:start + chunk_rows]
+            del source
+        out.flush()
+        del out
+        os.remove(raw_path)
+    logger.info(f"📥 {path}: {rows} candles gravados em {directory}.")
+    return rows
@@ -0,0 +1,428 @@
+# Arquivo: core/filters.py
+
+import numpy as np
+import pandas as pd
+from abc import ABC, abstractmethod
+from typing import Iterable
+from core import kernels
+from core import resampler
+from core.data_loader import MarketData, _to_epoch_seconds
+from core.indicator_store import IndicatorStore, read_only_column
+
+# Motivos de rejeição como bits (combináveis): registrados em arrays uint8, sem montar texto
+REJECT_TREND = 1          # Preço do lado errado da EMA de tendência
+REJECT_VOLUME = 2         # Volume abaixo da média + filtro
+REJECT_NO_DATA = 4        # Dados insuficientes (aquecimento dos filtros)
+REJECT_RSI = 8            # RSI esticado na direção do sinal
+REJECT_MACD = 16          # Histograma do MACD contra o sinal
+REJECT_ATR = 32           # Volatilidade (ATR) fora da faixa operável
+REJECT_HOURS = 64         # Candle fora do horário permitido
+REJECTION_LABELS = {
+    REJECT_TREND: 'tendência', REJECT_VOLUME: 'volume', REJECT_NO_DATA: 'dados insuficientes',
+    REJECT_RSI: 'rsi', REJECT_MACD: 'macd', REJECT_ATR: 'atr', REJECT_HOURS: 'horário',
+}
+# Chaves das métricas (``rejected_<chave>``)
+REJECTION_KEYS = {
+    REJECT_TREND: 'trend', REJECT_VOLUME: 'volume', REJECT_NO_DATA: 'no_data',
+    REJECT_RSI: 'rsi', REJECT_MACD: 'macd', REJECT_ATR: 'atr', REJECT_HOURS: 'hours',
+}
+
+
+class FilterContext:
+    """
+    Colunas disponíveis para os filtros, por nome: primeiro as do IndicatorStore, depois
+    as dos dados (``close``, ``tick_volume``, ``time`` em epoch...). Os indicadores de um
+    filtro são calculados na primeira vez que ele é avaliado (``require``).
+    """
+
+    def __init__(self, data, store: IndicatorStore = None, backend: str = None):
+        self.data = data
+        self.store = store
+        self.backend = backend
+        self.length = len(data)
+        self._columns = {}
+        self._ready = set()
+
+    def __contains__(self, name: str) -> bool:
+        if self.store is not None and name in self.store:
+            return True
+        return isinstance(self.data, pd.DataFrame) and name in self.data.columns
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if self.store is not None and name in self.store:
+            return self.store[name]
+        values = self._columns.get(name)
+        if values is None:
+            values = self._columns[name] = self._data_column(name)
+        return values
+
+    def _data_column(self, name: str) -> np.ndarray:
+        if name != 'time' or isinstance(self.data, MarketData):
+            return np.asarray(read_only_column(self.data, name))
+        if 'time' in self.data.columns:
+            return _to_epoch_seconds(self.data['time'].to_numpy())
+        return _to_epoch_seconds(self.data.index.to_numpy())
+
+    def require(self, flt: 'ConfirmationFilter'):
+        """Garante os indicadores do filtro (calculados uma vez por contexto; colunas já presentes são reaproveitadas)."""
+        if flt in self._ready:
+            return
+        if not all(column in self for column in flt.columns):
+            if self.store is None:
+                self.store = IndicatorStore(self.length)
+            flt.compute(self.data, self.store, self.backend)
+        self._ready.add(flt)
+
+    def has_nan(self, flt: 'ConfirmationFilter', index) -> np.ndarray:
+        """True onde algum indicador do filtro ainda está aquecendo (NaN)."""
+        nan = np.zeros(np.shape(index), dtype=bool)
+        for column in flt.columns:
+            nan |= np.isnan(self[column][index])
+        return nan
+
+
+class ConfirmationFilter(ABC):
+    """
+    Filtro de confirmação: declara as colunas que precisa (``columns``), o custo relativo
+    de avaliá-lo (``cost``: indicadores a calcular + operações por candle) e o bit de
+    rejeição (``flag``).
+
+    ``passes(ctx, index, direction)`` funciona com um índice escalar (ao vivo) ou com um
+    array de índices (backtest vetorizado); ``direction`` é 1 (compra) ou -1 (venda).
+    """
+    flag = 0
+    cost = 1.0
+    columns = ()
+
+    def min_bars(self) -> int:
+        """Candles mínimos no timeframe do robô para o filtro ter valor."""
+        return 0
+
+    def lookback(self, base_timeframe) -> int:
+        """Candles de histórico necessários para aquecer os indicadores do filtro."""
+        return self.min_bars()
+
+    def compute(self, data, store: IndicatorStore, backend: str = None):
+        """Calcula os indicadores do filtro em ``store`` (sem modificar ``data``)."""
+
+    @abstractmethod
+    def passes(self, ctx: FilterContext, index, direction):
+        """Máscara (ou bool) dos candles em ``index`` que passam no filtro na direção ``direction``."""
+
+    def describe(self, ctx: FilterContext, i: int, direction: int) -> str:
+        """Descrição (com valores) da rejeição no candle ``i``. Só chamada quando o texto é necessário."""
+        return f"❌ {REJECTION_LABELS[self.flag].capitalize()}"
+
+
+class TrendFilter(ConfirmationFilter):
+    """Compra só acima da EMA de tendência e venda só abaixo (EMA no timeframe do robô ou num maior)."""
+    flag = REJECT_TREND
+
+    def __init__(self, period: int = 50, timeframe: str = None, incremental: bool = False):
+        self.period = period
+        self.timeframe = timeframe or None
+        if self.timeframe is not None:
+            resampler.timeframe_seconds(self.timeframe)  # Valida o nome antes do primeiro cálculo
+        self.column = f'EMA_{period}' if self.timeframe is None else f'EMA_{period}_{self.timeframe}'
+        self.columns = (self.column,)
+        # A EMA de timeframe maior exige agregar os candles e alinhar de volta
+        self.cost = 1.0 if self.timeframe is None else 3.0
+        # Ao vivo: o timeframe maior é mantido por um MultiTimeframeAggregator, que só recebe os
+        # candles fechados novos de cada ciclo (O(1) por candle, sem reagregar a janela inteira)
+        self.incremental = incremental and self.timeframe is not None
+        self._live = None
+        self._fed = None  # Horário do último candle fechado incorporado ao agregador
+
+    def min_bars(self) -> int:
+        return self.period
+
+    def lookback(self, base_timeframe) -> int:
+        if self.timeframe is None:
+            return self.period
+        ratio = resampler.timeframe_seconds(self.timeframe) // resampler.timeframe_seconds(base_timeframe)
+        return (self.period + 1) * max(1, ratio)
+
+    def compute(self, data, store, backend=None):
+        if self.timeframe is None:
+            kernels.ema(read_only_column(data, 'close'), self.period, out=store.allocate(self.column), backend=backend)
+            return
+        market_data = data if isinstance(data, MarketData) else MarketData.from_dataframe(data)
+        trend = store.allocate(self.column)
+        if self.incremental:
+            # Ao vivo só o último candle é avaliado
+            trend[:] = np.nan
+            if len(trend):
+                trend[-1] = self._live_value(market_data)
+            store.mark_warmup(len(trend) - 1 if len(trend) and not np.isnan(trend[-1]) else len(trend))
+            return
+        trend[:] = resampler.htf_ema(market_data, self.timeframe, self.period, backend=backend)
+        valid = np.flatnonzero(~np.isnan(trend))
+        store.mark_warmup(int(valid[0]) if valid.size else len(trend))
+
+    def _live_value(self, data: MarketData) -> float:
+        """
+        EMA do timeframe maior vista pelo último candle (em formação): os candles fechados
+        ainda não incorporados entram no agregador e o último só é "espiado" (``peek_ema``).
+        """
+        time = np.asarray(data.time, dtype=np.int64)
+        closed = len(time) - 1
+        if closed < 2:
+            self._live = self._fed = None
+            return np.nan
+        start = int(np.searchsorted(time[:closed], self._fed, side='right')) if self._fed is not None else 0
+        if self._live is None or start == 0 or time[start - 1] != self._fed:
+            # Primeiro ciclo, lacuna maior que a janela ou histórico trocado: aquece com os dados recebidos
+            self._live = resampler.MultiTimeframeAggregator.from_history(data.slice(0, closed), [self.timeframe],
+                                                                         [self.period])
+        else:
+            for j in range(start, closed):
+                self._live.update(time[j], data.open[j], data.high[j], data.low[j], data.close[j],
+                                  data.tick_volume[j])
+        self._fed = int(time[closed - 1])
+        return self._live.peek_ema(self.timeframe, self.period, time[-1], float(data.close[-1]))
+
+    def passes(self, ctx, index, direction):
+        close, ema = ctx['close'][index], ctx[self.column][index]
+        return np.where(direction > 0, close > ema, close < ema)
+
+    def describe(self, ctx, i, direction):
+        side = '<' if direction > 0 else '>'
+        name = f"EMA {self.period}" + (f" {self.timeframe}" if self.timeframe else "")
+        return f"❌ Tendência: Preço ({ctx['close'][i]:.2f}) {side} {name} ({ctx[self.column][i]:.2f})"
+
+
+class VolumeFilter(ConfirmationFilter):
+    """Volume do candle acima da média móvel de volume (MMV) + ``percent``."""
+    flag = REJECT_VOLUME
+    cost = 1.0
+    columns = ('MMV',)
+
+    def __init__(self, period: int = 10, percent: float = 0.0):
+        self.period = period
+        self.percent = percent
+
+    def min_bars(self) -> int:
+        return self.period
+
+    def compute(self, data, store, backend=None):
+        kernels.rolling_mean(read_only_column(data, 'tick_volume'), self.period, out=store.allocate('MMV'), backend=backend)
+        store.mark_warmup(self.period - 1)
+
+    def passes(self, ctx, index, direction):
+        # Se percent for 0.00, basta o volume superar a média
+        return ctx['tick_volume'][index] > ctx['MMV'][index] * (1 + self.percent)
+
+    def describe(self, ctx, i, direction):
+        return (f"❌ Volume: Atual ({ctx['tick_volume'][i]:.0f}) < Média + {self.percent * 100:.0f}% "
+                f"({ctx['MMV'][i] * (1 + self.percent):.0f})")
+
+
+class RSIFilter(ConfirmationFilter):
+    """Evita comprar com RSI sobrecomprado e vender com RSI sobrevendido."""
+    flag = REJECT_RSI
+    cost = 2.0
+
+    def __init__(self, period: int = 14, overbought: float = 70.0, oversold: float = 30.0):
+        self.period = period
+        self.overbought = overbought
+        self.oversold = oversold
+        self.columns = (f'RSI_{period}',)
+
+    def min_bars(self) -> int:
+        return self.period
+
+    def compute(self, data, store, backend=None):
+        kernels.rsi(read_only_column(data, 'close'), self.period, out=store.allocate(self.columns[0]), backend=backend)
+        store.mark_warmup(self.period)
+
+    def passes(self, ctx, index, direction):
+        rsi = ctx[self.columns[0]][index]
+        return np.where(direction > 0, rsi < self.overbought, rsi > self.oversold)
+
+    def describe(self, ctx, i, direction):
+        limit = f"> {self.overbought:.0f}" if direction > 0 else f"< {self.oversold:.0f}"
+        return f"❌ RSI {self.period}: {ctx[self.columns[0]][i]:.1f} {limit}"
+
+
+class MACDFilter(ConfirmationFilter):
+    """Histograma do MACD a favor do sinal (positivo na compra, negativo na venda)."""
+    flag = REJECT_MACD
+    cost = 3.0
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+        suffix = f'{fast_period}_{slow_period}_{signal_period}'
+        self.outputs = (f'MACD_{suffix}', f'MACD_Signal_{suffix}', f'MACD_Hist_{suffix}')
+        self.columns = (self.outputs[2],)
+
+    def min_bars(self) -> int:
+        return self.slow_period + self.signal_period
+
+    def compute(self, data, store, backend=None):
+        out = tuple(store.allocate(name) for name in self.outputs)
+        kernels.macd(read_only_column(data, 'close'), self.fast_period, self.slow_period, self.signal_period,
+                     out=out, backend=backend)
+        store.mark_warmup(self.min_bars())
+
+    def passes(self, ctx, index, direction):
+        hist = ctx[self.columns[0]][index]
+        return np.where(direction > 0, hist > 0, hist < 0)
+
+    def describe(self, ctx, i, direction):
+        side = '<=' if direction > 0 else '>='
+        return f"❌ MACD: Histograma ({ctx[self.columns[0]][i]:.2f}) {side} 0"
+
+
+class ATRFilter(ConfirmationFilter):
+    """Só opera com o ATR (em pontos) entre ``min_points`` e ``max_points``: nem mercado parado, nem esticado."""
+    flag = REJECT_ATR
+    cost = 2.0
+
+    def __init__(self, period: int = 14, min_points: float = 0.0, max_points: float = np.inf):
+        self.period = period
+        self.min_points = min_points
+        self.max_points = max_points
+        self.columns = (f'ATR_{period}',)
+
+    def min_bars(self) -> int:
+        return self.period
+
+    def compute(self, data, store, backend=None):
+        kernels.atr(read_only_column(data, 'high'), read_only_column(data, 'low'), read_only_column(data, 'close'),
+                    self.period, out=store.allocate(self.columns[0]), backend=backend)
+        store.mark_warmup(self.period)
+
+    def passes(self, ctx, index, direction):
+        atr = ctx[self.columns[0]][index]
+        return (atr >= self.min_points) & (atr <= self.max_points)
+
+    def describe(self, ctx, i, direction):
+        return (f"❌ ATR {self.period}: {ctx[self.columns[0]][i]:.1f} fora de "
+                f"[{self.min_points:.0f}, {self.max_points:.0f}]")
+
+
+class TradingHoursFilter(ConfirmationFilter):
+    """Só aceita sinais com o candle entre ``start`` e ``end`` (HH:MM, horário do servidor)."""
+    flag = REJECT_HOURS
+    cost = 0.1  # Sem indicadores: só aritmética sobre o horário
+
+    def __init__(self, start: str = '09:05', end: str = '17:30'):
+        self.start, self.end = start, end
+        self._start = _minutes(start) * 60
+        self._end = _minutes(end) * 60
+
+    def passes(self, ctx, index, direction):
+        seconds = ctx['time'][index] % 86400
+        return (seconds >= self._start) & (seconds < self._end)
+
+    def describe(self, ctx, i, direction):
+        minutes = int(ctx['time'][i] % 86400) // 60
+        return f"❌ Horário: {minutes // 60:02d}:{minutes % 60:02d} fora de {self.start}-{self.end}"
+
+
+class FilterPipeline:
+    """
+    Composição de filtros avaliados do mais barato para o mais caro.
+
+    - Ao vivo (``flags_at`` com ``short_circuit=True``): para no primeiro filtro que
+      rejeita, e os indicadores dos filtros seguintes nem chegam a ser calculados.
+    - Backtest (``flags``): cada filtro vira uma máscara booleana sobre todos os candles
+      com sinal de uma vez, e as máscaras são combinadas nos bits de rejeição.
+    """
+
+    def __init__(self, filters: Iterable[ConfirmationFilter]):
+        # sorted é estável: filtros de mesmo custo mantêm a ordem informada
+        self.filters = sorted(filters, key=lambda flt: flt.cost)
+        owners = {}
+        for flt in self.filters:
+            for column in flt.columns:
+                other = owners.setdefault(column, flt)
+                if other is not flt and vars(other) != vars(flt):
+                    raise ValueError(f"Filtros {type(other).__name__} e {type(flt).__name__} usam a mesma coluna '{column}'.")
+        self.context = None
+
+    @property
+    def columns(self) -> tuple:
+        return tuple(dict.fromkeys(column for flt in self.filters for column in flt.columns))
+
+    def find(self, kind: type):
+        """Primeiro filtro do tipo ``kind`` (ou None)."""
+        return next((flt for flt in self.filters if isinstance(flt, kind)), None)
+
+    def min_bars(self) -> int:
+        return max((flt.min_bars() for flt in self.filters), default=0)
+
+    def lookback(self, base_timeframe) -> int:
+        return max((flt.lookback(base_timeframe) for flt in self.filters), default=0)
+
+    def prepare(self, data, store: IndicatorStore = None, backend: str = None, lazy: bool = False) -> IndicatorStore:
+        """
+        Prepara o contexto de avaliação sobre ``data``. Com ``lazy=True`` (modo ao vivo) os
+        indicadores só são calculados quando o filtro é avaliado; sem, todos na hora.
+        """
+        if store is None:
+            store = IndicatorStore(len(data))
+        store.discard(*self.columns)  # Evita ler valores de um ciclo anterior (buffers reaproveitados)
+        self.context = FilterContext(data, store, backend)
+        if not lazy:
+            for flt in self.filters:
+                self.context.require(flt)
+        return store
+
+    def flags_at(self, i: int, direction: int, context: FilterContext = None, short_circuit: bool = True) -> int:
+        """
+        Bits de rejeição do candle ``i`` (0 = confirmado). Com ``short_circuit`` retorna o
+        primeiro motivo encontrado; sem, avalia todos os filtros (diagnóstico).
+        """
+        ctx = context if context is not None else self.context
+        flags = 0
+        for flt in self.filters:
+            ctx.require(flt)
+            if ctx.has_nan(flt, i):
+                if short_circuit:
+                    return REJECT_NO_DATA
+                flags |= REJECT_NO_DATA
+            elif not flt.passes(ctx, i, direction):
+                if short_circuit:
+                    return flt.flag
+                flags |= flt.flag
+        # Filtro aquecendo: os demais motivos não são confiáveis
+        return REJECT_NO_DATA if flags & REJECT_NO_DATA else flags
+
+    def flags(self, directions, context: FilterContext = None) -> np.ndarray:
+        """
+        Versão vetorizada: ``directions`` é um array com 1 (compra), -1 (venda) ou 0 (nada).
+        Retorna um array uint8 com todos os bits de rejeição de cada candle com sinal.
+        """
+        ctx = context if context is not None else self.context
+        directions = np.asarray(directions)
+        index = np.flatnonzero(directions)
+        side = directions[index]
+        failed = np.zeros(index.size, dtype=np.uint8)
+        no_data = np.zeros(index.size, dtype=bool)
+        with np.errstate(invalid='ignore'):
+            for flt in self.filters:
+                ctx.require(flt)
+                no_data |= ctx.has_nan(flt, index)
+                failed |= np.logical_not(flt.passes(ctx, index, side)).astype(np.uint8) * np.uint8(flt.flag)
+
+        out = np.zeros(directions.shape[0], dtype=np.uint8)
+        out[index] = np.where(no_data, REJECT_NO_DATA, failed)
+        return out
+
+    def describe(self, flags: int, i: int, direction: int, context: FilterContext = None) -> str:
+        """Texto detalhado dos motivos em ``flags`` (gerado só quando alguém pede)."""
+        ctx = context if context is not None else self.context
+        if flags & REJECT_NO_DATA:
+            return "❌ Dados insuficientes para os filtros"
+        return '; '.join(flt.describe(ctx, i, direction) for flt in self.filters if flags & flt.flag)
+
+    def __str__(self) -> str:
+        return ' → '.join(f"{type(flt).__name__}({flt.cost:g})" for flt in self.filters)
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 60 + int(minutes)
@@ -0,0 +1,210 @@
+# Arquivo: core/history_store.py
+
+import os
+import time
+import uuid
+import glob
+import importlib.util
+import threading
+import pandas as pd
+from datetime import datetime
+from utils.logger import logger
+
+# Parquet (pyarrow) e DuckDB são opcionais: sem pyarrow as partições são gravadas em CSV,
+# que o DuckDB e o pandas também leem.
+PARQUET_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+DUCKDB_AVAILABLE = importlib.util.find_spec('duckdb') is not None
+
+# Tabelas: execuções de backtest, trades de cada execução e eventos do executor ao vivo
+TABLES = ('runs', 'trades', 'events')
+# Coluna com a data de cada linha, que define a sua partição (a primeira presente)
+PARTITION_KEYS = {'runs': ('created_at',), 'trades': ('entry_time', 'exit_time'), 'events': ('time',)}
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class HistoryStore:
+    """
+    Histórico colunar de backtests e da operação ao vivo, em partições pela data de cada
+    linha (``time`` do evento, ``created_at`` da execução, entrada do trade):
+
+        <root>/<tabela>/date=AAAA-MM-DD/part-<id>.parquet   (ou .csv sem pyarrow)
+
+    As linhas ficam em buffer e são gravadas em lotes (``batch_size`` linhas ou
+    ``flush_seconds`` segundos); cada lote vira um arquivo novo, então vários
+    processos podem gravar no mesmo diretório sem coordenação. Ao vivo, ``start`` liga
+    uma thread de escrita e ``append`` só enfileira (nunca grava na thread de trading).
+
+    ``read`` devolve um DataFrame (com poda por data) e ``sql`` consulta as tabelas
+    com DuckDB (``SELECT ... FROM runs JOIN trades USING (run_id)``).
+    """
+
+    def __init__(self, root: str = 'history', batch_size: int = 5000, flush_seconds: float = 60.0,
+                 format: str = None):
+        self.root = root
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.format = format or ('parquet' if PARQUET_AVAILABLE else 'csv')
+        if self.format == 'parquet' and not PARQUET_AVAILABLE:
+            raise ImportError("Formato parquet requer o pacote pyarrow (pip install pyarrow).")
+        self._buffers = {table: [] for table in TABLES}
+        self._last_flush = time.monotonic()
+        self._parts = 0
+        self._lock = threading.Lock()        # Buffers (thread de trading)
+        self._write_lock = threading.Lock()  # Escrita em disco (nunca segurado por append)
+        self._wake = threading.Event()       # Lote cheio: acorda a thread de escrita
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Escrita ---
+
+    def append(self, table: str, rows: list):
+        with self._lock:
+            self._buffers[table].extend(rows)
+            pending = sum(len(rows) for rows in self._buffers.values())
+        if pending >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+            if self._thread is not None:
+                self._wake.set()  # Grava na thread de escrita
+            else:
+                self.flush()      # Backtest/otimização: sem thread, grava no próprio processo
+
+    def add_run(self, params: dict, metrics: dict, trades: list = (), source: str = 'backtest',
+                run_id: str = None) -> str:
+        """
+        Registra uma execução (parâmetros + métricas) e seus trades. Retorna o run_id.
+        ``run_id`` permite gravar os trades antes (em blocos) e a execução no final.
+        """
+        run_id = run_id or new_run_id()
+        row = {'run_id': run_id, 'created_at': pd.Timestamp.now(), 'source': source}
+        row.update(params)
+        row.update({k: v for k, v in metrics.items() if not isinstance(v, (dict, list))})
+        with self._lock:
+            self._buffers['trades'].extend(dict(trade, run_id=run_id) for trade in trades)
+        self.append('runs', [row])
+        return run_id
+
+    def add_event(self, event: str, **fields):
+        """Registra um evento ao vivo (sinal, rejeição, ordem, execução...)."""
+        self.append('events', [dict(fields, event=event, time=pd.Timestamp.now())])
+
+    def flush(self):
+        """Grava os buffers como novas partições (um lote que falhou por erro de E/S é regravado no próximo)."""
+        with self._write_lock:
+            with self._lock:
+                buffers = {table: rows for table, rows in self._buffers.items() if rows}
+                self._buffers = {table: [] for table in TABLES}
+                self._last_flush = time.monotonic()
+
+            for table, rows in buffers.items():
+                pending = []
+                try:
+                    df = pd.DataFrame(rows)
+                    pending = self._partitions(table, df)
+                    while pending:
+                        day, positions = pending[0]
+                        self._write(table, df.iloc[positions], day)
+                        pending.pop(0)
+                except OSError as e:
+                    # Disco cheio, permissão, rede...: as linhas não gravadas voltam para a frente do buffer
+                    unwritten = [rows[i] for _, positions in pending for i in positions]
+                    logger.error(f"Erro ao gravar {len(unwritten)} linhas em {table}: {e}. "
+                                 f"Nova tentativa no próximo flush.")
+                    with self._lock:
+                        self._buffers[table][:0] = unwritten
+                except Exception as e:
+                    # Linhas que não viram tabela (tipos inválidos) falhariam em todo flush: descartadas
+                    logger.error(f"Erro ao gravar {len(rows)} linhas em {table}: {e}. Linhas descartadas.")
+
+    @staticmethod
+    def _partitions(table: str, df: pd.DataFrame) -> list:
+        """Posições das linhas de cada dia (pela data da própria linha; sem data: hoje): [(AAAA-MM-DD, posições)]."""
+        today = f"{datetime.now():%Y-%m-%d}"
+        days = pd.Series(today, index=df.index)
+        for key in reversed(PARTITION_KEYS[table]):  # A primeira coluna presente prevalece
+            if key in df:
+                stamps = pd.to_datetime(df[key], errors='coerce')
+                days = stamps.dt.strftime('%Y-%m-%d').where(stamps.notna(), days)
+        return [(day, positions.tolist()) for day, positions in sorted(days.groupby(days.to_numpy()).indices.items())]
+
+    def _write(self, table: str, df: pd.DataFrame, day: str = None):
+        partition = os.path.join(self.root, table, f"date={day or f'{datetime.now():%Y-%m-%d}'}")
+        os.makedirs(partition, exist_ok=True)
+        self._parts += 1
+        name = f"part-{int(time.time() * 1000)}-{os.getpid()}-{self._parts}.{self.format}"
+        path = os.path.join(partition, name)
+        tmp = f"{path}.tmp"
+        if self.format == 'parquet':
+            df.to_parquet(tmp, index=False)
+        else:
+            df.to_csv(tmp, index=False)
+        os.replace(tmp, path)  # Leitores nunca veem um arquivo pela metade
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Qualquer erro só é registrado: a thread de escrita nunca morre em silêncio
+                logger.error(f"Erro ao gravar o histórico {self.root}: {e}")
+
+    def start(self):
+        """Liga a thread de escrita: a partir daqui ``append`` nunca grava na thread que o chama."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='HistoryStore', daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Para a thread de escrita (se houver) e grava o que restou no buffer."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join(timeout=5)
+        self.flush()
+
+    # --- Leitura ---
+
+    def files(self, table: str, start_date: str = None, end_date: str = None) -> list:
+        """Arquivos da tabela, podados pelas partições de data (AAAA-MM-DD, inclusive)."""
+        result = []
+        for partition in sorted(glob.glob(os.path.join(self.root, table, 'date=*'))):
+            day = partition.rsplit('date=', 1)[-1]
+            if (start_date and day < start_date) or (end_date and day > end_date):
+                continue
+            result.extend(sorted(glob.glob(os.path.join(partition, f'*.{self.format}'))))
+        return result
+
+    def read(self, table: str, start_date: str = None, end_date: str = None, columns: list = None) -> pd.DataFrame:
+        frames = []
+        for path in self.files(table, start_date, end_date):
+            if self.format == 'parquet':
+                frames.append(pd.read_parquet(path, columns=columns))
+            else:
+                frames.append(pd.read_csv(path, usecols=columns))
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def sql(self, query: str) -> pd.DataFrame:
+        """Executa SQL (DuckDB) sobre as tabelas runs, trades e events."""
+        if not DUCKDB_AVAILABLE:
+            raise ImportError("Consultas SQL requerem o pacote duckdb (pip install duckdb).")
+        import duckdb
+
+        reader = 'read_parquet' if self.format == 'parquet' else 'read_csv_auto'
+        con = duckdb.connect()
+        try:
+            for table in TABLES:
+                if self.files(table):
+                    pattern = os.path.join(self.root, table, 'date=*', f'*.{self.format}')
+                    con.execute(f"CREATE VIEW {table} AS SELECT * FROM {reader}('{pattern}', "
+                                f"hive_partitioning=true, union_by_name=true)")
+            return con.execute(query).df()
+        finally:
+            con.close()
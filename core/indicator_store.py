@@ -0,0 +1,90 @@
+# Arquivo: core/indicator_store.py
+
+import numpy as np
+import pandas as pd
+
+
+def read_only_column(data, name: str) -> np.ndarray:
+    """
+    Retorna a coluna ``name`` de um DataFrame ou MarketData como view somente leitura.
+    Nenhum dado é copiado e qualquer tentativa de escrita no input gera erro.
+    """
+    if isinstance(data, pd.DataFrame):
+        values = data[name].to_numpy()
+    else:
+        values = getattr(data, name)
+
+    view = values.view()
+    view.flags.writeable = False
+    return view
+
+
+class IndicatorStore:
+    """
+    Armazena as colunas de indicadores em arrays pré-alocados, separados dos dados
+    de entrada (que nunca são modificados).
+
+    O aquecimento dos indicadores é registrado em ``start_index`` (primeiro candle
+    com todos os valores válidos) em vez de remover linhas com NaN.
+    """
+
+    def __init__(self, length: int, dtype=np.float64):
+        self.length = length
+        self.dtype = np.dtype(dtype)
+        self.columns = {}
+        self.start_index = 0
+
+    def reset(self, length: int, dtype=None):
+        """Prepara o store para um novo cálculo, reaproveitando os buffers se o tamanho não mudou."""
+        dtype = self.dtype if dtype is None else np.dtype(dtype)
+        if length != self.length or dtype != self.dtype:
+            self.columns = {}
+        self.length = length
+        self.dtype = dtype
+        self.start_index = 0
+
+    def allocate(self, name: str) -> np.ndarray:
+        """Retorna o buffer de saída da coluna ``name`` (criado apenas na primeira vez)."""
+        buffer = self.columns.get(name)
+        if buffer is None:
+            buffer = np.empty(self.length, dtype=self.dtype)
+            self.columns[name] = buffer
+        return buffer
+
+    def discard(self, *names: str):
+        """Remove colunas que não foram recalculadas (evita ler valores de um ciclo anterior)."""
+        for name in names:
+            self.columns.pop(name, None)
+
+    def mark_warmup(self, bars: int):
+        """Registra que os primeiros ``bars`` candles ainda não têm o indicador completo."""
+        self.start_index = max(self.start_index, min(bars, self.length))
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __len__(self) -> int:
+        return self.length
+
+    def keys(self):
+        return self.columns.keys()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer.nbytes for buffer in self.columns.values())
+
+    def to_frame(self, data: pd.DataFrame = None, trim_warmup: bool = True) -> pd.DataFrame:
+        """
+        Monta um DataFrame com os indicadores (e as colunas de ``data``, se informado)
+        para consumidores que ainda trabalham com pandas. Só é chamado sob demanda.
+        """
+        start = self.start_index if trim_warmup else 0
+        frame = pd.DataFrame({name: buffer[start:] for name, buffer in self.columns.items()})
+        if data is not None:
+            source = data.iloc[start:]
+            frame.index = source.index
+            frame = pd.concat([source, frame], axis=1)
+        return frame
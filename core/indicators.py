@@ -5,83 +5,165 @@ import numpy as np
 from typing import List
 from utils.config import CONFIG
 from utils.logger import logger
+from core import kernels
+from core.indicator_store import IndicatorStore, read_only_column
 
 class TechnicalIndicators:
-    """Calcula todos os indicadores técnicos necessários para a análise do robô."""
+    """
+    Calcula todos os indicadores técnicos necessários para a análise do robô.
+
+    data: DataFrame OHLCV ou MarketData. É apenas lido (views somente leitura, sem cópia);
+    os resultados vão para ``self.store`` (IndicatorStore), que pode ser reaproveitado
+    entre chamadas para evitar novas alocações.
+
+    backend: 'pandas' (padrão, ewm/rolling do pandas) ou um backend de kernels
+    ('auto', 'numpy', 'numba') que calcula direto sobre arrays float64.
+    """
+
+    def __init__(self, data, backend: str = 'pandas', store: IndicatorStore = None):
+        self.data = data
+        self.backend = backend
+        self.use_kernels = backend != 'pandas'
+        if self.use_kernels:
+            kernels.resolve_backend(backend)  # Valida o nome do backend antes dos cálculos
+
+        close = read_only_column(data, 'close')
+        dtype = close.dtype if close.dtype in (np.float32, np.float64) else np.float64
+        if store is None:
+            store = IndicatorStore(len(close), dtype=dtype)
+        else:
+            store.reset(len(close), dtype=dtype)
+        self.store = store
+
+    def _column(self, name: str) -> np.ndarray:
+        return read_only_column(self.data, name)
+
+    def _series(self, name: str) -> pd.Series:
+        # Series sobre a view somente leitura (sem cópia) para o backend pandas
+        return pd.Series(self._column(name), copy=False)
+
+    def _write(self, name: str, values):
+        """Escreve um resultado do backend pandas no buffer pré-alocado da coluna."""
+        out = self.store.allocate(name)
+        out[:] = values
+        return out
 
-    def __init__(self, data: pd.DataFrame):
-        # A cópia evita modificar o DataFrame original que pode ser usado em outros lugares
-        self.data = data.copy()
-        
     def add_ema(self, periods: List[int]):
         """Calcula Média Móvel Exponencial (EMA) para Tendência."""
         for p in periods:
-            self.data[f'EMA_{p}'] = self.data['close'].ewm(span=p, adjust=False).mean()
+            if self.use_kernels:
+                kernels.ema(self._column('close'), p, out=self.store.allocate(f'EMA_{p}'), backend=self.backend)
+            else:
+                self._write(f'EMA_{p}', self._series('close').ewm(span=p, adjust=False).mean())
 
-    def add_atr(self, period: int = CONFIG.get('RISK.ATR_PERIOD', 14)):
+    def add_atr(self, period: int = None):
         """Calcula Average True Range (ATR) para Volatilidade e Stops Dinâmicos."""
-        high = self.data['high']
-        low = self.data['low']
-        close = self.data['close'].shift(1)
-        
+        if period is None:
+            # Lido na chamada (e não na importação do módulo) para não forçar a leitura do config.yaml
+            period = CONFIG.risk.atr_period
+
+        if self.use_kernels:
+            kernels.atr(
+                self._column('high'), self._column('low'), self._column('close'), period,
+                out=self.store.allocate(f'ATR_{period}'), backend=self.backend
+            )
+            return
+
+        high = self._series('high')
+        low = self._series('low')
+        close = self._series('close').shift(1)
+
         # True Range (TR)
         tr = pd.DataFrame({
             'tr1': high - low,
             'tr2': abs(high - close),
             'tr3': abs(low - close)
         }).max(axis=1)
-        
+
         # ATR (Média móvel exponencial do TR)
-        self.data[f'ATR_{period}'] = tr.ewm(span=period, adjust=False).mean()
+        self._write(f'ATR_{period}', tr.ewm(span=period, adjust=False).mean())
 
     def add_rsi(self, period: int = 14):
         """Calcula Relative Strength Index (RSI) para Força."""
-        delta = self.data['close'].diff()
+        if self.use_kernels:
+            kernels.rsi(self._column('close'), period, out=self.store.allocate('RSI'), backend=self.backend)
+            return
+
+        delta = self._series('close').diff()
         gain = (delta.where(delta > 0, 0)).ewm(span=period, adjust=False).mean()
         loss = (-delta.where(delta < 0, 0)).ewm(span=period, adjust=False).mean()
-        
+
         # Evita divisão por zero
-        rs = gain / loss.replace(0, 1e-10) 
-        self.data['RSI'] = 100 - (100 / (1 + rs))
+        rs = gain / loss.replace(0, 1e-10)
+        self._write('RSI', 100 - (100 / (1 + rs)))
 
     def add_macd(self, fast_period=12, slow_period=26, signal_period=9):
         """Calcula Moving Average Convergence Divergence (MACD) para Força/Momentum."""
-        ema_fast = self.data['close'].ewm(span=fast_period, adjust=False).mean()
-        ema_slow = self.data['close'].ewm(span=slow_period, adjust=False).mean()
-        self.data['MACD'] = ema_fast - ema_slow
-        self.data['MACD_Signal'] = self.data['MACD'].ewm(span=signal_period, adjust=False).mean()
-        self.data['MACD_Hist'] = self.data['MACD'] - self.data['MACD_Signal']
-        
+        if self.use_kernels:
+            out = (self.store.allocate('MACD'), self.store.allocate('MACD_Signal'), self.store.allocate('MACD_Hist'))
+            kernels.macd(self._column('close'), fast_period, slow_period, signal_period, out=out, backend=self.backend)
+            return
+
+        close = self._series('close')
+        ema_fast = close.ewm(span=fast_period, adjust=False).mean()
+        ema_slow = close.ewm(span=slow_period, adjust=False).mean()
+        macd = self._write('MACD', ema_fast - ema_slow)
+        signal = self._write('MACD_Signal', pd.Series(macd, copy=False).ewm(span=signal_period, adjust=False).mean())
+        np.subtract(macd, signal, out=self.store.allocate('MACD_Hist'))
+
     def add_bollinger_bands(self, period=20, stddev=2):
         """Calcula Bandas de Bollinger (BB) para Volatilidade/Desvio Estatístico."""
-        self.data['BB_Middle'] = self.data['close'].rolling(window=period).mean()
-        self.data['BB_StdDev'] = self.data['close'].rolling(window=period).std()
-        self.data['BB_Upper'] = self.data['BB_Middle'] + (self.data['BB_StdDev'] * stddev)
-        self.data['BB_Lower'] = self.data['BB_Middle'] - (self.data['BB_StdDev'] * stddev)
+        if self.use_kernels:
+            close = self._column('close')
+            middle = kernels.rolling_mean(close, period, out=self.store.allocate('BB_Middle'), backend=self.backend)
+            std = kernels.rolling_std(close, period, out=self.store.allocate('BB_StdDev'), backend=self.backend)
+        else:
+            close = self._series('close')
+            middle = self._write('BB_Middle', close.rolling(window=period).mean())
+            std = self._write('BB_StdDev', close.rolling(window=period).std())
+
+        upper = np.multiply(std, stddev, out=self.store.allocate('BB_Upper'))
+        upper += middle
+        lower = np.multiply(std, -stddev, out=self.store.allocate('BB_Lower'))
+        lower += middle
+        self.store.mark_warmup(period - 1)
 
     def add_volume_analysis(self, period=20):
         """Adiciona análise básica de volume (Média Móvel)."""
         # 'tick_volume' é o campo de volume do MT5
-        self.data['Volume_MA'] = self.data['tick_volume'].rolling(window=period).mean()
+        if self.use_kernels:
+            kernels.rolling_mean(self._column('tick_volume'), period, out=self.store.allocate('Volume_MA'), backend=self.backend)
+        else:
+            self._write('Volume_MA', self._series('tick_volume').rolling(window=period).mean())
+        self.store.mark_warmup(period - 1)
 
     def add_all_indicators(self) -> pd.DataFrame:
-        """Executa o cálculo de todos os indicadores e retorna o DataFrame enriquecido."""
-        
+        """
+        Executa o cálculo de todos os indicadores e retorna o DataFrame enriquecido, sem as
+        linhas de aquecimento (como o antigo ``dropna``). ``self.data`` não é modificado.
+        """
+        data = self.data if isinstance(self.data, pd.DataFrame) else self.data.to_dataframe()
+        return self.compute_all().to_frame(data)
+
+    def compute_all(self) -> IndicatorStore:
+        """
+        Executa o cálculo de todos os indicadores e retorna o IndicatorStore (sem montar DataFrame).
+        Use ``store.to_frame(data)`` se precisar do DataFrame enriquecido.
+        """
+
         # Tendência (EMAs definidas na config.yaml da Estratégia Trend-Following)
         self.add_ema([9, 21, 50])
-        
+
         # Volatilidade e Stop
         self.add_atr()
         self.add_bollinger_bands()
-        
+
         # Força e Momentum
         self.add_rsi()
         self.add_macd()
         self.add_volume_analysis() # Confirmação volumétrica
-        
-        # Remove as linhas iniciais que contêm valores NaN (quebra de indicador)
-        initial_length = len(self.data)
-        self.data.dropna(inplace=True)
-        logger.debug(f"Removidas {initial_length - len(self.data)} linhas com NaN após cálculo de indicadores.")
 
-        return self.data
\ No newline at end of file
+        # As linhas iniciais com NaN (quebra de indicador) não são removidas: o início válido fica em start_index
+        logger.debug(f"Aquecimento dos indicadores: {self.store.start_index} candles (start_index).")
+
+        return self.store
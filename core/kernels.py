@@ -0,0 +1,353 @@
+# Arquivo: core/kernels.py
+
+"""
+Kernels numéricos para as recursões dos indicadores (EMA, ATR, RSI, MACD,
+médias/desvios móveis e True Range) sobre arrays NumPy crus.
+
+Entradas float32 (modo compacto) são aceitas sem conversão, e todas as funções
+aceitam ``out`` para escrever em um array pré-alocado (float32 ou float64).
+
+Dois backends estão disponíveis:
+- 'numba': laços compilados com @njit (apenas se o pacote numba estiver instalado);
+- 'numpy': NumPy puro (fallback automático quando o compilador não existe).
+
+O backend pode ser escolhido por chamada (parâmetro ``backend``) ou globalmente
+com ``set_backend``. 'auto' usa numba quando disponível.
+"""
+
+import importlib.util
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.logger import logger
+
+# O numba só é importado (e os laços compilados) no primeiro uso do backend 'numba',
+# para não pesar na inicialização de processos que usam apenas NumPy.
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+_JIT_KERNELS = None
+
+BACKENDS = ('auto', 'numpy', 'numba')
+
+_default_backend = 'auto'
+
+
+def resolve_backend(backend: str = None) -> str:
+    """Converte o nome pedido ('auto', 'numpy', 'numba') no backend efetivo."""
+    name = (backend or _default_backend).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Backend de kernels desconhecido: {backend}. Opções: {BACKENDS}")
+
+    if name == 'auto':
+        return 'numba' if NUMBA_AVAILABLE else 'numpy'
+
+    if name == 'numba' and not NUMBA_AVAILABLE:
+        logger.warning("numba não está instalado. Usando backend NumPy puro para os indicadores.")
+        return 'numpy'
+
+    return name
+
+
+def set_backend(backend: str):
+    """Define o backend padrão usado quando nenhum é informado na chamada."""
+    global _default_backend
+    resolve_backend(backend)  # Valida o nome
+    _default_backend = backend.lower()
+
+
+def get_backend() -> str:
+    """Retorna o backend efetivo atualmente configurado."""
+    return resolve_backend(_default_backend)
+
+
+# --- LAÇOS DE REFERÊNCIA (compilados pelo numba quando disponível) ---
+
+def _ema_loop(values, alpha, out):
+    """EMA recursiva equivalente a pandas ewm(adjust=False): ignora NaNs iniciais."""
+    n = values.shape[0]
+    start = 0
+    while start < n and np.isnan(values[start]):
+        out[start] = np.nan
+        start += 1
+    if start == n:
+        return out
+
+    acc = values[start]
+    out[start] = acc
+    for i in range(start + 1, n):
+        x = values[i]
+        if not np.isnan(x):
+            acc = acc + alpha * (x - acc)
+        out[i] = acc
+    return out
+
+
+def _true_range_loop(high, low, close, out):
+    """True Range: max(H-L, |H-C[-1]|, |L-C[-1]|). O primeiro candle usa apenas H-L."""
+    n = high.shape[0]
+    if n == 0:
+        return out
+    out[0] = high[0] - low[0]
+    for i in range(1, n):
+        prev_close = close[i - 1]
+        tr = high[i] - low[i]
+        up = abs(high[i] - prev_close)
+        down = abs(low[i] - prev_close)
+        if up > tr:
+            tr = up
+        if down > tr:
+            tr = down
+        out[i] = tr
+    return out
+
+
+def _rolling_mean_loop(values, window, out):
+    """Média móvel simples em O(n), NaN até completar a janela."""
+    n = values.shape[0]
+    acc = 0.0
+    for i in range(n):
+        acc += values[i]
+        if i >= window:
+            acc -= values[i - window]
+        if i >= window - 1:
+            out[i] = acc / window
+        else:
+            out[i] = np.nan
+    return out
+
+
+def _rolling_std_loop(values, window, ddof, out):
+    """Desvio padrão móvel (ddof configurável) recalculado por janela para manter a precisão."""
+    n = values.shape[0]
+    for i in range(n):
+        if i < window - 1 or window - ddof <= 0:
+            out[i] = np.nan
+            continue
+        mean = 0.0
+        for j in range(i - window + 1, i + 1):
+            mean += values[j]
+        mean /= window
+        ss = 0.0
+        for j in range(i - window + 1, i + 1):
+            d = values[j] - mean
+            ss += d * d
+        out[i] = np.sqrt(ss / (window - ddof))
+    return out
+
+
+def _range_breaks_loop(prices, size, high, low, out):
+    """Marca (out=1) o tick que completa cada range bar; high/low: extremos do candle em formação (NaN = nenhum)."""
+    for i in range(prices.shape[0]):
+        p = prices[i]
+        if np.isnan(high):
+            high = p
+            low = p
+        elif p > high:
+            high = p
+        elif p < low:
+            low = p
+        if high - low >= size:
+            out[i] = 1
+            high = np.nan
+            low = np.nan
+        else:
+            out[i] = 0
+    return high, low
+
+
+def _volume_breaks_loop(volume, size, acc, out):
+    """Marca (out=1) o tick que completa cada volume bar; acc: volume do candle em formação."""
+    for i in range(volume.shape[0]):
+        acc += volume[i]
+        if acc >= size:
+            out[i] = 1
+            acc = 0.0
+        else:
+            out[i] = 0
+    return acc
+
+
+def _jit() -> dict:
+    """Compila (uma vez por processo) os laços com numba."""
+    global _JIT_KERNELS
+    if _JIT_KERNELS is None:
+        from numba import njit
+        _JIT_KERNELS = {
+            'ema': njit(cache=True)(_ema_loop),
+            'true_range': njit(cache=True)(_true_range_loop),
+            'rolling_mean': njit(cache=True)(_rolling_mean_loop),
+            'rolling_std': njit(cache=True)(_rolling_std_loop),
+            'range_breaks': njit(cache=True)(_range_breaks_loop),
+            'volume_breaks': njit(cache=True)(_volume_breaks_loop),
+        }
+    return _JIT_KERNELS
+
+
+# --- HELPERS ---
+
+def _as_float_array(values) -> np.ndarray:
+    """Mantém float32/float64 como estão (sem cópia); os demais tipos viram float64."""
+    values = np.asarray(values)
+    if values.dtype not in (np.float32, np.float64):
+        values = values.astype(np.float64)
+    return np.ascontiguousarray(values)
+
+
+def _prepare_out(out, n: int) -> np.ndarray:
+    # Sem ``out``, o resultado é float64 para não perder precisão nas recursões
+    if out is None:
+        return np.empty(n, dtype=np.float64)
+    if out.shape[0] != n:
+        raise ValueError(f"Array de saída com tamanho {out.shape[0]}, esperado {n}.")
+    return out
+
+
+def _ema_numpy(values: np.ndarray, alpha: float, out: np.ndarray) -> np.ndarray:
+    # A recursão não é vetorizável de forma estável; iterar sobre floats Python
+    # é bem mais rápido do que indexar o array elemento a elemento.
+    n = values.shape[0]
+    valid = np.flatnonzero(~np.isnan(values))
+    if valid.size == 0:
+        out[:] = np.nan
+        return out
+
+    start = int(valid[0])
+    out[:start] = np.nan
+    acc = float(values[start])
+    result = [acc]
+    append = result.append
+    for x in values[start + 1:].tolist():
+        if x == x:  # Ignora NaN sem chamar np.isnan
+            acc += alpha * (x - acc)
+        append(acc)
+    out[start:n] = result
+    return out
+
+
+# --- API PÚBLICA ---
+
+def ema(values, span: int, out: np.ndarray = None, backend: str = None) -> np.ndarray:
+    """Média Móvel Exponencial (equivalente a ``ewm(span=span, adjust=False).mean()``)."""
+    values = _as_float_array(values)
+    out = _prepare_out(out, values.shape[0])
+    alpha = 2.0 / (span + 1.0)
+
+    if resolve_backend(backend) == 'numba':
+        return _jit()['ema'](values, alpha, out)
+    return _ema_numpy(values, alpha, out)
+
+
+def true_range(high, low, close, out: np.ndarray = None, backend: str = None) -> np.ndarray:
+    """True Range sem DataFrame temporário."""
+    high = _as_float_array(high)
+    low = _as_float_array(low)
+    close = _as_float_array(close)
+    n = high.shape[0]
+    out = _prepare_out(out, n)
+
+    if resolve_backend(backend) == 'numba':
+        return _jit()['true_range'](high, low, close, out)
+
+    if n == 0:
+        return out
+    np.subtract(high, low, out=out)
+    prev_close = close[:-1]
+    np.maximum(out[1:], np.abs(high[1:] - prev_close), out=out[1:])
+    np.maximum(out[1:], np.abs(low[1:] - prev_close), out=out[1:])
+    return out
+
+
+def atr(high, low, close, period: int = 14, out: np.ndarray = None, backend: str = None) -> np.ndarray:
+    """Average True Range (EMA do True Range)."""
+    tr = true_range(high, low, close, backend=backend)
+    return ema(tr, period, out=out, backend=backend)
+
+
+def rsi(close, period: int = 14, out: np.ndarray = None, backend: str = None) -> np.ndarray:
+    """Relative Strength Index com médias exponenciais de ganhos e perdas."""
+    close = _as_float_array(close)
+    n = close.shape[0]
+    out = _prepare_out(out, n)
+
+    delta = np.zeros(n, dtype=np.float64)
+    if n > 1:
+        np.subtract(close[1:], close[:-1], out=delta[1:])
+    gain = ema(np.where(delta > 0, delta, 0.0), period, backend=backend)
+    loss = ema(np.where(delta < 0, -delta, 0.0), period, backend=backend)
+
+    # Evita divisão por zero (mesmo critério da versão pandas)
+    loss[loss == 0] = 1e-10
+    np.divide(gain, loss, out=out)
+    out += 1.0
+    np.divide(100.0, out, out=out)
+    np.subtract(100.0, out, out=out)
+    return out
+
+
+def macd(close, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9,
+         out: tuple = None, backend: str = None) -> tuple:
+    """Retorna (MACD, Sinal, Histograma). ``out`` é uma tupla opcional com os três arrays de saída."""
+    close = _as_float_array(close)
+    n = close.shape[0]
+    macd_out, signal_out, hist_out = out if out is not None else (None, None, None)
+
+    macd_line = ema(close, fast_period, out=_prepare_out(macd_out, n), backend=backend)
+    macd_line -= ema(close, slow_period, backend=backend)
+    signal = ema(macd_line, signal_period, out=signal_out, backend=backend)
+    hist = np.subtract(macd_line, signal, out=_prepare_out(hist_out, n))
+    return macd_line, signal, hist
+
+
+def rolling_mean(values, window: int, out: np.ndarray = None, backend: str = None) -> np.ndarray:
+    """Média móvel simples (NaN nas primeiras ``window - 1`` posições)."""
+    values = _as_float_array(values)
+    n = values.shape[0]
+    out = _prepare_out(out, n)
+
+    if resolve_backend(backend) == 'numba':
+        return _jit()['rolling_mean'](values, window, out)
+
+    out[:min(window - 1, n)] = np.nan
+    if n >= window:
+        np.mean(sliding_window_view(values, window), axis=1, out=out[window - 1:])
+    return out
+
+
+def rolling_std(values, window: int, ddof: int = 1, out: np.ndarray = None, backend: str = None) -> np.ndarray:
+    """Desvio padrão móvel (ddof=1, como ``rolling().std()`` do pandas)."""
+    values = _as_float_array(values)
+    n = values.shape[0]
+    out = _prepare_out(out, n)
+
+    if resolve_backend(backend) == 'numba':
+        return _jit()['rolling_std'](values, window, ddof, out)
+
+    if window - ddof <= 0:
+        out[:] = np.nan
+        return out
+    out[:min(window - 1, n)] = np.nan
+    if n >= window:
+        np.std(sliding_window_view(values, window), axis=1, ddof=ddof, out=out[window - 1:])
+    return out
+
+
+def range_breaks(prices, size: float, state: tuple = (np.nan, np.nan), out: np.ndarray = None,
+                 backend: str = None) -> tuple:
+    """
+    Fim de cada range bar (máxima - mínima >= ``size``) numa sequência de preços.
+    Retorna (marcas int8, novo estado) para continuar no próximo bloco de ticks.
+    """
+    prices = _as_float_array(prices)
+    out = out if out is not None else np.empty(prices.shape[0], dtype=np.int8)
+    loop = _jit()['range_breaks'] if resolve_backend(backend) == 'numba' else _range_breaks_loop
+    high, low = loop(prices, float(size), float(state[0]), float(state[1]), out)
+    return out, (float(high), float(low))
+
+
+def volume_breaks(volume, size: float, acc: float = 0.0, out: np.ndarray = None, backend: str = None) -> tuple:
+    """
+    Fim de cada volume bar (volume acumulado >= ``size``; o excedente não passa ao próximo).
+    Retorna (marcas int8, volume do candle em formação).
+    """
+    volume = _as_float_array(volume)
+    out = out if out is not None else np.empty(volume.shape[0], dtype=np.int8)
+    loop = _jit()['volume_breaks'] if resolve_backend(backend) == 'numba' else _volume_breaks_loop
+    return out, float(loop(volume, float(size), float(acc), out))
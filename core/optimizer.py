@@ -0,0 +1,152 @@
+# Arquivo: core/optimizer.py
+
+import os
+import itertools
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Union
+from utils.config import CONFIG, set_config
+from utils.logger import logger
+from utils.perf import peak_rss_mb
+from core.backtester import Backtester
+from core.data_loader import MarketData
+from core.history_store import HistoryStore
+from core.risk_engine import RiskEngine, ExposureBook
+from core.session_calendar import SessionCalendar
+from core.signal_index import SignalIndexCache, data_fingerprint, signal_key
+
+# Dados históricos do processo worker (enviados uma única vez pelo initializer)
+_WORKER_DATA = None
+_WORKER_OPTIONS = {}
+# Índices de sinais do worker: as combinações de SL/TP com as mesmas EMAs reaproveitam o índice
+_WORKER_SIGNALS = SignalIndexCache()
+_WORKER_DATA_KEY = ''
+
+
+def build_grid(ema_fast_list, ema_slow_list, sl_points_list, tp_points_list) -> List[dict]:
+    """Monta a grade de parâmetros, descartando combinações com EMA rápida >= lenta."""
+    return [
+        {'ema_fast': fast, 'ema_slow': slow, 'sl_points': sl, 'tp_points': tp}
+        for fast, slow, sl, tp in itertools.product(ema_fast_list, ema_slow_list, sl_points_list, tp_points_list)
+        if fast < slow
+    ]
+
+
+def _init_worker(data: MarketData, options: dict):
+    global _WORKER_DATA, _WORKER_OPTIONS, _WORKER_SIGNALS, _WORKER_DATA_KEY
+    _WORKER_DATA = data
+    _WORKER_OPTIONS = options
+    _WORKER_SIGNALS = SignalIndexCache(options.get('signal_cache'))
+    # Em disco a chave precisa identificar os dados; em memória o worker só vê este histórico
+    _WORKER_DATA_KEY = data_fingerprint(data) if options.get('signal_cache') else ''
+    # Configuração já interpretada pelo processo principal: o worker não relê o YAML
+    if options.get('config') is not None:
+        set_config(options['config'])
+
+
+def _run_single(params: dict) -> dict:
+    """Executa um backtest no worker e anexa o pico de memória do processo."""
+    risk_engine = None
+    if _WORKER_OPTIONS.get('risk_sizing'):
+        # Exposição própria por execução: as combinações da grade não compartilham risco
+        risk_engine = RiskEngine(params['sl_points'], params['tp_points'], book=ExposureBook())
+    session = _WORKER_OPTIONS.get('session')
+    tester = Backtester(_WORKER_DATA, backend=_WORKER_OPTIONS.get('backend'), risk_engine=risk_engine,
+                        session=session, trend_timeframe=_WORKER_OPTIONS.get('trend_timeframe'), **params)
+    # A chave inclui os filtros: índices em disco com outra confirmação não são reaproveitados
+    key = signal_key(_WORKER_DATA_KEY, params['ema_fast'], params['ema_slow'], pipeline=tester.confirmer.pipeline,
+                     session=session)
+    signal_index = _WORKER_SIGNALS.get(key)
+    if signal_index is not None:
+        tester.use_signal_index(signal_index)
+    metrics = tester.run()
+    if signal_index is None:
+        _WORKER_SIGNALS.put(key, tester.signal_index)
+    metrics['worker_pid'] = os.getpid()
+    metrics['peak_rss_mb'] = peak_rss_mb()
+    if _WORKER_OPTIONS.get('keep_trades'):
+        # Trades voltam ao processo principal, que grava o histórico (workers não gravam em disco)
+        metrics['trades'] = tester.trades
+    return metrics
+
+
+def worker_options(data: MarketData, backend: str = None, keep_trades: bool = False, risk_sizing: bool = False,
+                   session: SessionCalendar = None, signal_cache: str = None, trend_timeframe: str = None) -> dict:
+    """Opções enviadas aos workers junto com o histórico (configuração já interpretada, índice do pregão)."""
+    return {'backend': backend, 'config': CONFIG.to_dict() if CONFIG.is_loaded else None,
+            'keep_trades': keep_trades, 'risk_sizing': risk_sizing,
+            'session': session.index(data.time) if session is not None else None,
+            'signal_cache': signal_cache, 'trend_timeframe': trend_timeframe or None}
+
+
+def collect_results(grid: List[dict], results: List[dict], history: HistoryStore = None) -> pd.DataFrame:
+    """Grava as execuções no histórico (se houver) e monta o DataFrame de métricas na ordem da grade."""
+    if history is not None:
+        for params, metrics in zip(grid, results):
+            if 'trades' in metrics:
+                metrics['run_id'] = history.add_run(params, metrics, metrics.pop('trades'))
+        history.flush()
+
+    # Parâmetros da grade como colunas (superfícies e robustez no relatório)
+    df_results = pd.concat([pd.DataFrame(grid), pd.DataFrame(results)], axis=1)
+    log_worker_memory(df_results)
+    return df_results
+
+
+def run_optimization(data: Union[pd.DataFrame, MarketData], grid: List[dict], workers: int = 1,
+                     compact: bool = False, backend: str = None, history: HistoryStore = None,
+                     risk_sizing: bool = False, session: SessionCalendar = None, queue: str = None,
+                     sweep_id: str = None, signal_cache: str = None, chunksize: int = None,
+                     trend_timeframe: str = None) -> pd.DataFrame:
+    """
+    Roda o backtest para cada combinação da grade e retorna um DataFrame de métricas.
+
+    workers > 1 distribui as execuções em processos, ``chunksize`` combinações por envio (padrão:
+    ~4 envios por worker). No modo compacto (float32/int32) o histórico enviado a cada worker
+    ocupa metade da memória.
+
+    Com ``history`` cada execução (parâmetros, métricas e trades) é gravada no histórico
+    colunar e o DataFrame ganha a coluna ``run_id``. ``risk_sizing`` dimensiona os trades
+    com o RiskEngine (seção RISK do config) em vez do volume fixo de 1 contrato.
+    ``session`` aplica o calendário do pregão; o índice é calculado uma vez e compartilhado
+    por todas as combinações. ``trend_timeframe`` confirma a tendência no tempo gráfico maior
+    (STRATEGY.TREND_TIMEFRAME), como no backtest simples.
+
+    Cada worker guarda o índice de sinais (``SignalIndex``) de cada par de EMAs e o
+    reaproveita nas demais combinações de SL/TP; com ``signal_cache`` (diretório) os
+    índices ficam em disco e valem também para as próximas otimizações sobre os mesmos dados.
+
+    Com ``queue`` (diretório compartilhado) a grade vira uma fila de tarefas
+    (``core.work_queue``): este processo coordena, ``workers`` processos locais consomem e
+    workers em outras máquinas podem se juntar com ``python -m core.work_queue --queue <dir>``.
+    """
+    if not isinstance(data, MarketData):
+        data = MarketData.from_dataframe(data, compact=compact)
+    options = worker_options(data, backend, keep_trades=history is not None, risk_sizing=risk_sizing, session=session,
+                             signal_cache=signal_cache, trend_timeframe=trend_timeframe)
+
+    if queue is not None:
+        from core.work_queue import run_distributed
+        results = run_distributed(queue, data, grid, options, workers=workers, sweep_id=sweep_id)
+        return collect_results(grid, results, history)
+
+    logger.info(f"Otimização iniciada: {len(grid)} combinações, {workers} worker(s), "
+                f"histórico de {len(data)} candles ({data.nbytes / 1e6:.1f} MB, {data.price_dtype}).")
+
+    if workers <= 1:
+        _init_worker(data, options)
+        results = [_run_single(params) for params in grid]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data, options)) as pool:
+            chunksize = chunksize or max(1, len(grid) // (workers * 4))
+            results = list(pool.map(_run_single, grid, chunksize=chunksize))
+
+    return collect_results(grid, results, history)
+
+
+def log_worker_memory(df_results: pd.DataFrame):
+    """Reporta o pico de RSS de cada worker da otimização."""
+    if df_results.empty or 'worker_pid' not in df_results:
+        return
+    for pid, peak in df_results.groupby('worker_pid')['peak_rss_mb'].max().items():
+        logger.info(f"Worker {pid}: pico de memória (RSS) {peak:.1f} MB")
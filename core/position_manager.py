@@ -0,0 +1,190 @@
+# Arquivo: core/position_manager.py
+
+"""
+Gestão da posição aberta: break-even, trailing stop e saída parcial.
+
+As regras são as mesmas no robô e no backtest. Internamente os preços são normalizados
+pela direção (``x = preço`` na compra, ``x = -preço`` na venda), de modo que "a favor"
+é sempre "para cima": o stop só sobe, o melhor preço é um máximo corrente e o stop
+é atingido quando ``x <= stop``.
+
+- Ao vivo, ``update(preço)`` é chamado a cada tick e faz O(1) comparações (sem NumPy);
+- no backtest, ``stop_curve`` calcula o stop de um bloco inteiro de candles de uma vez
+  a partir do máximo acumulado (``np.maximum.accumulate``).
+
+As modificações de SL enviadas à corretora são agrupadas (``pending_stop``): só sai um
+``TRADE_ACTION_SLTP`` quando o stop andou pelo menos ``modify_step_points`` desde o
+último envio e passou ``modify_interval`` segundos; enquanto isso o robô protege a
+posição localmente com o stop mais recente.
+"""
+
+import numpy as np
+
+# Ações retornadas por ``update`` (bits combináveis)
+STOP_HIT = 1        # Preço atingiu o stop (original ou movido): fechar
+TAKE_PROFIT = 2     # Preço atingiu o alvo: fechar
+STOP_MOVED = 4      # Stop andou a favor (break-even ou trailing)
+PARTIAL_EXIT = 8    # Lucro da parcial atingido: realizar parte do volume
+
+
+class PositionManager:
+    """
+    Regras de gestão (em pontos, convertidos em preço por ``point``, o preço de 1 ponto do
+    ativo: 1.0 no backtest, o ``point`` do símbolo na corretora) e o estado da posição aberta.
+    Todas as regras em 0 = apenas SL/TP fixos (``enabled`` False).
+
+    - ``break_even_points``: lucro (pela máxima excursão a favor) que move o stop para a
+      entrada + ``break_even_offset`` pontos;
+    - ``trailing_points``: distância do stop ao melhor preço, a partir de
+      ``trailing_start_points`` de lucro;
+    - ``partial_points``: lucro que realiza ``partial_fraction`` do volume (uma vez).
+    """
+
+    def __init__(self, break_even_points: int = 0, break_even_offset: int = 0, trailing_points: int = 0,
+                 trailing_start_points: int = 0, partial_points: int = 0, partial_fraction: float = 0.5,
+                 point: float = 1.0, modify_step_points: int = 1, modify_interval: float = 0.0):
+        if not 0 < partial_fraction < 1:
+            raise ValueError(f"partial_fraction deve estar entre 0 e 1 (recebido {partial_fraction}).")
+        self.break_even = break_even_points * point
+        self.break_even_offset = break_even_offset * point
+        self.trailing = trailing_points * point
+        self.trailing_start = trailing_start_points * point
+        self.partial = partial_points * point
+        self.point = point
+        self.partial_fraction = partial_fraction
+        self.modify_step = max(modify_step_points, 0) * point
+        self.modify_interval = modify_interval
+
+        self.active = False
+        self.direction = 1
+        self.entry = self.stop = self.target = self.best = 0.0
+        self.moved = False
+        self.partial_done = False
+        self._sent_stop = 0.0
+        self._sent_at = float('-inf')
+
+    @classmethod
+    def from_settings(cls, settings, point: float = 1.0) -> 'PositionManager':
+        """Regras a partir da seção MANAGEMENT do config (``ManagementSettings``)."""
+        return cls(break_even_points=settings.break_even_points, break_even_offset=settings.break_even_offset,
+                   trailing_points=settings.trailing_points, trailing_start_points=settings.trailing_start_points,
+                   partial_points=settings.partial_points, partial_fraction=settings.partial_fraction,
+                   point=point, modify_step_points=settings.modify_step_points,
+                   modify_interval=settings.modify_interval_seconds)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.break_even or self.trailing or self.partial)
+
+    @property
+    def moves_stop(self) -> bool:
+        return bool(self.break_even or self.trailing)
+
+    # --- Estado da posição (ao vivo) ---
+
+    def open(self, trade_type: str, entry_price: float, sl_price: float, tp_price: float):
+        """Começa a acompanhar uma posição (o stop inicial é o que a corretora já tem)."""
+        d = 1 if trade_type == "BUY" else -1
+        self.direction = d
+        # Sem SL/TP na corretora (0.0): nível inalcançável
+        self.entry = d * entry_price
+        self.stop = d * sl_price if sl_price else float('-inf')
+        self.target = d * tp_price if tp_price else float('inf')
+        self.best = self.entry
+        self.moved = False
+        self.partial_done = False
+        self._sent_stop = self.stop
+        self._sent_at = float('-inf')
+        self.active = True
+
+    def close(self):
+        self.active = False
+
+    def inherit(self, other: 'PositionManager'):
+        """Continua a posição acompanhada por ``other`` (novas regras no hot reload do config)."""
+        if other.active:
+            for name in ('active', 'direction', 'entry', 'stop', 'target', 'best', 'moved', 'partial_done',
+                         '_sent_stop', '_sent_at'):
+                setattr(self, name, getattr(other, name))
+
+    def sync(self, sl_price: float):
+        """Adota o SL da corretora se ele for mais apertado que o local (ex.: movido no terminal)."""
+        x = self.direction * sl_price
+        if sl_price and x > self.stop:
+            self.stop = x
+            self._sent_stop = x
+
+    def stop_level(self, best: float) -> float:
+        """Stop (normalizado) para o melhor preço ``best``: nunca abaixo do stop atual."""
+        level = self.stop
+        profit = best - self.entry
+        if self.break_even and profit >= self.break_even:
+            level = max(level, self.entry + self.break_even_offset)
+        if self.trailing and profit >= self.trailing_start:
+            level = max(level, best - self.trailing)
+        return level
+
+    def update(self, price: float) -> int:
+        """
+        Um tick: confere stop e alvo contra os níveis vigentes e, se a posição segue aberta,
+        atualiza melhor preço, stop e parcial. Retorna os bits das ações (0 = nada a fazer).
+        """
+        x = self.direction * price
+        if x <= self.stop:
+            return STOP_HIT
+        if x >= self.target:
+            return TAKE_PROFIT
+        if x <= self.best:
+            return 0
+        self.best = x
+        actions = 0
+        level = self.stop_level(x)
+        if level > self.stop:
+            self.stop = level
+            self.moved = True
+            actions |= STOP_MOVED
+        if self.partial and not self.partial_done and x - self.entry >= self.partial:
+            self.partial_done = True
+            actions |= PARTIAL_EXIT
+        return actions
+
+    @property
+    def stop_price(self) -> float:
+        return self.direction * self.stop
+
+    @property
+    def exit_reason(self) -> str:
+        return "STOP_MOVEL" if self.moved else "SL"
+
+    # --- Envio agrupado das modificações ---
+
+    def pending_stop(self, now: float):
+        """Preço do SL a enviar agora (ou None): o stop andou o passo mínimo e o intervalo passou."""
+        if self.stop - self._sent_stop < max(self.modify_step, 1e-12) or now - self._sent_at < self.modify_interval:
+            return None
+        return self.stop_price
+
+    def stop_sent(self, sl_price: float, now: float):
+        self._sent_stop = self.direction * sl_price
+        self._sent_at = now
+
+    def stop_failed(self, now: float):
+        """Modificação recusada: só tenta de novo depois do intervalo mínimo."""
+        self._sent_at = now
+
+    def partial_volume(self, volume: float, step: float = 1.0) -> float:
+        """Volume da parcial arredondado ao lote (0 se não sobra volume para manter a posição)."""
+        partial = np.floor(volume * self.partial_fraction / step) * step
+        return float(partial) if 0 < partial < volume else 0.0
+
+    # --- Backtest vetorizado ---
+
+    def stop_curve(self, entry: float, stop: float, best: np.ndarray) -> np.ndarray:
+        """``stop_level`` para um array de melhores preços (normalizados), a partir de ``stop``."""
+        level = np.full(best.shape, stop, dtype=np.float64)
+        profit = best - entry
+        if self.break_even:
+            np.maximum(level, np.where(profit >= self.break_even, entry + self.break_even_offset, -np.inf), out=level)
+        if self.trailing:
+            np.maximum(level, np.where(profit >= self.trailing_start, best - self.trailing, -np.inf), out=level)
+        return level
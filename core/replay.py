@@ -0,0 +1,126 @@
+# Arquivo: core/replay.py
+
+"""
+Replay acelerado do executor ao vivo.
+
+Roda o mesmo ``TradeExecutor.start_loop`` de produção sobre um histórico gravado:
+o ``mt5.simulator`` substitui o terminal e o ``ReplayClock`` substitui o ``time.sleep``
+do loop, avançando o histórico pelo intervalo simulado. Um mês de candles roda em minutos.
+"""
+
+import time
+import logging
+import numpy as np
+from typing import Union
+import pandas as pd
+from utils.config import CONFIG
+from utils.clock import ClockStopped
+from utils.logger import logger
+from core.data_loader import MarketData
+
+
+class ReplayClock:
+    """
+    Relógio do replay: ``sleep(s)`` avança ``s`` segundos de tempo simulado no simulador.
+
+    ``speed`` (ex.: 100 a 10000) faz o loop esperar ``s / speed`` segundos reais;
+    ``None`` roda o mais rápido possível. Também mede o tempo de CPU de cada ciclo
+    (do fim de um ``sleep`` ao início do próximo).
+    """
+
+    def __init__(self, simulator, speed: float = None):
+        self.simulator = simulator
+        self.speed = speed
+        self._now = float(simulator.now)
+        self.cycle_cpu = []
+        self._cycle_start = time.process_time()
+
+    def now(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float):
+        self.cycle_cpu.append(time.process_time() - self._cycle_start)
+
+        self._now += seconds
+        opened = self.simulator.advance_to(self._now)
+        if opened == 0 and self.simulator.finished():
+            raise ClockStopped()
+
+        if self.speed:
+            time.sleep(seconds / self.speed)
+        self._cycle_start = time.process_time()
+
+
+def run_replay(history: Union[pd.DataFrame, MarketData], symbol: str = None, speed: float = None,
+               check_interval: float = None, window: int = 300, log_level: int = logging.WARNING) -> dict:
+    """
+    Executa o loop real do TradeExecutor sobre ``history`` e retorna as métricas do replay.
+
+    ``window`` candles iniciais servem de aquecimento dos indicadores (o primeiro ciclo
+    já busca ``window`` candles). ``check_interval`` sobrepõe o EXECUTION.CHECK_INTERVAL_SECONDS.
+    """
+    from mt5.simulator import SimulatedMT5, install, uninstall
+    from mt5.mt5_connector import MT5Connector, resolve_timeframe
+    from mt5.broker import MT5Broker
+    from core.trade_executor import TradeExecutor
+
+    symbol = symbol or CONFIG.global_.symbol
+    timeframe_name = CONFIG.global_.timeframe
+
+    sim = SimulatedMT5(login=1, password='replay', server='REPLAY')
+    previous_level = logger.level
+    install(sim)
+    try:
+        timeframe = resolve_timeframe(timeframe_name)
+        sim.add_symbol(symbol, history, timeframe=timeframe, start=window - 1)
+        bars = len(sim.feeds[symbol].data) - window + 1
+        start_time = sim.now
+
+        connector = MT5Connector(login=1, password='replay', server='REPLAY')
+        connector.retry_delay = 0
+        clock = ReplayClock(sim, speed=speed)
+        executor = TradeExecutor(symbol=symbol, timeframe=timeframe_name, broker=MT5Broker(connector), clock=clock)
+        if check_interval is not None:
+            executor.check_interval = check_interval
+
+        logger.setLevel(log_level)  # O log por ciclo dominaria o tempo do replay
+        start_wall = time.perf_counter()
+        executor.start_loop()
+        wall = time.perf_counter() - start_wall
+    finally:
+        logger.setLevel(previous_level)
+        uninstall()
+
+    cpu_ms = np.asarray(clock.cycle_cpu) * 1000
+    closed = [d.profit for d in sim.deals if d.entry == sim.DEAL_ENTRY_OUT]
+    simulated = clock.now() - start_time
+    return {
+        'cycles': len(cpu_ms),
+        'api_calls_per_cycle': sim.calls / len(cpu_ms) if len(cpu_ms) else 0.0,
+        'bars': bars,
+        'simulated_seconds': simulated,
+        'wall_seconds': wall,
+        'speedup': simulated / wall if wall > 0 else float('inf'),
+        'cpu_ms_mean': float(cpu_ms.mean()) if len(cpu_ms) else 0.0,
+        'cpu_ms_p50': float(np.percentile(cpu_ms, 50)) if len(cpu_ms) else 0.0,
+        'cpu_ms_p99': float(np.percentile(cpu_ms, 99)) if len(cpu_ms) else 0.0,
+        'cpu_ms_max': float(cpu_ms.max()) if len(cpu_ms) else 0.0,
+        'total_trades': len(closed),
+        'net_profit': float(sum(closed)),
+        'win_rate': 100.0 * sum(p > 0 for p in closed) / len(closed) if closed else 0.0,
+    }
+
+
+def log_report(report: dict):
+    """Imprime o relatório do replay no log."""
+    logger.critical("================================================")
+    logger.critical("⏩ REPLAY DO EXECUTOR AO VIVO ⏩")
+    logger.critical(f"Ciclos: {report['cycles']} | Candles: {report['bars']} | "
+                    f"Tempo simulado: {report['simulated_seconds'] / 3600:.1f} h em {report['wall_seconds']:.1f} s "
+                    f"({report['speedup']:.0f}x)")
+    logger.critical(f"CPU por ciclo: média {report['cpu_ms_mean']:.3f} ms | p50 {report['cpu_ms_p50']:.3f} ms | "
+                    f"p99 {report['cpu_ms_p99']:.3f} ms | máx {report['cpu_ms_max']:.3f} ms | "
+                    f"chamadas ao MT5: {report['api_calls_per_cycle']:.1f}/ciclo")
+    logger.critical(f"Trades: {report['total_trades']} | Lucro Líquido: R$ {report['net_profit']:.2f} | "
+                    f"Win Rate: {report['win_rate']:.2f}%")
+    logger.critical("================================================")
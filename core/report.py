@@ -0,0 +1,230 @@
+# Arquivo: core/report.py
+
+import os
+import html
+import time
+import warnings
+import importlib.util
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Iterable, Sequence
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.logger import logger
+
+# matplotlib/seaborn só para o PNG: sem eles o relatório HTML continua sendo gerado
+MATPLOTLIB_AVAILABLE = importlib.util.find_spec('matplotlib') is not None
+SEABORN_AVAILABLE = importlib.util.find_spec('seaborn') is not None
+
+# Pares de parâmetros das superfícies (eixo x, eixo y)
+PARAMETER_PAIRS = (('ema_fast', 'ema_slow'), ('sl_points', 'tp_points'))
+PARAMETERS = ('ema_fast', 'ema_slow', 'sl_points', 'tp_points')
+
+# Escala de cores vermelho -> amarelo -> verde (pior -> melhor)
+_COLOR_STOPS = np.array([[215, 48, 39], [254, 224, 139], [26, 152, 80]], dtype=np.float64)
+
+_report_executor = None
+
+
+def _finite(values: pd.Series) -> pd.Series:
+    """Métrica com infinitos como NaN (ex.: profit factor sem nenhuma perda)."""
+    return pd.to_numeric(values, errors='coerce').replace([np.inf, -np.inf], np.nan)
+
+
+def surface(results: pd.DataFrame, x: str, y: str, metric: str = 'profit_factor', agg: str = 'median') -> pd.DataFrame:
+    """Superfície da métrica: linhas = valores de ``y``, colunas = valores de ``x`` (agregando os demais parâmetros)."""
+    values = _finite(results[metric])
+    return values.groupby([results[y], results[x]]).agg(agg).unstack(x).sort_index().sort_index(axis=1)
+
+
+def neighborhood_stats(grid: np.ndarray, radius: int = 1) -> tuple:
+    """
+    Média, desvio e mínimo de cada célula e das vizinhas (até ``radius`` passos em todos os
+    eixos), de uma vez para a grade inteira. Células sem valor (NaN) são ignoradas.
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    size = 2 * radius + 1
+    windows = sliding_window_view(np.pad(grid, radius, constant_values=np.nan), (size,) * grid.ndim)
+    axes = tuple(range(grid.ndim, 2 * grid.ndim))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # Janelas só com NaN
+        mean = np.nanmean(windows, axis=axes)
+        std = np.nanstd(windows, axis=axes)
+        low = np.nanmin(windows, axis=axes)
+    missing = np.isnan(grid)
+    for array in (mean, std, low):
+        array[missing] = np.nan
+    return mean, std, low
+
+
+def robustness_scores(results: pd.DataFrame, params: Sequence[str] = PARAMETERS, metric: str = 'profit_factor',
+                      radius: int = 1) -> pd.DataFrame:
+    """
+    Robustez de cada execução pelas combinações vizinhas na grade de ``params``:
+    ``robust_score`` = média da vizinhança - desvio da vizinhança. Um pico isolado (vizinhos
+    ruins) pontua menos que um platô de resultados bons.
+    """
+    axes = [np.unique(results[param].to_numpy()) for param in params]
+    position = tuple(np.searchsorted(axis, results[param].to_numpy()) for axis, param in zip(axes, params))
+    values = _finite(results[metric]).to_numpy(dtype=np.float64)
+
+    # Grade densa (combinações ausentes = NaN); execuções repetidas na mesma célula viram a média
+    shape = tuple(len(axis) for axis in axes)
+    total, count = np.zeros(shape), np.zeros(shape)
+    valid = ~np.isnan(values)
+    cell = tuple(p[valid] for p in position)
+    np.add.at(total, cell, values[valid])
+    np.add.at(count, cell, 1)
+    with np.errstate(invalid='ignore'):
+        grid = total / count
+
+    mean, std, low = neighborhood_stats(grid, radius)
+    return pd.DataFrame({
+        'neighbors_mean': mean[position],
+        'neighbors_min': low[position],
+        'robust_score': (mean - std)[position],
+    }, index=results.index)
+
+
+def sensitivity(results: pd.DataFrame, params: Sequence[str] = PARAMETERS, metric: str = 'profit_factor') -> pd.DataFrame:
+    """Mediana da métrica por valor de cada parâmetro e a amplitude relativa (quanto a métrica depende dele)."""
+    values = _finite(results[metric])
+    rows = []
+    for param in params:
+        medians = values.groupby(results[param]).median()
+        center = abs(medians.median()) or 1.0
+        best = medians.idxmax() if medians.notna().any() else None
+        rows.append({'parameter': param, 'values': len(medians), 'best_value': best,
+                     'spread': (medians.max() - medians.min()) / center})
+    return pd.DataFrame(rows)
+
+
+# --- HTML (sem dependências) ---
+
+def _colors(values: np.ndarray) -> np.ndarray:
+    """Cor hexadecimal de cada valor (normalizado entre o mínimo e o máximo)."""
+    values = np.asarray(values, dtype=np.float64)
+    finite = values[np.isfinite(values)]
+    low, high = (finite.min(), finite.max()) if finite.size else (0.0, 1.0)
+    scale = np.clip((values - low) / ((high - low) or 1.0), 0, 1) * (len(_COLOR_STOPS) - 1)
+    left = np.minimum(np.floor(np.nan_to_num(scale)).astype(int), len(_COLOR_STOPS) - 2)
+    frac = (np.nan_to_num(scale) - left)[..., None]
+    rgb = (_COLOR_STOPS[left] * (1 - frac) + _COLOR_STOPS[left + 1] * frac).round().astype(int)
+    hexes = np.array([f'#{r:02x}{g:02x}{b:02x}' for r, g, b in rgb.reshape(-1, 3)]).reshape(values.shape)
+    return np.where(np.isnan(values), '#eeeeee', hexes)
+
+
+def _heatmap_html(table: pd.DataFrame, title: str) -> str:
+    values = table.to_numpy(dtype=np.float64)
+    colors = _colors(values)
+    header = ''.join(f'<th>{html.escape(str(c))}</th>' for c in table.columns)
+    body = []
+    for row_label, row_values, row_colors in zip(table.index, values, colors):
+        cells = ''.join(f'<td style="background:{color}">{"" if np.isnan(v) else f"{v:.2f}"}</td>'
+                        for v, color in zip(row_values, row_colors))
+        body.append(f'<tr><th>{html.escape(str(row_label))}</th>{cells}</tr>')
+    corner = f'{html.escape(str(table.index.name))} \\ {html.escape(str(table.columns.name))}'
+    return (f'<div class="map"><h3>{html.escape(title)}</h3><table class="heat">'
+            f'<tr><th>{corner}</th>{header}</tr>{"".join(body)}</table></div>')
+
+
+_STYLE = """
+body { font-family: sans-serif; margin: 24px; color: #222; }
+.map { display: inline-block; vertical-align: top; margin: 0 24px 24px 0; }
+table { border-collapse: collapse; font-size: 12px; }
+td, th { border: 1px solid #ccc; padding: 3px 6px; text-align: right; }
+table.heat td { min-width: 42px; }
+"""
+
+
+def render_html(results: pd.DataFrame, metric: str = 'profit_factor', pairs: Iterable = PARAMETER_PAIRS,
+                params: Sequence[str] = PARAMETERS, top: int = 20) -> str:
+    """Relatório HTML estático: superfícies da métrica e da robustez, sensibilidade e ranking."""
+    sections = [f'<h1>Sensibilidade de parâmetros — {html.escape(metric)}</h1>',
+                f'<p>{len(results)} execuções. Robustez = média - desvio das combinações vizinhas.</p>']
+    for x, y in pairs:
+        sections.append(f'<h2>{html.escape(x)} × {html.escape(y)}</h2>')
+        sections.append(_heatmap_html(surface(results, x, y, metric), f'{metric} (mediana)'))
+        sections.append(_heatmap_html(surface(results, x, y, 'robust_score'), 'robust_score (mediana)'))
+
+    sections.append('<h2>Sensibilidade por parâmetro</h2>')
+    sections.append(sensitivity(results, params, metric).to_html(index=False, float_format='{:.3f}'.format))
+
+    columns = [c for c in (*params, metric, 'robust_score', 'neighbors_min', 'net_profit', 'total_trades', 'win_rate')
+               if c in results.columns]
+    ranking = results.sort_values('robust_score', ascending=False, na_position='last').head(top)[columns]
+    sections.append(f'<h2>Top {top} por robustez</h2>')
+    sections.append(ranking.to_html(index=False, float_format='{:.2f}'.format))
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Relatório de otimização</title>'
+            f'<style>{_STYLE}</style></head><body>{"".join(sections)}</body></html>')
+
+
+# --- PNG (matplotlib/seaborn opcionais, sem interface gráfica) ---
+
+def render_png(results: pd.DataFrame, path: str, metric: str = 'profit_factor', pairs: Iterable = PARAMETER_PAIRS):
+    """
+    Todas as superfícies numa única figura (uma linha por par: métrica e robustez), salva
+    de uma vez. Usa a API orientada a objetos (Figure), sem pyplot nem backend de janela.
+    """
+    from matplotlib.figure import Figure
+    pairs = list(pairs)
+    figure = Figure(figsize=(12, 5 * len(pairs)), layout='constrained')
+    axes = figure.subplots(len(pairs), 2, squeeze=False)
+    for row, (x, y) in enumerate(pairs):
+        for ax, column in zip(axes[row], (metric, 'robust_score')):
+            table = surface(results, x, y, column)
+            if SEABORN_AVAILABLE:
+                import seaborn
+                seaborn.heatmap(table, ax=ax, cmap='RdYlGn', annot=table.size <= 400, fmt='.2f')
+            else:
+                image = ax.imshow(table.to_numpy(dtype=np.float64), cmap='RdYlGn', aspect='auto', origin='lower')
+                ax.set_xticks(range(table.shape[1]), [str(c) for c in table.columns])
+                ax.set_yticks(range(table.shape[0]), [str(i) for i in table.index])
+                figure.colorbar(image, ax=ax)
+            ax.set_title(f'{column}: {x} × {y}')
+            ax.set_xlabel(x)
+            ax.set_ylabel(y)
+    figure.savefig(path, dpi=100)
+
+
+def write_report(results: pd.DataFrame, directory: str = 'reports', metric: str = 'profit_factor',
+                 pairs: Iterable = PARAMETER_PAIRS, params: Sequence[str] = PARAMETERS, png: bool = True) -> dict:
+    """
+    Calcula a robustez de cada execução e grava ``report.html`` (sempre), ``heatmaps.png``
+    (com matplotlib) e ``results.csv`` em ``directory``. Retorna os caminhos gravados.
+    """
+    start = time.perf_counter()
+    pairs = list(pairs)
+    params = [p for p in params if p in results.columns]
+    results = pd.concat([results.drop(columns=['neighbors_mean', 'neighbors_min', 'robust_score'], errors='ignore'),
+                         robustness_scores(results, params, metric)], axis=1)
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+
+    paths['html'] = os.path.join(directory, 'report.html')
+    with open(paths['html'], 'w', encoding='utf-8') as f:
+        f.write(render_html(results, metric, pairs, params))
+
+    paths['csv'] = os.path.join(directory, 'results.csv')
+    results.drop(columns=['params'], errors='ignore').to_csv(paths['csv'], index=False)
+
+    if png:
+        if MATPLOTLIB_AVAILABLE:
+            paths['png'] = os.path.join(directory, 'heatmaps.png')
+            render_png(results, paths['png'], metric, pairs)
+        else:
+            logger.warning("matplotlib não instalado: relatório gerado apenas em HTML.")
+
+    logger.info(f"📊 Relatório de {len(results)} execuções gravado em {directory} ({time.perf_counter() - start:.1f} s).")
+    return paths
+
+
+def submit_report(results: pd.DataFrame, directory: str = 'reports', **kwargs) -> Future:
+    """
+    Gera o relatório numa thread de fundo (uma por vez) e retorna o Future: o processo
+    principal e os workers da otimização seguem sem esperar a renderização.
+    """
+    global _report_executor
+    if _report_executor is None:
+        _report_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report')
+    return _report_executor.submit(write_report, results.copy(), directory, **kwargs)
@@ -0,0 +1,235 @@
+# Arquivo: core/resampler.py
+
+import numpy as np
+from typing import Dict, Iterable
+from core import kernels
+from core.data_loader import MarketData, COLUMNS
+
+# Duração de cada timeframe em segundos
+TIMEFRAMES = {
+    'M1': 60, 'M5': 300, 'M15': 900, 'M30': 1800,
+    'H1': 3600, 'H4': 14400, 'D1': 86400,
+}
+
+# Constantes MT5 (mt5.TIMEFRAME_*) -> nome
+_MT5_CONSTANTS = {1: 'M1', 5: 'M5', 15: 'M15', 30: 'M30', 16385: 'H1', 16388: 'H4', 16408: 'D1'}
+
+
+def timeframe_seconds(timeframe) -> int:
+    """Segundos de um timeframe: 'H1', 'MT5.TIMEFRAME_H1', 'TIMEFRAME_H1' ou a constante MT5 (16385)."""
+    if isinstance(timeframe, (int, np.integer)):
+        if int(timeframe) not in _MT5_CONSTANTS:
+            raise ValueError(f"Constante de timeframe MT5 desconhecida: {timeframe}")
+        timeframe = _MT5_CONSTANTS[int(timeframe)]
+    name = str(timeframe).rsplit('TIMEFRAME_', 1)[-1].upper()
+    if name not in TIMEFRAMES:
+        raise ValueError(f"Timeframe desconhecido: {timeframe}. Use um de {', '.join(TIMEFRAMES)}.")
+    return TIMEFRAMES[name]
+
+
+def infer_seconds(time: np.ndarray) -> int:
+    """Timeframe dos candles pelo intervalo mais comum (robusto a lacunas entre sessões)."""
+    if len(time) < 2:
+        return TIMEFRAMES['M1']
+    diffs = np.diff(np.asarray(time, dtype=np.int64))
+    diffs = diffs[diffs > 0]
+    return int(np.median(diffs)) if diffs.size else TIMEFRAMES['M1']
+
+
+# --- MODO HISTÓRICO (vetorizado) ---
+
+def resample(data: MarketData, timeframe) -> MarketData:
+    """
+    Agrega candles em um timeframe maior numa única passada (``reduceat``), sem DataFrame.
+    O tempo de cada candle agregado é a abertura do período (como no MT5).
+    """
+    seconds = timeframe_seconds(timeframe)
+    bucket = (np.asarray(data.time, dtype=np.int64) // seconds) * seconds
+    if bucket.size == 0:
+        return MarketData(*(getattr(data, column)[:0] for column in COLUMNS), symbol=data.symbol)
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], bucket.size] - 1
+    return MarketData(
+        time=bucket[starts],
+        open=data.open[starts],
+        high=np.maximum.reduceat(data.high, starts),
+        low=np.minimum.reduceat(data.low, starts),
+        close=data.close[ends],
+        tick_volume=np.add.reduceat(data.tick_volume, starts),
+        symbol=data.symbol,
+    )
+
+
+def resample_many(data: MarketData, timeframes: Iterable) -> Dict[str, MarketData]:
+    """
+    Gera vários timeframes em cascata (M1 -> M5 -> M15 -> H1 -> D1): cada nível agrega o
+    anterior, então o custo total fica próximo de uma única passada sobre os dados de base.
+    """
+    result = {}
+    source, source_seconds = data, infer_seconds(data.time)
+    for name in sorted(timeframes, key=timeframe_seconds):
+        seconds = timeframe_seconds(name)
+        # Só reaproveita o nível anterior se os períodos forem múltiplos (M15 -> H1 sim; M30 -> H4 sim)
+        base = source if seconds % source_seconds == 0 else data
+        result[name] = resample(base, name)
+        source, source_seconds = result[name], seconds
+    return result
+
+
+def align(htf: MarketData, values, base_time, timeframe, base_seconds: int = None) -> np.ndarray:
+    """
+    Projeta ``values`` (um por candle de ``htf``) nos candles de base sem lookahead: cada
+    candle de base vê apenas o último candle maior já FECHADO no fechamento dele.
+    Antes do primeiro candle maior fechado o valor é NaN.
+    """
+    seconds = timeframe_seconds(timeframe)
+    base_time = np.asarray(base_time, dtype=np.int64)
+    if base_seconds is None:
+        base_seconds = infer_seconds(base_time)
+
+    htf_close_time = np.asarray(htf.time, dtype=np.int64) + seconds
+    index = np.searchsorted(htf_close_time, base_time + base_seconds, side='right') - 1
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(base_time.shape[0], np.nan)
+    valid = index >= 0
+    out[valid] = values[index[valid]]
+    return out
+
+
+def htf_ema(data: MarketData, timeframe, period: int, backend: str = None) -> np.ndarray:
+    """EMA de ``period`` candles do timeframe maior, alinhada aos candles de ``data``."""
+    htf = resample(data, timeframe)
+    return align(htf, kernels.ema(htf.close, period, backend=backend), data.time, timeframe)
+
+
+# --- MODO AO VIVO (O(1) por candle) ---
+
+class BarAggregator:
+    """
+    Constrói candles de um timeframe a partir de candles menores (ou ticks), um de cada vez.
+
+    Com ``base_seconds`` (duração do candle de entrada) o candle maior fecha junto com o último
+    candle menor do período, como em ``align``; com ticks (``base_seconds=0``) ele fecha quando
+    chega o primeiro tick do período seguinte.
+    """
+
+    def __init__(self, timeframe, base_seconds: int = 0):
+        self.timeframe = timeframe
+        self.seconds = timeframe_seconds(timeframe)
+        self.base_seconds = base_seconds
+        self.current = None   # Candle em formação: [time, open, high, low, close, volume]
+
+    def update(self, time: int, open: float, high: float, low: float, close: float, volume: float = 0) -> list:
+        """Incorpora um candle menor. Retorna os candles (tuplas) que fecharam, normalmente nenhum ou um."""
+        time = int(time)
+        bucket = (time // self.seconds) * self.seconds
+        closed = []
+        current = self.current
+        if current is not None and current[0] == bucket:
+            if high > current[2]:
+                current[2] = high
+            if low < current[3]:
+                current[3] = low
+            current[4] = close
+            current[5] += volume
+        else:
+            if current is not None:
+                closed.append(tuple(current))  # Período anterior sem o último candle (lacuna)
+            current = self.current = [bucket, open, high, low, close, volume]
+
+        if self.base_seconds and time + self.base_seconds >= bucket + self.seconds:
+            closed.append(tuple(current))
+            self.current = None
+        return closed
+
+    def update_tick(self, time: int, price: float, volume: float = 0) -> list:
+        return self.update(time, price, price, price, price, volume)
+
+
+class IncrementalEMA:
+    """EMA atualizada em O(1), com a mesma recursão de ``kernels.ema``."""
+
+    def __init__(self, period: int):
+        self.alpha = 2.0 / (period + 1.0)
+        self.value = np.nan
+
+    def update(self, x: float) -> float:
+        self.value = self.next(x)
+        return self.value
+
+    def next(self, x: float, value: float = None) -> float:
+        """Valor após ``x`` (a partir de ``value`` ou do atual), sem alterar o estado."""
+        value = self.value if value is None else value
+        if value != value:  # Primeiro valor
+            return float(x)
+        return value + self.alpha * (x - value)
+
+
+class MultiTimeframeAggregator:
+    """
+    Mantém vários timeframes ao vivo a partir de um único fluxo de candles de base (M1) ou
+    ticks: cada atualização custa O(número de timeframes), sem buscar cada timeframe na corretora.
+
+    ``ema(tf, period)`` devolve a EMA do último candle FECHADO do timeframe (sem lookahead),
+    o mesmo valor que ``align`` produz no modo histórico.
+    """
+
+    def __init__(self, timeframes: Iterable, ema_periods: Iterable = (), base_seconds: int = 60):
+        self.aggregators = {tf: BarAggregator(tf, base_seconds) for tf in timeframes}
+        self.emas = {tf: {p: IncrementalEMA(p) for p in ema_periods} for tf in self.aggregators}
+        self.last_closed = {tf: None for tf in self.aggregators}
+
+    @classmethod
+    def from_history(cls, data: MarketData, timeframes: Iterable, ema_periods: Iterable = ()) -> 'MultiTimeframeAggregator':
+        """Aquece os timeframes com o histórico (vetorizado) e continua ao vivo a partir dali."""
+        base_seconds = infer_seconds(data.time)
+        timeframes, ema_periods = list(timeframes), list(ema_periods)
+        mtf = cls(timeframes, ema_periods, base_seconds)
+        if len(data) == 0:
+            return mtf
+        end = int(data.time[-1]) + base_seconds
+        for tf, htf in resample_many(data, timeframes).items():
+            bars = [tuple(x.item() for x in row) for row in zip(*(getattr(htf, c) for c in COLUMNS))]
+            # O último candle agregado continua em formação se o período ainda não terminou
+            if bars and bars[-1][0] + timeframe_seconds(tf) > end:
+                mtf.aggregators[tf].current = list(bars.pop())
+            if not bars:
+                continue
+            mtf.last_closed[tf] = bars[-1]
+            closes = np.array([bar[4] for bar in bars], dtype=np.float64)
+            for period, ema in mtf.emas[tf].items():
+                ema.value = float(kernels.ema(closes, period)[-1])
+        return mtf
+
+    def update(self, time: int, open: float, high: float, low: float, close: float, volume: float = 0) -> dict:
+        """Incorpora um candle de base. Retorna {timeframe: último candle fechado} dos que fecharam agora."""
+        closed_now = {}
+        for tf, aggregator in self.aggregators.items():
+            for closed in aggregator.update(time, open, high, low, close, volume):
+                self.last_closed[tf] = closed_now[tf] = closed
+                for ema in self.emas[tf].values():
+                    ema.update(closed[4])
+        return closed_now
+
+    def update_tick(self, time: int, price: float, volume: float = 0) -> dict:
+        return self.update(time, price, price, price, price, volume)
+
+    def ema(self, timeframe, period: int) -> float:
+        return self.emas[timeframe][period].value
+
+    def peek_ema(self, timeframe, period: int, time: int, close: float) -> float:
+        """
+        EMA que ``ema`` devolveria depois de ``update`` com este candle de base (ex.: o candle
+        ainda em formação, que será atualizado), sem alterar o estado.
+        """
+        aggregator, ema = self.aggregators[timeframe], self.emas[timeframe][period]
+        time = int(time)
+        bucket = (time // aggregator.seconds) * aggregator.seconds
+        value = ema.value
+        current = aggregator.current
+        if current is not None and current[0] != bucket:
+            value = ema.next(current[4], value)  # Período anterior fecharia pela lacuna
+        if aggregator.base_seconds and time + aggregator.base_seconds >= bucket + aggregator.seconds:
+            value = ema.next(close, value)
+        return value
@@ -0,0 +1,174 @@
+# Arquivo: core/risk_engine.py
+
+import threading
+import numpy as np
+import pandas as pd
+from utils.config import CONFIG, RiskSettings
+from utils.logger import logger
+from core.risk_manager import RiskManager
+
+
+class ExposureBook:
+    """
+    Estado de risco do portfólio, compartilhado pelos executores de todos os ativos:
+    risco aberto por ativo (R$ até o stop) e P&L realizado no dia.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open_risk = {}   # ativo -> R$ em risco até o stop
+        self.day = None
+        self.realized = 0.0   # P&L realizado no dia corrente
+
+    def roll(self, day):
+        """Zera o P&L do dia quando a data muda."""
+        if day is not None and day != self.day:
+            with self._lock:
+                if day != self.day:
+                    self.day = day
+                    self.realized = 0.0
+
+    def total_open_risk(self, exclude: str = None) -> float:
+        with self._lock:
+            return sum(risk for symbol, risk in self.open_risk.items() if symbol != exclude)
+
+    def open(self, symbol: str, risk: float):
+        with self._lock:
+            self.open_risk[symbol] = risk
+
+    def close(self, symbol: str, pnl: float, day=None):
+        self.roll(day)
+        with self._lock:
+            self.open_risk.pop(symbol, None)
+            self.realized += pnl
+
+    def update(self, symbol: str, risk: float, pnl: float = 0.0, day=None):
+        """Posição ainda aberta com stop movido ou volume reduzido: novo risco e P&L da parte encerrada."""
+        self.roll(day)
+        with self._lock:
+            self.open_risk[symbol] = risk
+            self.realized += pnl
+
+
+# Portfólio padrão do processo: executores de ativos diferentes somam a exposição aqui
+PORTFOLIO = ExposureBook()
+
+
+class RiskEngine(RiskManager):
+    """
+    Dimensiona cada ordem no momento do envio, em vez de um volume fixo calculado na partida:
+
+    - stops pelo ATR (``RISK.ATR_STOP_MULTIPLIER``), com o TP na mesma proporção TP/SL da estratégia;
+    - volume = MAX_RISK_PER_TRADE / (SL x POINT_VALUE), limitado por MAX_VOLUME_LIMIT;
+    - limite de perda diária (``RISK.DAILY_LOSS_LIMIT``): atingido, o volume é 0 até o dia seguinte;
+    - risco aberto máximo entre ativos (``RISK.MAX_OPEN_RISK``), somado no ``ExposureBook``.
+
+    As versões ``*_array`` aplicam as mesmas regras a arrays inteiros (backtests).
+    """
+
+    def __init__(self, sl_points: int, tp_points: int, risk: RiskSettings = None, book: ExposureBook = None):
+        super().__init__(sl_points, tp_points, risk)
+        # O TP segue a proporção TP/SL (também com stops pelo ATR): SL_POINTS 0 não tem proporção
+        if self.sl_points <= 0 or self.tp_points <= 0:
+            raise ValueError(f"SL/TP devem ser positivos para o RiskEngine (recebido {self.sl_points}/{self.tp_points}).")
+        risk = risk if risk is not None else CONFIG.risk
+        self.atr_period = risk.atr_period
+        self.atr_stop_multiplier = risk.atr_stop_multiplier
+        self.daily_loss_limit = risk.daily_loss_limit
+        self.max_open_risk = risk.max_open_risk
+        self.book = book if book is not None else PORTFOLIO
+
+    @property
+    def uses_atr(self) -> bool:
+        return self.atr_stop_multiplier > 0
+
+    # --- Versões vetorizadas (backtest) ---
+
+    def stops_array(self, atr) -> tuple:
+        """SL/TP em pontos para cada candle. Sem ATR válido, usa o SL/TP fixo."""
+        atr = np.asarray(atr, dtype=np.float64)
+        sl = np.full(atr.shape, self.sl_points, dtype=np.int64)
+        if self.uses_atr:
+            valid = np.isfinite(atr) & (atr > 0)
+            sl[valid] = np.maximum(1, np.rint(atr[valid] * self.atr_stop_multiplier)).astype(np.int64)
+        tp = np.maximum(1, np.rint(sl * (self.tp_points / self.sl_points))).astype(np.int64)
+        return sl, tp
+
+    def size_array(self, sl_points) -> np.ndarray:
+        """Volume para cada SL (pontos): risco por trade, limite de contratos e risco aberto máximo."""
+        sl_points = np.asarray(sl_points, dtype=np.float64)
+        risk_per_contract = sl_points * self.point_value
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume = np.floor(self.max_risk_per_trade / risk_per_contract)
+            volume = np.clip(np.nan_to_num(volume, nan=1, posinf=1), 1, self.max_volume_limit)
+            if self.max_open_risk > 0:
+                volume = np.minimum(volume, np.floor(self.max_open_risk / risk_per_contract))
+        volume[~(sl_points > 0)] = 1  # Mesmo fallback de calculate_volume
+        return volume.astype(np.int64)
+
+    def size_trades(self, sl_points, days=None, pnl_points=None) -> np.ndarray:
+        """
+        Volume de cada trade de um backtest (em ordem cronológica). Com ``days`` e ``pnl_points``
+        aplica o limite de perda diária: após a perda realizada do dia atingir o limite, os
+        trades seguintes do mesmo dia recebem volume 0.
+        """
+        volume = self.size_array(sl_points)
+        if self.daily_loss_limit <= 0 or days is None or pnl_points is None or len(volume) == 0:
+            return volume
+
+        pnl = pd.Series(np.asarray(pnl_points, dtype=np.float64) * self.point_value * volume)
+        days = pd.Series(np.asarray(days))
+        # P&L realizado no dia antes de cada trade; o primeiro estouro bloqueia o resto do dia
+        realized_before = pnl.groupby(days).cumsum() - pnl
+        breached = (realized_before <= -self.daily_loss_limit).groupby(days).cummax()
+        volume[breached.to_numpy()] = 0
+        return volume
+
+    # --- Versão ao vivo (uma ordem por vez) ---
+
+    def stops(self, atr: float = None) -> tuple:
+        """SL/TP em pontos para a próxima ordem."""
+        sl, tp = self.stops_array([np.nan if atr is None else atr])
+        return int(sl[0]), int(tp[0])
+
+    def daily_limit_hit(self, day=None) -> bool:
+        self.book.roll(day)
+        return self.daily_loss_limit > 0 and self.book.realized <= -self.daily_loss_limit
+
+    def size_order(self, symbol: str, sl_points: int, day=None) -> int:
+        """Volume da próxima ordem em ``symbol`` (0 = não operar)."""
+        if self.daily_limit_hit(day):
+            logger.warning(f"⛔ Limite de perda diária atingido (R$ {self.book.realized:.2f} / "
+                           f"-R$ {self.daily_loss_limit:.2f}). Nenhuma nova ordem hoje.")
+            return 0
+
+        volume = int(self.size_array([sl_points])[0])
+        if self.max_open_risk > 0 and volume > 0:
+            room = self.max_open_risk - self.book.total_open_risk(exclude=symbol)
+            volume = max(0, min(volume, int(room // (sl_points * self.point_value))))
+            if volume == 0:
+                logger.warning(f"⛔ Risco aberto máximo (R$ {self.max_open_risk:.2f}) atingido entre os ativos. "
+                               f"Ordem em {symbol} bloqueada.")
+        return volume
+
+    def position_pnl(self, position: dict, price: float) -> float:
+        """P&L (R$) da posição se fechada em ``price``."""
+        direction = 1 if position['type'] == 'BUY' else -1
+        return (price - position['entry_price']) * direction * self.point_value * position['volume']
+
+    def on_open(self, symbol: str, volume: int, sl_points: int):
+        self.book.open(symbol, volume * sl_points * self.point_value)
+
+    def on_close(self, symbol: str, pnl: float, day=None):
+        self.book.close(symbol, pnl, day)
+
+    def on_update(self, symbol: str, position: dict, pnl: float = 0.0, day=None):
+        """Risco até o stop atual da posição (zero com o stop no lucro) e P&L de uma saída parcial."""
+        if not position.get('sl_price'):
+            # Posição sem stop na corretora: risco pelo SL padrão, como numa ordem nova
+            risk = position['volume'] * self.sl_points * self.point_value
+        else:
+            direction = 1 if position['type'] == 'BUY' else -1
+            # Mesma conversão do position_pnl: o P&L se a posição for stopada agora
+            risk = max(0.0, (position['entry_price'] - position['sl_price']) * direction) * self.point_value * position['volume']
+        self.book.update(symbol, risk, pnl, day)
@@ -1,6 +1,6 @@
 # Arquivo: core/risk_manager.py - CORREÇÃO FINAL
 
-from utils.config import CONFIG
+from utils.config import CONFIG, RiskSettings
 from utils.logger import logger
 
 class RiskManager:
@@ -9,16 +9,14 @@ class RiskManager:
     no risco máximo aceito por trade e definindo SL/TP.
     """
     
-    def __init__(self, sl_points: int, tp_points: int):
+    def __init__(self, sl_points: int, tp_points: int, risk: RiskSettings = None):
         
-        # 1. Carrega parâmetros de risco do CONFIG
-        # 🟢 CORREÇÃO CRÍTICA: Ler a seção RISK como um dicionário
-        risk_config = CONFIG.get('RISK', {}) 
-        
-        # Usamos .get() no dicionário 'risk_config' com valores de fallback
-        self.max_risk_per_trade = risk_config.get('MAX_RISK_PER_TRADE', 100.0) # Fallback para R$100
-        self.point_value = risk_config.get('POINT_VALUE', 0.20)              # Fallback para R$0.20 (Mini-Índice)
-        self.max_volume_limit = risk_config.get('MAX_VOLUME_LIMIT', 5)       # Fallback para 5 contratos
+        # 1. Carrega parâmetros de risco já validados (seção RISK tipada do CONFIG)
+        # Os valores padrão de RiskSettings são os fallbacks: R$100, R$0.20 (Mini-Índice), 5 contratos
+        risk = risk if risk is not None else CONFIG.risk
+        self.max_risk_per_trade = risk.max_risk_per_trade
+        self.point_value = risk.point_value
+        self.max_volume_limit = risk.max_volume_limit
 
         # 2. Armazena SL/TP e garante que sejam INTEIROS
         try:
@@ -0,0 +1,198 @@
+# Arquivo: core/session_calendar.py
+
+import numpy as np
+from datetime import date, timedelta
+from typing import Iterable
+from core.resampler import infer_seconds
+
+# Estado de cada candle como bits (um uint8 por candle)
+IN_SESSION = 1        # Dentro do pregão contínuo (abertura <= horário < fechamento)
+ENTRY_ALLOWED = 2     # Janela em que o robô pode abrir posição
+AUCTION = 4           # Leilão de abertura ou call de fechamento
+FORCE_FLAT = 8        # Zeragem obrigatória do day trade (opcional: também no último candle do pregão nos dados)
+
+DAY = 86400
+
+
+def _seconds(hhmm: str) -> int:
+    hours, minutes = hhmm.split(':')
+    return (int(hours) * 60 + int(minutes)) * 60
+
+
+def _easter(year: int) -> date:
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def b3_holidays(year: int) -> list:
+    """
+    Dias sem pregão na B3: feriados nacionais, Carnaval, Sexta-feira Santa, Corpus Christi,
+    24/12 e 31/12. Feriados municipais/extraordinários entram via ``holidays`` do calendário.
+    """
+    easter = _easter(year)
+    days = [date(year, 1, 1), date(year, 4, 21), date(year, 5, 1), date(year, 9, 7), date(year, 10, 12),
+            date(year, 11, 2), date(year, 11, 15), date(year, 12, 24), date(year, 12, 25), date(year, 12, 31),
+            easter - timedelta(days=48), easter - timedelta(days=47),   # Carnaval (segunda e terça)
+            easter - timedelta(days=2),                                 # Sexta-feira Santa
+            easter + timedelta(days=60)]                                # Corpus Christi
+    if year >= 2024:
+        days.append(date(year, 11, 20))  # Consciência Negra (feriado nacional desde 2024)
+    return sorted(days)
+
+
+class SessionIndex:
+    """
+    Índice pré-calculado do calendário sobre os horários dos candles: três arrays alinhados
+    aos dados, com consulta O(1) por posição.
+
+    - ``session_id`` (int32): dia do pregão (dias desde 1970-01-01) ou -1 fora do pregão;
+    - ``minutes_to_close`` (int16): minutos até o fechamento do pregão (-1 fora dele);
+    - ``flags`` (uint8): bits IN_SESSION, ENTRY_ALLOWED, AUCTION e FORCE_FLAT.
+    """
+
+    def __init__(self, session_id: np.ndarray, minutes_to_close: np.ndarray, flags: np.ndarray):
+        self.session_id = session_id
+        self.minutes_to_close = minutes_to_close
+        self.flags = flags
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+    def __getitem__(self, i: int) -> tuple:
+        """(session_id, minutes_to_close, flags) do candle ``i``."""
+        return int(self.session_id[i]), int(self.minutes_to_close[i]), int(self.flags[i])
+
+    @property
+    def entry_allowed(self) -> np.ndarray:
+        return (self.flags & ENTRY_ALLOWED) != 0
+
+    @property
+    def force_flat(self) -> np.ndarray:
+        return (self.flags & FORCE_FLAT) != 0
+
+    @property
+    def in_session(self) -> np.ndarray:
+        return (self.flags & IN_SESSION) != 0
+
+
+class SessionCalendar:
+    """
+    Calendário de pregão da B3 para day trade (WIN/WDO), em horário do servidor (Brasília).
+
+    Cada candle é classificado pelo horário de FECHAMENTO (abertura + duração do candle),
+    o momento em que o robô decide. Padrões do mini índice:
+
+        08:55-09:00 leilão de abertura | 09:00-18:25 pregão | 18:25-18:30 call de fechamento
+
+    Entradas só entre ``entry_start`` e ``last_entry``; a partir de ``flat_time`` qualquer
+    posição deve ser zerada (antes da zeragem compulsória da corretora).
+
+    ``flat_last_bar`` também zera no último candle de cada pregão presente nos dados (dias
+    encerrados mais cedo ou com dados faltando). É lookahead: saber que um candle é o último
+    do dia exige ver o seguinte, algo que o robô ao vivo não sabe. Por isso é opcional.
+    """
+
+    def __init__(self, open_time: str = '09:00', close_time: str = '18:25', entry_start: str = '09:05',
+                 last_entry: str = '17:30', flat_time: str = '18:10', opening_auction_minutes: int = 5,
+                 closing_call_minutes: int = 5, holidays: Iterable = (), years: Iterable = None,
+                 flat_last_bar: bool = False):
+        self.open_time, self.close_time = open_time, close_time
+        self.entry_start, self.last_entry, self.flat_time = entry_start, last_entry, flat_time
+        self._open, self._close = _seconds(open_time), _seconds(close_time)
+        self._entry_start, self._last_entry = _seconds(entry_start), _seconds(last_entry)
+        self._flat = _seconds(flat_time)
+        self._auction_start = self._open - opening_auction_minutes * 60
+        self._call_end = self._close + closing_call_minutes * 60
+        if not self._open <= self._entry_start <= self._last_entry <= self._flat <= self._close:
+            raise ValueError(f"Horários do pregão fora de ordem: abertura {open_time} <= início {entry_start} "
+                             f"<= última entrada {last_entry} <= zeragem {flat_time} <= fechamento {close_time}.")
+        self.flat_last_bar = flat_last_bar
+        self.extra_holidays = tuple(holidays)
+        self._holiday_days = set(_day_number(day) for day in self.extra_holidays)
+        self._years = set()
+        for year in (years or ()):
+            self._add_year(year)
+
+    @classmethod
+    def from_settings(cls, settings) -> 'SessionCalendar':
+        """Calendário a partir da seção SESSION do config (``SessionSettings``)."""
+        holidays = [day.strip() for day in settings.holidays.split(',') if day.strip()]
+        return cls(open_time=settings.open_time, close_time=settings.close_time, entry_start=settings.entry_start,
+                   last_entry=settings.last_entry, flat_time=settings.flat_time, holidays=holidays,
+                   flat_last_bar=settings.flat_last_bar)
+
+    def _add_year(self, year: int):
+        if year not in self._years:
+            self._years.add(year)
+            self._holiday_days.update(_day_number(day) for day in b3_holidays(year))
+
+    def _holidays_for(self, days: np.ndarray) -> np.ndarray:
+        if days.size:
+            first, last = _day_date(int(days.min())).year, _day_date(int(days.max())).year
+            for year in range(first, last + 1):
+                self._add_year(year)
+        return np.fromiter(self._holiday_days, dtype=np.int64, count=len(self._holiday_days))
+
+    def index(self, time, bar_seconds: int = None) -> SessionIndex:
+        """
+        Classifica todos os candles de uma vez (epoch em segundos, horário de abertura do
+        candle). Cada candle depende só do próprio horário (nenhum lookahead), salvo com
+        ``flat_last_bar``, em que o último candle de cada pregão nos dados também recebe FORCE_FLAT.
+        """
+        time = np.asarray(time, dtype=np.int64)
+        if bar_seconds is None:
+            bar_seconds = infer_seconds(time) if time.size > 1 else 0
+        index = self._classify(time + bar_seconds)
+        if not self.flat_last_bar:
+            return index
+
+        # Último candle de cada pregão presente nos dados
+        session_id, flags = index.session_id, index.flags
+        in_day = session_id >= 0
+        last_of_day = in_day & np.r_[session_id[1:] != session_id[:-1], True]
+        flags[last_of_day] |= FORCE_FLAT
+        flags[last_of_day] &= ~np.uint8(ENTRY_ALLOWED)
+        return index
+
+    def status(self, bar_time: int, bar_seconds: int = 0) -> tuple:
+        """(session_id, minutes_to_close, flags) de um único candle (modo ao vivo)."""
+        return self._classify(np.array([int(bar_time) + bar_seconds], dtype=np.int64))[0]
+
+    def _classify(self, moment: np.ndarray) -> SessionIndex:
+        day = moment // DAY
+        seconds = moment - day * DAY
+        weekday = (day + 3) % 7  # 1970-01-01 foi uma quinta-feira (segunda = 0)
+        trading_day = (weekday < 5) & ~np.isin(day, self._holidays_for(day))
+
+        in_session = trading_day & (seconds >= self._open) & (seconds < self._close)
+        auction = trading_day & (((seconds >= self._auction_start) & (seconds < self._open))
+                                 | ((seconds >= self._close) & (seconds < self._call_end)))
+        entry = in_session & (seconds >= self._entry_start) & (seconds < self._last_entry)
+        # A zeragem vale também para o call de fechamento (ainda há posição a encerrar)
+        flat = trading_day & (seconds >= self._flat) & (seconds < self._call_end)
+
+        flags = (in_session * np.uint8(IN_SESSION) | entry * np.uint8(ENTRY_ALLOWED)
+                 | auction * np.uint8(AUCTION) | flat * np.uint8(FORCE_FLAT)).astype(np.uint8)
+        active = in_session | auction
+        session_id = np.where(active, day, -1).astype(np.int32)
+        minutes = np.where(active, np.maximum(self._close - seconds, 0) // 60, -1).astype(np.int16)
+        return SessionIndex(session_id, minutes, flags)
+
+
+def _day_number(day) -> int:
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return (day - date(1970, 1, 1)).days
+
+
+def _day_date(number: int) -> date:
+    return date(1970, 1, 1) + timedelta(days=number)
@@ -1,82 +1,188 @@
 # Arquivo: core/signal_confirmer.py
 
-import pandas as pd
+from typing import Iterable
 from utils.logger import logger
+from core.indicator_store import IndicatorStore
 import numpy as np
 
+# Bits de rejeição definidos junto dos filtros (reexportados aqui)
+from core.filters import (REJECT_TREND, REJECT_VOLUME, REJECT_NO_DATA, REJECT_RSI, REJECT_MACD, REJECT_ATR,
+                          REJECT_HOURS, REJECTION_LABELS, REJECTION_KEYS, FilterPipeline, FilterContext,
+                          TrendFilter, VolumeFilter)
+
+# Sinal como inteiro, para arrays de diagnóstico
+SIGNAL_CODES = {'HOLD': 0, 'BUY': 1, 'SELL': -1}
+
+
+def describe_rejection(flags: int) -> str:
+    """Texto dos motivos de uma rejeição (gerado só quando alguém pede)."""
+    return ', '.join(label for bit, label in REJECTION_LABELS.items() if flags & bit) or 'aceito'
+
+
+class RejectionStats:
+    """Contadores agregados de sinais avaliados e rejeições por filtro."""
+
+    def __init__(self):
+        self.signals = 0
+        self.accepted = 0
+        self.by_flag = dict.fromkeys(REJECTION_LABELS, 0)
+
+    def add(self, flags: int):
+        self.signals += 1
+        if flags == 0:
+            self.accepted += 1
+            return
+        for bit in self.by_flag:
+            if flags & bit:
+                self.by_flag[bit] += 1
+
+    def add_many(self, flags: np.ndarray):
+        """Versão vetorizada de ``add`` para vários sinais de uma vez."""
+        flags = np.asarray(flags)
+        self.signals += len(flags)
+        self.accepted += int(np.count_nonzero(flags == 0))
+        for bit in self.by_flag:
+            self.by_flag[bit] += int(np.count_nonzero(flags & bit))
+
+    def merge(self, other: 'RejectionStats'):
+        """Soma os contadores de outro bloco (ex.: backtest em streaming)."""
+        self.signals += other.signals
+        self.accepted += other.accepted
+        for bit, count in other.by_flag.items():
+            self.by_flag[bit] += count
+
+    def as_dict(self) -> dict:
+        counts = {f'rejected_{REJECTION_KEYS[bit]}': count for bit, count in self.by_flag.items()}
+        return {'signals': self.signals, 'accepted': self.accepted, **counts}
+
+    def __str__(self) -> str:
+        rejected = ', '.join(f"{REJECTION_LABELS[bit]}: {count}" for bit, count in self.by_flag.items() if count)
+        return f"{self.signals} sinais, {self.accepted} aceitos. Rejeições por filtro: {rejected}"
+
+
 class SignalConfirmer:
     """
     Aplica filtros avançados para confirmar a validade de um sinal de negociação.
+
+    Os filtros formam um ``FilterPipeline`` (do mais barato para o mais caro). Por padrão
+    são os de tendência (EMA longa) e volume (MMV); ``filters`` troca a composição, por
+    exemplo ``[TrendFilter(50), VolumeFilter(10), RSIFilter(14), TradingHoursFilter()]``.
+
+    Com ``trend_timeframe`` (ex.: 'H1') o filtro de tendência usa a EMA do timeframe maior,
+    agregada dos próprios candles e alinhada sem lookahead, em vez da EMA no mesmo timeframe.
+    ``incremental`` (robô ao vivo) mantém essa EMA num ``MultiTimeframeAggregator`` alimentado
+    pelos candles fechados de cada ciclo, em vez de reagregar a janela inteira.
     """
     # ⚠️ ALTERAÇÃO AQUI: long_trend_period mudado para 50.
     # ⚠️ ALTERAÇÃO AQUI: volume_filter_percent mudado para 0.00.
-    def __init__(self, long_trend_period: int = 50, volume_avg_period: int = 10, volume_filter_percent: float = 0.00):
+    def __init__(self, long_trend_period: int = 50, volume_avg_period: int = 10, volume_filter_percent: float = 0.00,
+                 trend_timeframe: str = None, filters: Iterable = None, incremental: bool = False):
         self.long_trend_period = long_trend_period 
         self.volume_avg_period = volume_avg_period 
-        self.volume_filter_percent = volume_filter_percent 
+        self.trend_timeframe = trend_timeframe or None
+        if filters is None:
+            filters = [TrendFilter(long_trend_period, self.trend_timeframe, incremental=incremental),
+                       VolumeFilter(volume_avg_period, volume_filter_percent)]
+        self.pipeline = FilterPipeline(filters)
+        # Diagnóstico das rejeições (sem logs por candle): contadores e o último motivo
+        self.stats = RejectionStats()
+        self.last_rejection = 0
+        self._warned_no_data = False
         
-        logger.info(f"Confirmador de Sinal inicializado. Filtro de Tendência: EMA {long_trend_period}. Filtro de Volume: {self.volume_filter_percent * 100:.0f}% acima da média.")
+        logger.info(f"Confirmador de Sinal inicializado. Filtros (do mais barato ao mais caro): {self.pipeline}.")
 
-    def calculate_confirmation_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
-        
-        # 1. EMA de Tendência de Longo Prazo (agora EMA 50)
-        data[f'EMA_{self.long_trend_period}'] = data['close'].ewm(
-            span=self.long_trend_period, adjust=False
-        ).mean()
-        
-        # 2. Média Móvel de Volume (MMV)
-        data['MMV'] = data['tick_volume'].rolling(window=self.volume_avg_period).mean()
-        
-        return data
+    @property
+    def volume_filter_percent(self) -> float:
+        volume = self.pipeline.find(VolumeFilter)
+        return volume.percent if volume is not None else 0.0
 
-    def confirm_signal(self, data: pd.DataFrame, signal: str) -> str:
+    @volume_filter_percent.setter
+    def volume_filter_percent(self, value: float):
+        volume = self.pipeline.find(VolumeFilter)
+        if volume is not None:
+            volume.percent = value
+
+    @property
+    def trend_column(self) -> str:
+        """Coluna do IndicatorStore com a EMA de tendência."""
+        trend = self.pipeline.find(TrendFilter)
+        return trend.column if trend is not None else None
+
+    def lookback_bars(self, base_timeframe) -> int:
+        """Candles de base necessários para aquecer todos os filtros."""
+        return self.pipeline.lookback(base_timeframe)
+
+    def calculate_confirmation_indicators(self, data, store: IndicatorStore = None, backend: str = None,
+                                          lazy: bool = False) -> IndicatorStore:
+        """
+        Calcula os indicadores dos filtros em ``store`` sem modificar ``data``.
+        Pode receber o mesmo store da estratégia para manter todos os indicadores juntos.
+        Com ``lazy=True`` (ao vivo) cada indicador só é calculado se o seu filtro for avaliado.
+        """
+        return self.pipeline.prepare(data, store, backend=backend, lazy=lazy)
+
+    def _context(self, data, indicators) -> FilterContext:
+        """Contexto preparado por ``calculate_confirmation_indicators`` se for o mesmo par dados/store."""
+        ctx = self.pipeline.context
+        if ctx is not None and ctx.data is data and ctx.store is indicators:
+            return ctx
+        if indicators is None or indicators is data:
+            return FilterContext(data)
+        return FilterContext(data, indicators)
+
+    def confirm_signal(self, data, signal: str, indicators=None) -> str:
+        """
+        Confirma o sinal no último candle. ``indicators`` é o IndicatorStore com os
+        indicadores dos filtros; se omitido, as colunas são lidas do próprio ``data``.
+        Os filtros param no primeiro que rejeita. No modo ao vivo (um sinal por ciclo) o
+        resultado é registrado no log.
+        """
+        if signal not in ("BUY", "SELL"):
+            return "HOLD"
+        ctx = self._context(data, indicators)
+        i = len(data) - 1
+        direction = SIGNAL_CODES[signal]
         
         # Verifica se há dados suficientes para calcular os filtros
-        if len(data) < self.long_trend_period or data['MMV'].isnull().iloc[-1]:
-            logger.warning("Dados insuficientes para rodar filtros de confirmação. Retornando HOLD.")
+        flags = REJECT_NO_DATA if len(data) < self.pipeline.min_bars() else self.pipeline.flags_at(i, direction, ctx)
+        self.last_rejection = flags
+        self.stats.add(flags)
+
+        if flags == REJECT_NO_DATA:
+            if not self._warned_no_data:
+                self._warned_no_data = True
+                logger.warning("Dados insuficientes para rodar filtros de confirmação. Retornando HOLD.")
             return "HOLD"
 
-        current_close = data['close'].iloc[-1]
-        ema_long_trend = data[f'EMA_{self.long_trend_period}'].iloc[-1]
-        current_volume = data['tick_volume'].iloc[-1]
-        avg_volume = data['MMV'].iloc[-1]
-        
-        # 1. Filtro Direcional (Tendência)
-        is_uptrend = current_close > ema_long_trend
-        is_downtrend = current_close < ema_long_trend
-        
-        # 2. Confirmação de Volume (Filtro de Força)
-        # Se volume_filter_percent for 0.00, esta condição sempre será True
-        is_high_volume = current_volume > (avg_volume * (1 + self.volume_filter_percent))
-        
-        # --- Lógica de Confirmação ---
-        
-        if signal == "BUY":
-            if is_uptrend and is_high_volume:
-                logger.info("✅ Sinal de COMPRA confirmado por TENDÊNCIA e VOLUME!")
-                return "BUY"
-            else:
-                reason = []
-                if not is_uptrend:
-                    reason.append(f"❌ Tendência: Preço ({current_close:.2f}) < EMA {self.long_trend_period} ({ema_long_trend:.2f})")
-                if not is_high_volume:
-                    reason.append(f"❌ Volume: Atual ({current_volume:.0f}) < Média + {self.volume_filter_percent * 100:.0f}% ({avg_volume * (1 + self.volume_filter_percent):.0f})")
-                
-                logger.info(f"👉 Compra rejeitada: {'; '.join(reason)}")
-                return "HOLD"
-        
-        elif signal == "SELL":
-            if is_downtrend and is_high_volume:
-                logger.info("✅ Sinal de VENDA confirmado por TENDÊNCIA e VOLUME!")
-                return "SELL"
-            else:
-                reason = []
-                if not is_downtrend:
-                    reason.append(f"❌ Tendência: Preço ({current_close:.2f}) > EMA {self.long_trend_period} ({ema_long_trend:.2f})")
-                if not is_high_volume:
-                    reason.append(f"❌ Volume: Atual ({current_volume:.0f}) < Média + {self.volume_filter_percent * 100:.0f}% ({avg_volume * (1 + self.volume_filter_percent):.0f})")
-
-                logger.info(f"👉 Venda rejeitada: {'; '.join(reason)}")
-                return "HOLD"
-        
-        return "HOLD"
\ No newline at end of file
+        if flags == 0:
+            logger.info(f"✅ Sinal de {'COMPRA' if signal == 'BUY' else 'VENDA'} confirmado pelos filtros!")
+            return signal
+        logger.info(f"👉 {'Compra' if signal == 'BUY' else 'Venda'} rejeitada: "
+                    f"{self.pipeline.describe(flags, i, direction, ctx)}")
+        return "HOLD"
+
+    def rejection_flags_at(self, i: int, signal: str, short_circuit: bool = False) -> int:
+        """
+        Motivos (bits REJECT_*) pelos quais o sinal no índice ``i`` seria rejeitado; 0 = confirmado.
+        Por padrão avalia todos os filtros (diagnóstico); com ``short_circuit`` só o primeiro motivo.
+        """
+        return self.pipeline.flags_at(i, SIGNAL_CODES[signal], short_circuit=short_circuit)
+
+    def confirm_signal_at(self, i: int, signal: str) -> str:
+        """
+        Aplica os filtros no índice ``i`` dos dados preparados (sem recortar DataFrames a cada candle).
+        Não gera log: o motivo fica em ``last_rejection`` e nos contadores de ``stats``.
+        """
+        if signal not in ("BUY", "SELL"):
+            return "HOLD"
+        flags = self.rejection_flags_at(i, signal, short_circuit=True)
+        self.last_rejection = flags
+        self.stats.add(flags)
+        return signal if flags == 0 else "HOLD"
+
+    def rejection_flags(self, signals) -> np.ndarray:
+        """
+        Versão vetorizada: ``signals`` é um array de SIGNAL_CODES (1 compra, -1 venda, 0 nada).
+        Retorna um array uint8 com todos os bits de rejeição de cada candle com sinal.
+        """
+        return self.pipeline.flags(signals)
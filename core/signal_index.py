@@ -0,0 +1,123 @@
+# Arquivo: core/signal_index.py
+
+import os
+import hashlib
+import numpy as np
+from utils.logger import logger
+from core.data_loader import MarketData
+
+
+class SignalIndex:
+    """
+    Índice esparso dos sinais de um conjunto de dados com um conjunto de parâmetros: só os
+    candles com cruzamento (``bars``), a direção (1 compra, -1 venda) e os bits de rejeição
+    dos filtros (0 = sinal confirmado). ``start`` é o primeiro candle operável.
+
+    Sem lookahead: o evento no candle ``i`` usa apenas dados até ``i`` (EMAs e filtros são
+    recursivos/causais e a EMA de timeframe maior só muda quando o candle maior fecha), então
+    o índice de um prefixo dos dados é o prefixo do índice.
+
+    O backtest salta entre os eventos em vez de visitar todos os candles; como os sinais não
+    dependem de SL/TP, o mesmo índice serve a todas as combinações de stops da grade.
+    """
+
+    def __init__(self, bars: np.ndarray, direction: np.ndarray, flags: np.ndarray, start: int = 0, length: int = None):
+        self.bars = np.asarray(bars, dtype=np.int64)
+        self.direction = np.asarray(direction, dtype=np.int8)
+        self.flags = np.asarray(flags, dtype=np.uint8)
+        self.start = int(start)
+        self.length = int(length if length is not None else (self.bars[-1] + 1 if len(self.bars) else 0))
+        self.confirmed = np.flatnonzero(self.flags == 0)  # Posições (em ``bars``) dos sinais confirmados
+
+    @classmethod
+    def from_signals(cls, primary: np.ndarray, flags: np.ndarray, start: int = 0) -> 'SignalIndex':
+        """Extrai os eventos dos arrays densos (sinal primário e bits de rejeição por candle)."""
+        bars = np.flatnonzero(primary)
+        bars = bars[bars >= start]
+        return cls(bars, primary[bars], flags[bars], start, len(primary))
+
+    def __len__(self) -> int:
+        return len(self.bars)
+
+    def span(self, start: int, stop: int) -> tuple:
+        """Posições [lo, hi) dos eventos com candle em [start, stop)."""
+        return int(np.searchsorted(self.bars, start)), int(np.searchsorted(self.bars, stop))
+
+    def next_confirmed(self, position: int) -> int:
+        """Posição do primeiro sinal confirmado a partir da posição ``position`` (ou len(self))."""
+        k = int(np.searchsorted(self.confirmed, position))
+        return int(self.confirmed[k]) if k < len(self.confirmed) else len(self.bars)
+
+    def dense(self) -> tuple:
+        """Arrays densos (sinal primário int8 e bits uint8 por candle), para conferência."""
+        primary = np.zeros(self.length, dtype=np.int8)
+        flags = np.zeros(self.length, dtype=np.uint8)
+        primary[self.bars] = self.direction
+        flags[self.bars] = self.flags
+        return primary, flags
+
+    def save(self, path: str):
+        np.savez(path, bars=self.bars, direction=self.direction, flags=self.flags,
+                 meta=np.array([self.start, self.length], dtype=np.int64))
+
+    @classmethod
+    def load(cls, path: str) -> 'SignalIndex':
+        with np.load(path) as f:
+            start, length = (int(v) for v in f['meta'])
+            return cls(f['bars'], f['direction'], f['flags'], start, length)
+
+    def __repr__(self) -> str:
+        return f"SignalIndex({len(self)} eventos, {len(self.confirmed)} confirmados, {self.length} candles)"
+
+
+def data_fingerprint(data: MarketData) -> str:
+    """Hash do conteúdo dos candles usados pelos sinais (tempo, preços de fechamento e volume)."""
+    digest = hashlib.blake2b(digest_size=12)
+    for column in ('time', 'high', 'low', 'close', 'tick_volume'):
+        digest.update(np.ascontiguousarray(getattr(data, column)).tobytes())
+    return digest.hexdigest()
+
+
+def signal_key(data_key: str, ema_fast: int, ema_slow: int, pipeline=None, session=None) -> str:
+    """Chave do índice: dados + períodos das EMAs + composição dos filtros + calendário do pregão."""
+    parts = [data_key, f'ema={ema_fast}/{ema_slow}']
+    if pipeline is not None:
+        parts += [f"{type(flt).__name__}{sorted((k, v) for k, v in vars(flt).items() if k != 'columns' and not k.startswith('_'))}"
+                  for flt in pipeline.filters]
+    if session is not None:
+        parts.append(hashlib.blake2b(np.ascontiguousarray(session.flags).tobytes(), digest_size=8).hexdigest())
+    return hashlib.blake2b('|'.join(parts).encode(), digest_size=12).hexdigest()
+
+
+class SignalIndexCache:
+    """Índices em memória e, com ``directory``, também em disco (um .npz por chave, reaproveitado entre execuções)."""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory
+        self._memory = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.npz')
+
+    def get(self, key: str) -> SignalIndex:
+        index = self._memory.get(key)
+        if index is None and self.directory and os.path.exists(self._path(key)):
+            try:
+                index = self._memory[key] = SignalIndex.load(self._path(key))
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Índice de sinais ilegível ({self._path(key)}): {e}. Recalculando.")
+        if index is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return index
+
+    def put(self, key: str, index: SignalIndex):
+        self._memory[key] = index
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._path(key) + '.tmp.npz'
+            index.save(tmp)
+            os.replace(tmp, self._path(key))  # Outro processo nunca lê um arquivo pela metade
@@ -0,0 +1,189 @@
+# Arquivo: core/state_journal.py
+
+import os
+import json
+import time
+import queue
+import threading
+from utils.logger import logger
+
+# Tipos de registro do journal
+ORDER, POSITION, POSITION_CLOSED, INDICATORS, SNAPSHOT = 'order', 'position', 'position_closed', 'indicators', 'snapshot'
+
+
+class JournalState:
+    """Estado reconstruído a partir do journal."""
+
+    def __init__(self):
+        self.position = None       # Última posição aberta (dict) ou None
+        self.indicators = None     # Último snapshot de indicadores
+        self.orders = 0            # Ordens registradas
+        self.records = 0           # Registros lidos
+        self.last_seq = 0
+
+    def apply(self, record: dict):
+        kind = record.get('kind')
+        self.records += 1
+        self.last_seq = record.get('seq', self.last_seq)
+        if kind == SNAPSHOT:
+            self.position = record.get('position')
+            self.indicators = record.get('indicators')
+            self.orders = record.get('orders', 0)
+        elif kind == ORDER:
+            self.orders += 1
+        elif kind == POSITION:
+            self.position = record['position']
+        elif kind == POSITION_CLOSED:
+            self.position = None
+        elif kind == INDICATORS:
+            self.indicators = record['values']
+
+    def as_snapshot(self) -> dict:
+        return {'kind': SNAPSHOT, 'position': self.position, 'indicators': self.indicators, 'orders': self.orders}
+
+
+class StateJournal:
+    """
+    Journal append-only (JSON por linha) do estado do executor ao vivo: ordens, posições
+    e snapshots de indicadores.
+
+    ``record`` só enfileira (nunca bloqueia a thread de trading); uma thread de escrita
+    grava os registros em lotes, com um único ``fsync`` por lote (a cada ``flush_interval``).
+    Na reinicialização, ``recover`` reconstrói o estado lendo o arquivo, sem recalcular histórico.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.05, fsync: bool = True):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.written = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._failed = []  # Lote cuja gravação falhou: vai na frente do próximo flush
+        self._seq = 0
+        self._lock = threading.Lock()        # Numeração (thread de trading)
+        self._write_lock = threading.Lock()  # Escrita em disco (nunca segurado por record)
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Leitura ---
+
+    @staticmethod
+    def read(path: str) -> JournalState:
+        """Reconstrói o estado. Uma última linha incompleta (queda durante a escrita) é ignorada."""
+        state = JournalState()
+        if not os.path.exists(path):
+            return state
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Registro incompleto ignorado no journal {path}.")
+                    continue
+                state.apply(record)
+        return state
+
+    def recover(self) -> JournalState:
+        """Lê o journal e continua a numeração de onde parou."""
+        start = time.perf_counter()
+        state = self.read(self.path)
+        self._seq = state.last_seq
+        logger.info(f"Journal {self.path}: {state.records} registros lidos em "
+                    f"{(time.perf_counter() - start) * 1000:.1f} ms. Posição: {state.position}")
+        return state
+
+    def compact(self) -> JournalState:
+        """Reescreve o journal como um único snapshot (troca atômica do arquivo)."""
+        with self._write_lock:
+            self._write_pending()
+            state = self.read(self.path)
+            snapshot = state.as_snapshot()
+            snapshot['seq'] = state.last_seq
+            tmp = f"{self.path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(snapshot, default=float) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        return state
+
+    # --- Escrita ---
+
+    def record(self, kind: str, **data):
+        """Enfileira um registro (não bloqueia)."""
+        with self._lock:
+            self._seq += 1
+            data['seq'] = self._seq
+        data['kind'] = kind
+        data['ts'] = time.time()
+        self._queue.put(data)
+
+    def _drain(self) -> list:
+        batch, self._failed = self._failed, []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _encode(self, batch: list) -> str:
+        lines = []
+        for record in batch:
+            try:
+                lines.append(json.dumps(record, default=float) + '\n')
+            except (TypeError, ValueError) as e:
+                # Um registro inválido não pode travar o journal: descartado com log, o resto segue
+                logger.error(f"Registro {record.get('kind')} (seq {record.get('seq')}) não serializável "
+                             f"descartado do journal {self.path}: {e}")
+        return ''.join(lines)
+
+    def _write(self, batch: list):
+        if not batch:
+            return
+        lines = self._encode(batch)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        self.written += len(batch)
+        self.batches += 1
+
+    def _write_pending(self):
+        batch = self._drain()
+        try:
+            self._write(batch)
+        except OSError:
+            # Disco cheio, arquivo bloqueado...: o lote não se perde, é regravado no próximo flush
+            self._failed = batch
+            raise
+
+    def flush(self):
+        """Grava imediatamente o que estiver na fila (thread atual), começando por um lote que falhou."""
+        with self._write_lock:
+            self._write_pending()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                # Qualquer erro só é registrado: a thread de escrita nunca morre em silêncio
+                logger.error(f"Erro ao gravar o journal {self.path}: {e}")
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='StateJournal', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval * 2 + 1)
+        self.flush()
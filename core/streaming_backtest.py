@@ -0,0 +1,168 @@
+# Arquivo: core/streaming_backtest.py
+
+import os
+import pandas as pd
+from typing import Iterable
+from utils.logger import logger
+from utils.perf import peak_rss_mb
+from core.backtester import Backtester
+from core.data_loader import MarketData
+from core.history_store import HistoryStore, new_run_id
+from core.resampler import TIMEFRAMES, infer_seconds
+from core.risk_engine import RiskEngine
+from core.session_calendar import SessionCalendar
+from core.position_manager import PositionManager
+from core.signal_confirmer import RejectionStats
+
+# Cauda de aquecimento = EMA_WARMUP_FACTOR x maior período: o peso do início da cauda numa
+# EMA cai para (1 - 2/(n+1))^(20n) ~ e^-40, abaixo da precisão de float64
+EMA_WARMUP_FACTOR = 20
+
+
+class StreamingBacktester:
+    """
+    Backtest sobre um fluxo de blocos de candles (um dia, um mês...) para históricos maiores
+    que a RAM. A memória depende do tamanho do bloco, não do histórico.
+
+    Entre blocos o estado continua:
+    - indicadores: cada bloco é processado junto com uma cauda dos candles anteriores longa o
+      bastante para as EMAs convergirem (janelas móveis saem exatas);
+    - posição: a posição aberta passa para o bloco seguinte. O último candle de cada bloco
+      só é simulado no bloco seguinte, quando já se sabe se ele fecha o pregão;
+    - trades: gravados a cada bloco em ``trades_path`` (CSV) e/ou no ``history``, e
+      descartados da memória.
+
+    Com ``risk_engine`` o limite de perda diária é aplicado por bloco: use blocos alinhados
+    a dias ou meses (``data_loader.iter_periods``) para o limite valer no dia inteiro.
+    """
+
+    def __init__(self, sl_points: int, tp_points: int, ema_fast: int, ema_slow: int, backend: str = None,
+                 risk_engine: RiskEngine = None, trend_timeframe: str = None, filters=None,
+                 session: SessionCalendar = None, warmup_bars: int = None, trades_path: str = None,
+                 history: HistoryStore = None, management: PositionManager = None):
+        self.params = {'ema_fast': ema_fast, 'ema_slow': ema_slow, 'sl_points': sl_points, 'tp_points': tp_points}
+        self.options = {'backend': backend, 'risk_engine': risk_engine, 'trend_timeframe': trend_timeframe,
+                        'filters': filters, 'session': session, 'management': management}
+        self.warmup_bars = warmup_bars
+        self.trades_path = trades_path
+        self.history = history
+        self.run_id = None
+        self.tester = None
+        self._reset_totals()
+
+    def _reset_totals(self):
+        self.stats = RejectionStats()
+        self.bars = 0
+        self.chunks = 0
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self._header_written = False
+
+    def _warmup(self, data: MarketData) -> int:
+        """Candles de cauda entre blocos (maior período de estratégia, filtros e ATR, em candles de base)."""
+        if self.warmup_bars is not None:
+            return max(1, self.warmup_bars)
+        tester = self.tester
+        periods = [tester.strategy.slow_period, tester.confirmer.pipeline.min_bars()]
+        base = {seconds: name for name, seconds in TIMEFRAMES.items()}.get(infer_seconds(data.time))
+        if base is not None:
+            periods.append(tester.confirmer.pipeline.lookback(base))
+        if self.options['risk_engine'] is not None:
+            periods.append(self.options['risk_engine'].atr_period)
+        return EMA_WARMUP_FACTOR * max(periods)
+
+    def run(self, chunks: Iterable[MarketData]) -> dict:
+        """Consome os blocos (em ordem de tempo) e retorna as métricas do histórico inteiro."""
+        self._reset_totals()
+        self.run_id = new_run_id()
+        if self.trades_path and os.path.exists(self.trades_path):
+            os.remove(self.trades_path)
+
+        tail = None
+        warmup = None
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            window = chunk if tail is None else MarketData.concat([tail, chunk])
+            if self.tester is None:
+                self.tester = Backtester(window, **self.params, **self.options)
+                warmup = self._warmup(window)
+            else:
+                self.tester.load(window)
+
+            start = self.tester.prepare()
+            if tail is not None:
+                start = max(start, len(tail) - 1)  # Último candle do bloco anterior (adiado)
+            # O último candle fica para o próximo bloco (ou para o fechamento do fluxo)
+            self.tester.simulate(start, len(window) - 1)
+            self._collect()
+
+            self.bars += len(chunk)
+            self.chunks += 1
+            tail = window.slice(max(0, len(window) - warmup))
+
+        if self.tester is not None and tail is not None:
+            # Fim do fluxo: simula o candle adiado e encerra a posição remanescente
+            last = len(self.tester.data) - 1
+            self.tester.simulate(last, last + 1)
+            if self.tester.position:
+                self.tester._close_position(last, "ENCERRAMENTO")
+            self._collect()
+
+        metrics = self._metrics()
+        if self.history is not None:
+            self.history.add_run(self.params, metrics, source='streaming', run_id=self.run_id)
+            self.history.flush()
+        logger.info(f"Backtest em streaming: {self.bars} candles em {self.chunks} blocos, "
+                    f"{self.total_trades} trades. Pico de memória (RSS): {peak_rss_mb():.0f} MB.")
+        return metrics
+
+    def _collect(self):
+        """Dimensiona e grava os trades fechados no bloco e acumula as métricas (nada fica em memória)."""
+        tester = self.tester
+        self.stats.merge(tester.confirmer.stats)
+        tester.confirmer.stats = RejectionStats()
+        if not tester.trades:
+            return
+        tester._size_trades()
+        trades = tester.trades
+        tester.trades = []
+
+        for trade in trades:
+            pnl = trade['pnl_real']
+            if pnl > 0:
+                self.winning_trades += 1
+                self.gross_profit += pnl
+            elif pnl < 0:
+                self.gross_loss += pnl
+        self.total_trades += len(trades)
+
+        if self.trades_path:
+            pd.DataFrame(trades).to_csv(self.trades_path, mode='a', header=not self._header_written, index=False)
+            self._header_written = True
+        if self.history is not None:
+            self.history.append('trades', [dict(trade, run_id=self.run_id) for trade in trades])
+
+    def _metrics(self) -> dict:
+        """Mesmas métricas do ``Backtester``, a partir dos acumuladores."""
+        net_profit = self.gross_profit + self.gross_loss
+        initial_balance = self.tester.initial_balance if self.tester is not None else 1000.0
+        if self.total_trades:
+            win_rate = self.winning_trades / self.total_trades * 100
+            profit_factor = self.gross_profit / abs(self.gross_loss) if self.gross_loss else float('inf')
+        else:
+            win_rate = profit_factor = 0.0
+        return {
+            'total_trades': self.total_trades,
+            'final_balance': initial_balance + net_profit,
+            'net_profit': net_profit,
+            'win_rate': win_rate,
+            'profit_factor': profit_factor,
+            'params': {'EMA': f"{self.params['ema_fast']}/{self.params['ema_slow']}",
+                       'SL/TP': f"{self.params['sl_points']}/{self.params['tp_points']}"},
+            'bars': self.bars,
+            'chunks': self.chunks,
+            **self.stats.as_dict(),
+        }
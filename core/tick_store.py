@@ -0,0 +1,156 @@
+# Arquivo: core/tick_store.py
+
+import os
+import json
+import numpy as np
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator
+from utils.logger import logger
+
+# Colunas gravadas de cada tick (campos de ``mt5.copy_ticks_*``) e seus dtypes
+TICK_COLUMNS = ('time_msc', 'bid', 'ask', 'last', 'volume', 'flags')
+MS_PER_DAY = 86_400_000
+
+
+def tick_dtypes(compact: bool = False) -> Dict[str, np.dtype]:
+    """dtype de cada coluna: preços/volume em float32 no modo compacto (metade do disco e da RAM)."""
+    real = np.float32 if compact else np.float64
+    return {'time_msc': np.dtype(np.int64), 'bid': np.dtype(real), 'ask': np.dtype(real),
+            'last': np.dtype(real), 'volume': np.dtype(real), 'flags': np.dtype(np.uint32)}
+
+
+def _day_name(day_index: int) -> str:
+    return datetime.fromtimestamp(day_index * 86400, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+class TickStore:
+    """
+    Armazém colunar de ticks em binário cru, um diretório por ativo e dia:
+
+        <root>/<ativo>/AAAA-MM-DD/{time_msc,bid,ask,last,volume,flags}.bin
+
+    ``append`` grava blocos de ticks no fim dos arquivos (sem reescrever nada) e
+    ``iter_chunks`` lê de volta em blocos de tamanho fixo via memory-map: o consumo de
+    memória não depende do tamanho do histórico.
+
+    Os ticks devem chegar em ordem de tempo. Se o processo cair no meio de um ``append``,
+    as colunas são lidas até o menor comprimento comum (ticks incompletos são ignorados).
+    """
+
+    def __init__(self, root: str = 'ticks', compact: bool = False):
+        self.root = root
+        self.compact = compact
+
+    def _symbol_dir(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol)
+
+    def dtypes(self, symbol: str) -> Dict[str, np.dtype]:
+        """dtypes gravados para o ativo (definidos no primeiro append)."""
+        path = os.path.join(self._symbol_dir(symbol), 'dtypes.json')
+        if not os.path.exists(path):
+            return tick_dtypes(self.compact)
+        with open(path, 'r', encoding='utf-8') as f:
+            return {column: np.dtype(name) for column, name in json.load(f).items()}
+
+    # --- Escrita ---
+
+    def append(self, symbol: str, ticks) -> int:
+        """Grava um bloco de ticks (array estruturado do MT5 ou dict de colunas). Retorna a quantidade."""
+        if len(ticks['time_msc']) == 0:
+            return 0
+        directory = self._symbol_dir(symbol)
+        os.makedirs(directory, exist_ok=True)
+        meta = os.path.join(directory, 'dtypes.json')
+        if not os.path.exists(meta):
+            with open(meta, 'w', encoding='utf-8') as f:
+                json.dump({column: dtype.str for column, dtype in tick_dtypes(self.compact).items()}, f)
+        dtypes = self.dtypes(symbol)
+
+        time_msc = np.asarray(ticks['time_msc'], dtype=np.int64)
+        volume = ticks['volume_real'] if _has_field(ticks, 'volume_real') else ticks['volume']
+        columns = {name: ticks[name] for name in ('bid', 'ask', 'last', 'flags')}
+        columns['volume'] = volume
+        columns['time_msc'] = time_msc
+
+        # Um bloco pode atravessar a meia-noite: separa por dia
+        days = time_msc // MS_PER_DAY
+        cuts = np.flatnonzero(np.diff(days)) + 1
+        for start, stop in zip(np.r_[0, cuts], np.r_[cuts, len(days)]):
+            day_dir = os.path.join(directory, _day_name(int(days[start])))
+            os.makedirs(day_dir, exist_ok=True)
+            _truncate_to_common_length(day_dir, dtypes)
+            for name in TICK_COLUMNS:
+                values = np.ascontiguousarray(np.asarray(columns[name])[start:stop], dtype=dtypes[name])
+                with open(os.path.join(day_dir, f'{name}.bin'), 'ab') as f:
+                    values.tofile(f)
+        return len(time_msc)
+
+    def ingest(self, symbol: str, chunks: Iterable) -> int:
+        """Grava um fluxo de blocos (ex.: ``mt5.tick_feed.iter_ticks``) sem acumulá-los em memória."""
+        total = 0
+        for chunk in chunks:
+            total += self.append(symbol, chunk)
+        logger.info(f"📥 {total} ticks de {symbol} gravados em {self._symbol_dir(symbol)}.")
+        return total
+
+    # --- Leitura ---
+
+    def days(self, symbol: str, start: str = None, end: str = None) -> list:
+        """Dias gravados (AAAA-MM-DD), opcionalmente entre ``start`` e ``end`` (inclusive)."""
+        directory = self._symbol_dir(symbol)
+        if not os.path.isdir(directory):
+            return []
+        return [day for day in sorted(os.listdir(directory))
+                if os.path.isdir(os.path.join(directory, day))
+                and (start is None or day >= start) and (end is None or day <= end)]
+
+    def _open_day(self, symbol: str, day: str, dtypes: dict) -> Dict[str, np.ndarray]:
+        day_dir = os.path.join(self._symbol_dir(symbol), day)
+        columns = {}
+        for name in TICK_COLUMNS:
+            path = os.path.join(day_dir, f'{name}.bin')
+            size = os.path.getsize(path) // dtypes[name].itemsize
+            columns[name] = np.memmap(path, dtype=dtypes[name], mode='r', shape=(size,)) if size else \
+                np.empty(0, dtype=dtypes[name])
+        length = min(len(values) for values in columns.values())
+        return {name: values[:length] for name, values in columns.items()}
+
+    def last_time_msc(self, symbol: str):
+        """Horário (ms) do último tick gravado, ou None (usado para retomar um download)."""
+        days = self.days(symbol)
+        if not days:
+            return None
+        time_msc = self._open_day(symbol, days[-1], self.dtypes(symbol))['time_msc']
+        return int(time_msc[-1]) if len(time_msc) else None
+
+    def count(self, symbol: str, start: str = None, end: str = None) -> int:
+        dtypes = self.dtypes(symbol)
+        return sum(len(self._open_day(symbol, day, dtypes)['time_msc']) for day in self.days(symbol, start, end))
+
+    def iter_chunks(self, symbol: str, start: str = None, end: str = None,
+                    chunk_size: int = 1_000_000) -> Iterator[Dict[str, np.ndarray]]:
+        """Blocos de até ``chunk_size`` ticks (dict de colunas, views do memory-map), em ordem de tempo."""
+        dtypes = self.dtypes(symbol)
+        for day in self.days(symbol, start, end):
+            columns = self._open_day(symbol, day, dtypes)
+            for offset in range(0, len(columns['time_msc']), chunk_size):
+                yield {name: values[offset:offset + chunk_size] for name, values in columns.items()}
+
+
+def _truncate_to_common_length(day_dir: str, dtypes: dict):
+    """Descarta ticks incompletos de um append interrompido, para as colunas continuarem alinhadas."""
+    paths = {name: os.path.join(day_dir, f'{name}.bin') for name in TICK_COLUMNS}
+    sizes = {name: os.path.getsize(path) // dtypes[name].itemsize if os.path.exists(path) else 0
+             for name, path in paths.items()}
+    length = min(sizes.values())
+    for name, path in paths.items():
+        if os.path.exists(path) and os.path.getsize(path) != length * dtypes[name].itemsize:
+            logger.warning(f"Ticks incompletos descartados em {path} (append interrompido).")
+            with open(path, 'r+b') as f:
+                f.truncate(length * dtypes[name].itemsize)
+
+
+def _has_field(ticks, name: str) -> bool:
+    if isinstance(ticks, np.ndarray):
+        return ticks.dtype.names is not None and name in ticks.dtype.names
+    return name in ticks
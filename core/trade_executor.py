@@ -2,10 +2,18 @@
 
 import pandas as pd
 from utils.logger import logger
-from utils.config import CONFIG
-from core.risk_manager import RiskManager
+from utils.config import CONFIG, Settings
+from core.risk_engine import RiskEngine, ExposureBook
+from core.indicators import TechnicalIndicators
 from strategies.ema_cross import EMACrossStrategy
 from core.signal_confirmer import SignalConfirmer 
+from core.indicator_store import IndicatorStore
+from utils.clock import SYSTEM_CLOCK, ClockStopped
+from core.state_journal import StateJournal, JournalState, ORDER, POSITION, POSITION_CLOSED, INDICATORS
+from core.history_store import HistoryStore
+from core.session_calendar import SessionCalendar, ENTRY_ALLOWED, FORCE_FLAT, IN_SESSION
+from core.resampler import timeframe_seconds
+from core.position_manager import PositionManager, STOP_HIT, TAKE_PROFIT, STOP_MOVED, PARTIAL_EXIT
 import time
 import random 
 
@@ -47,8 +55,9 @@ def api_get_data(symbol: str, timeframe: int, bars: int) -> pd.DataFrame:
     
     return data
 
-def api_send_order(symbol: str, trade_type: str, volume: int, sl_price: float, tp_price: float) -> bool:
-    """Simula o envio de ordem via API e inicializa a posição ativa."""
+def api_send_order(symbol: str, trade_type: str, volume: int, sl_price: float, tp_price: float,
+                   entry_price: float) -> bool:
+    """Simula o envio de ordem via API e inicializa a posição ativa (executada a ``entry_price``)."""
     global ACTIVE_POSITION
     
     logger.info(f"ORDEM ENVIADA VIA API: {trade_type} {volume}x {symbol}. SL: {sl_price:.2f}, TP: {tp_price:.2f}")
@@ -56,95 +65,401 @@ def api_send_order(symbol: str, trade_type: str, volume: int, sl_price: float, t
     ACTIVE_POSITION = {
         'symbol': symbol,
         'type': trade_type,
-        'entry_price': api_get_data(symbol, 60, 1)['close'].iloc[-1],
+        'entry_price': entry_price,
         'volume': volume,
         'sl_price': sl_price,
         'tp_price': tp_price
     }
     return True
 
-def api_close_position(reason: str):
-    """Simula o fechamento de uma posição via API."""
+def api_close_position(reason: str, volume: int = None):
+    """Simula o fechamento de uma posição via API (ou de ``volume`` contratos dela)."""
     global ACTIVE_POSITION
     
     if not ACTIVE_POSITION:
         return
     
+    if volume and volume < ACTIVE_POSITION['volume']:
+        logger.critical(f"🛑 SAÍDA PARCIAL por {reason}: {volume} de {ACTIVE_POSITION['volume']} contratos.")
+        ACTIVE_POSITION = dict(ACTIVE_POSITION, volume=ACTIVE_POSITION['volume'] - volume)
+        return
+    
     # Log mais detalhado sobre o resultado do fechamento
     result = "LOSS" if reason == "SL" else ("GAIN" if reason == "TP" else "ENCERRADA")
     
     logger.critical(f"🛑 POSIÇÃO FECHADA por {reason}! RESULTADO: {result}. Preço de Entrada: {ACTIVE_POSITION['entry_price']:.2f}")
     ACTIVE_POSITION = None 
+
+def api_modify_position(sl_price: float) -> bool:
+    """Simula a modificação do SL da posição via API."""
+    global ACTIVE_POSITION
     
+    if not ACTIVE_POSITION:
+        return False
+    logger.info(f"SL MODIFICADO VIA API: {ACTIVE_POSITION['sl_price']:.2f} -> {sl_price:.2f}")
+    ACTIVE_POSITION = dict(ACTIVE_POSITION, sl_price=sl_price)
+    return True
+    
+
+class ApiBroker:
+    """
+    Corretora padrão do executor: as funções ``api_*`` simuladas acima.
+
+    Qualquer objeto com a mesma interface (connect, get_data, get_position, send_order,
+    close_position, modify_position, exit_price, shutdown) pode ser passado ao TradeExecutor,
+    ex.: ``mt5.broker.MT5Broker`` sobre o terminal real ou sobre o ``mt5.simulator``.
+    """
+
+    volume_step = 1
+    point = 1.0  # Preço de 1 ponto (1 ponto = 1 de preço, como no backtest)
+
+    def connect(self) -> bool:
+        return api_connect()
+
+    def shutdown(self):
+        pass
+
+    def get_data(self, symbol: str, timeframe, bars: int) -> pd.DataFrame:
+        return api_get_data(symbol, timeframe, bars)
+
+    def get_position(self):
+        return ACTIVE_POSITION
+
+    def send_order(self, symbol: str, trade_type: str, volume: int, price: float, sl_price: float,
+                   tp_price: float, sl_points: int, tp_points: int) -> bool:
+        return api_send_order(symbol, trade_type, volume, sl_price, tp_price, entry_price=price)
+
+    def close_position(self, reason: str, volume: int = None):
+        api_close_position(reason, volume)
+
+    def modify_position(self, sl_price: float) -> bool:
+        return api_modify_position(sl_price)
+
+    def exit_price(self, trade_type: str):
+        # A API simulada não tem ticks entre os ciclos
+        return None
+
+    def restore_position(self, position: dict):
+        """Restaura a posição simulada registrada no journal (reinício após queda)."""
+        global ACTIVE_POSITION
+        ACTIVE_POSITION = dict(position)
+
 
 # --- CLASSE TRADE EXECUTOR ---
 
 class TradeExecutor:
     
-    def __init__(self, symbol: str, timeframe: int):
+    def __init__(self, symbol: str, timeframe: int, broker=None, clock=None,
+                 journal: StateJournal = None, close_on_exit: bool = None, history: HistoryStore = None,
+                 risk_book: ExposureBook = None):
         self.symbol = symbol
         self.timeframe = timeframe
+        self.broker = broker if broker is not None else ApiBroker()
+        # Relógio do loop (o replay injeta um relógio acelerado no lugar do time.sleep)
+        self.clock = clock if clock is not None else SYSTEM_CLOCK
+        # Journal de estado (ordens, posições, indicadores) para retomar após uma queda
+        self.journal = journal
+        # Histórico colunar de sinais, rejeições, ordens e execuções (analytics)
+        self.history = history
+        # Zerar a posição ao sair do loop (CTRL+C, erro): por padrão só sem journal; com journal
+        # a posição fica na corretora (com SL/TP no servidor) e é retomada no reinício
+        self.close_on_exit = journal is None if close_on_exit is None else close_on_exit
+        self.last_indicators = None
+        self._journaled_position = None
+        self._close_reason = None
+        self._last_bar_time = None
+        # Último preço/dia vistos e SL da última ordem (P&L e exposição no RiskEngine)
+        self._last_price = None
+        self._last_day = None
+        self._order_sl_points = None
         
-        # 🟢 CORREÇÃO CRÍTICA 1: Usar sintaxe de dicionário aninhado para garantir a leitura.
-        self.risk_manager = RiskManager(
-            sl_points=CONFIG['STRATEGY']['SL_POINTS'],
-            tp_points=CONFIG['STRATEGY']['TP_POINTS']
+        settings = CONFIG.settings
+        # Dimensiona cada ordem no envio (ATR, perda diária, exposição entre ativos)
+        self.risk_manager = RiskEngine(
+            sl_points=settings.strategy.sl_points,
+            tp_points=settings.strategy.tp_points,
+            risk=settings.risk,
+            book=risk_book
         )
         
-        # 🟢 CORREÇÃO CRÍTICA 2: Usar sintaxe de dicionário aninhado para garantir a leitura.
         self.strategy = EMACrossStrategy(
-            fast_period=CONFIG['STRATEGY']['EMA_SHORT_PERIOD'],
-            slow_period=CONFIG['STRATEGY']['EMA_LONG_PERIOD']
+            fast_period=settings.strategy.ema_short_period,
+            slow_period=settings.strategy.ema_long_period
         )
         
-        self.confirmer = SignalConfirmer() 
+        # Tendência em timeframe maior mantida candle a candle (sem reagregar a janela a cada ciclo)
+        self.confirmer = SignalConfirmer(trend_timeframe=settings.strategy.trend_timeframe, incremental=True)
+        # Calendário do pregão (janela de entradas e zeragem do day trade); None = sem restrição
+        self.session = SessionCalendar.from_settings(settings.session) if settings.session.enabled else None
+        self._session_flags = None
+        # Break-even, trailing stop e parcial da posição aberta (O(1) por tick), em preço pelo
+        # ponto do símbolo: 1 ponto = 1 de preço (como no backtest) até conectar à corretora
+        self.point = 1.0
+        self._management = settings.management
+        self.position_manager = PositionManager.from_settings(settings.management, self.point)
+        self._managed_key = None
+        # Buffers dos indicadores reaproveitados a cada ciclo (sem alocar colunas no DataFrame)
+        self.indicators = IndicatorStore(0)
+        self._risk_indicators = IndicatorStore(0)
         
-        # O volume deve vir do RiskManager, que faz o cálculo
-        self.volume = self.risk_manager.calculate_volume() 
+        self.check_interval = settings.execution.check_interval_seconds
+        self.tick_interval = settings.execution.tick_interval_seconds
         self.is_connected = False
         
-        logger.info(f"Executor inicializado para {symbol} em {timeframe}. Volume de Contratos: {self.volume}")
+        # Configuração recarregada (hot reload) aguardando o próximo ciclo do loop
+        self._pending_settings = None
+        
+        logger.info(f"Executor inicializado para {symbol} em {timeframe}. Volume base (SL fixo): "
+                    f"{self.risk_manager.calculate_volume()} contratos")
+
+    def on_config_reload(self, settings: Settings):
+        """
+        Listener do ConfigWatcher: apenas agenda a nova configuração. Ela é aplicada
+        no início do próximo ciclo, nunca no meio de uma decisão.
+        """
+        self._pending_settings = settings
+
+    def apply_config(self, settings: Settings):
+        """
+        Troca parâmetros de risco e estratégia sem reiniciar o robô. A posição aberta
+        (da corretora) não é alterada: mantém o SL/TP com que foi enviada.
+        """
+        risk_manager = RiskEngine(
+            sl_points=settings.strategy.sl_points,
+            tp_points=settings.strategy.tp_points,
+            risk=settings.risk,
+            book=self.risk_manager.book  # Exposição e P&L do dia continuam valendo
+        )
+        strategy = EMACrossStrategy(
+            fast_period=settings.strategy.ema_short_period,
+            slow_period=settings.strategy.ema_long_period
+        )
+        
+        # Novo timeframe de tendência: filtros reconstruídos (a EMA maior se refaz com a janela do próximo ciclo)
+        confirmer = self.confirmer
+        if (settings.strategy.trend_timeframe or None) != confirmer.trend_timeframe:
+            confirmer = SignalConfirmer(trend_timeframe=settings.strategy.trend_timeframe, incremental=True)
+        
+        session = SessionCalendar.from_settings(settings.session) if settings.session.enabled else None
+        # Novas regras de gestão continuam a posição acompanhada (melhor preço e stop já movido)
+        position_manager = PositionManager.from_settings(settings.management, self.point)
+        position_manager.inherit(self.position_manager)
+        
+        # Troca das referências só depois de tudo construído (sem estado intermediário)
+        self.risk_manager = risk_manager
+        self.strategy = strategy
+        self.confirmer = confirmer
+        self.session = session
+        self.position_manager = position_manager
+        self._management = settings.management
+        self.check_interval = settings.execution.check_interval_seconds
+        self.tick_interval = settings.execution.tick_interval_seconds
+        
+        logger.warning(f"🔄 Parâmetros atualizados: EMA {strategy.fast_period}/{strategy.slow_period}, "
+                       f"tendência em {confirmer.trend_timeframe or 'timeframe do robô'}, SL/TP {risk_manager.sl_points}/{risk_manager.tp_points}, Volume base {risk_manager.calculate_volume()}. "
+                       f"Posição aberta preservada: {self.position_open}")
+
+    def _apply_pending_config(self):
+        settings, self._pending_settings = self._pending_settings, None
+        if settings is not None:
+            self.apply_config(settings)
 
     @property
     def position_open(self):
-        return ACTIVE_POSITION is not None
+        return self.broker.get_position() is not None
 
     def connect(self):
         """Tenta conectar ao servidor de API da Corretora."""
-        self.is_connected = api_connect()
+        self.is_connected = self.broker.connect()
         if self.is_connected:
             logger.info("Conexão com a API estabelecida com sucesso.")
+            self._use_symbol_point(float(getattr(self.broker, 'point', 1.0)))
         else:
             logger.error("Falha ao conectar à API da Corretora.")
             
         return self.is_connected
 
+    def _use_symbol_point(self, point: float):
+        """Converte pontos em preço pelo ponto do símbolo na corretora (o mesmo do SL/TP enviado)."""
+        if point == self.point:
+            return
+        self.point = point
+        position_manager = PositionManager.from_settings(self._management, point)
+        position_manager.inherit(self.position_manager)
+        self.position_manager = position_manager
+
     def monitor_and_close(self, current_price: float):
         """
-        Verifica se o preço atual atingiu o Stop Loss ou Take Profit e fecha a posição.
+        Verifica se o preço atual atingiu o Stop Loss (original ou movido pela gestão) ou o
+        Take Profit e fecha a posição; senão aplica break-even, trailing e parcial.
         """
-        if not self.position_open:
+        pos = self.broker.get_position()
+        if pos is None:
             return
-            
-        pos = ACTIVE_POSITION
         
-        if pos['type'] == "BUY":
-            if current_price <= pos['sl_price']:
-                api_close_position(reason="SL")
-            elif current_price >= pos['tp_price']:
-                api_close_position(reason="TP")
+        if self._manage(pos, current_price):
+            manager = self.position_manager
+            logger.info(f"Posição {pos['type']} aberta. Monitorando. Preço: {current_price:.2f} "
+                        f"(SL {manager.stop_price:.2f} / TP {pos['tp_price']:.2f})")
+
+    def on_tick(self, price: float = None) -> bool:
+        """
+        Gestão da posição entre os ciclos, a cada tick (sem buscar candles nem recalcular
+        indicadores): O(1) com a posição aberta. ``price`` padrão: o preço de saída do último
+        tick da corretora. Retorna False se não havia posição ou preço.
+        """
+        pos = self.broker.get_position()
+        if pos is None:
+            return False
+        if price is None:
+            price = self.broker.exit_price(pos['type'])
+            if price is None:
+                return False
+        self._last_price = float(price)
+        self._manage(pos, price)
+        return True
+
+    def _manage(self, pos: dict, price: float) -> bool:
+        """Aplica um preço à posição: True se ela continua aberta."""
+        manager = self.position_manager
+        key = (pos.get('ticket'), pos['type'], pos['entry_price'])
+        if key != self._managed_key:
+            # Posição nova (ou restaurada): o stop inicial é o que está na corretora
+            self._managed_key = key
+            manager.open(pos['type'], pos['entry_price'], pos['sl_price'], pos['tp_price'])
+        else:
+            manager.sync(pos['sl_price'])
+        
+        actions = manager.update(price)
+        if actions & STOP_HIT:
+            self._close(manager.exit_reason)
+            return False
+        if actions & TAKE_PROFIT:
+            self._close("TP")
+            return False
+        if actions & PARTIAL_EXIT:
+            volume = manager.partial_volume(pos['volume'], getattr(self.broker, 'volume_step', 1))
+            if volume:
+                self.broker.close_position(reason="PARCIAL", volume=volume)
+        if actions & STOP_MOVED or manager.moved:
+            self._send_stop()
+        return True
+
+    def _send_stop(self):
+        """Envia o stop movido à corretora, agrupado pelo passo e intervalo mínimos da gestão."""
+        manager = self.position_manager
+        now = self.clock.now()
+        sl_price = manager.pending_stop(now)
+        if sl_price is None:
+            return
+        if self.broker.modify_position(sl_price):
+            manager.stop_sent(sl_price, now)
+            logger.info(f"🔒 Stop movido para {sl_price:.2f} ({'trailing' if manager.trailing else 'break-even'}).")
+        else:
+            # Tenta de novo só depois do intervalo; até lá o stop local protege a posição
+            manager.stop_failed(now)
+
+    def _session_status(self, data_df: pd.DataFrame) -> int:
+        """Bits do calendário para o último candle (tudo liberado sem calendário)."""
+        if self.session is None or not isinstance(data_df.index, pd.DatetimeIndex):
+            return IN_SESSION | ENTRY_ALLOWED
+        bar_time = int(data_df.index[-1].value // 1_000_000_000)
+        _, minutes_to_close, flags = self.session.status(bar_time, timeframe_seconds(self.timeframe))
+        if flags != self._session_flags:
+            # Log só na mudança de estado (abertura da janela, fim das entradas, zeragem)
+            self._session_flags = flags
+            if flags & FORCE_FLAT:
+                logger.warning(f"⏰ Horário de zeragem do day trade ({self.session.flat_time}): posições serão encerradas.")
+            elif flags & ENTRY_ALLOWED:
+                logger.info(f"🔔 Janela de entradas aberta ({minutes_to_close} min para o fechamento do pregão).")
             else:
-                logger.info(f"Posição BUY aberta. Monitorando. Preço: {current_price:.2f} (SL {pos['sl_price']:.2f} / TP {pos['tp_price']:.2f})")
+                logger.info("🔕 Fora da janela de entradas do pregão: apenas monitorando.")
+        return flags
+
+    def _close(self, reason: str):
+        self._close_reason = reason
+        self.broker.close_position(reason=reason)
                 
-        elif pos['type'] == "SELL":
-            if current_price >= pos['sl_price']:
-                api_close_position(reason="SL")
-            elif current_price <= pos['tp_price']:
-                api_close_position(reason="TP")
+    # --- Journal de estado ---
+
+    def _track_position(self):
+        """
+        Registra a abertura/alteração/fechamento da posição desde o último ciclo: exposição e
+        P&L do dia no RiskEngine, journal e histórico.
+        """
+        position = self.broker.get_position()
+        previous, reason, self._close_reason = self._journaled_position, self._close_reason, None
+        if position == previous:
+            return
+        if position is None:
+            # Sem motivo do executor: fechada pela corretora (SL/TP no servidor)
+            reason = reason or "CORRETORA"
+            self.position_manager.close()
+            self._managed_key = None
+            price = self._last_price if self._last_price is not None else previous['entry_price']
+            self.risk_manager.on_close(self.symbol, self.risk_manager.position_pnl(previous, price), self._last_day)
+            if self.journal is not None:
+                self.journal.record(POSITION_CLOSED, position=previous, reason=reason)
+            if self.history is not None:
+                self.history.add_event('close', **dict(previous, reason=reason))
+        else:
+            if previous is None:
+                sl_points = self._order_sl_points or self.risk_manager.sl_points
+                self.risk_manager.on_open(self.symbol, position['volume'], sl_points)
+            elif (position['volume'], position['sl_price']) != (previous['volume'], previous['sl_price']):
+                # Saída parcial e/ou stop movido: P&L da parte encerrada e risco até o novo stop
+                closed = previous['volume'] - position['volume']
+                price = self._last_price if self._last_price is not None else previous['entry_price']
+                pnl = self.risk_manager.position_pnl(dict(previous, volume=closed), price) if closed > 0 else 0.0
+                self.risk_manager.on_update(self.symbol, position, pnl, self._last_day)
+                if self.history is not None and closed > 0:
+                    self.history.add_event('partial', **dict(position, closed_volume=closed, price=price))
+            if self.journal is not None:
+                self.journal.record(POSITION, position=dict(position))
+            if self.history is not None and previous is None:
+                self.history.add_event('fill', **position)
+        self._journaled_position = position
+
+    def _journal_indicators(self, bar_time):
+        """Snapshot dos últimos valores dos indicadores, uma vez por candle."""
+        if bar_time == self._last_bar_time:
+            return
+        self._last_bar_time = bar_time
+        values = {name: float(self.indicators[name][-1]) for name in self.indicators.keys()}
+        values['bar_time'] = str(bar_time)
+        self.last_indicators = values
+        self.journal.record(INDICATORS, values=values)
+
+    def recover(self) -> JournalState:
+        """
+        Retoma o estado do journal em vez de adivinhá-lo: restaura a posição simulada (ApiBroker)
+        ou, se a corretora for a fonte da verdade (MT5), apenas confere a posição registrada.
+        """
+        state = self.journal.recover()
+        self.last_indicators = state.indicators
+        current = self.broker.get_position()
+
+        if state.position is not None and current is None:
+            if hasattr(self.broker, 'restore_position'):
+                self.broker.restore_position(state.position)
+                logger.warning(f"♻️ Posição restaurada do journal: {state.position}")
             else:
-                logger.info(f"Posição SELL aberta. Monitorando. Preço: {current_price:.2f} (SL {pos['sl_price']:.2f} / TP {pos['tp_price']:.2f})")
-                
-                
+                logger.warning(f"Posição do journal não existe mais na corretora (fechada durante a queda): {state.position}")
+                self.journal.record(POSITION_CLOSED, position=state.position, reason="CORRETORA")
+        self._journaled_position = self.broker.get_position()
+        if self._journaled_position is not None:
+            # Risco até o stop real da posição (com stops pelo ATR ele difere de SL_POINTS)
+            self.risk_manager.on_update(self.symbol, self._journaled_position, day=self._last_day)
+        return state
+
+    def _current_atr(self, data: pd.DataFrame):
+        """ATR do último candle (apenas com stops dinâmicos)."""
+        if not self.risk_manager.uses_atr:
+            return None
+        period = self.risk_manager.atr_period
+        TechnicalIndicators(data, backend='auto', store=self._risk_indicators).add_atr(period)
+        return float(self._risk_indicators[f'ATR_{period}'][-1])
+
     def execute_trade(self, signal: str, data: pd.DataFrame):
         
         if self.position_open or signal == "HOLD":
@@ -152,15 +467,14 @@ class TradeExecutor:
         
         current_price = data['close'].iloc[-1]
         
-        if self.volume == 0:
+        # 🟢 SL/TP (fixos ou pelo ATR) e volume calculados pelo RiskEngine para esta ordem
+        sl_points, tp_points = self.risk_manager.stops(self._current_atr(data))
+        volume = self.risk_manager.size_order(self.symbol, sl_points, day=self._last_day)
+        if volume == 0:
             logger.warning("Volume zero. Abortando execução.")
             return
-
-        # 🟢 Usa SL/TP do RiskManager
-        sl_points = self.risk_manager.sl_points
-        tp_points = self.risk_manager.tp_points
-        # 🟢 Usa o valor de ponto do RiskManager
-        point_value = self.risk_manager.point_value 
+        # 🟢 Pontos em preço pelo ponto do símbolo (o mesmo da gestão da posição e do backtest)
+        point_value = self.point
         
         trade_type = ""
         
@@ -177,55 +491,128 @@ class TradeExecutor:
         else:
             return
 
-        api_send_order(
+        sent = self.broker.send_order(
             symbol=self.symbol, 
             trade_type=trade_type, 
-            volume=self.volume, 
+            volume=volume, 
+            price=current_price,
             sl_price=sl_price, 
-            tp_price=tp_price
+            tp_price=tp_price,
+            sl_points=sl_points,
+            tp_points=tp_points
         )
-        logger.info(f"Ordem de {signal} executada. Posicionamento aguardando confirmação.")
+        if self.journal is not None:
+            self.journal.record(ORDER, signal=signal, type=trade_type, volume=volume, price=current_price,
+                                sl_price=sl_price, tp_price=tp_price, accepted=bool(sent))
+        if self.history is not None:
+            self.history.add_event('order', symbol=self.symbol, signal=signal, type=trade_type, volume=volume,
+                                   price=current_price, sl_price=sl_price, tp_price=tp_price, accepted=bool(sent))
+        if sent:
+            self._order_sl_points = sl_points
+            logger.info(f"Ordem de {signal} executada. Posicionamento aguardando confirmação.")
+        else:
+            logger.error(f"Ordem de {signal} rejeitada pela corretora.")
 
 
+    def run_cycle(self, bars_to_fetch: int = 300):
+        """Um ciclo de decisão: busca dados, monitora a posição e, se não houver posição, avalia o sinal."""
+        # 0. Aplica uma configuração recarregada entre ciclos (um novo timeframe de tendência pode pedir mais candles)
+        self._apply_pending_config()
+        bars_to_fetch = max(bars_to_fetch, self.confirmer.lookback_bars(self.timeframe))
+        
+        data_df = self.broker.get_data(self.symbol, self.timeframe, bars_to_fetch)
+        if data_df is None or data_df.empty:
+            logger.warning("Sem dados da corretora neste ciclo.")
+            return
+        current_price = data_df['close'].iloc[-1]
+        self._last_price = float(current_price)
+        if isinstance(data_df.index, pd.DatetimeIndex):
+            self._last_day = data_df.index[-1].date()
+        
+        session_flags = self._session_status(data_df)
+        
+        # 1. Monitorar e Fechar Posições (no horário de zeragem, encerra de qualquer forma)
+        if self.position_open:
+            if session_flags & FORCE_FLAT:
+                self._close("FIM_DO_PREGAO")
+            else:
+                self.monitor_and_close(current_price)
+        
+        # 2. Gerar e Confirmar Sinal (se a posição estiver fechada e o pregão permitir entradas)
+        if not self.position_open and session_flags & ENTRY_ALLOWED:
+            self.indicators.reset(len(data_df))
+            self.strategy.calculate_indicators(data_df, self.indicators)
+            primary_signal = self.strategy.generate_signal(self.indicators)
+            
+            # Indicadores dos filtros calculados sob demanda: param no primeiro filtro que rejeita
+            self.confirmer.calculate_confirmation_indicators(data_df, self.indicators, lazy=True)
+            final_signal = self.confirmer.confirm_signal(data_df, primary_signal, self.indicators)
+            
+            logger.info(f"Preço Atual: {current_price:.2f} | Sinal Primário: {primary_signal} | Sinal FINAL: {final_signal}")
+            
+            if self.journal is not None:
+                self._journal_indicators(data_df.index[-1])
+            if self.history is not None and primary_signal != "HOLD":
+                # Sinal primário barrado pelos filtros de confirmação = rejeição
+                self.history.add_event('signal' if final_signal == primary_signal else 'rejection',
+                                       symbol=self.symbol, bar_time=str(data_df.index[-1]), price=current_price,
+                                       primary=primary_signal, final=final_signal,
+                                       rejection_flags=self.confirmer.last_rejection if final_signal == "HOLD" else 0)
+            self.execute_trade(final_signal, data_df)
+        
+        self._track_position()
+
+    def _wait(self, seconds: float):
+        """
+        Espera até o próximo ciclo. Com EXECUTION.TICK_INTERVAL_SECONDS, a espera é fatiada e
+        a posição aberta é gerida pelo último tick em cada fatia (``on_tick``).
+        """
+        if not self.tick_interval:
+            self.clock.sleep(seconds)
+            return
+        remaining = seconds
+        while remaining > 1e-9:
+            step = min(self.tick_interval, remaining)
+            self.clock.sleep(step)
+            remaining -= step
+            self.on_tick()
+
     def start_loop(self):
         """O loop principal de execução do robô."""
         if not self.connect():
             return
         
-        bars_to_fetch = 300 
-        check_interval = CONFIG.get('EXECUTION.CHECK_INTERVAL_SECONDS', 10) # Assumindo 10s se não definido
+        if self.journal is not None:
+            self.recover()
+            self.journal.start()
+        if self.history is not None:
+            self.history.start()  # Lotes do histórico gravados fora da thread de trading
+        
+        # Com filtro em timeframe maior, busca candles suficientes para aquecer a EMA de tendência
+        bars_to_fetch = max(300, self.confirmer.lookback_bars(self.timeframe))
         
         logger.info("Iniciando loop de execução autônomo. Pressione CTRL+C para parar.")
         
         try:
             while True:
-                data_df = api_get_data(self.symbol, self.timeframe, bars_to_fetch)
-                current_price = data_df['close'].iloc[-1]
-                
-                # 1. Monitorar e Fechar Posições
-                if self.position_open:
-                    self.monitor_and_close(current_price)
-                
-                # 2. Gerar e Confirmar Sinal (se a posição estiver fechada)
-                if not self.position_open:
-                    data_with_emas = self.strategy.calculate_indicators(data_df)
-                    primary_signal = self.strategy.generate_signal(data_with_emas)
-                    
-                    data_with_confirmer_indicators = self.confirmer.calculate_confirmation_indicators(data_with_emas)
-                    final_signal = self.confirmer.confirm_signal(data_with_confirmer_indicators, primary_signal)
-                    
-                    logger.info(f"Preço Atual: {current_price:.2f} | Sinal Primário: {primary_signal} | Sinal FINAL: {final_signal}")
-                    
-                    self.execute_trade(final_signal, data_df)
-                
-                time.sleep(check_interval)
+                self.run_cycle(bars_to_fetch)
+                self._wait(self.check_interval)
 
+        except ClockStopped:
+            logger.info("Relógio encerrado (fim do replay). Encerrando Executor.")
         except KeyboardInterrupt:
             logger.info("Loop interrompido pelo usuário (CTRL+C). Encerrando Executor.")
         except Exception as e:
             # Não use logger.error dentro do finally, use aqui
             logger.error(f"Erro Crítico no loop: {e}")
         finally:
-            api_close_position(reason="ENCERRAMENTO")
+            if self.close_on_exit:
+                self._close("ENCERRAMENTO")
+            self._track_position()
+            if self.journal is not None:
+                self.journal.stop()
+            if self.history is not None:
+                self.history.close()
+            self.broker.shutdown()
             logger.info("Robô encerrado.")
             self.is_connected = False
\ No newline at end of file
@@ -0,0 +1,115 @@
+# Arquivo: core/walk_forward.py
+
+import numpy as np
+import pandas as pd
+from typing import List
+from utils.logger import logger
+from core.backtester import Backtester
+from core.data_loader import MarketData
+from core.optimizer import run_optimization
+from core.resampler import TIMEFRAMES, infer_seconds
+from core.session_calendar import SessionCalendar
+from core.signal_confirmer import SignalConfirmer
+from core.streaming_backtest import EMA_WARMUP_FACTOR
+
+PARAMS = ('ema_fast', 'ema_slow', 'sl_points', 'tp_points')
+
+
+def fold_bounds(time: np.ndarray, train_days: int, test_days: int, step_days: int = None) -> List[tuple]:
+    """
+    Janelas (treino_início, treino_fim, teste_início, teste_fim), em índices de candle, contando
+    dias com candles (pregões). A janela avança ``step_days`` (padrão: ``test_days``), então os
+    períodos de teste de folds consecutivos não se sobrepõem.
+    """
+    step_days = step_days or test_days
+    day = np.asarray(time) // 86400
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(day)) + 1, [len(day)]])
+    days = len(starts) - 1
+    folds = []
+    for first in range(0, days - train_days - test_days + 1, step_days):
+        split = first + train_days
+        folds.append((int(starts[first]), int(starts[split]), int(starts[split]), int(starts[split + test_days])))
+    return folds
+
+
+def filter_warmup(time: np.ndarray, trend_timeframe: str = None) -> int:
+    """
+    Candles de base para aquecer os filtros de confirmação, com a tendência em timeframe maior
+    convertida para o timeframe dos candles (como no ``StreamingBacktester``).
+    """
+    pipeline = SignalConfirmer(trend_timeframe=trend_timeframe).pipeline
+    base = {seconds: name for name, seconds in TIMEFRAMES.items()}.get(infer_seconds(time))
+    return max(pipeline.min_bars(), pipeline.lookback(base) if base is not None else 0)
+
+
+def evaluate_window(data: MarketData, params: dict, start: int, stop: int, session: SessionCalendar = None,
+                    backend: str = None, trend_timeframe: str = None, filter_bars: int = None) -> dict:
+    """
+    Backtest de ``params`` só nos candles [start, stop), com os indicadores aquecidos pelos
+    candles anteriores (nenhum trade abre antes de ``start``). ``filter_bars``: aquecimento dos
+    filtros já calculado por ``filter_warmup`` (o walk-forward calcula uma vez por execução).
+    """
+    if filter_bars is None:
+        filter_bars = filter_warmup(data.time, trend_timeframe)
+    warmup = EMA_WARMUP_FACTOR * max(params['ema_slow'], filter_bars)
+    first = max(0, start - warmup)
+    tester = Backtester(data.slice(first, stop), backend=backend, session=session, trend_timeframe=trend_timeframe,
+                        **params)
+    tester.simulate(max(tester.prepare(), start - first))
+    if tester.position:
+        tester._close_position(len(tester.data) - 1, "ENCERRAMENTO")
+    tester._size_trades()
+    return tester._calculate_metrics()
+
+
+def walk_forward(data: MarketData, grid: List[dict], train_days: int = 20, test_days: int = 5, step_days: int = None,
+                 metric: str = 'profit_factor', min_trades: int = 1, workers: int = 1, queue: str = None,
+                 session: SessionCalendar = None, backend: str = None, name: str = 'wf',
+                 trend_timeframe: str = None) -> pd.DataFrame:
+    """
+    Otimização walk-forward: em cada fold otimiza a grade no treino, escolhe a melhor combinação
+    por ``metric`` (com pelo menos ``min_trades``) e a avalia no período de teste seguinte.
+
+    Retorna uma linha por fold com os parâmetros escolhidos, a métrica no treino e as métricas
+    fora da amostra (prefixo ``oos_``). Com ``queue`` cada fold é uma varredura na fila
+    distribuída (``<name>-fold<k>``), retomável se o coordenador cair.
+    """
+    folds = fold_bounds(data.time, train_days, test_days, step_days)
+    if not folds:
+        raise ValueError(f"Histórico curto demais para {train_days} dias de treino + {test_days} de teste.")
+    logger.info(f"Walk-forward: {len(folds)} folds de {train_days}+{test_days} dias, {len(grid)} combinações por fold.")
+    filter_bars = filter_warmup(data.time, trend_timeframe)
+
+    rows = []
+    for k, (train_start, train_stop, test_start, test_stop) in enumerate(folds):
+        results = run_optimization(data.slice(train_start, train_stop), grid, workers=workers, backend=backend,
+                                   session=session, queue=queue, sweep_id=f'{name}-fold{k}' if queue else None,
+                                   trend_timeframe=trend_timeframe)
+        row = {'fold': k,
+               'train_start': pd.Timestamp(int(data.time[train_start]), unit='s'),
+               'test_start': pd.Timestamp(int(data.time[test_start]), unit='s'),
+               'test_end': pd.Timestamp(int(data.time[test_stop - 1]), unit='s')}
+
+        candidates = results[results['total_trades'] >= min_trades]
+        candidates = candidates[np.isfinite(pd.to_numeric(candidates[metric], errors='coerce'))]
+        if candidates.empty:
+            logger.warning(f"Fold {k}: nenhuma combinação com {min_trades}+ trades no treino. Fold sem operação.")
+            rows.append(row)
+            continue
+
+        best = candidates.sort_values(metric, ascending=False).iloc[0]
+        params = {param: int(best[param]) for param in PARAMS}
+        oos = evaluate_window(data, params, test_start, test_stop, session=session, backend=backend,
+                              trend_timeframe=trend_timeframe, filter_bars=filter_bars)
+        row.update(params)
+        row[f'train_{metric}'] = float(best[metric])
+        row.update({f'oos_{key}': oos[key] for key in ('total_trades', 'net_profit', 'win_rate', 'profit_factor')})
+        rows.append(row)
+        logger.info(f"Fold {k}: EMA {params['ema_fast']}/{params['ema_slow']} SL/TP {params['sl_points']}/"
+                    f"{params['tp_points']} -> fora da amostra R$ {oos['net_profit']:.2f} em {oos['total_trades']} trades.")
+
+    df = pd.DataFrame(rows)
+    if 'oos_net_profit' in df:
+        logger.info(f"Walk-forward concluído: lucro fora da amostra R$ {df['oos_net_profit'].sum():.2f} "
+                    f"em {int(df['oos_total_trades'].sum())} trades.")
+    return df
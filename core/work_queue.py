@@ -0,0 +1,314 @@
+# Arquivo: core/work_queue.py
+
+"""
+Fila de tarefas da otimização distribuída, num diretório compartilhado entre as máquinas:
+
+    <root>/queue.sqlite            tarefas, leases e resultados (SQLite, só biblioteca padrão)
+    <root>/data/<sweep_id>/*.npy   histórico da varredura (lido com memory-map pelos workers)
+
+O coordenador (``run_optimization(..., queue=<root>)``) publica a grade e espera; os
+workers (``python -m core.work_queue --queue <root>``, em qualquer máquina que monte o
+diretório) pegam tarefas com lease, rodam o backtest e gravam o resultado.
+
+- Lease: a tarefa fica reservada por ``lease_seconds`` (renovado enquanto o backtest roda);
+  se o worker cair, o lease expira e outra máquina pega a tarefa.
+- Retentativas: até ``max_attempts`` leases por tarefa; depois ela fica como 'failed'.
+- Deduplicação: o id da tarefa é o hash (varredura + parâmetros); combinações repetidas
+  viram uma tarefa só e, se dois workers terminarem a mesma tarefa (lease expirado), só o
+  primeiro resultado é gravado.
+
+O diretório precisa de locks POSIX funcionando (disco local, NFSv4 ou similar).
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import pickle
+import socket
+import sqlite3
+import hashlib
+import argparse
+import threading
+import multiprocessing
+from collections import namedtuple
+from contextlib import closing, contextmanager
+from typing import List
+from utils.logger import logger
+from core.data_loader import MarketData
+
+# Estados de uma tarefa
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+Task = namedtuple('Task', 'task_id sweep_id params attempts')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sweeps (
+    sweep_id TEXT PRIMARY KEY, created_at REAL, symbol TEXT, options BLOB);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY, sweep_id TEXT, seq INTEGER, params TEXT, status TEXT,
+    attempts INTEGER DEFAULT 0, worker TEXT, lease_until REAL, error TEXT);
+CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, lease_until);
+CREATE TABLE IF NOT EXISTS results (
+    task_id TEXT PRIMARY KEY, sweep_id TEXT, worker TEXT, finished_at REAL, metrics BLOB);
+"""
+
+
+def task_id(sweep_id: str, params: dict) -> str:
+    """Id determinístico da tarefa: a mesma combinação na mesma varredura é sempre a mesma tarefa."""
+    key = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(f'{sweep_id}:{key}'.encode()).hexdigest()[:20]
+
+
+def default_worker_id() -> str:
+    return f'{socket.gethostname()}-{os.getpid()}'
+
+
+class WorkQueue:
+    """Fila de tarefas com lease sobre SQLite (uma conexão por operação: segura entre threads e processos)."""
+
+    def __init__(self, root: str, lease_seconds: float = 300.0, max_attempts: int = 3):
+        self.root = root
+        self.path = os.path.join(root, 'queue.sqlite')
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(root, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.executescript(_SCHEMA)  # Idempotente (IF NOT EXISTS); executescript faz o próprio commit
+
+    def _connect(self) -> sqlite3.Connection:
+        # timeout: espera o lock de outro processo em vez de falhar na hora
+        return sqlite3.connect(self.path, timeout=60, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self):
+        """Transação com lock de escrita desde o início (dois workers nunca pegam a mesma tarefa)."""
+        with closing(self._connect()) as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                yield db
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+
+    def data_dir(self, sweep_id: str) -> str:
+        return os.path.join(self.root, 'data', sweep_id)
+
+    # --- Coordenador ---
+
+    def submit(self, data: MarketData, grid: List[dict], options: dict = None, sweep_id: str = None) -> str:
+        """
+        Publica o histórico e a grade de uma varredura. Resubmeter o mesmo ``sweep_id`` não
+        duplica tarefas (retoma a varredura de onde parou). Retorna o sweep_id.
+        """
+        sweep_id = sweep_id or uuid.uuid4().hex[:16]
+        directory = self.data_dir(sweep_id)
+        if not os.path.exists(os.path.join(directory, 'time.npy')):
+            data.save(directory)
+        rows = [(task_id(sweep_id, params), sweep_id, seq, json.dumps(params), PENDING)
+                for seq, params in enumerate(grid)]
+        with self._transaction() as db:
+            db.execute('INSERT OR IGNORE INTO sweeps VALUES (?, ?, ?, ?)',
+                       (sweep_id, time.time(), data.symbol, pickle.dumps(options or {})))
+            db.executemany('INSERT OR IGNORE INTO tasks (task_id, sweep_id, seq, params, status) VALUES (?, ?, ?, ?, ?)',
+                           rows)
+        logger.info(f"📤 Varredura {sweep_id}: {len({row[0] for row in rows})} tarefas publicadas em {self.root}.")
+        return sweep_id
+
+    def progress(self, sweep_id: str = None) -> dict:
+        """Tarefas por estado (de uma varredura ou da fila inteira)."""
+        query = 'SELECT status, COUNT(*) FROM tasks' + (' WHERE sweep_id = ?' if sweep_id else '') + ' GROUP BY status'
+        with closing(self._connect()) as db:
+            counts = dict(db.execute(query, (sweep_id,) if sweep_id else ()).fetchall())
+        return {status: counts.get(status, 0) for status in (PENDING, LEASED, DONE, FAILED)}
+
+    def results(self, sweep_id: str) -> dict:
+        """Métricas gravadas por task_id."""
+        with closing(self._connect()) as db:
+            rows = db.execute('SELECT task_id, metrics FROM results WHERE sweep_id = ?', (sweep_id,)).fetchall()
+        return {tid: pickle.loads(blob) for tid, blob in rows}
+
+    def errors(self, sweep_id: str) -> dict:
+        """Último erro das tarefas que falharam em todas as tentativas."""
+        with closing(self._connect()) as db:
+            rows = db.execute('SELECT task_id, error FROM tasks WHERE sweep_id = ? AND status = ?',
+                              (sweep_id, FAILED)).fetchall()
+        return dict(rows)
+
+    # --- Worker ---
+
+    def lease(self, worker: str) -> Task:
+        """Reserva a próxima tarefa pendente (ou com lease expirado). None se não houver."""
+        now = time.time()
+        with self._transaction() as db:
+            # Leases expirados que já esgotaram as tentativas não voltam para a fila
+            db.execute('UPDATE tasks SET status = ?, error = ? WHERE status = ? AND lease_until < ? AND attempts >= ?',
+                       (FAILED, 'lease expirado (worker parou?)', LEASED, now, self.max_attempts))
+            row = db.execute('SELECT task_id, sweep_id, params, attempts FROM tasks '
+                             'WHERE status = ? OR (status = ? AND lease_until < ?) ORDER BY rowid LIMIT 1',
+                             (PENDING, LEASED, now)).fetchone()
+            if row is None:
+                return None
+            db.execute('UPDATE tasks SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1 '
+                       'WHERE task_id = ?', (LEASED, worker, now + self.lease_seconds, row[0]))
+        return Task(row[0], row[1], json.loads(row[2]), row[3] + 1)
+
+    def renew(self, task_id: str, worker: str) -> bool:
+        """Estende o lease enquanto o worker ainda é o dono da tarefa."""
+        with self._transaction() as db:
+            cursor = db.execute('UPDATE tasks SET lease_until = ? WHERE task_id = ? AND worker = ? AND status = ?',
+                                (time.time() + self.lease_seconds, task_id, worker, LEASED))
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: str, worker: str, metrics: dict) -> bool:
+        """Grava o resultado. False se a tarefa já tinha resultado (de outro worker)."""
+        with self._transaction() as db:
+            sweep_id, = db.execute('SELECT sweep_id FROM tasks WHERE task_id = ?', (task_id,)).fetchone()
+            cursor = db.execute('INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?)',
+                                (task_id, sweep_id, worker, time.time(), pickle.dumps(metrics)))
+            db.execute('UPDATE tasks SET status = ?, worker = ?, error = NULL WHERE task_id = ?', (DONE, worker, task_id))
+        return cursor.rowcount == 1
+
+    def fail(self, task_id: str, worker: str, error: str):
+        """Devolve a tarefa para a fila (ou marca 'failed' após ``max_attempts`` tentativas)."""
+        with self._transaction() as db:
+            db.execute('UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, lease_until = NULL, '
+                       'error = ? WHERE task_id = ? AND worker = ? AND status = ?',
+                       (self.max_attempts, FAILED, PENDING, error, task_id, worker, LEASED))
+
+    def sweep(self, sweep_id: str) -> tuple:
+        """Histórico (memory-map) e opções de uma varredura."""
+        with closing(self._connect()) as db:
+            symbol, blob = db.execute('SELECT symbol, options FROM sweeps WHERE sweep_id = ?', (sweep_id,)).fetchone()
+        return MarketData.load(self.data_dir(sweep_id), mmap=True, symbol=symbol), pickle.loads(blob)
+
+
+class _LeaseKeeper:
+    """Renova o lease em segundo plano enquanto o backtest da tarefa roda."""
+
+    def __init__(self, queue: WorkQueue, task: Task, worker: str):
+        self.queue, self.task, self.worker = queue, task, worker
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='lease-keeper')
+
+    def _run(self):
+        while not self._stop.wait(self.queue.lease_seconds / 3):
+            try:
+                self.queue.renew(self.task.task_id, self.worker)
+            except sqlite3.Error as e:
+                logger.warning(f"Falha ao renovar lease de {self.task.task_id}: {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(root: str, worker_id: str = None, exit_when_empty: bool = False, idle_timeout: float = None,
+               poll_interval: float = 1.0, max_tasks: int = None, lease_seconds: float = 300.0) -> int:
+    """
+    Consome tarefas da fila até ``max_tasks``, até a fila esvaziar (``exit_when_empty``) ou
+    até ficar ``idle_timeout`` segundos sem tarefa. Retorna quantas tarefas concluiu.
+    """
+    from core import optimizer
+
+    queue = WorkQueue(root, lease_seconds=lease_seconds)
+    worker_id = worker_id or default_worker_id()
+    loaded = None
+    done = 0
+    idle_since = time.monotonic()
+    logger.info(f"👷 Worker {worker_id} consumindo {queue.path}")
+
+    while max_tasks is None or done < max_tasks:
+        task = queue.lease(worker_id)
+        if task is None:
+            if exit_when_empty and not queue.progress()[LEASED]:
+                break
+            if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        if loaded != task.sweep_id:
+            # Histórico e opções carregados uma vez por varredura
+            optimizer._init_worker(*queue.sweep(task.sweep_id))
+            loaded = task.sweep_id
+        try:
+            with _LeaseKeeper(queue, task, worker_id):
+                metrics = optimizer._run_single(task.params)
+        except Exception as e:
+            logger.error(f"Tarefa {task.task_id} falhou (tentativa {task.attempts}): {e}", exc_info=True)
+            queue.fail(task.task_id, worker_id, f'{type(e).__name__}: {e}')
+            continue
+        metrics['worker'] = worker_id
+        if not queue.complete(task.task_id, worker_id, metrics):
+            logger.warning(f"Tarefa {task.task_id} já tinha resultado de outro worker: descartado.")
+        done += 1
+        idle_since = time.monotonic()
+
+    logger.info(f"Worker {worker_id} encerrado após {done} tarefas.")
+    return done
+
+
+def run_distributed(root: str, data: MarketData, grid: List[dict], options: dict, workers: int = 1,
+                    sweep_id: str = None, poll_interval: float = 0.5, timeout: float = None) -> List[dict]:
+    """
+    Coordenador: publica a varredura, inicia ``workers`` processos locais (0 = só workers
+    externos) e espera todas as tarefas terminarem. Retorna as métricas na ordem da grade;
+    tarefas que falharam em todas as tentativas voltam apenas com a chave ``error``.
+    """
+    queue = WorkQueue(root)
+    sweep_id = queue.submit(data, grid, options, sweep_id)
+    processes = [multiprocessing.Process(target=run_worker, args=(root,), daemon=True,
+                                         kwargs={'exit_when_empty': True, 'poll_interval': poll_interval})
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    start = time.monotonic()
+    try:
+        while True:
+            progress = queue.progress(sweep_id)
+            if not progress[PENDING] and not progress[LEASED]:
+                break
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise TimeoutError(f"Varredura {sweep_id} incompleta após {timeout:.0f} s: {progress}")
+            time.sleep(poll_interval)
+    finally:
+        for process in processes:
+            process.join(timeout=poll_interval * 4)
+            if process.is_alive():
+                process.terminate()
+
+    results, errors = queue.results(sweep_id), queue.errors(sweep_id)
+    if errors:
+        logger.error(f"Varredura {sweep_id}: {len(errors)} tarefas falharam em todas as tentativas.")
+    logger.info(f"📥 Varredura {sweep_id} concluída em {time.monotonic() - start:.1f} s: {progress}")
+    ids = [task_id(sweep_id, params) for params in grid]
+    return [dict(results[tid]) if tid in results else {'error': errors.get(tid)} for tid in ids]
+
+
+def main(argv=None):
+    from utils.logger import setup_logger
+
+    parser = argparse.ArgumentParser(description='Worker da otimização distribuída.')
+    parser.add_argument('--queue', required=True, help='Diretório compartilhado da fila')
+    parser.add_argument('--worker-id', default=None)
+    parser.add_argument('--idle-timeout', type=float, default=None, help='Encerra após N segundos sem tarefa')
+    parser.add_argument('--poll', type=float, default=1.0, help='Intervalo de consulta da fila (s)')
+    args = parser.parse_args(argv)
+
+    setup_logger()
+    run_worker(args.queue, args.worker_id, idle_timeout=args.idle_timeout, poll_interval=args.poll)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
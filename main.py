@@ -1,16 +1,49 @@
 # Arquivo: main.py
 
-from utils.config import CONFIG
+"""
+Robô de day trade: linha de comando.
+
+    python main.py live                                   # Executor ao vivo (MT5)
+    python main.py live --paper                           # Executor com corretora simulada
+    python main.py backtest --data data/win_m1 --start 2025-01-02 --end 2025-03-31
+    python main.py backtest --data historico.csv --stream D --trades trades.csv
+    python main.py optimize --data data/win_m1 --workers 8 --chunk-size 4
+    python main.py walk-forward --data data/win_m1 --train-days 20 --test-days 5
+    python main.py replay --data historico.csv --speed 600
+    python main.py ingest historico.csv --out data/win_m1 --chunk-size 500000
+    python main.py worker --queue /mnt/fila
+    python main.py bench streaming -- --months 6
+
+``--data`` aceita um diretório gerado por ``ingest`` (lido com memory-map), um CSV OHLCV ou
+nada (dados sintéticos de ``--bars`` candles). ``--threads`` limita as threads de
+BLAS/OpenMP/numba por processo (padrão: variáveis do ambiente ou 1).
+"""
+
+from utils.config import CONFIG, ConfigWatcher
 from utils.logger import setup_logger, logger
-from core.trade_executor import TradeExecutor
-from core.backtester import Backtester # ⚠️ NOVO IMPORT
+import os
+import sys
 import random
-import pandas as pd
+import argparse
+
+# pandas, otimizador e executor são importados dentro das funções: o comando escolhido
+# carrega apenas o que usa, e a inicialização do programa fica mais rápida.
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+BENCHMARKS = {
+    'startup': 'bench_startup.py',
+    'streaming': 'streaming_backtest.py',
+    'ticks': 'tick_month.py',
+    'soak': 'soak_mt5_simulator.py',
+}
 
 # --- FUNÇÕES AUXILIARES ---
 
-def generate_historical_data(bars: int = 500) -> pd.DataFrame:
+def generate_historical_data(bars: int = 500):
     """Gera dados de preço simulados com tendência para backtest."""
+    import pandas as pd
+
     data = pd.DataFrame({
         'time': pd.to_datetime(pd.Series(range(bars)) * 60, unit='s', origin='2025-01-01'),
         'open': 10000.0,
@@ -19,15 +52,15 @@ def generate_historical_data(bars: int = 500) -> pd.DataFrame:
         'close': 10000.0,
         'tick_volume': 1000,
     })
-    
+
     # Simula uma leve tendência de alta com volatilidade e volume
     price = 10000.0
     for i in range(bars):
         volatility = random.uniform(-10, 10)
-        trend = 0.5 * (i / bars) 
-        
+        trend = 0.5 * (i / bars)
+
         price += volatility + trend
-        
+
         data.loc[i, 'close'] = price
         data.loc[i, 'open'] = price + random.uniform(-5, 5)
         data.loc[i, 'high'] = max(data.loc[i, 'open'], data.loc[i, 'close']) + random.uniform(0, 5)
@@ -37,42 +70,60 @@ def generate_historical_data(bars: int = 500) -> pd.DataFrame:
     data.set_index('time', inplace=True)
     return data
 
-def run_backtest():
+def load_dataset(path: str = None, compact: bool = False, bars: int = 500, start: str = None, end: str = None,
+                 symbol: str = None):
+    """Diretório de .npy (``ingest``) com memory-map, CSV OHLCV ou, sem caminho, dados sintéticos; recortado por data."""
+    from core.data_loader import MarketData, load_csv, select_range
+
+    if path is None:
+        data = MarketData.from_dataframe(generate_historical_data(bars=bars), compact=compact, symbol=symbol)
+    elif os.path.isdir(path):
+        data = MarketData.load(path, mmap=True, symbol=symbol)
+    else:
+        data = load_csv(path, compact=compact, symbol=symbol)
+    return select_range(data, start, end) if start or end else data
+
+def _session():
+    """Calendário do pregão quando SESSION.ENABLED (entradas na janela e zeragem no fim do dia)."""
+    from core.session_calendar import SessionCalendar
+    return SessionCalendar.from_settings(CONFIG.session) if CONFIG.session.enabled else None
+
+def run_backtest(workers: int = 1, compact: bool = False, data=None, grid: list = None, queue: str = None,
+                 chunksize: int = None, signal_cache: str = None, report_dir: str = 'reports', history_dir: str = 'history'):
     """Roda a otimização de parâmetros da estratégia."""
+    from core.optimizer import build_grid, run_optimization
+    from core.history_store import HistoryStore
+    from core.report import submit_report
+
     logger.info("--- INICIANDO BACKTEST E OTIMIZAÇÃO DE PARÂMETROS ---")
-    
-    historical_data = generate_historical_data(bars=500)
-    
+
+    historical_data = generate_historical_data(bars=500) if data is None else data
+
     # Parâmetros que queremos testar
-    ema_fast_list = [9, 10, 12]
-    ema_slow_list = [20, 26, 30]
-    sl_points_list = [15, 20, 30]
-    tp_points_list = [30, 40, 60]
-    
-    best_results = []
-    
-    total_runs = len(ema_fast_list) * len(ema_slow_list) * len(sl_points_list) * len(tp_points_list)
-    current_run = 0
-
-    for fast in ema_fast_list:
-        for slow in ema_slow_list:
-            if fast >= slow:
-                continue
-            for sl in sl_points_list:
-                for tp in tp_points_list:
-                    current_run += 1
-                    logger.info(f"Rodando teste {current_run}/{total_runs}: EMA {fast}/{slow}, SL/TP {sl}/{tp}")
-                    
-                    tester = Backtester(historical_data, sl_points=sl, tp_points=tp, ema_fast=fast, ema_slow=slow)
-                    metrics = tester.run()
-                    best_results.append(metrics)
+    grid = grid or build_grid(
+        ema_fast_list=[9, 10, 12],
+        ema_slow_list=[20, 26, 30],
+        sl_points_list=[15, 20, 30],
+        tp_points_list=[30, 40, 60],
+    )
+
+    # Cada execução (parâmetros, métricas e trades) fica no histórico para consultas posteriores
+    # Com SESSION.ENABLED, entradas só na janela do pregão e zeragem no fim do dia
+    results = run_optimization(historical_data, grid, workers=workers, compact=compact,
+                               history=HistoryStore(history_dir) if history_dir else None, session=_session(),
+                               queue=queue, signal_cache=signal_cache, chunksize=chunksize,
+                               trend_timeframe=CONFIG.strategy.trend_timeframe or None)
+
+    # Heatmaps e robustez das combinações em segundo plano (HTML/PNG estáticos em reports/)
+    report = submit_report(results, report_dir)
 
     # Encontrar a melhor configuração (usando Fator de Lucro como métrica principal)
-    df_results = pd.DataFrame([r for r in best_results if r['total_trades'] > 0])
-    
+    df_results = results[results['total_trades'] > 0]
+
     if df_results.empty:
         logger.warning("Nenhum trade foi executado no backtest. Ajuste os filtros.")
-        return
+        report.result()
+        return results
 
     # Escolhe a melhor combinação (Ex: Maior Profit Factor)
     best_run = df_results.sort_values(by='profit_factor', ascending=False).iloc[0]
@@ -85,30 +136,286 @@ def run_backtest():
     logger.critical(f"Fator de Lucro (Profit Factor): {best_run['profit_factor']:.2f}")
     logger.critical(f"Total de Trades: {best_run['total_trades']}")
     logger.critical("================================================")
-    
+    logger.info(f"Relatório de sensibilidade: {report.result()['html']}")
+
     # ⚠️ Em produção, você usaria o resultado aqui para atualizar o config.py antes de rodar o executor.
-    
-# --- EXECUÇÃO PRINCIPAL ---
+    return results
 
-# --- EXECUÇÃO PRINCIPAL ---
+def _management(break_even: int = None, trailing: int = None, partial: int = None):
+    """Gestão da posição do config (MANAGEMENT) com os pontos do CLI sobrepostos (1 ponto = 1 de preço no backtest)."""
+    from dataclasses import replace
+    from core.position_manager import PositionManager
+    overrides = {key: value for key, value in (('break_even_points', break_even), ('trailing_points', trailing),
+                                               ('partial_points', partial)) if value is not None}
+    return PositionManager.from_settings(replace(CONFIG.management, **overrides), point=1.0)
 
-if __name__ == "__main__":
-    setup_logger()
+def run_single_backtest(data, params: dict, stream: str = None, chunk_size: int = None, trades_path: str = None,
+                        backend: str = None, chunks=None, management=None) -> dict:
+    """
+    Um backtest com ``params``. Com ``stream`` ('D'/'M'), ``chunk_size`` (candles) ou ``chunks``
+    (blocos já prontos, ex.: lidos do CSV aos poucos) roda em blocos (``StreamingBacktester``):
+    a memória depende do bloco, não do histórico. ``management``: break-even, trailing e parcial.
+    """
+    import pandas as pd
+    from core.backtester import Backtester
+
+    if stream or chunk_size or chunks is not None:
+        from core.streaming_backtest import StreamingBacktester
+        from core.data_loader import iter_periods
+
+        if chunks is None:
+            chunks = (iter_periods(data, stream) if stream
+                      else (data.slice(i, i + chunk_size) for i in range(0, len(data), chunk_size)))
+        metrics = StreamingBacktester(backend=backend, session=_session(), trades_path=trades_path,
+                                      trend_timeframe=CONFIG.strategy.trend_timeframe or None,
+                                      management=management, **params).run(chunks)
+    else:
+        tester = Backtester(data, backend=backend, session=_session(), management=management,
+                            trend_timeframe=CONFIG.strategy.trend_timeframe or None, **params)
+        metrics = tester.run()
+        if trades_path:
+            pd.DataFrame(tester.trades).to_csv(trades_path, index=False)
+
+    logger.info(f"📊 Backtest EMA {metrics['params']['EMA']} SL/TP {metrics['params']['SL/TP']}: "
+                f"{metrics['total_trades']} trades | R$ {metrics['net_profit']:.2f} | "
+                f"acerto {metrics['win_rate']:.1f}% | PF {metrics['profit_factor']:.2f}")
+    return metrics
+
+def run_live_replay(csv_path: str = None, speed: float = None, data=None):
+    """Roda o loop real do executor sobre um histórico gravado (relógio acelerado, sem terminal MT5)."""
+    from core.data_loader import load_csv
+    from core.replay import run_replay, log_report
+
+    logger.info("--- INICIANDO REPLAY DO EXECUTOR AO VIVO ---")
+    if data is None:
+        data = load_csv(csv_path) if csv_path else generate_historical_data(bars=2000)
+    log_report(run_replay(data, speed=speed))
+
+def build_live_broker():
+    """
+    Corretora de produção: ``MT5Broker`` com as ordens enviadas pelo ``OrderManager`` (fila sem
+    bloquear o ciclo, limite de envio e pré-validação com ``order_check``) e a sessão vigiada
+    pelo ``ConnectionSupervisor`` (heartbeat, reconexão com backoff e ressincronização das
+    posições após uma queda).
+    """
+    from mt5.mt5_connector import get_connector
+    from mt5.order_handler import get_order_handler
+    from mt5.order_manager import OrderManager
+    from mt5.supervisor import ConnectionSupervisor
+    from mt5.broker import MT5Broker
+
+    connector = get_connector()
+    order_handler = get_order_handler()
+    order_manager = OrderManager(order_handler).start()
+    supervisor = ConnectionSupervisor(connector, order_manager=order_manager)
+    return MT5Broker(connector, order_handler, order_manager=order_manager, supervisor=supervisor)
+
+def run_trading_bot(paper: bool = False, close_on_exit: bool = False):
+    """
+    Executor em tempo real no MT5, com journal de estado, histórico e hot reload do config.
+    ``paper``: corretora simulada (``ApiBroker``, candles aleatórios), com journal e histórico
+    separados dos de produção. Ao sair, a posição fica aberta (SL/TP no servidor) e é retomada
+    pelo journal no reinício; ``close_on_exit`` zera a posição ao encerrar.
+    """
+    from core.trade_executor import TradeExecutor, ApiBroker
+    from core.state_journal import StateJournal
+    from core.history_store import HistoryStore
 
     logger.info("================================================")
     logger.info("INICIANDO ROBÔ DE DAY TRADE AUTÔNOMO")
     logger.info("================================================")
-    
-    # ⚠️ Agora, vamos para o mercado real/demo!
-    
-    # 1. RODAR BACKTEST (ESTA LINHA FOI COMENTADA)
-    # run_backtest()
-    
-    # 2. RODAR EXECUTOR EM TEMPO REAL (ESTE BLOCO FOI DESCOMENTADO)
+    if paper:
+        logger.warning("📝 Modo simulado (--paper): nenhuma ordem vai ao MT5.")
+
     executor = TradeExecutor(
-        symbol=CONFIG.get('GLOBAL.SYMBOL'), # Corrigi para usar 'GLOBAL'
-        timeframe=CONFIG.get('GLOBAL.TIMEFRAME') # Corrigi para usar 'GLOBAL'
+        symbol=CONFIG.global_.symbol,
+        timeframe=CONFIG.global_.timeframe,
+        broker=ApiBroker() if paper else build_live_broker(),
+        # Ordens, posições e indicadores em journal: após uma queda o robô retoma o estado
+        journal=StateJournal(os.path.join('state', 'paper_journal.jsonl' if paper else 'executor_journal.jsonl')),
+        # Sinais, rejeições, ordens e execuções no histórico colunar
+        history=HistoryStore(os.path.join('history', 'paper') if paper else 'history'),
+        close_on_exit=close_on_exit
     )
-    executor.start_loop()
-    
-    logger.info("Programa finalizado com sucesso.")
\ No newline at end of file
+
+    # Hot reload: alterações de risco/estratégia no config.yaml entram no próximo ciclo, sem reiniciar
+    CONFIG.subscribe(executor.on_config_reload)
+    watcher = ConfigWatcher().start()
+    try:
+        executor.start_loop()
+    finally:
+        watcher.stop()
+
+    logger.info("Programa finalizado com sucesso.")
+
+# --- COMANDOS ---
+
+def _int_list(text: str) -> list:
+    return [int(value) for value in text.split(',') if value.strip()]
+
+def _dataset(args):
+    return load_dataset(args.data, args.compact, args.bars, args.start, args.end, args.symbol)
+
+def _grid(args) -> list:
+    from core.optimizer import build_grid
+    return build_grid(args.ema_fast, args.ema_slow, args.sl, args.tp)
+
+def cmd_live(args):
+    run_trading_bot(paper=args.paper, close_on_exit=args.close_on_exit)
+
+def cmd_backtest(args):
+    strategy = CONFIG.strategy
+    params = {'ema_fast': args.ema_fast or strategy.ema_short_period, 'ema_slow': args.ema_slow or strategy.ema_long_period,
+              'sl_points': args.sl or strategy.sl_points, 'tp_points': args.tp or strategy.tp_points}
+    management = _management(args.break_even, args.trailing, args.partial)
+    if args.chunk_size and args.data and os.path.isfile(args.data) and not args.stream:
+        # CSV lido em blocos: o arquivo nunca é carregado inteiro
+        from core.data_loader import iter_csv_chunks, select_range
+        chunks = (select_range(chunk, args.start, args.end)
+                  for chunk in iter_csv_chunks(args.data, args.chunk_size, args.compact, args.symbol))
+        run_single_backtest(None, params, chunks=chunks, trades_path=args.trades, backend=args.backend,
+                            management=management)
+        return
+    run_single_backtest(_dataset(args), params, stream=args.stream, chunk_size=args.chunk_size,
+                        trades_path=args.trades, backend=args.backend, management=management)
+
+def cmd_optimize(args):
+    run_backtest(workers=args.workers, compact=args.compact, data=_dataset(args), grid=_grid(args), queue=args.queue,
+                 chunksize=args.chunk_size, signal_cache=args.signal_cache, report_dir=args.report,
+                 history_dir=args.history or None)
+
+def cmd_walk_forward(args):
+    from core.walk_forward import walk_forward
+
+    folds = walk_forward(_dataset(args), _grid(args), train_days=args.train_days, test_days=args.test_days,
+                         step_days=args.step_days, metric=args.metric, min_trades=args.min_trades,
+                         workers=args.workers, queue=args.queue, session=_session(), name=args.name,
+                         trend_timeframe=CONFIG.strategy.trend_timeframe or None)
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    folds.to_csv(args.out, index=False)
+    logger.info(f"Folds gravados em {args.out}")
+
+def cmd_replay(args):
+    run_live_replay(speed=args.speed, data=_dataset(args))
+
+def cmd_ingest(args):
+    from core.data_loader import ingest_csv
+    ingest_csv(args.csv, args.out, chunk_rows=args.chunk_size, compact=args.compact, symbol=args.symbol)
+
+def cmd_worker(args):
+    from core.work_queue import run_worker
+    run_worker(args.queue, args.worker_id, idle_timeout=args.idle_timeout, poll_interval=args.poll)
+
+def cmd_bench(args):
+    import runpy
+    script = os.path.join(ROOT, 'benchmarks', BENCHMARKS[args.name])
+    sys.argv = [script, *args.args]
+    runpy.run_path(script, run_name='__main__')
+
+def _add_data_arguments(parser, bars: int = 500):
+    parser.add_argument('--data', default=None, help='Diretório do ingest ou CSV OHLCV (padrão: dados sintéticos)')
+    parser.add_argument('--bars', type=int, default=bars, help='Candles sintéticos quando --data não é informado')
+    parser.add_argument('--start', default=None, help='Primeiro dia/horário (AAAA-MM-DD[ HH:MM])')
+    parser.add_argument('--end', default=None, help='Último dia/horário (uma data inclui o dia inteiro)')
+    parser.add_argument('--symbol', default=None)
+    parser.add_argument('--compact', action='store_true', help='Preços em float32 (metade da memória)')
+
+def _add_grid_arguments(parser):
+    _add_data_arguments(parser)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--queue', default=None, help='Diretório compartilhado da fila distribuída')
+    parser.add_argument('--ema-fast', type=_int_list, default=[9, 10, 12])
+    parser.add_argument('--ema-slow', type=_int_list, default=[20, 26, 30])
+    parser.add_argument('--sl', type=_int_list, default=[15, 20, 30])
+    parser.add_argument('--tp', type=_int_list, default=[30, 40, 60])
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='main.py', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=None,
+                        help='Threads de BLAS/OpenMP/numba por processo (padrão: variáveis do ambiente ou 1)')
+    commands = parser.add_subparsers(dest='command', required=True, metavar='comando')
+
+    live = commands.add_parser('live', help='Executor ao vivo no MT5')
+    live.add_argument('--paper', action='store_true',
+                      help='Corretora simulada (candles aleatórios), sem enviar ordens ao MT5')
+    live.add_argument('--close-on-exit', action='store_true',
+                      help='Zera a posição ao encerrar (padrão: mantém e retoma pelo journal)')
+    live.set_defaults(func=cmd_live)
+
+    backtest = commands.add_parser('backtest', help='Um backtest (parâmetros do config.yaml por padrão)')
+    _add_data_arguments(backtest)
+    backtest.add_argument('--ema-fast', type=int, default=None)
+    backtest.add_argument('--ema-slow', type=int, default=None)
+    backtest.add_argument('--sl', type=int, default=None)
+    backtest.add_argument('--tp', type=int, default=None)
+    backtest.add_argument('--break-even', type=int, default=None, help='Pontos de lucro para o stop ir à entrada')
+    backtest.add_argument('--trailing', type=int, default=None, help='Distância do trailing stop (pontos)')
+    backtest.add_argument('--partial', type=int, default=None, help='Pontos de lucro da saída parcial')
+    backtest.add_argument('--stream', choices=('D', 'M'), default=None, help='Em blocos de um dia ou um mês')
+    backtest.add_argument('--chunk-size', type=int, default=None, help='Em blocos de N candles')
+    backtest.add_argument('--trades', default=None, help='CSV dos trades')
+    backtest.add_argument('--backend', default=None, choices=('auto', 'numpy', 'numba'))
+    backtest.set_defaults(func=cmd_backtest)
+
+    optimize = commands.add_parser('optimize', help='Otimização da grade + relatório de sensibilidade')
+    _add_grid_arguments(optimize)
+    optimize.add_argument('--chunk-size', type=int, default=None, help='Combinações por envio a cada worker')
+    optimize.add_argument('--report', default='reports')
+    optimize.add_argument('--history', default='history', help='Diretório do histórico colunar ("" = não grava)')
+    optimize.add_argument('--signal-cache', default=None, help='Diretório dos índices de sinais')
+    optimize.set_defaults(func=cmd_optimize)
+
+    wf = commands.add_parser('walk-forward', help='Otimização walk-forward (treino/teste deslizantes)')
+    _add_grid_arguments(wf)
+    wf.add_argument('--train-days', type=int, default=20)
+    wf.add_argument('--test-days', type=int, default=5)
+    wf.add_argument('--step-days', type=int, default=None)
+    wf.add_argument('--metric', default='profit_factor')
+    wf.add_argument('--min-trades', type=int, default=5)
+    wf.add_argument('--name', default='wf', help='Prefixo das varreduras na fila')
+    wf.add_argument('--out', default=os.path.join('reports', 'walk_forward.csv'))
+    wf.set_defaults(func=cmd_walk_forward)
+
+    replay = commands.add_parser('replay', help='Loop do executor sobre um histórico (sem terminal MT5)')
+    _add_data_arguments(replay, bars=2000)
+    replay.add_argument('--speed', type=float, default=None, help='Aceleração do relógio (padrão: sem espera)')
+    replay.set_defaults(func=cmd_replay)
+
+    ingest = commands.add_parser('ingest', help='CSV OHLCV -> colunas .npy (memory-map)')
+    ingest.add_argument('csv')
+    ingest.add_argument('--out', required=True)
+    ingest.add_argument('--chunk-size', type=int, default=500_000, help='Linhas do CSV por bloco')
+    ingest.add_argument('--compact', action='store_true')
+    ingest.add_argument('--symbol', default=None)
+    ingest.set_defaults(func=cmd_ingest)
+
+    worker = commands.add_parser('worker', help='Worker da fila distribuída')
+    worker.add_argument('--queue', required=True)
+    worker.add_argument('--worker-id', default=None)
+    worker.add_argument('--idle-timeout', type=float, default=None)
+    worker.add_argument('--poll', type=float, default=1.0)
+    worker.set_defaults(func=cmd_worker)
+
+    bench = commands.add_parser('bench', help='Benchmarks (argumentos extras após --)')
+    bench.add_argument('name', choices=sorted(BENCHMARKS))
+    bench.add_argument('args', nargs=argparse.REMAINDER)
+    bench.set_defaults(func=cmd_bench)
+    return parser
+
+# --- EXECUÇÃO PRINCIPAL ---
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'bench' and args.args[:1] == ['--']:
+        args.args = args.args[1:]
+
+    # Antes de qualquer import do NumPy: o número de threads do BLAS é lido na carga da biblioteca
+    from utils.perf import pin_threads
+    pin_threads(args.threads or 1, override=args.threads is not None)
+
+    setup_logger()
+    args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
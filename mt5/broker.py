@@ -0,0 +1,143 @@
+# Arquivo: mt5/broker.py
+
+from mt5.mt5_connector import mt5, get_connector, resolve_timeframe
+from mt5.order_handler import OrderHandler, get_order_handler
+from mt5.order_manager import REJECTED
+from utils.logger import logger
+
+
+class MT5Broker:
+    """
+    Adaptador do TradeExecutor para o MetaTrader 5 (terminal real ou ``mt5.simulator``).
+
+    Expõe a mesma interface do ``ApiBroker`` do executor: connect, get_data, get_position,
+    send_order, close_position, modify_position, exit_price e shutdown. SL/TP são enviados
+    junto com a ordem e executados pelo servidor; o stop movido pela gestão da posição é
+    atualizado com ``TRADE_ACTION_SLTP``.
+
+    Com um ``OrderManager``, as ordens são enfileiradas (sem bloquear o ciclo) e a
+    ordem ainda em andamento conta como posição, evitando entradas duplicadas.
+    Com um ``ConnectionSupervisor``, ciclos durante uma queda do terminal são pulados
+    (sem dados) enquanto a reconexão acontece em segundo plano.
+    """
+
+    def __init__(self, connector=None, order_handler=None, order_manager=None, supervisor=None):
+        self.connector = connector if connector is not None else get_connector()
+        self.order_handler = order_handler if order_handler is not None else (
+            get_order_handler() if connector is None else OrderHandler(self.connector))
+        self.symbol = self.connector.symbol
+        self.magic_number = self.connector.magic_number
+        self.order_manager = order_manager
+        self.supervisor = supervisor
+        self._pending = None  # (OrderTicket, posição provisória) da última ordem enfileirada
+        self._last_position = None
+
+    def connect(self) -> bool:
+        connected = self.connector.connect()
+        if connected and self.supervisor is not None:
+            self.supervisor.start()
+        return connected
+
+    def shutdown(self):
+        if self.supervisor is not None:
+            self.supervisor.stop()
+        if self.order_manager is not None:
+            # Esvazia a fila (ex.: o fechamento do encerramento) antes de desligar o terminal
+            self.order_manager.stop()
+        self.connector.shutdown()
+
+    def get_data(self, symbol: str, timeframe, bars: int):
+        if self.supervisor is not None and not self.supervisor.is_connected:
+            return None
+        return self.connector.get_market_data(resolve_timeframe(timeframe), bars)
+
+    def _position(self):
+        """Posição aberta do robô (filtrada pelo magic number) no símbolo configurado."""
+        positions = mt5.positions_get(symbol=self.symbol)
+        if not positions:
+            return None
+        for position in positions:
+            if position.magic == self.magic_number:
+                return position
+        return None
+
+    def get_position(self):
+        positions = mt5.positions_get(symbol=self.symbol)
+        if positions is None:
+            # Terminal sem resposta: mantém a última posição conhecida (não presume fechamento)
+            return self._last_position
+        position = next((p for p in positions if p.magic == self.magic_number), None)
+
+        if position is None:
+            result = None
+            if self._pending is not None and not self._pending[0].is_done:
+                result = self._pending[1]
+        else:
+            result = {
+                'symbol': position.symbol,
+                'type': "BUY" if position.type == mt5.POSITION_TYPE_BUY else "SELL",
+                'entry_price': position.price_open,
+                'volume': position.volume,
+                'sl_price': position.sl,
+                'tp_price': position.tp,
+                'ticket': position.ticket,
+            }
+        self._last_position = result
+        return result
+
+    def send_order(self, symbol: str, trade_type: str, volume: int, price: float, sl_price: float,
+                   tp_price: float, sl_points: int, tp_points: int) -> bool:
+        # O OrderHandler recalcula os níveis a partir do ASK/BID e do ponto do símbolo
+        if self.order_manager is not None:
+            order = self.order_manager.submit(trade_type, volume, sl_points, tp_points, symbol=self.symbol)
+            self._pending = (order, {'symbol': self.symbol, 'type': trade_type, 'entry_price': price,
+                                     'volume': volume, 'sl_price': sl_price, 'tp_price': tp_price, 'ticket': None})
+            return order.status != REJECTED
+        if trade_type == "BUY":
+            result = self.order_handler.open_buy(volume, sl_points, tp_points)
+        else:
+            result = self.order_handler.open_sell(volume, sl_points, tp_points)
+        return result is not None
+
+    def close_position(self, reason: str, volume: float = None):
+        """Fecha a posição do robô (ou só ``volume`` dela: saída parcial)."""
+        position = self._position()
+        if position is None:
+            return
+        if self.order_manager is not None:
+            self.order_manager.sync_positions()
+            self.order_manager.close(position.ticket, comment=reason, volume=volume)
+            logger.critical(f"🛑 FECHAMENTO ENFILEIRADO por {reason}! Ticket: {position.ticket}.")
+            return
+        result = self.order_handler.close_position(position, comment=reason, volume=volume)
+        if result is not None:
+            logger.critical(f"🛑 POSIÇÃO FECHADA por {reason}! Ticket: {position.ticket}. "
+                            f"Preço de Entrada: {position.price_open:.2f} | Saída: {result.price:.2f}"
+                            + (f" | Volume: {volume}" if volume else ""))
+
+    def modify_position(self, sl_price: float) -> bool:
+        """Move o SL da posição do robô no servidor (TRADE_ACTION_SLTP), mantendo o TP."""
+        position = self._position()
+        if position is None:
+            return False
+        if self.order_manager is not None:
+            self.order_manager.sync_positions()
+            return self.order_manager.modify(position.ticket, sl_price).status != REJECTED
+        return self.order_handler.modify_position(position, sl_price) is not None
+
+    def exit_price(self, trade_type: str):
+        """Preço do último tick pelo qual a posição sairia (BID na compra, ASK na venda), ou None."""
+        # Direto do terminal (sem o cache): a saída decide sobre o tick mais recente
+        tick = mt5.symbol_info_tick(self.symbol)
+        if tick is None:
+            return None
+        return tick.bid if trade_type == "BUY" else tick.ask
+
+    @property
+    def volume_step(self) -> float:
+        return getattr(self.order_handler.symbol_spec(self.symbol), 'volume_step', 1.0)
+
+    @property
+    def point(self) -> float:
+        """Preço de 1 ponto do símbolo (o mesmo com que o OrderHandler converte SL/TP)."""
+        return getattr(self.order_handler.symbol_spec(self.symbol), 'point', 1.0) or 1.0
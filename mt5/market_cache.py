@@ -0,0 +1,136 @@
+# Arquivo: mt5/market_cache.py
+
+import time
+import threading
+import numpy as np
+from mt5.mt5_connector import mt5
+
+
+class TTLCache:
+    """Cache chave -> valor com validade de ``ttl`` segundos e contadores de acerto/falha."""
+
+    def __init__(self, ttl: float, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """Retorna o valor em cache ou chama ``loader()`` (resultados None não são guardados)."""
+        now = self.clock()
+        with self._lock:
+            cached = self._data.get(key)
+            if cached is not None and now - cached[0] < self.ttl:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        value = loader()
+        if value is not None:
+            with self._lock:
+                self._data[key] = (now, value)
+        return value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+
+class MarketCache:
+    """
+    Cache compartilhado das consultas de mercado ao terminal MT5.
+
+    - especificação do símbolo (``symbol_info``): TTL longo, muda raramente;
+    - último tick (``symbol_info_tick``): TTL abaixo de 1 s, absorve as consultas
+      repetidas dentro de um mesmo ciclo (cálculo de SL/TP, envio, fechamento);
+    - candles (``rates``): mantém a janela pedida e busca apenas os últimos
+      ``refresh_bars`` candles a cada chamada, em vez da janela inteira.
+
+    ``invalidate`` descarta tudo (usado após reconexão ou troca de terminal).
+    """
+
+    def __init__(self, spec_ttl: float = 300.0, tick_ttl: float = 0.25, refresh_bars: int = 3):
+        self.specs = TTLCache(spec_ttl)
+        self.ticks = TTLCache(tick_ttl)
+        self.refresh_bars = refresh_bars
+        self.rates_full = 0         # Buscas da janela completa
+        self.rates_incremental = 0  # Buscas apenas dos últimos candles
+        self._rates = {}
+        self._lock = threading.Lock()
+
+    def set_clock(self, clock=time.monotonic):
+        """Troca o relógio das validades (ex.: horário simulado do replay)."""
+        self.specs.clock = clock
+        self.ticks.clock = clock
+
+    def symbol_info(self, symbol: str):
+        return self.specs.get(symbol, lambda: mt5.symbol_info(symbol))
+
+    def symbol_info_tick(self, symbol: str):
+        return self.ticks.get(symbol, lambda: mt5.symbol_info_tick(symbol))
+
+    def rates(self, symbol: str, timeframe: int, count: int):
+        """Últimos ``count`` candles (array estruturado do MT5), atualizados de forma incremental."""
+        key = (symbol, timeframe, count)
+        with self._lock:
+            cached = self._rates.get(key)
+
+        merged = None
+        if cached is not None:
+            recent = mt5.copy_rates_from_pos(symbol, timeframe, 0, self.refresh_bars)
+            if recent is None:
+                return None
+            merged = self._merge(cached, recent, count)
+            if merged is not None:
+                self.rates_incremental += 1
+
+        if merged is None:
+            merged = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+            if merged is None:
+                return None
+            self.rates_full += 1
+
+        with self._lock:
+            if len(merged) == count:
+                self._rates[key] = merged
+            else:
+                self._rates.pop(key, None)  # Histórico curto: não há janela completa para reaproveitar
+        return merged
+
+    @staticmethod
+    def _merge(cached: np.ndarray, recent: np.ndarray, count: int):
+        """Encaixa os candles recentes no fim da janela; None se houver lacuna (exige busca completa)."""
+        if len(recent) == 0:
+            return cached
+        first = recent['time'][0]
+        idx = int(np.searchsorted(cached['time'], first))
+        if idx >= len(cached) or cached['time'][idx] != first:
+            return None
+        return np.concatenate((cached[:idx], recent))[-count:]
+
+    def invalidate(self):
+        self.specs.invalidate()
+        self.ticks.invalidate()
+        with self._lock:
+            self._rates.clear()
+
+    def stats(self) -> dict:
+        return {
+            'spec_hits': self.specs.hits, 'spec_misses': self.specs.misses,
+            'tick_hits': self.ticks.hits, 'tick_misses': self.ticks.misses,
+            'rates_full': self.rates_full, 'rates_incremental': self.rates_incremental,
+        }
+
+    def reset_stats(self):
+        self.specs.hits = self.specs.misses = 0
+        self.ticks.hits = self.ticks.misses = 0
+        self.rates_full = self.rates_incremental = 0
+
+
+# Cache global compartilhado por conector, OrderHandler e OrderManager
+MARKET_CACHE = MarketCache()
@@ -1,51 +1,82 @@
 # Arquivo: mt5/mt5_connector.py
 
-import MetaTrader5 as mt5
 from utils.config import CONFIG
 from utils.logger import logger
+from utils.lazy_import import LazyModule
+from utils.backoff import backoff_delay
 import time
-import pandas as pd
+
+# O pacote MetaTrader5 (somente Windows) é importado apenas na primeira chamada à API
+mt5 = LazyModule('MetaTrader5')
+
+# ⚠️ Caminho comum da XP. Se falhar, você deve ajustar este valor manualmente.
+MT5_TERMINAL_PATH = r"C:\Program Files\MetaTrader 5 XP Investimentos\terminal64.exe"
+
+def resolve_timeframe(timeframe) -> int:
+    """Converte 'MT5.TIMEFRAME_M5' / 'TIMEFRAME_M5' (como no config.yaml) na constante do MT5."""
+    if isinstance(timeframe, str):
+        return getattr(mt5, timeframe.split('.')[-1])
+    return timeframe
 
 class MT5Connector:
     """Gerencia a conexão de baixo nível com o terminal MetaTrader 5."""
-    def __init__(self):
-        # Lê credenciais e configurações globais
-        self.login = int(CONFIG.MT5_LOGIN)
-        self.password = CONFIG.MT5_PASSWORD
-        self.server = CONFIG.MT5_SERVER
-        self.symbol = CONFIG.get('GLOBAL.SYMBOL')
-        self.magic_number = CONFIG.get('GLOBAL.MAGIC_NUMBER')
-        self.deviation = CONFIG.get('GLOBAL.DEVIATION')
+    def __init__(self, login: int = None, password: str = None, server: str = None):
+        # Lê credenciais (do .env, salvo se informadas, ex.: no simulador) e configurações globais
+        self.login = int(login if login is not None else CONFIG.MT5_LOGIN)
+        self.password = password if password is not None else CONFIG.MT5_PASSWORD
+        self.server = server if server is not None else CONFIG.MT5_SERVER
+        self.symbol = CONFIG.global_.symbol
+        self.magic_number = CONFIG.global_.magic_number
+        self.deviation = CONFIG.global_.deviation
+        # Espera entre retentativas de ordem (zerada no simulador para não atrasar o replay)
+        self.retry_delay = 2
+        # Backoff das retentativas de login: 1 s, 2 s, 4 s... até 30 s (com jitter)
+        self.reconnect_base_delay = 1.0
+        self.reconnect_max_delay = 30.0
 
-    def connect(self, retry=3) -> bool:
-        """Tenta inicializar e logar no MT5 com retentativas, forçando o caminho da XP."""
-        
-        # ⚠️ Caminho comum da XP. Se falhar, você deve ajustar este valor manualmente.
-        path_to_mt5 = r"C:\Program Files\MetaTrader 5 XP Investimentos\terminal64.exe" 
-        
+    def _initialize(self) -> bool:
+        """Inicializa a ponte com o terminal, forçando o caminho da XP."""
         # 1. Tenta inicializar usando o caminho específico
-        if not mt5.initialize(path=path_to_mt5):
-            # 2. Se falhar, tenta o initialize padrão (se o terminal já estiver aberto)
-            if not mt5.initialize():
-                logger.error(f"mt5.initialize() falhou, erro: {mt5.last_error()}")
-                return False
+        if mt5.initialize(path=MT5_TERMINAL_PATH):
+            return True
+        # 2. Se falhar, tenta o initialize padrão (se o terminal já estiver aberto)
+        return mt5.initialize()
+
+    def _login(self) -> bool:
+        if not mt5.login(self.login, self.password, self.server):
+            return False
+        # Nova sessão: especificações, ticks e candles em cache podem estar desatualizados
+        from mt5.market_cache import MARKET_CACHE
+        MARKET_CACHE.invalidate()
+        return True
+
+    def connect(self, retry=3) -> bool:
+        """Tenta inicializar e logar no MT5 com retentativas (backoff exponencial com jitter)."""
+        if not self._initialize():
+            logger.error(f"mt5.initialize() falhou, erro: {mt5.last_error()}")
+            return False
             
         for i in range(retry):
-            authorized = mt5.login(self.login, self.password, self.server)
-            if authorized:
+            if self._login():
                 logger.info(f"Conexão MT5 estabelecida. Conta: {self.login} no servidor {self.server}")
                 return True
             
             logger.warning(f"Tentativa {i+1} de Login falhou (Erro -6). Verifique o .env e se o terminal da XP está aberto. Erro: {mt5.last_error()}.")
-            mt5.shutdown() 
-            time.sleep(5)
-            # Re-inicializa para a próxima tentativa
-            mt5.initialize(path=path_to_mt5) 
+            time.sleep(backoff_delay(i, self.reconnect_base_delay, self.reconnect_max_delay))
+            # Só re-inicializa se a ponte com o terminal caiu (sem o ciclo completo shutdown/initialize)
+            if mt5.terminal_info() is None:
+                self._initialize()
             
         logger.critical(f"Falha total de login após {retry} tentativas. Abortando.")
         mt5.shutdown()
         return False
 
+    def reconnect(self) -> bool:
+        """Uma tentativa rápida de restabelecer a sessão (usada pelo ConnectionSupervisor)."""
+        if mt5.terminal_info() is None and not self._initialize():
+            return False
+        return self._login()
+
     def check_connection(self) -> bool:
         """Verifica se a conexão está ativa e com o login correto."""
         try:
@@ -64,9 +95,12 @@ class MT5Connector:
         mt5.shutdown()
         logger.info("MT5 desconectado.")
 
-    def get_market_data(self, timeframe: int, count: int) -> pd.DataFrame or None:
-        """Obtém os últimos N candles e retorna como DataFrame."""
-        rates = mt5.copy_rates_from_pos(self.symbol, timeframe, 0, count)
+    def get_market_data(self, timeframe: int, count: int):
+        """Obtém os últimos N candles (incrementalmente, via cache) e retorna como DataFrame."""
+        import pandas as pd
+        from mt5.market_cache import MARKET_CACHE
+
+        rates = MARKET_CACHE.rates(self.symbol, timeframe, count)
         
         if rates is None or len(rates) == 0:
             logger.warning(f"Falha ao obter dados para {self.symbol}. Erro: {mt5.last_error()}")
@@ -83,15 +117,34 @@ class MT5Connector:
         for i in range(retry):
             result = mt5.order_send(request)
             
+            if result is None:
+                # Sem resposta do terminal (ex.: conexão IPC perdida)
+                logger.warning(f"Ordem sem resposta do terminal (Tentativa {i+1}). Erro: {mt5.last_error()}.")
+                time.sleep(self.retry_delay)
+                continue
+            
             if result.retcode == mt5.TRADE_RETCODE_DONE:
-                logger.info(f"Ordem {request.get('type')} enviada c/ sucesso! ID: {result.order}. Volume: {request['volume']}")
+                logger.info(f"Ordem {request.get('type')} enviada c/ sucesso! ID: {result.order}. Volume: {request.get('volume')}")
                 return result
             
             logger.warning(f"Ordem falhou (Tentativa {i+1}). RetCode: {result.retcode}. Erro: {mt5.last_error()}.")
-            time.sleep(2)
+            time.sleep(self.retry_delay)
         
         logger.error(f"Falha ao enviar ordem após 3 tentativas. Request: {request}")
         return None
 
-# Instância global
-MT5 = MT5Connector()
\ No newline at end of file
+# Instância global, criada no primeiro uso (importar o módulo não lê credenciais nem o MT5)
+_MT5 = None
+
+def get_connector() -> MT5Connector:
+    """Retorna a instância global do conector."""
+    global _MT5
+    if _MT5 is None:
+        _MT5 = MT5Connector()
+    return _MT5
+
+def __getattr__(name):
+    # Mantém compatibilidade com ``from mt5.mt5_connector import MT5``
+    if name == 'MT5':
+        return get_connector()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
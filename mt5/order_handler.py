@@ -1,7 +1,7 @@
 # Arquivo: mt5/order_handler.py
 
-import MetaTrader5 as mt5
-from mt5.mt5_connector import MT5
+from mt5.mt5_connector import mt5, get_connector
+from mt5.market_cache import MARKET_CACHE
 from utils.config import CONFIG
 from utils.logger import logger
 from typing import Union
@@ -9,17 +9,27 @@ from typing import Union
 class OrderHandler:
     """Lida com a lógica de execução (compra, venda, fechamento, modificação) e conversão de pontos para preço."""
     
-    def __init__(self):
-        self.symbol = CONFIG.get('GLOBAL.SYMBOL')
-        self.magic_number = CONFIG.get('GLOBAL.MAGIC_NUMBER')
-        self.deviation = CONFIG.get('GLOBAL.DEVIATION')
+    def __init__(self, connector=None):
+        self.symbol = CONFIG.global_.symbol
+        self.magic_number = CONFIG.global_.magic_number
+        self.deviation = CONFIG.global_.deviation
+        self._connector = connector
+
+    @property
+    def connector(self):
+        """Conector usado no envio (o global, salvo se outro foi informado)."""
+        return self._connector if self._connector is not None else get_connector()
+
+    def symbol_spec(self, symbol: str = None):
+        """symbol_info do símbolo (ponto, dígitos, tick), do cache compartilhado."""
+        return MARKET_CACHE.symbol_info(symbol or self.symbol)
         
-    def _calculate_price_levels(self, current_price, sl_points, tp_points, direction):
+    def _calculate_price_levels(self, current_price, sl_points, tp_points, direction, symbol=None):
         """Calcula os preços exatos de SL e TP (em preço, não pontos) para o MT5."""
         
-        symbol_info = mt5.symbol_info(self.symbol)
+        symbol_info = self.symbol_spec(symbol)
         if symbol_info is None:
-            logger.error(f"Símbolo {self.symbol} não encontrado para cálculo de ponto.")
+            logger.error(f"Símbolo {symbol or self.symbol} não encontrado para cálculo de ponto.")
             return 0.0, 0.0
             
         point = symbol_info.point # O valor de um tick/ponto
@@ -37,21 +47,23 @@ class OrderHandler:
         # O MT5 geralmente exige 2 casas decimais para WIN/WDO
         return round(sl_price, 2), round(tp_price, 2)
 
-    def open_buy(self, volume: float, sl_points: int, tp_points: int, comment="BUY_AUTO"):
-        """Envia ordem de COMPRA a mercado."""
-        tick_info = mt5.symbol_info_tick(self.symbol)
+    def build_market_request(self, direction: int, volume: float, sl_points: int, tp_points: int,
+                             comment: str, symbol: str = None):
+        """Monta o request de ordem a mercado (ASK para compra, BID para venda) ou None sem tick."""
+        symbol = symbol or self.symbol
+        tick_info = MARKET_CACHE.symbol_info_tick(symbol)
         if tick_info is None:
             logger.error("Falha ao obter tick info (ASK/BID).")
             return None
             
-        price = tick_info.ask # Preço de ASK para compra
-        sl_price, tp_price = self._calculate_price_levels(price, sl_points, tp_points, mt5.ORDER_TYPE_BUY)
+        price = tick_info.ask if direction == mt5.ORDER_TYPE_BUY else tick_info.bid
+        sl_price, tp_price = self._calculate_price_levels(price, sl_points, tp_points, direction, symbol)
         
-        request = {
+        return {
             "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": self.symbol,
+            "symbol": symbol,
             "volume": volume,
-            "type": mt5.ORDER_TYPE_BUY,
+            "type": direction,
             "price": price,
             "deviation": self.deviation,
             "sl": sl_price,
@@ -61,33 +73,88 @@ class OrderHandler:
             "type_filling": mt5.ORDER_FILLING_RETURN, 
             "type_time": mt5.ORDER_TIME_GTC,
         }
-        return MT5.send_order_request(request)
 
-    def open_sell(self, volume: float, sl_points: int, tp_points: int, comment="SELL_AUTO"):
+    def open_buy(self, volume: float, sl_points: int, tp_points: int, comment="BUY_AUTO", symbol: str = None):
+        """Envia ordem de COMPRA a mercado."""
+        request = self.build_market_request(mt5.ORDER_TYPE_BUY, volume, sl_points, tp_points, comment, symbol)
+        if request is None:
+            return None
+        return self.connector.send_order_request(request)
+
+    def open_sell(self, volume: float, sl_points: int, tp_points: int, comment="SELL_AUTO", symbol: str = None):
         """Envia ordem de VENDA a mercado."""
-        tick_info = mt5.symbol_info_tick(self.symbol)
+        request = self.build_market_request(mt5.ORDER_TYPE_SELL, volume, sl_points, tp_points, comment, symbol)
+        if request is None:
+            return None
+        return self.connector.send_order_request(request)
+
+    def build_close_request(self, position, comment="CLOSE_AUTO", volume: float = None):
+        """
+        Monta a ordem oposta a mercado que fecha ``position`` (objeto de mt5.positions_get);
+        com ``volume`` menor que o da posição, fecha só essa parte (saída parcial).
+        """
+        tick_info = MARKET_CACHE.symbol_info_tick(position.symbol)
         if tick_info is None:
             logger.error("Falha ao obter tick info (ASK/BID).")
             return None
-            
-        price = tick_info.bid # Preço de BID para venda
-        sl_price, tp_price = self._calculate_price_levels(price, sl_points, tp_points, mt5.ORDER_TYPE_SELL)
-        
-        request = {
+
+        # Compra é fechada com venda no BID; venda é fechada com compra no ASK
+        if position.type == mt5.POSITION_TYPE_BUY:
+            order_type, price = mt5.ORDER_TYPE_SELL, tick_info.bid
+        else:
+            order_type, price = mt5.ORDER_TYPE_BUY, tick_info.ask
+
+        return {
             "action": mt5.TRADE_ACTION_DEAL,
-            "symbol": self.symbol,
-            "volume": volume,
-            "type": mt5.ORDER_TYPE_SELL,
+            "symbol": position.symbol,
+            "volume": volume if volume else position.volume,
+            "type": order_type,
+            "position": position.ticket,
             "price": price,
             "deviation": self.deviation,
-            "sl": sl_price,
-            "tp": tp_price,
             "magic": self.magic_number,
             "comment": comment,
             "type_filling": mt5.ORDER_FILLING_RETURN,
             "type_time": mt5.ORDER_TIME_GTC,
         }
-        return MT5.send_order_request(request)
 
-# Instância global (será usada pelos módulos de execução)
-ORDER_HANDLER = OrderHandler()
\ No newline at end of file
+    def close_position(self, position, comment="CLOSE_AUTO", volume: float = None):
+        """Fecha uma posição aberta (objeto de mt5.positions_get) com uma ordem oposta a mercado."""
+        request = self.build_close_request(position, comment, volume)
+        if request is None:
+            return None
+        return self.connector.send_order_request(request)
+
+    def build_modify_request(self, position, sl_price: float, tp_price: float = None):
+        """Monta a modificação de SL/TP (TRADE_ACTION_SLTP) da posição; o TP atual é mantido se omitido."""
+        digits = getattr(self.symbol_spec(position.symbol), 'digits', 2)
+        return {
+            "action": mt5.TRADE_ACTION_SLTP,
+            "symbol": position.symbol,
+            "position": position.ticket,
+            "sl": round(sl_price, digits),
+            "tp": round(position.tp if tp_price is None else tp_price, digits),
+            "magic": self.magic_number,
+        }
+
+    def modify_position(self, position, sl_price: float, tp_price: float = None):
+        """Altera o SL (e opcionalmente o TP) de uma posição aberta no servidor."""
+        request = self.build_modify_request(position, sl_price, tp_price)
+        # Modificação recusada não deve ser repetida em rajada: o próximo tick envia o stop atualizado
+        return self.connector.send_order_request(request, retry=1)
+
+# Instância global (será usada pelos módulos de execução), criada no primeiro uso
+_ORDER_HANDLER = None
+
+def get_order_handler() -> OrderHandler:
+    """Retorna a instância global do OrderHandler."""
+    global _ORDER_HANDLER
+    if _ORDER_HANDLER is None:
+        _ORDER_HANDLER = OrderHandler()
+    return _ORDER_HANDLER
+
+def __getattr__(name):
+    # Mantém compatibilidade com ``from mt5.order_handler import ORDER_HANDLER``
+    if name == 'ORDER_HANDLER':
+        return get_order_handler()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
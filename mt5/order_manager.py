@@ -0,0 +1,297 @@
+# Arquivo: mt5/order_manager.py
+
+import time
+import queue
+import itertools
+import threading
+from mt5.mt5_connector import mt5
+from mt5.order_handler import OrderHandler, get_order_handler
+from utils.logger import logger
+
+# Estados de uma ordem no OrderManager
+QUEUED, SENT, DONE, REJECTED, FAILED = 'QUEUED', 'SENT', 'DONE', 'REJECTED', 'FAILED'
+# Ordens sobre uma posição já aberta (não contam como exposição nova)
+POSITION_ORDERS = ('CLOSE', 'MODIFY')
+
+
+class RateLimiter:
+    """Token bucket: no máximo ``rate`` ordens por segundo, com rajadas de até ``burst``."""
+
+    def __init__(self, rate: float, burst: int = None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self) -> float:
+        """Consome um token, esperando se necessário. Retorna o tempo esperado (s)."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class OrderTicket:
+    """Acompanhamento de uma ordem enviada ao OrderManager (preenchido pelo worker)."""
+
+    def __init__(self, order_id: int, symbol: str, trade_type: str, volume: float, position: int = None):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.trade_type = trade_type  # 'BUY', 'SELL', 'CLOSE' ou 'MODIFY'
+        self.volume = volume
+        self.position = position      # Ticket da posição a fechar/modificar (ordens CLOSE e MODIFY)
+        self.status = QUEUED
+        self.retcode = None
+        self.ticket = None            # Ticket da posição aberta (ordens BUY/SELL executadas)
+        self.price = None
+        self.request = None
+        self.params = ()
+        self._done = threading.Event()
+
+    def finish(self, status: str, retcode: int = None):
+        self.status = status
+        self.retcode = retcode
+        self._done.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Bloqueia até a ordem ser concluída (executada, rejeitada ou com falha)."""
+        return self._done.wait(timeout)
+
+    @property
+    def is_done(self) -> bool:
+        return self._done.is_set()
+
+    def __repr__(self) -> str:
+        return f"OrderTicket({self.order_id}, {self.trade_type} {self.volume}x {self.symbol}, {self.status})"
+
+
+class OrderManager:
+    """
+    Gerenciador de ordens sobre o OrderHandler.
+
+    - ``submit``/``close`` não bloqueiam: a ordem entra em uma fila e é enviada por
+      worker(s) em segundo plano (ou por ``process_pending`` quando não há thread);
+    - envio limitado por um token bucket (``max_orders_per_second``);
+    - cada ordem é pré-validada com ``mt5.order_check`` antes do ``order_send``;
+    - ordens em andamento (``in_flight``) e posições do robô (``positions``) ficam em
+      tabelas indexadas por ticket, filtradas pelo magic number.
+    """
+
+    def __init__(self, order_handler: OrderHandler = None, max_orders_per_second: float = 5.0,
+                 burst: int = None, workers: int = 1):
+        self.order_handler = order_handler if order_handler is not None else get_order_handler()
+        self.magic_number = self.order_handler.magic_number
+        self.limiter = RateLimiter(max_orders_per_second, burst)
+        self.workers = workers
+
+        self.in_flight = {}   # order_id -> OrderTicket
+        self.positions = {}   # ticket -> dict da posição (somente o magic number do robô)
+        self.stats = {'submitted': 0, 'sent': 0, 'done': 0, 'rejected': 0, 'failed': 0, 'throttled_seconds': 0.0}
+
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._threads = []
+
+    # --- Envio ---
+
+    def submit(self, trade_type: str, volume: float, sl_points: int, tp_points: int, symbol: str = None,
+               comment: str = None) -> OrderTicket:
+        """Enfileira uma ordem a mercado ('BUY' ou 'SELL'). Recusa se já houver exposição no símbolo."""
+        symbol = symbol or self.order_handler.symbol
+        order = OrderTicket(next(self._ids), symbol, trade_type, volume)
+
+        if self.has_exposure(symbol):
+            logger.warning(f"Ordem {trade_type} em {symbol} ignorada: já existe ordem em andamento ou posição aberta.")
+            order.finish(REJECTED)
+            return order
+
+        order.params = (sl_points, tp_points, comment or f"{trade_type}_AUTO")
+        return self._enqueue(order)
+
+    def close(self, ticket: int, comment: str = "CLOSE_AUTO", volume: float = None) -> OrderTicket:
+        """Enfileira o fechamento da posição ``ticket`` (ou só ``volume`` dela: saída parcial)."""
+        position = self.positions.get(ticket, {})
+        order = OrderTicket(next(self._ids), position.get('symbol'), 'CLOSE', volume or position.get('volume'),
+                            position=ticket)
+        order.params = (comment, volume)
+        return self._enqueue(order)
+
+    def modify(self, ticket: int, sl_price: float, tp_price: float = None) -> OrderTicket:
+        """Enfileira a modificação de SL/TP (TRADE_ACTION_SLTP) da posição ``ticket``."""
+        position = self.positions.get(ticket, {})
+        order = OrderTicket(next(self._ids), position.get('symbol'), 'MODIFY', position.get('volume'), position=ticket)
+        order.params = (sl_price, tp_price)
+        return self._enqueue(order)
+
+    def _enqueue(self, order: OrderTicket) -> OrderTicket:
+        with self._lock:
+            self.in_flight[order.order_id] = order
+            self.stats['submitted'] += 1
+        self._queue.put(order)
+        return order
+
+    def has_exposure(self, symbol: str) -> bool:
+        """True se há ordem de abertura em andamento ou posição aberta do robô no símbolo."""
+        with self._lock:
+            if any(o.symbol == symbol and o.trade_type not in POSITION_ORDERS for o in self.in_flight.values()):
+                return True
+            return any(p['symbol'] == symbol for p in self.positions.values())
+
+    def pending_for(self, symbol: str):
+        """Ordem de abertura ainda em andamento no símbolo (ou None)."""
+        with self._lock:
+            for order in self.in_flight.values():
+                if order.symbol == symbol and order.trade_type not in POSITION_ORDERS:
+                    return order
+        return None
+
+    # --- Processamento ---
+
+    def _build_request(self, order: OrderTicket):
+        handler = self.order_handler
+        if order.trade_type in POSITION_ORDERS:
+            found = mt5.positions_get(ticket=order.position)
+            if not found:
+                return None
+            if order.trade_type == 'MODIFY':
+                return handler.build_modify_request(found[0], *order.params)
+            return handler.build_close_request(found[0], *order.params)
+
+        direction = mt5.ORDER_TYPE_BUY if order.trade_type == 'BUY' else mt5.ORDER_TYPE_SELL
+        sl_points, tp_points, comment = order.params
+        return handler.build_market_request(direction, order.volume, sl_points, tp_points, comment, order.symbol)
+
+    def _execute(self, order: OrderTicket):
+        try:
+            request = self._build_request(order)
+            order.request = request
+            if request is None:
+                self._finish(order, FAILED)
+                return
+
+            # Pré-validação: ordens inválidas não consomem o limite de envio nem uma ida ao servidor
+            check = mt5.order_check(request)
+            if check is None or check.retcode != 0:
+                retcode = None if check is None else check.retcode
+                logger.warning(f"Ordem {order} rejeitada no order_check. RetCode: {retcode}")
+                self._finish(order, REJECTED, retcode)
+                return
+
+            waited = self.limiter.acquire()
+            with self._lock:
+                self.stats['throttled_seconds'] += waited
+                self.stats['sent'] += 1
+            order.status = SENT
+            result = self.order_handler.connector.send_order_request(request, retry=1)
+        except Exception as e:
+            logger.error(f"Erro ao processar a ordem {order}: {e}")
+            self._finish(order, FAILED)
+            return
+
+        if result is None:
+            self._finish(order, FAILED)
+            return
+
+        order.price = result.price
+        with self._lock:
+            position = self.positions.get(order.position)
+            if order.trade_type == 'MODIFY':
+                if position is not None:
+                    position.update(sl_price=request['sl'], tp_price=request['tp'])
+            elif order.trade_type == 'CLOSE':
+                if position is not None and request['volume'] < position['volume']:
+                    position['volume'] -= request['volume']  # Saída parcial: a posição continua
+                else:
+                    self.positions.pop(order.position, None)
+            else:
+                order.ticket = result.order
+                self.positions[result.order] = {
+                    'ticket': result.order,
+                    'symbol': order.symbol,
+                    'type': order.trade_type,
+                    'volume': order.volume,
+                    'entry_price': result.price,
+                    'sl_price': request['sl'],
+                    'tp_price': request['tp'],
+                    'magic': self.magic_number,
+                }
+        self._finish(order, DONE, result.retcode)
+
+    def _finish(self, order: OrderTicket, status: str, retcode: int = None):
+        with self._lock:
+            self.in_flight.pop(order.order_id, None)
+            self.stats[status.lower()] += 1
+        order.finish(status, retcode)
+
+    def process_pending(self) -> int:
+        """Processa a fila no thread atual (uso sem workers, ex.: replay e testes). Retorna quantas ordens."""
+        processed = 0
+        while True:
+            try:
+                order = self._queue.get_nowait()
+            except queue.Empty:
+                return processed
+            self._execute(order)
+            processed += 1
+
+    def _worker(self):
+        while True:
+            order = self._queue.get()
+            if order is None:
+                return
+            self._execute(order)
+
+    def start(self):
+        """Inicia os workers de envio em segundo plano."""
+        if not self._threads:
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f'OrderManager-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        """Encerra os workers depois de esvaziar a fila."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # --- Sincronização ---
+
+    def sync_positions(self) -> dict:
+        """Reconstrói a tabela de posições a partir do terminal (somente o magic number do robô)."""
+        positions = mt5.positions_get()
+        if positions is None:
+            return self.positions
+
+        table = {}
+        for pos in positions:
+            if pos.magic != self.magic_number:
+                continue
+            table[pos.ticket] = {
+                'ticket': pos.ticket,
+                'symbol': pos.symbol,
+                'type': "BUY" if pos.type == mt5.POSITION_TYPE_BUY else "SELL",
+                'volume': pos.volume,
+                'entry_price': pos.price_open,
+                'sl_price': pos.sl,
+                'tp_price': pos.tp,
+                'magic': pos.magic,
+            }
+        with self._lock:
+            self.positions = table
+        return table
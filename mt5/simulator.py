@@ -0,0 +1,555 @@
+# Arquivo: mt5/simulator.py
+
+"""
+Simulador local do MetaTrader 5 para paper trading em alta velocidade (e testes no Linux).
+
+``SimulatedMT5`` expõe a mesma API usada pelo robô (initialize, login, copy_rates_from_pos,
+symbol_info, symbol_info_tick, order_send, order_check, positions_get, ...), com as mesmas
+constantes e retcodes, mas sobre um motor de execução que reexecuta um histórico gravado.
+
+O relógio só anda quando ``advance()`` é chamado (ou a cada ``copy_rates_from_pos`` com
+``auto_advance=True``), então o replay roda tão rápido quanto o código que o consome.
+
+    sim = SimulatedMT5()
+    sim.add_symbol('WINQ25', market_data, timeframe=sim.TIMEFRAME_M5)
+    install(sim)   # ``import MetaTrader5`` passa a devolver o simulador
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from utils.logger import logger
+from core.data_loader import MarketData
+
+# --- ESTRUTURAS DE RETORNO (mesmos campos do pacote MetaTrader5) ---
+
+Tick = namedtuple('Tick', 'time bid ask last volume time_msc flags volume_real')
+SymbolInfo = namedtuple('SymbolInfo', 'name point digits trade_tick_size trade_tick_value volume_min '
+                                      'volume_max volume_step trade_contract_size visible spread')
+AccountInfo = namedtuple('AccountInfo', 'login server currency balance equity profit margin margin_free leverage')
+TerminalInfo = namedtuple('TerminalInfo', 'connected trade_allowed name path')
+TradePosition = namedtuple('TradePosition', 'ticket time type magic identifier volume price_open sl tp '
+                                            'price_current profit symbol comment')
+TradeDeal = namedtuple('TradeDeal', 'ticket order time type entry magic position_id volume price profit '
+                                    'symbol comment reason')
+OrderSendResult = namedtuple('OrderSendResult', 'retcode deal order volume price bid ask comment request_id '
+                                                'retcode_external request')
+OrderCheckResult = namedtuple('OrderCheckResult', 'retcode balance equity profit margin margin_free margin_level '
+                                                  'comment request')
+
+RATES_DTYPE = np.dtype([
+    ('time', '<i8'), ('open', '<f8'), ('high', '<f8'), ('low', '<f8'), ('close', '<f8'),
+    ('tick_volume', '<u8'), ('spread', '<i4'), ('real_volume', '<u8'),
+])
+
+TICK_DTYPE = np.dtype([
+    ('time', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('last', '<f8'), ('volume', '<u8'),
+    ('time_msc', '<i8'), ('flags', '<u4'), ('volume_real', '<f8'),
+])
+
+
+class _SymbolFeed:
+    """Histórico e especificação de um símbolo no simulador."""
+
+    def __init__(self, name: str, data: MarketData, timeframe: int, point: float, digits: int,
+                 tick_size: float, tick_value: float, spread_points: int,
+                 volume_min: float, volume_max: float, volume_step: float):
+        self.name = name
+        self.data = data
+        self.timeframe = timeframe
+        self.spread_points = spread_points
+        self.info = SymbolInfo(
+            name=name, point=point, digits=digits, trade_tick_size=tick_size, trade_tick_value=tick_value,
+            volume_min=volume_min, volume_max=volume_max, volume_step=volume_step, trade_contract_size=1.0,
+            visible=True, spread=spread_points,
+        )
+        self.cursor = -1  # Índice do candle atual (-1 = antes do início)
+
+    @property
+    def bid(self) -> float:
+        return float(self.data.close[self.cursor])
+
+    @property
+    def ask(self) -> float:
+        return self.bid + self.spread_points * self.info.point
+
+
+class SimulatedMT5:
+    """Substituto do módulo ``MetaTrader5`` com motor de execução sobre histórico gravado."""
+
+    # --- CONSTANTES (mesmos valores do pacote oficial) ---
+    TIMEFRAME_M1, TIMEFRAME_M5, TIMEFRAME_M15, TIMEFRAME_M30 = 1, 5, 15, 30
+    TIMEFRAME_H1, TIMEFRAME_H4, TIMEFRAME_D1 = 16385, 16388, 16408
+
+    ORDER_TYPE_BUY, ORDER_TYPE_SELL = 0, 1
+    POSITION_TYPE_BUY, POSITION_TYPE_SELL = 0, 1
+    DEAL_TYPE_BUY, DEAL_TYPE_SELL = 0, 1
+    DEAL_ENTRY_IN, DEAL_ENTRY_OUT = 0, 1
+    DEAL_REASON_CLIENT, DEAL_REASON_EXPERT, DEAL_REASON_SL, DEAL_REASON_TP = 0, 3, 4, 5
+
+    TRADE_ACTION_DEAL, TRADE_ACTION_PENDING, TRADE_ACTION_SLTP = 1, 5, 6
+    TRADE_ACTION_MODIFY, TRADE_ACTION_REMOVE, TRADE_ACTION_CLOSE_BY = 7, 8, 10
+
+    ORDER_FILLING_FOK, ORDER_FILLING_IOC, ORDER_FILLING_RETURN = 0, 1, 2
+    ORDER_TIME_GTC, ORDER_TIME_DAY = 0, 1
+
+    COPY_TICKS_ALL, COPY_TICKS_INFO, COPY_TICKS_TRADE = -1, 1, 2
+    TICK_FLAG_BID, TICK_FLAG_ASK, TICK_FLAG_LAST, TICK_FLAG_VOLUME = 2, 4, 8, 16
+
+    TRADE_RETCODE_REQUOTE = 10004
+    TRADE_RETCODE_REJECT = 10006
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+    TRADE_RETCODE_INVALID_VOLUME = 10014
+    TRADE_RETCODE_INVALID_PRICE = 10015
+    TRADE_RETCODE_INVALID_STOPS = 10016
+    TRADE_RETCODE_MARKET_CLOSED = 10018
+    TRADE_RETCODE_NO_MONEY = 10019
+    TRADE_RETCODE_TOO_MANY_REQUESTS = 10024
+    TRADE_RETCODE_CONNECTION = 10031
+    TRADE_RETCODE_POSITION_CLOSED = 10036
+
+    RES_S_OK = 1
+    RES_E_FAIL = -1
+    RES_E_INVALID_PARAMS = -2
+    RES_E_NOT_FOUND = -4
+    RES_E_AUTH_FAILED = -6
+    RES_E_INTERNAL_FAIL_CONNECT = -10004
+
+    def __init__(self, login: int = None, password: str = None, server: str = None,
+                 balance: float = 100000.0, auto_advance: bool = False):
+        # Credenciais aceitas (None = aceita qualquer uma)
+        self._login, self._password, self._server = login, password, server
+        self.auto_advance = auto_advance
+        self.feeds = {}
+        self.ticks = {}  # Ticks gravados por símbolo (array TICK_DTYPE ordenado por time_msc)
+        self.initialized = False
+        self.connected = True  # Pode ser derrubado em testes para simular queda do terminal
+        self.account_login = login or 0
+        self.account_server = server or 'SIMULADOR'
+        self.balance = balance
+        self.positions = {}
+        self.deals = []
+        self.calls = 0  # Total de chamadas à API (útil para medir IPC por ciclo)
+        self._next_ticket = 1
+        self._last_error = (self.RES_S_OK, 'Success')
+
+    # --- DADOS E RELÓGIO ---
+
+    def add_symbol(self, symbol: str, history, timeframe: int = 5, point: float = 1.0, digits: int = 0,
+                   tick_size: float = 5.0, tick_value: float = 1.0, spread_points: int = 5,
+                   volume_min: float = 1.0, volume_max: float = 500.0, volume_step: float = 1.0,
+                   start: int = 0):
+        """
+        Registra o histórico (MarketData ou DataFrame OHLCV) de um símbolo. ``start`` é o
+        índice do candle "atual" inicial (ex.: 300 para já ter janela de indicadores).
+        """
+        data = history if isinstance(history, MarketData) else MarketData.from_dataframe(history)
+        feed = _SymbolFeed(symbol, data, timeframe, point, digits, tick_size, tick_value, spread_points,
+                           volume_min, volume_max, volume_step)
+        feed.cursor = min(start, len(data) - 1)
+        self.feeds[symbol] = feed
+        return feed
+
+    def add_ticks(self, symbol: str, ticks: np.ndarray):
+        """Registra ticks gravados (array TICK_DTYPE em ordem de tempo) para ``copy_ticks_range``."""
+        self.ticks[symbol] = ticks
+
+    @property
+    def now(self) -> int:
+        """Horário (epoch s) do candle atual mais recente entre os símbolos."""
+        return max((int(feed.data.time[feed.cursor]) for feed in self.feeds.values()), default=0)
+
+    def finished(self) -> bool:
+        return all(feed.cursor >= len(feed.data) - 1 for feed in self.feeds.values())
+
+    def advance(self, bars: int = 1) -> bool:
+        """
+        Avança o relógio ``bars`` candles (no símbolo com o próximo horário mais próximo)
+        e executa SL/TP das posições contra a máxima/mínima de cada novo candle.
+        Retorna False quando o histórico termina.
+        """
+        for _ in range(bars):
+            pending = [f for f in self.feeds.values() if f.cursor < len(f.data) - 1]
+            if not pending:
+                return False
+            next_time = min(int(f.data.time[f.cursor + 1]) for f in pending)
+            for feed in pending:
+                if int(feed.data.time[feed.cursor + 1]) == next_time:
+                    feed.cursor += 1
+                    self._match_stops(feed)
+        return True
+
+    def next_time(self):
+        """Horário (epoch s) do próximo candle do replay, ou None se o histórico terminou."""
+        pending = [int(f.data.time[f.cursor + 1]) for f in self.feeds.values() if f.cursor < len(f.data) - 1]
+        return min(pending) if pending else None
+
+    def advance_to(self, timestamp: int) -> int:
+        """Avança todos os candles com horário <= ``timestamp``. Retorna quantos foram abertos."""
+        bars = 0
+        next_time = self.next_time()
+        while next_time is not None and next_time <= timestamp:
+            self.advance()
+            bars += 1
+            next_time = self.next_time()
+        return bars
+
+    def _match_stops(self, feed: _SymbolFeed):
+        """Fecha posições cujo SL/TP foi atingido no candle atual (SL tem prioridade)."""
+        i = feed.cursor
+        bar_open, high, low = float(feed.data.open[i]), float(feed.data.high[i]), float(feed.data.low[i])
+
+        for ticket, pos in list(self.positions.items()):
+            if pos.symbol != feed.name:
+                continue
+            is_buy = pos.type == self.POSITION_TYPE_BUY
+            if pos.sl and (low <= pos.sl if is_buy else high >= pos.sl):
+                # Gap além do stop executa na abertura
+                price = min(bar_open, pos.sl) if is_buy else max(bar_open, pos.sl)
+                self._close(ticket, price, self.DEAL_REASON_SL, 'sl')
+            elif pos.tp and (high >= pos.tp if is_buy else low <= pos.tp):
+                price = max(bar_open, pos.tp) if is_buy else min(bar_open, pos.tp)
+                self._close(ticket, price, self.DEAL_REASON_TP, 'tp')
+
+    # --- CONEXÃO ---
+
+    def _call(self) -> bool:
+        self.calls += 1
+        if not self.initialized or not self.connected:
+            self._last_error = (self.RES_E_INTERNAL_FAIL_CONNECT, 'No IPC connection')
+            return False
+        return True
+
+    def initialize(self, path: str = None, **kwargs) -> bool:
+        self.calls += 1
+        if not self.connected:
+            self._last_error = (self.RES_E_INTERNAL_FAIL_CONNECT, 'Terminal not found')
+            return False
+        self.initialized = True
+        self._last_error = (self.RES_S_OK, 'Success')
+        if 'login' in kwargs:
+            return self.login(kwargs['login'], kwargs.get('password'), kwargs.get('server'))
+        return True
+
+    def login(self, login, password=None, server=None, timeout=None) -> bool:
+        if not self._call():
+            return False
+        expected = (self._login, self._password, self._server)
+        received = (login, password, server)
+        if any(e is not None and e != r for e, r in zip(expected, received)):
+            self._last_error = (self.RES_E_AUTH_FAILED, 'Authorization failed')
+            return False
+        self.account_login = login
+        self.account_server = server or self.account_server
+        return True
+
+    def shutdown(self):
+        self.calls += 1
+        self.initialized = False
+        return True
+
+    def last_error(self):
+        return self._last_error
+
+    def version(self):
+        return (500, 4000, 'SimulatedMT5')
+
+    def terminal_info(self):
+        if not self._call():
+            return None
+        return TerminalInfo(connected=True, trade_allowed=True, name='SimulatedMT5', path='')
+
+    def account_info(self):
+        if not self._call():
+            return None
+        profit = sum(self._profit(pos, self._exit_price(pos)) for pos in self.positions.values())
+        equity = self.balance + profit
+        return AccountInfo(login=self.account_login, server=self.account_server, currency='BRL',
+                           balance=self.balance, equity=equity, profit=profit, margin=0.0,
+                           margin_free=equity, leverage=1)
+
+    # --- MERCADO ---
+
+    def symbol_select(self, symbol: str, enable: bool = True) -> bool:
+        return self._call() and symbol in self.feeds
+
+    def symbol_info(self, symbol: str):
+        if not self._call():
+            return None
+        feed = self.feeds.get(symbol)
+        if feed is None:
+            self._last_error = (self.RES_E_NOT_FOUND, f'Symbol {symbol} not found')
+            return None
+        return feed.info
+
+    def symbol_info_tick(self, symbol: str):
+        if not self._call():
+            return None
+        feed = self.feeds.get(symbol)
+        if feed is None:
+            self._last_error = (self.RES_E_NOT_FOUND, f'Symbol {symbol} not found')
+            return None
+        t = int(feed.data.time[feed.cursor])
+        bid = feed.bid
+        return Tick(time=t, bid=bid, ask=feed.ask, last=bid, volume=int(feed.data.tick_volume[feed.cursor]),
+                    time_msc=t * 1000, flags=6, volume_real=float(feed.data.tick_volume[feed.cursor]))
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int):
+        """Últimos ``count`` candles terminando ``start_pos`` candles antes do atual (0 = atual)."""
+        if not self._call():
+            return None
+        feed = self.feeds.get(symbol)
+        if feed is None or timeframe != feed.timeframe:
+            self._last_error = (self.RES_E_INVALID_PARAMS, f'Invalid params ({symbol}, timeframe {timeframe})')
+            return None
+
+        if self.auto_advance:
+            self.advance()
+
+        end = feed.cursor + 1 - start_pos
+        begin = max(0, end - count)
+        if end <= 0:
+            return np.empty(0, dtype=RATES_DTYPE)
+
+        data = feed.data
+        rates = np.empty(end - begin, dtype=RATES_DTYPE)
+        for column in ('time', 'open', 'high', 'low', 'close', 'tick_volume'):
+            rates[column] = getattr(data, column)[begin:end]
+        rates['spread'] = feed.spread_points
+        rates['real_volume'] = 0
+        return rates
+
+    def copy_rates_range(self, symbol: str, timeframe: int, date_from, date_to):
+        """Candles com horário entre date_from e date_to (limitado ao candle atual)."""
+        if not self._call():
+            return None
+        feed = self.feeds.get(symbol)
+        if feed is None or timeframe != feed.timeframe:
+            self._last_error = (self.RES_E_INVALID_PARAMS, f'Invalid params ({symbol}, timeframe {timeframe})')
+            return None
+        times = feed.data.time[:feed.cursor + 1]
+        begin = int(np.searchsorted(times, _to_epoch(date_from), side='left'))
+        end = int(np.searchsorted(times, _to_epoch(date_to), side='right'))
+        return self.copy_rates_from_pos(symbol, timeframe, feed.cursor + 1 - end, end - begin) if end > begin \
+            else np.empty(0, dtype=RATES_DTYPE)
+
+    def copy_ticks_range(self, symbol: str, date_from, date_to, flags: int = -1):
+        """Ticks com horário entre date_from e date_to (inclusive, em segundos)."""
+        if not self._call():
+            return None
+        ticks = self.ticks.get(symbol)
+        if ticks is None:
+            self._last_error = (self.RES_E_INVALID_PARAMS, f'Invalid params ({symbol})')
+            return None
+        begin = int(np.searchsorted(ticks['time_msc'], _to_epoch(date_from) * 1000, side='left'))
+        end = int(np.searchsorted(ticks['time_msc'], (_to_epoch(date_to) + 1) * 1000, side='left'))
+        selected = ticks[begin:end]
+        if flags == self.COPY_TICKS_TRADE:
+            selected = selected[(selected['flags'] & self.TICK_FLAG_LAST) != 0]
+        elif flags == self.COPY_TICKS_INFO:
+            selected = selected[(selected['flags'] & (self.TICK_FLAG_BID | self.TICK_FLAG_ASK)) != 0]
+        return selected.copy()
+
+    # --- POSIÇÕES E HISTÓRICO ---
+
+    def positions_total(self) -> int:
+        return len(self.positions) if self._call() else 0
+
+    def positions_get(self, symbol: str = None, ticket: int = None, group: str = None):
+        if not self._call():
+            return None
+        result = []
+        for pos in self.positions.values():
+            if symbol is not None and pos.symbol != symbol:
+                continue
+            if ticket is not None and pos.ticket != ticket:
+                continue
+            result.append(pos._replace(price_current=self._exit_price(pos),
+                                       profit=self._profit(pos, self._exit_price(pos))))
+        return tuple(result)
+
+    def orders_total(self) -> int:
+        return 0
+
+    def orders_get(self, symbol: str = None, ticket: int = None, group: str = None):
+        return () if self._call() else None
+
+    def history_deals_get(self, date_from=None, date_to=None, position: int = None):
+        if not self._call():
+            return None
+        deals = self.deals
+        if position is not None:
+            deals = [d for d in deals if d.position_id == position]
+        if date_from is not None and date_to is not None:
+            start, stop = _to_epoch(date_from), _to_epoch(date_to)
+            deals = [d for d in deals if start <= d.time <= stop]
+        return tuple(deals)
+
+    # --- ORDENS ---
+
+    def order_check(self, request: dict):
+        """Valida o request sem executá-lo (retcode 0 = ok, como no terminal)."""
+        if not self._call():
+            return None
+        retcode, comment = self._validate(request)
+        account = self.account_info()
+        return OrderCheckResult(retcode=0 if retcode == self.TRADE_RETCODE_DONE else retcode,
+                                balance=account.balance, equity=account.equity, profit=account.profit,
+                                margin=0.0, margin_free=account.margin_free, margin_level=0.0,
+                                comment=comment, request=request)
+
+    def order_send(self, request: dict):
+        if not self._call():
+            return None
+
+        retcode, comment = self._validate(request)
+        if retcode != self.TRADE_RETCODE_DONE:
+            return self._result(retcode, request, comment=comment)
+
+        action = request['action']
+        feed = self.feeds[request['symbol']]
+
+        if action == self.TRADE_ACTION_SLTP:
+            ticket = request['position']
+            self.positions[ticket] = self.positions[ticket]._replace(
+                sl=float(request.get('sl', 0.0)), tp=float(request.get('tp', 0.0)))
+            return self._result(retcode, request, order=ticket, comment='SL/TP modified')
+
+        is_buy = request['type'] == self.ORDER_TYPE_BUY
+        price = feed.ask if is_buy else feed.bid
+
+        if request.get('position'):
+            # Deal de fechamento da posição informada
+            deal = self._close(request['position'], price, self.DEAL_REASON_EXPERT, request.get('comment', ''),
+                               volume=float(request['volume']))
+            return self._result(retcode, request, deal=deal.ticket, order=deal.order, volume=deal.volume,
+                                price=price, feed=feed)
+
+        ticket = self._ticket()
+        pos = TradePosition(
+            ticket=ticket, time=int(feed.data.time[feed.cursor]),
+            type=self.POSITION_TYPE_BUY if is_buy else self.POSITION_TYPE_SELL,
+            magic=request.get('magic', 0), identifier=ticket, volume=float(request['volume']), price_open=price,
+            sl=float(request.get('sl', 0.0) or 0.0), tp=float(request.get('tp', 0.0) or 0.0),
+            price_current=price, profit=0.0, symbol=feed.name, comment=request.get('comment', ''),
+        )
+        self.positions[ticket] = pos
+        deal = self._record_deal(pos, price, self.DEAL_ENTRY_IN, self.DEAL_TYPE_BUY if is_buy else self.DEAL_TYPE_SELL,
+                                 0.0, self.DEAL_REASON_EXPERT, pos.comment)
+        return self._result(retcode, request, deal=deal.ticket, order=ticket, volume=pos.volume, price=price, feed=feed)
+
+    def _validate(self, request: dict) -> tuple:
+        """Retorna (retcode, comentário) para o request, como o servidor faria."""
+        feed = self.feeds.get(request.get('symbol'))
+        if feed is None:
+            return self.TRADE_RETCODE_INVALID, 'Unknown symbol'
+
+        action = request.get('action')
+        if action == self.TRADE_ACTION_SLTP:
+            pos = self.positions.get(request.get('position'))
+            if pos is None:
+                return self.TRADE_RETCODE_POSITION_CLOSED, 'Position not found'
+            # Como no servidor: o novo SL/TP não pode estar do lado errado do preço de saída
+            is_buy = pos.type == self.POSITION_TYPE_BUY
+            price = self._exit_price(pos)
+            sl, tp = request.get('sl') or 0.0, request.get('tp') or 0.0
+            if (sl and (sl >= price if is_buy else sl <= price)) or (tp and (tp <= price if is_buy else tp >= price)):
+                return self.TRADE_RETCODE_INVALID_STOPS, 'Invalid stops'
+            return self.TRADE_RETCODE_DONE, 'Request valid'
+        if action != self.TRADE_ACTION_DEAL:
+            return self.TRADE_RETCODE_INVALID, 'Unsupported action'
+
+        if request.get('position') and request['position'] not in self.positions:
+            return self.TRADE_RETCODE_POSITION_CLOSED, 'Position not found'
+        if request.get('position') and float(request.get('volume', 0)) > self.positions[request['position']].volume:
+            return self.TRADE_RETCODE_INVALID_VOLUME, 'Invalid volume'
+
+        volume = float(request.get('volume', 0))
+        info = feed.info
+        steps = volume / info.volume_step
+        if volume < info.volume_min or volume > info.volume_max or abs(steps - round(steps)) > 1e-9:
+            return self.TRADE_RETCODE_INVALID_VOLUME, 'Invalid volume'
+
+        if not request.get('position'):
+            is_buy = request.get('type') == self.ORDER_TYPE_BUY
+            price = feed.ask if is_buy else feed.bid
+            sl, tp = request.get('sl') or 0.0, request.get('tp') or 0.0
+            if (sl and (sl >= price if is_buy else sl <= price)) or (tp and (tp <= price if is_buy else tp >= price)):
+                return self.TRADE_RETCODE_INVALID_STOPS, 'Invalid stops'
+
+        return self.TRADE_RETCODE_DONE, 'Request valid'
+
+    # --- MOTOR INTERNO ---
+
+    def _ticket(self) -> int:
+        ticket = self._next_ticket
+        self._next_ticket += 1
+        return ticket
+
+    def _exit_price(self, pos: TradePosition) -> float:
+        feed = self.feeds[pos.symbol]
+        return feed.bid if pos.type == self.POSITION_TYPE_BUY else feed.ask
+
+    def _profit(self, pos: TradePosition, exit_price: float) -> float:
+        info = self.feeds[pos.symbol].info
+        direction = 1.0 if pos.type == self.POSITION_TYPE_BUY else -1.0
+        return direction * (exit_price - pos.price_open) / info.trade_tick_size * info.trade_tick_value * pos.volume
+
+    def _close(self, ticket: int, price: float, reason: int, comment: str, volume: float = None) -> TradeDeal:
+        """Fecha a posição (ou só ``volume`` dela, se menor: a posição continua com o restante)."""
+        pos = self.positions.pop(ticket)
+        if volume is not None and volume < pos.volume:
+            self.positions[ticket] = pos._replace(volume=pos.volume - volume)
+            pos = pos._replace(volume=volume)
+        profit = self._profit(pos, price)
+        self.balance += profit
+        deal_type = self.DEAL_TYPE_SELL if pos.type == self.POSITION_TYPE_BUY else self.DEAL_TYPE_BUY
+        return self._record_deal(pos, price, self.DEAL_ENTRY_OUT, deal_type, profit, reason, comment)
+
+    def _record_deal(self, pos: TradePosition, price: float, entry: int, deal_type: int, profit: float,
+                     reason: int, comment: str) -> TradeDeal:
+        deal = TradeDeal(ticket=self._ticket(), order=pos.ticket, time=int(self.feeds[pos.symbol].data.time[self.feeds[pos.symbol].cursor]),
+                         type=deal_type, entry=entry, magic=pos.magic, position_id=pos.ticket, volume=pos.volume,
+                         price=price, profit=profit, symbol=pos.symbol, comment=comment, reason=reason)
+        self.deals.append(deal)
+        return deal
+
+    def _result(self, retcode: int, request: dict, deal: int = 0, order: int = 0, volume: float = 0.0,
+                price: float = 0.0, comment: str = 'Request executed', feed: _SymbolFeed = None) -> OrderSendResult:
+        return OrderSendResult(retcode=retcode, deal=deal, order=order, volume=volume, price=price,
+                               bid=feed.bid if feed else 0.0, ask=feed.ask if feed else 0.0, comment=comment,
+                               request_id=self.calls, retcode_external=0, request=request)
+
+
+def _to_epoch(value) -> int:
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).timestamp())
+
+
+def install(simulator: SimulatedMT5) -> SimulatedMT5:
+    """Faz ``import MetaTrader5`` (e o conector, que importa sob demanda) usar o simulador."""
+    from mt5.mt5_connector import mt5 as lazy_mt5
+    from mt5.market_cache import MARKET_CACHE
+
+    sys.modules['MetaTrader5'] = simulator
+    lazy_mt5.reset()
+    # Validade do cache medida no relógio do replay (o tick só muda quando o candle avança)
+    MARKET_CACHE.invalidate()
+    MARKET_CACHE.set_clock(lambda: simulator.now)
+    logger.info(f"Simulador MT5 instalado ({', '.join(simulator.feeds) or 'sem símbolos'}).")
+    return simulator
+
+
+def uninstall():
+    """Remove o simulador; o próximo acesso volta a importar o pacote real."""
+    from mt5.mt5_connector import mt5 as lazy_mt5
+    from mt5.market_cache import MARKET_CACHE
+
+    if isinstance(sys.modules.get('MetaTrader5'), SimulatedMT5):
+        del sys.modules['MetaTrader5']
+    lazy_mt5.reset()
+    MARKET_CACHE.invalidate()
+    MARKET_CACHE.set_clock()
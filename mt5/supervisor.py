@@ -0,0 +1,139 @@
+# Arquivo: mt5/supervisor.py
+
+import time
+import threading
+from typing import Callable, List
+from mt5.mt5_connector import mt5, get_connector
+from mt5.market_cache import MARKET_CACHE
+from utils.backoff import backoff_delay
+from utils.logger import logger
+
+
+class ConnectionSupervisor:
+    """
+    Supervisiona a sessão com o terminal MT5 em uma thread daemon.
+
+    - heartbeat barato (``mt5.account_info``) a cada ``heartbeat_interval`` segundos,
+      detectando uma queda em menos de 1 s;
+    - reconexão rápida (``MT5Connector.reconnect``) com backoff exponencial e jitter;
+    - após reconectar: descarta o cache de mercado (candles são rebuscados por inteiro),
+      ressincroniza as posições do OrderManager e avisa os listeners;
+    - métricas de quedas e da latência de reconexão em ``stats``.
+    """
+
+    def __init__(self, connector=None, order_manager=None, heartbeat_interval: float = 0.5,
+                 base_backoff: float = 0.25, max_backoff: float = 30.0):
+        self.connector = connector if connector is not None else get_connector()
+        self.order_manager = order_manager
+        self.heartbeat_interval = heartbeat_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.connected = threading.Event()
+        self.connected.set()
+        self.stats = {'heartbeats': 0, 'drops': 0, 'reconnects': 0, 'failed_attempts': 0,
+                      'last_reconnect_seconds': None, 'max_reconnect_seconds': 0.0}
+        self.reconnect_latencies = []
+
+        self._listeners: List[Callable] = []
+        self._dropped_at = None
+        self._attempt = 0
+        self._next_attempt = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self.connected.is_set()
+
+    def subscribe(self, listener: Callable[[], None]):
+        """Registra uma função chamada após cada reconexão bem-sucedida."""
+        self._listeners.append(listener)
+
+    def heartbeat(self) -> bool:
+        """True se o terminal responde e a conta logada é a configurada."""
+        self.stats['heartbeats'] += 1
+        try:
+            info = mt5.account_info()
+        except Exception:
+            return False
+        return info is not None and info.login == self.connector.login
+
+    def check(self) -> bool:
+        """Um passo da supervisão: heartbeat ou, se desconectado, uma tentativa de reconexão."""
+        now = time.monotonic()
+
+        if self.is_connected:
+            if self.heartbeat():
+                return True
+            self._on_drop(now)
+
+        if now < self._next_attempt:
+            return False
+        return self._try_reconnect(now)
+
+    def _on_drop(self, now: float):
+        self.connected.clear()
+        self.stats['drops'] += 1
+        self._dropped_at = now
+        self._attempt = 0
+        self._next_attempt = now
+        logger.critical(f"⚠️ Conexão com o MT5 perdida (erro: {mt5.last_error()}). Iniciando reconexão.")
+
+    def _try_reconnect(self, now: float) -> bool:
+        try:
+            restored = self.connector.reconnect()
+        except Exception as e:
+            logger.error(f"Erro na reconexão ao MT5: {e}")
+            restored = False
+
+        if not restored:
+            self.stats['failed_attempts'] += 1
+            delay = backoff_delay(self._attempt, self.base_backoff, self.max_backoff)
+            self._attempt += 1
+            self._next_attempt = now + delay
+            logger.warning(f"Reconexão {self._attempt} falhou. Nova tentativa em {delay:.2f} s.")
+            return False
+
+        self._resync()
+        latency = time.monotonic() - self._dropped_at
+        self.reconnect_latencies.append(latency)
+        self.stats['reconnects'] += 1
+        self.stats['last_reconnect_seconds'] = latency
+        self.stats['max_reconnect_seconds'] = max(self.stats['max_reconnect_seconds'], latency)
+        self.connected.set()
+        logger.warning(f"✅ Conexão com o MT5 restabelecida em {latency * 1000:.0f} ms "
+                       f"({self._attempt + 1} tentativa(s)).")
+        return True
+
+    def _resync(self):
+        """Estado que pode ter mudado durante a queda: cache de mercado, posições e listeners."""
+        MARKET_CACHE.invalidate()
+        if self.order_manager is not None:
+            self.order_manager.sync_positions()
+        for listener in list(self._listeners):
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Erro ao ressincronizar {listener} após reconexão: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check()
+            # Desconectado: acorda a tempo da próxima tentativa (respeitando o backoff)
+            wait = self.heartbeat_interval
+            if not self.is_connected:
+                wait = min(wait, max(0.0, self._next_attempt - time.monotonic()))
+            self._stop.wait(wait)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='ConnectionSupervisor', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.heartbeat_interval * 2 + 1)
@@ -0,0 +1,58 @@
+# Arquivo: mt5/tick_feed.py
+
+from datetime import datetime, timezone
+from typing import Iterator
+import numpy as np
+import pandas as pd
+from utils.logger import logger
+from mt5.mt5_connector import mt5
+from core.tick_store import TickStore
+
+
+def _epoch(value) -> int:
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).timestamp())
+
+
+def iter_ticks(symbol: str, date_from, date_to, window_seconds: int = 3600, flags: int = None,
+               after_msc: int = None) -> Iterator[np.ndarray]:
+    """
+    Busca os ticks de ``mt5.copy_ticks_range`` em janelas contíguas [início, início + window_seconds):
+    cada bloco é entregue e descartado antes do próximo (um dia de WIN tem milhões de ticks).
+    O ``date_to`` da API inclui o último segundo, então cada bloco é recortado à sua janela
+    (nenhum tick sai em duas janelas). ``after_msc`` descarta os ticks até esse horário (retomada).
+    Para no primeiro erro da API (o download pode ser retomado com ``download_ticks``).
+    """
+    flags = mt5.COPY_TICKS_ALL if flags is None else flags
+    start, end = _epoch(date_from), _epoch(date_to)
+    for window_start in range(start, end + 1, window_seconds):
+        window_end = min(window_start + window_seconds, end + 1)
+        ticks = mt5.copy_ticks_range(symbol, datetime.fromtimestamp(window_start, tz=timezone.utc),
+                                     datetime.fromtimestamp(window_end, tz=timezone.utc), flags)
+        if ticks is None:
+            logger.error(f"copy_ticks_range falhou para {symbol} em {window_start}: {mt5.last_error()}")
+            return
+        time_msc = ticks['time_msc']
+        keep = (time_msc >= window_start * 1000) & (time_msc < window_end * 1000)
+        if after_msc is not None:
+            keep &= time_msc > after_msc
+        if not keep.all():
+            ticks = ticks[keep]
+        if len(ticks):
+            yield ticks
+
+
+def download_ticks(store: TickStore, symbol: str, date_from, date_to, window_seconds: int = 3600) -> int:
+    """
+    Grava os ticks do período no ``store``, retomando a partir do último tick já gravado: o
+    segundo dele é buscado de novo e só entram os ticks posteriores (em milissegundos).
+    """
+    start = _epoch(date_from)
+    last = store.last_time_msc(symbol)
+    if last is not None and last >= start * 1000:
+        start = last // 1000
+        logger.info(f"Retomando download de ticks de {symbol} a partir de {pd.Timestamp(last, unit='ms')}.")
+    else:
+        last = None
+    return store.ingest(symbol, iter_ticks(symbol, start, date_to, window_seconds, after_msc=last))
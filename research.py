@@ -0,0 +1,16 @@
+# Arquivo: research.py
+
+"""
+Modo de pesquisa headless (Linux, containers, nós de CPU): o mesmo CLI de ``main.py``
+(ingest, backtest, optimize, walk-forward, replay, worker, bench), usado como entrypoint
+da imagem Docker. Nenhum desses comandos importa o MetaTrader5.
+
+    python research.py optimize --data data/win_m1 --workers 8 [--queue /mnt/fila]
+"""
+
+import sys
+
+from main import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,6 +2,9 @@
 
 from utils.config import CONFIG
 from utils.logger import logger
+from core import kernels
+from core.indicator_store import IndicatorStore, read_only_column
+import numpy as np
 import pandas as pd 
 
 class EMACrossStrategy:
@@ -26,33 +29,57 @@ class EMACrossStrategy:
         
         logger.info(f"Estratégia EMA Cross inicializada. EMA Rápida: {self.fast_period}, EMA Lenta: {self.slow_period}.")
 
-    def calculate_indicators(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Calcula as EMAs necessárias para a estratégia."""
-        
-        if len(data) < self.slow_period:
-            return data
+    def calculate_indicators(self, data, store: IndicatorStore = None, backend: str = None) -> IndicatorStore:
+        """
+        Calcula as EMAs necessárias para a estratégia em ``store`` (colunas EMA_FAST/EMA_SLOW).
+        O DataFrame (ou MarketData) de entrada não é modificado.
+        """
+        close = read_only_column(data, 'close')
+        if store is None:
+            store = IndicatorStore(len(close))
+
+        if len(close) < self.slow_period:
+            store.discard('EMA_FAST', 'EMA_SLOW')
+            return store
             
-        data['EMA_FAST'] = data['close'].ewm(span=self.fast_period, adjust=False).mean()
-        data['EMA_SLOW'] = data['close'].ewm(span=self.slow_period, adjust=False).mean()
-        return data
+        kernels.ema(close, self.fast_period, out=store.allocate('EMA_FAST'), backend=backend)
+        kernels.ema(close, self.slow_period, out=store.allocate('EMA_SLOW'), backend=backend)
+        return store
 
-    def generate_signal(self, data: pd.DataFrame) -> str:
-        """Gera o sinal de BUY/SELL/HOLD baseado no cruzamento das EMAs."""
-        
-        if len(data) < 2:
+    @staticmethod
+    def signal_at(ema_fast, ema_slow, i: int) -> str:
+        """Sinal de cruzamento no índice ``i`` a partir dos arrays de EMA (usado pelo backtest)."""
+        if i < 1:
             return "HOLD"
-        
+
+        prev_fast, prev_slow = ema_fast[i - 1], ema_slow[i - 1]
+        curr_fast, curr_slow = ema_fast[i], ema_slow[i]
+
         # Condição de Compra: EMA Rápida cruza acima da Lenta
-        buy_signal = (data['EMA_FAST'].iloc[-2] < data['EMA_SLOW'].iloc[-2]) and \
-                     (data['EMA_FAST'].iloc[-1] > data['EMA_SLOW'].iloc[-1])
-        
-        # Condição de Venda: EMA Rápida cruza abaixo da Lenta
-        sell_signal = (data['EMA_FAST'].iloc[-2] > data['EMA_SLOW'].iloc[-2]) and \
-                      (data['EMA_FAST'].iloc[-1] < data['EMA_SLOW'].iloc[-1])
-        
-        if buy_signal:
+        if prev_fast < prev_slow and curr_fast > curr_slow:
             return "BUY"
-        elif sell_signal:
+        # Condição de Venda: EMA Rápida cruza abaixo da Lenta
+        if prev_fast > prev_slow and curr_fast < curr_slow:
             return "SELL"
-        else:
-            return "HOLD"
\ No newline at end of file
+        return "HOLD"
+
+    @staticmethod
+    def signals(ema_fast, ema_slow) -> np.ndarray:
+        """Versão vetorizada de ``signal_at``: 1 (compra), -1 (venda) ou 0 em cada candle (int8)."""
+        ema_fast, ema_slow = np.asarray(ema_fast), np.asarray(ema_slow)
+        out = np.zeros(ema_fast.shape[0], dtype=np.int8)
+        prev_fast, prev_slow = ema_fast[:-1], ema_slow[:-1]
+        curr_fast, curr_slow = ema_fast[1:], ema_slow[1:]
+        out[1:][(prev_fast < prev_slow) & (curr_fast > curr_slow)] = 1
+        out[1:][(prev_fast > prev_slow) & (curr_fast < curr_slow)] = -1
+        return out
+
+    def generate_signal(self, indicators) -> str:
+        """Gera o sinal de BUY/SELL/HOLD baseado no cruzamento das EMAs (IndicatorStore ou DataFrame)."""
+        
+        if len(indicators) < 2 or 'EMA_FAST' not in indicators:
+            return "HOLD"
+        
+        ema_fast = np.asarray(indicators['EMA_FAST'])
+        ema_slow = np.asarray(indicators['EMA_SLOW'])
+        return self.signal_at(ema_fast, ema_slow, len(ema_fast) - 1)
\ No newline at end of file
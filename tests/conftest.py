@@ -0,0 +1,41 @@
+# Arquivo: tests/conftest.py
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.data_loader import MarketData
+
+
+def create_random_data(bars: int = 600, seed: int = 7, start: str = '2025-01-01') -> pd.DataFrame:
+    """Gera um passeio aleatório OHLCV reprodutível (candles M1 a partir de ``start``)."""
+    rng = np.random.default_rng(seed)
+    close = 10000 + np.cumsum(rng.normal(0, 10, bars))
+    open_ = close + rng.uniform(-5, 5, bars)
+    data = pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.uniform(0, 5, bars),
+        'low': np.minimum(open_, close) - rng.uniform(0, 5, bars),
+        'close': close,
+        'tick_volume': rng.integers(1000, 1500, bars),
+    }, index=pd.date_range(start, periods=bars, freq='min', name='time'))
+    return data
+
+
+@pytest.fixture
+def random_data():
+    """Fábrica de DataFrames OHLCV: ``random_data(bars, seed=7, start='2025-01-01')``."""
+    return create_random_data
+
+
+@pytest.fixture
+def market_data():
+    """Fábrica de MarketData M1 (por padrão num pregão da B3): ``market_data(bars, start='2025-03-05')``."""
+    def build(bars: int = 6000, start: str = '2025-03-05', seed: int = 7) -> MarketData:
+        return MarketData.from_dataframe(create_random_data(bars, seed=seed, start=start))
+    return build
@@ -0,0 +1,62 @@
+# Arquivo: tests/test_backtester.py
+
+import sys
+import os
+import numpy as np
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.backtester import Backtester
+from core.data_loader import MarketData
+from core.optimizer import build_grid, run_optimization
+
+
+def test_compact_mode_uses_narrow_dtypes(random_data):
+    data = random_data(1000)
+    full = MarketData.from_dataframe(data)
+    compact = MarketData.from_dataframe(data, compact=True)
+
+    assert compact.close.dtype == np.float32
+    assert compact.tick_volume.dtype == np.int32
+    assert compact.time.dtype == np.int64
+    assert compact.nbytes < full.nbytes * 0.6
+    np.testing.assert_array_equal(compact.time, full.time)
+
+
+def test_backtester_does_not_copy_market_data(random_data):
+    market_data = MarketData.from_dataframe(random_data(500))
+    tester = Backtester(market_data, sl_points=15, tp_points=30, ema_fast=9, ema_slow=20)
+
+    assert tester.data is market_data
+    tester.run()
+    assert tester.indicators['EMA_FAST'].dtype == market_data.close.dtype
+
+
+def test_compact_mode_matches_full_precision(random_data):
+    data = random_data(3000, seed=3)
+    full = Backtester(data, sl_points=30, tp_points=60, ema_fast=12, ema_slow=30).run()
+    compact = Backtester(data, sl_points=30, tp_points=60, ema_fast=12, ema_slow=30, compact=True).run()
+
+    assert full['total_trades'] > 0
+    assert compact['total_trades'] == full['total_trades']
+    assert abs(compact['net_profit'] - full['net_profit']) < 0.5
+
+
+def test_market_data_roundtrip(tmp_path, random_data):
+    market_data = MarketData.from_dataframe(random_data(100), compact=True)
+    market_data.save(str(tmp_path))
+    loaded = MarketData.load(str(tmp_path))
+
+    np.testing.assert_array_equal(loaded.close, market_data.close)
+    assert list(loaded.to_dataframe().index) == list(random_data(100).index)
+
+
+def test_optimizer_reports_peak_rss(random_data):
+    grid = build_grid([9, 12], [20, 9], [15], [30])
+    assert len(grid) == 2  # 12/9 é descartada (rápida >= lenta)
+
+    results = run_optimization(random_data(800), grid, workers=1, compact=True)
+    assert len(results) == 2
+    assert (results['peak_rss_mb'] >= 0).all()
+    assert 'worker_pid' in results.columns
@@ -0,0 +1,118 @@
+# Arquivo: tests/test_cli.py
+
+import sys
+import os
+import subprocess
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import main
+from utils.config import CONFIG
+from core.data_loader import MarketData, select_range
+from utils.perf import THREAD_ENV_VARS
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch, random_data):
+    """Logs e saídas no diretório temporário; variáveis de threads restauradas ao final."""
+    monkeypatch.chdir(tmp_path)
+    for name in THREAD_ENV_VARS:
+        monkeypatch.setenv(name, os.environ.get(name, '1'))
+    data = random_data(bars=4 * 1440, start='2025-03-03')
+    data.to_csv(tmp_path / 'bars.csv')
+    return tmp_path
+
+
+def test_select_range_includes_whole_end_day(random_data):
+    data = random_data(bars=3 * 1440, start='2025-03-03')
+    md = MarketData.from_dataframe(data)
+    assert len(select_range(md, '2025-03-04', '2025-03-04')) == 1440
+    assert len(select_range(md, '2025-03-04 10:00', '2025-03-04 10:09')) == 10
+    assert len(select_range(md, end='2025-03-01')) == 0
+
+
+def test_command_is_required():
+    with pytest.raises(SystemExit):
+        main.build_parser().parse_args([])
+    args = main.build_parser().parse_args(['optimize', '--workers', '3', '--chunk-size', '2', '--ema-fast', '5,9'])
+    assert (args.workers, args.chunk_size, args.ema_fast) == (3, 2, [5, 9])
+
+
+def test_backtest_csv_in_chunks_matches_full_run(workdir):
+    common = ['backtest', '--data', 'bars.csv', '--start', '2025-03-04', '--ema-fast', '5', '--ema-slow', '12']
+    main.main(common + ['--trades', 'full.csv'])
+    main.main(common + ['--chunk-size', '1000', '--trades', 'chunked.csv'])
+    main.main(common + ['--stream', 'D', '--trades', 'daily.csv'])
+
+    full = pd.read_csv(workdir / 'full.csv')
+    assert len(full) > 0 and full['entry_time'].min() >= '2025-03-04'
+    for name in ('chunked.csv', 'daily.csv'):
+        other = pd.read_csv(workdir / name)
+        assert len(other) == len(full)
+        assert other['pnl_real'].sum() == pytest.approx(full['pnl_real'].sum())
+
+
+def test_startup_imports_nothing_heavy():
+    # Só o parser: pandas, numpy e o executor ficam para o comando escolhido
+    code = ("import sys, main; main.build_parser(); "
+            "print(sorted(m for m in ('pandas', 'numpy', 'core.trade_executor', 'MetaTrader5') if m in sys.modules))")
+    done = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.strip() == '[]'
+
+
+@pytest.fixture
+def live_sim(workdir, monkeypatch, random_data):
+    """Terminal simulado e credenciais no ambiente; o loop do executor não é iniciado."""
+    from mt5.simulator import SimulatedMT5, install, uninstall
+    from mt5 import mt5_connector, order_handler
+    from core.trade_executor import TradeExecutor
+
+    sim = SimulatedMT5(login=1, password='x', server='SIM')
+    sim.add_symbol(CONFIG.get('GLOBAL.SYMBOL'), random_data(bars=400), start=300)
+    install(sim)
+    for name, value in (('MT5_LOGIN', '1'), ('MT5_PASSWORD', 'x'), ('MT5_SERVER', 'SIM')):
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(mt5_connector, '_MT5', None)
+    monkeypatch.setattr(order_handler, '_ORDER_HANDLER', None)
+    started = []
+    monkeypatch.setattr(TradeExecutor, 'start_loop', lambda self: started.append(self))
+    yield started
+    for executor in started:
+        executor.broker.shutdown()
+    uninstall()
+
+
+def test_live_command_uses_mt5_broker_with_order_manager(live_sim):
+    main.main(['live'])
+    broker = live_sim[0].broker
+    assert type(broker).__name__ == 'MT5Broker'
+    assert broker.order_manager is not None and broker.order_manager._threads
+    # Com journal, o encerramento não zera a posição: ela é retomada no reinício
+    assert live_sim[0].close_on_exit is False
+
+
+def test_live_command_supervises_the_connection(live_sim):
+    main.main(['live'])
+    broker = live_sim[0].broker
+    supervisor = broker.supervisor
+    assert supervisor is not None and supervisor.order_manager is broker.order_manager
+    assert supervisor.connector is broker.connector
+
+    # O supervisor só começa a vigiar quando o executor conecta
+    assert broker.connect()
+    assert supervisor._thread is not None and supervisor._thread.is_alive()
+
+
+def test_paper_flag_keeps_the_simulated_broker_apart(live_sim, workdir):
+    from core.trade_executor import ApiBroker
+    main.main(['live', '--paper'])
+    executor = live_sim.pop()
+    assert isinstance(executor.broker, ApiBroker)
+    assert executor.journal.path.endswith('paper_journal.jsonl')
+    assert not (workdir / 'state' / 'executor_journal.jsonl').exists()
@@ -0,0 +1,121 @@
+# Arquivo: tests/test_config.py
+
+import sys
+import os
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.trade_executor as trade_executor
+from utils.config import CONFIG, Config, ConfigError, ConfigWatcher, Settings
+
+BASE_YAML = """
+GLOBAL:
+  SYMBOL: WINQ25
+  MAGIC_NUMBER: 777
+RISK:
+  MAX_RISK_PER_TRADE: 10.00
+  POINT_VALUE: 0.30
+  MAX_VOLUME_LIMIT: 5
+STRATEGY:
+  EMA_SHORT_PERIOD: 12
+  EMA_LONG_PERIOD: 20
+  SL_POINTS: 30
+  TP_POINTS: 40
+"""
+
+
+def write_config(path, text: str):
+    path.write_text(text, encoding='utf-8')
+    # Garante um mtime diferente mesmo em sistemas de arquivos com baixa resolução
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / 'config.yaml'
+    write_config(path, BASE_YAML)
+    return path
+
+
+def test_dotted_keys_and_typed_sections(config_file):
+    config = Config(str(config_file))
+
+    assert config.get('GLOBAL.SYMBOL') == 'WINQ25'
+    assert config.get('RISK.ATR_PERIOD', 14) == 14
+    assert config['STRATEGY']['SL_POINTS'] == 30
+    assert config.get('RISK', {})['POINT_VALUE'] == 0.30
+    assert config.global_.magic_number == 777
+    assert config.risk.point_value == 0.30
+    assert isinstance(config.risk.max_risk_per_trade, float)
+    assert config.execution.check_interval_seconds == 10.0
+
+
+def test_config_is_not_parsed_until_first_access(config_file):
+    config = Config(str(config_file))
+    assert not config.is_loaded
+    config.get('GLOBAL.SYMBOL')
+    assert config.is_loaded
+
+
+def test_credentials_come_from_environment(config_file, monkeypatch):
+    config = Config(str(config_file))
+    config._env_loaded = True  # Não lê o .env do projeto no teste
+    monkeypatch.setenv('MT5_LOGIN', '123456')
+    monkeypatch.delenv('MT5_SERVER', raising=False)
+
+    assert config.MT5_LOGIN == '123456'
+    with pytest.raises(EnvironmentError):
+        config.MT5_SERVER
+    with pytest.raises(AttributeError):
+        config.NOT_A_SETTING
+
+
+def test_invalid_values_are_rejected():
+    with pytest.raises(ConfigError):
+        Settings({'STRATEGY': {'EMA_SHORT_PERIOD': 30, 'EMA_LONG_PERIOD': 20}})
+    with pytest.raises(ConfigError):
+        Settings({'RISK': {'POINT_VALUE': 'abc'}})
+    with pytest.raises(ConfigError):
+        Settings({'RISK': {'MAX_VOLUME_LIMIT': 0}})
+
+
+def test_watcher_swaps_settings_and_keeps_previous_on_error(config_file):
+    config = Config(str(config_file))
+    received = []
+    config.subscribe(received.append)
+    before = config.settings
+    watcher = ConfigWatcher(config)
+
+    write_config(config_file, BASE_YAML.replace('SL_POINTS: 30', 'SL_POINTS: 50'))
+    assert watcher.check()
+    assert config.strategy.sl_points == 50
+    assert before.strategy.sl_points == 30  # Snapshot antigo permanece consistente
+    assert received == [config.settings]
+
+    write_config(config_file, BASE_YAML.replace('EMA_SHORT_PERIOD: 12', 'EMA_SHORT_PERIOD: 99'))
+    assert not watcher.check()
+    assert config.strategy.ema_short_period == 12
+
+
+def test_executor_hot_reload_keeps_open_position(monkeypatch):
+    executor = trade_executor.TradeExecutor(symbol='WINQ25', timeframe=5)
+    position = {'symbol': 'WINQ25', 'type': 'BUY', 'entry_price': 10000.0, 'volume': 1,
+                'sl_price': 9970.0, 'tp_price': 10040.0}
+    monkeypatch.setattr(trade_executor, 'ACTIVE_POSITION', position)
+
+    raw = dict(CONFIG.to_dict())
+    raw['STRATEGY'] = dict(raw['STRATEGY'], SL_POINTS=10, EMA_SHORT_PERIOD=5, TREND_TIMEFRAME='H1')
+    executor.on_config_reload(Settings(raw))
+
+    # Nada muda até o início do próximo ciclo
+    assert executor.risk_manager.sl_points != 10
+    executor._apply_pending_config()
+
+    assert executor.risk_manager.sl_points == 10
+    assert executor.strategy.fast_period == 5
+    assert executor.confirmer.trend_timeframe == 'H1'  # Filtro de tendência refeito no novo timeframe
+    assert trade_executor.ACTIVE_POSITION is position
+    assert position['sl_price'] == 9970.0
@@ -2,49 +2,46 @@
 
 import sys
 import os
+import pytest
+
 # Adiciona o diretório raiz ao path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from mt5.mt5_connector import MT5
-from utils.logger import logger
+from mt5 import mt5_connector
+from mt5.mt5_connector import resolve_timeframe
+from mt5.simulator import SimulatedMT5, install, uninstall
 from utils.config import CONFIG
-import MetaTrader5 as mt5
-
-def test_connection_and_data():
-    """Testa a conexão e a obtenção básica de dados."""
-    logger.info("--- INICIANDO TESTE DE CONEXÃO MT5 ---")
-    
-    # 1. Tenta conectar
-    if not MT5.connect():
-        logger.error("TESTE FALHOU: Falha ao conectar ao MetaTrader 5.")
-        return False
-
-    # 2. Tenta obter informações da conta
+
+
+@pytest.fixture
+def sim(monkeypatch, random_data):
+    """Terminal simulado com as credenciais do .env no ambiente (sem MetaTrader5 nem conta real)."""
+    simulator = SimulatedMT5(login=1001, password='senha', server='SIM')
+    simulator.add_symbol(CONFIG.get('GLOBAL.SYMBOL'), random_data(bars=400), start=300)
+    install(simulator)
+    for name, value in (('MT5_LOGIN', '1001'), ('MT5_PASSWORD', 'senha'), ('MT5_SERVER', 'SIM')):
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(mt5_connector, '_MT5', None)  # Instância global criada com estas credenciais
+    yield simulator
+    uninstall()
+
+
+def test_connection_and_data(sim):
+    """Testa a conexão e a obtenção básica de dados pela instância global ``MT5``."""
+    from mt5.mt5_connector import MT5, mt5
+
+    # 1. Conecta com as credenciais do .env
+    assert MT5.connect()
+    assert MT5.check_connection()
+
+    # 2. Informações da conta
     account_info = mt5.account_info()
-    if account_info is None:
-        logger.error(f"TESTE FALHOU: Não foi possível obter informações da conta. Erro: {mt5.last_error()}")
-        MT5.shutdown()
-        return False
-        
-    logger.info(f"Conta Logada: {account_info.login} | Saldo: R$ {account_info.balance:.2f} | Servidor: {CONFIG.MT5_SERVER}")
-    
-    # 3. Tenta obter dados (Timeframe do MT5)
-    # Garante que o timeframe seja lido corretamente como uma constante do MT5
-    timeframe_str = CONFIG.get('GLOBAL.TIMEFRAME', 'MT5.TIMEFRAME_M5').split('.')[-1]
-    timeframe = getattr(mt5, timeframe_str)
-    
-    rates = MT5.get_market_data(timeframe, count=10)
-    
-    if rates is None or rates.empty:
-        logger.error(f"TESTE FALHOU: Falha ao obter dados para {MT5.symbol}. Verifique o símbolo e o servidor.")
-        MT5.shutdown()
-        return False
-        
-    logger.info(f"Dados obtidos com sucesso para {MT5.symbol}. Último preço de fechamento: {rates['close'].iloc[-1]}")
+    assert account_info is not None and account_info.login == 1001
 
-    MT5.shutdown()
-    logger.info("--- TESTE DE CONEXÃO MT5 CONCLUÍDO COM SUCESSO ---")
-    return True
+    # 3. Dados no timeframe do config (constante do MT5)
+    rates = MT5.get_market_data(resolve_timeframe(CONFIG.get('GLOBAL.TIMEFRAME', 'MT5.TIMEFRAME_M5')), count=10)
+    assert len(rates) == 10
+    assert rates['close'].iloc[-1] == mt5.symbol_info_tick(MT5.symbol).bid
 
-if __name__ == "__main__":
-    test_connection_and_data()
\ No newline at end of file
+    MT5.shutdown()
+    assert not MT5.check_connection()
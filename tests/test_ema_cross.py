@@ -4,27 +4,19 @@ import sys
 import os
 import pandas as pd
 from datetime import datetime, timedelta
-import importlib # ⚠️ NOVO IMPORT PARA FORÇAR A RECARGA
 
 # Adiciona o diretório raiz do projeto ao path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Importa os módulos principais
-import utils.config # ⚠️ Importa o módulo de configuração
+from utils.config import StrategySettings
 from strategies.ema_cross import EMACrossStrategy
-from core.risk_manager import RiskManager 
 
-# ----------------------------------------------------
-# ⚠️ AÇÃO CRÍTICA: RECARGA FORÇADA DO CONFIG.YAML ⚠️
-# Isso garante que a estratégia leia os novos parâmetros (EMA 2 e 5)
-importlib.reload(utils.config) 
-# ----------------------------------------------------
+# Parâmetros do teste (EMA 2 e 5) pela seção STRATEGY tipada, sem recarregar o config.yaml
+STRATEGY = StrategySettings(ema_short_period=2, ema_long_period=5)
 
-# Cria a instância do RiskManager para inicializar o logger, se necessário
-RISK_MANAGER_TEST = RiskManager() 
-
-# Inicializa a estratégia (que agora cria sua própria instância de RiskManager e lê os parâmetros 2/5)
-EMA_STRATEGY = EMACrossStrategy()
+# Inicializa a estratégia com os períodos 2/5
+EMA_STRATEGY = EMACrossStrategy(fast_period=STRATEGY.ema_short_period, slow_period=STRATEGY.ema_long_period)
 
 def create_mock_data(prices: list) -> pd.DataFrame:
     """Cria um DataFrame de mock data com preços específicos."""
@@ -46,7 +38,7 @@ def run_ema_test(prices: list, expected_signal: str, test_name: str):
     # 1. Cria mock data
     mock_data = create_mock_data(prices)
 
-    # 2. Calcula os indicadores (EMAs)
+    # 2. Calcula os indicadores (EMAs, no IndicatorStore)
     data_with_emas = EMA_STRATEGY.calculate_indicators(mock_data)
     
     # 3. Gera o sinal
@@ -55,17 +47,18 @@ def run_ema_test(prices: list, expected_signal: str, test_name: str):
     print(f"\n--- Teste: {test_name} ---")
     
     # Verifica o cruzamento (Debugging)
-    ema_short = data_with_emas[f'EMA_{EMA_STRATEGY.short_period}'].iloc[-1]
-    ema_long = data_with_emas[f'EMA_{EMA_STRATEGY.long_period}'].iloc[-1]
+    ema_short = data_with_emas['EMA_FAST'][-1]
+    ema_long = data_with_emas['EMA_SLOW'][-1]
     
     print(f"Preço de Fechamento Final: {prices[-1]}")
-    print(f"EMA {EMA_STRATEGY.short_period}: {ema_short:.2f}")
-    print(f"EMA {EMA_STRATEGY.long_period}: {ema_long:.2f}")
+    print(f"EMA {EMA_STRATEGY.fast_period}: {ema_short:.2f}")
+    print(f"EMA {EMA_STRATEGY.slow_period}: {ema_long:.2f}")
     
     if signal == expected_signal:
         print(f"RESULTADO: ✅ SUCESSO. Sinal Gerado: {signal}")
     else:
         print(f"RESULTADO: ❌ FALHA. Sinal Gerado: {signal}, Esperado: {expected_signal}")
+    assert signal == expected_signal, test_name
 
 
 def run_strategy_tests():
@@ -110,5 +103,9 @@ def run_strategy_tests():
     run_ema_test(hold_series, "HOLD", "Teste 3: Sem Cruzamento (HOLD)")
 
 
+def test_ema_cross_signals():
+    run_strategy_tests()
+
+
 if __name__ == "__main__":
-    run_strategy_tests()
\ No newline at end of file
+    run_strategy_tests()
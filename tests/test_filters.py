@@ -0,0 +1,83 @@
+# Arquivo: tests/test_filters.py
+
+import sys
+import os
+import numpy as np
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.filters import (ConfirmationFilter, FilterPipeline, TrendFilter, VolumeFilter, RSIFilter, MACDFilter, ATRFilter,
+                          TradingHoursFilter, REJECT_HOURS, REJECT_RSI, REJECT_NO_DATA)
+from core.signal_confirmer import SignalConfirmer
+from core.indicator_store import IndicatorStore
+from core.backtester import Backtester
+
+
+def all_filters():
+    return [MACDFilter(), RSIFilter(14, 60, 40), TrendFilter(50), ATRFilter(14, 5, 200),
+            VolumeFilter(10, 0.1), TradingHoursFilter('10:00', '16:00')]
+
+
+def test_pipeline_orders_by_cost_and_rejects_shared_columns():
+    pipeline = FilterPipeline(all_filters())
+    costs = [flt.cost for flt in pipeline.filters]
+    assert costs == sorted(costs)
+    assert isinstance(pipeline.filters[0], TradingHoursFilter)
+    assert pipeline.min_bars() == 50
+
+    FilterPipeline([VolumeFilter(10), VolumeFilter(10)])  # Mesmos parâmetros: coluna compartilhada
+    with pytest.raises(ValueError):
+        FilterPipeline([VolumeFilter(10), VolumeFilter(20)])
+    with pytest.raises(TypeError):
+        type('NoPasses', (ConfirmationFilter,), {})()  # Classe base abstrata: ``passes`` é obrigatório
+
+
+def test_vectorized_masks_match_full_scalar_evaluation(random_data):
+    data = random_data(bars=3000)
+    pipeline = FilterPipeline(all_filters())
+    pipeline.prepare(data)
+    directions = np.random.default_rng(2).choice([-1, 0, 1], size=len(data))
+
+    flags = pipeline.flags(directions)
+    for i in np.flatnonzero(directions):
+        assert flags[i] == pipeline.flags_at(i, directions[i], short_circuit=False)
+    assert (flags[directions == 0] == 0).all()
+    assert (flags[:9][directions[:9] != 0] == REJECT_NO_DATA).all()  # MMV aquecendo
+    assert np.count_nonzero(flags & REJECT_HOURS) > 0 and np.count_nonzero(flags & REJECT_RSI) > 0
+
+
+def test_live_short_circuit_skips_expensive_indicators(random_data):
+    data = random_data(bars=300)
+    minute = data.index[-1].hour * 60 + data.index[-1].minute + 1
+    # Janela que não contém o último candle: o filtro de horário (o mais barato) rejeita
+    closed = TradingHoursFilter(f'{minute // 60:02d}:{minute % 60:02d}', f'{minute // 60:02d}:{minute % 60 + 1:02d}')
+    pipeline = FilterPipeline([MACDFilter(), closed])
+
+    store = IndicatorStore(len(data))
+    store.allocate('MACD_Hist_12_26_9')[:] = 123.0  # Valor velho de um ciclo anterior
+    pipeline.prepare(data, store, lazy=True)
+    assert pipeline.flags_at(len(data) - 1, 1) == REJECT_HOURS
+    assert 'MACD_Hist_12_26_9' not in store
+
+    pipeline = FilterPipeline([MACDFilter(), TradingHoursFilter('00:00', '23:59')])
+    pipeline.prepare(data, store, lazy=True)
+    assert pipeline.flags_at(len(data) - 1, 1) in (0, 16)
+    assert 'MACD_Hist_12_26_9' in store and store['MACD_Hist_12_26_9'][-1] != 123.0
+
+
+def test_backtest_with_custom_filters(random_data):
+    data = random_data(bars=5000)
+    default = Backtester(data, sl_points=20, tp_points=40, ema_fast=5, ema_slow=12).run()
+    tester = Backtester(data, sl_points=20, tp_points=40, ema_fast=5, ema_slow=12,
+                        filters=[TrendFilter(50), VolumeFilter(10), TradingHoursFilter('10:00', '16:00')])
+    metrics = tester.run()
+
+    assert metrics['rejected_hours'] > 0
+    assert metrics['total_trades'] < default['total_trades']
+    entries = np.array([trade['entry_time'].hour for trade in tester.trades])
+    assert ((entries >= 10) & (entries < 16)).all()
+
+    confirmer = SignalConfirmer(filters=[RSIFilter(), TrendFilter(20)])
+    assert confirmer.trend_column == 'EMA_20' and confirmer.volume_filter_percent == 0.0
@@ -0,0 +1,134 @@
+# Arquivo: tests/test_history_store.py
+
+import sys
+import os
+import time
+import threading
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.trade_executor as trade_executor
+from core.history_store import HistoryStore, DUCKDB_AVAILABLE
+from core.optimizer import build_grid, run_optimization
+from mt5.simulator import SimulatedMT5, install, uninstall
+from mt5.mt5_connector import MT5Connector
+from mt5.broker import MT5Broker
+from utils.config import CONFIG
+
+
+def test_rows_are_batched_into_partitions(tmp_path):
+    store = HistoryStore(str(tmp_path), batch_size=3, flush_seconds=3600)
+    store.add_event('signal', primary='BUY', final='BUY')
+    store.add_event('rejection', primary='SELL', final='HOLD')
+    assert store.files('events') == []  # Ainda no buffer
+
+    store.add_event('order', signal='BUY', accepted=True)
+    assert len(store.files('events')) == 1
+    store.add_event('fill', type='BUY')
+    store.close()
+
+    events = store.read('events')
+    assert list(events['event']) == ['signal', 'rejection', 'order', 'fill']
+    assert len(store.files('events')) == 2
+    assert store.read('events', start_date='2999-01-01').empty
+
+
+def test_rows_are_partitioned_by_their_own_date(tmp_path):
+    store = HistoryStore(str(tmp_path), batch_size=100, flush_seconds=3600)
+    trades = [{'entry_time': pd.Timestamp('2025-03-05 17:50'), 'pnl': 10.0},
+              {'entry_time': pd.Timestamp('2025-03-06 09:05'), 'pnl': -5.0},
+              {'entry_time': pd.Timestamp('2025-03-05 10:00'), 'pnl': 2.0}]
+    store.add_run({'ema_fast': 9}, {'net_profit': 7.0}, trades)
+    store.close()
+
+    assert [len(store.files('trades', day, day)) for day in ('2025-03-05', '2025-03-06')] == [1, 1]
+    assert list(store.read('trades', '2025-03-05', '2025-03-05')['pnl']) == [10.0, 2.0]
+    assert len(store.read('runs', start_date=f"{pd.Timestamp.now():%Y-%m-%d}")) == 1
+
+
+def test_background_writer_keeps_disk_off_the_calling_thread(tmp_path, monkeypatch):
+    store = HistoryStore(str(tmp_path), batch_size=2, flush_seconds=3600).start()
+    writers = []
+    write = store._write
+    monkeypatch.setattr(store, '_write', lambda *args: writers.append(threading.current_thread().name) or write(*args))
+
+    store.add_event('signal', primary='BUY')
+    store.add_event('order', signal='BUY')  # Lote cheio: só acorda a thread de escrita
+    deadline = time.monotonic() + 5
+    while not store.files('events') and time.monotonic() < deadline:
+        time.sleep(0.01)
+    store.close()
+
+    assert writers == ['HistoryStore']
+    assert list(store.read('events')['event']) == ['signal', 'order']
+
+
+def test_failed_batch_is_written_on_next_flush(tmp_path, monkeypatch):
+    store = HistoryStore(str(tmp_path), batch_size=100, flush_seconds=3600)
+    store.add_event('signal', primary='BUY')
+    write = store._write
+
+    def disk_full(table, df, day=None):
+        raise OSError(28, 'No space left on device')
+
+    monkeypatch.setattr(store, '_write', disk_full)
+    store.flush()
+    assert store.files('events') == []
+
+    store.add_event('order', signal='BUY')
+    monkeypatch.setattr(store, '_write', write)
+    store.flush()
+    assert list(store.read('events')['event']) == ['signal', 'order']
+
+
+def test_optimizer_records_runs_and_trades(tmp_path, random_data):
+    store = HistoryStore(str(tmp_path))
+    grid = build_grid([9, 12], [26], [20], [40])
+    results = run_optimization(random_data(bars=1500), grid, history=store)
+
+    runs = store.read('runs')
+    trades = store.read('trades')
+    assert set(runs['run_id']) == set(results['run_id'])
+    assert list(runs['ema_fast']) == [9, 12]
+    # Cada trade pertence a uma execução e as contagens batem com as métricas
+    counts = trades.groupby('run_id').size()
+    for _, run in runs.iterrows():
+        assert counts.get(run['run_id'], 0) == run['total_trades']
+
+
+@pytest.mark.skipif(not DUCKDB_AVAILABLE, reason="duckdb não instalado")
+def test_sql_joins_runs_and_trades(tmp_path, random_data):
+    store = HistoryStore(str(tmp_path))
+    run_optimization(random_data(bars=1500), build_grid([9], [26], [20], [40]), history=store)
+    df = store.sql("SELECT r.ema_fast, COUNT(*) AS n FROM runs r JOIN trades t USING (run_id) GROUP BY 1")
+    assert df['n'].iloc[0] == len(store.read('trades'))
+
+
+def test_executor_records_signals_orders_and_fills(tmp_path, random_data):
+    sim = SimulatedMT5()
+    sim.add_symbol(CONFIG.get('GLOBAL.SYMBOL'), random_data(bars=1200), start=300)
+    install(sim)
+    try:
+        connector = MT5Connector(login=1, password='x', server='SIM')
+        connector.retry_delay = 0
+        store = HistoryStore(str(tmp_path))
+        executor = trade_executor.TradeExecutor(CONFIG.get('GLOBAL.SYMBOL'), 'MT5.TIMEFRAME_M5',
+                                                broker=MT5Broker(connector), history=store)
+        executor.connect()
+        for _ in range(800):
+            executor.run_cycle()
+            sim.advance()
+        store.close()
+    finally:
+        uninstall()
+
+    events = store.read('events')
+    kinds = events['event'].value_counts()
+    opened = sum(d.entry == sim.DEAL_ENTRY_IN for d in sim.deals)
+    assert kinds.get('order', 0) == opened
+    assert kinds.get('fill', 0) == opened
+    # Toda ordem nasce de um sinal confirmado
+    assert kinds.get('signal', 0) >= opened
@@ -0,0 +1,81 @@
+# Arquivo: tests/test_indicator_store.py
+
+import sys
+import os
+import numpy as np
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.indicators import TechnicalIndicators
+from core.indicator_store import IndicatorStore, read_only_column
+from core.signal_confirmer import SignalConfirmer
+from strategies.ema_cross import EMACrossStrategy
+from strategies.trend_following import TrendFollowing
+
+
+def test_input_is_not_modified(random_data):
+    data = random_data(300)
+    columns_before = list(data.columns)
+
+    TechnicalIndicators(data).add_all_indicators()
+    EMACrossStrategy(9, 21).calculate_indicators(data)
+    SignalConfirmer().calculate_confirmation_indicators(data)
+
+    assert list(data.columns) == columns_before
+
+
+def test_input_views_are_read_only(random_data):
+    data = random_data(50)
+    close = read_only_column(data, 'close')
+    with pytest.raises(ValueError):
+        close[0] = 0.0
+
+
+def test_warmup_is_tracked_instead_of_dropping_rows(random_data):
+    data = random_data(300)
+    store = TechnicalIndicators(data).compute_all()
+
+    # Mesmo número de linhas que o antigo dropna() removia
+    enriched = store.to_frame(data, trim_warmup=False)
+    assert store.start_index == len(enriched) - len(enriched.dropna())
+    assert len(store) == len(data)
+    assert not np.isnan(store['BB_Middle'][store.start_index:]).any()
+    assert len(store.to_frame(data)) == len(data) - store.start_index
+
+
+def test_add_all_indicators_still_returns_the_enriched_dataframe(random_data):
+    data = random_data(300)
+    enriched = TechnicalIndicators(data).add_all_indicators()
+
+    # Mesmo resultado do antigo dropna(), sem modificar a entrada
+    expected = data.join(TechnicalIndicators(data).compute_all().to_frame(trim_warmup=False).set_index(data.index))
+    assert enriched.equals(expected.dropna())
+    assert len(data) == 300
+    assert isinstance(TrendFollowing(enriched).check_buy_signal(), bool)
+
+
+def test_store_buffers_are_reused(random_data):
+    data = random_data(300)
+    store = IndicatorStore(0)
+
+    TechnicalIndicators(data, store=store).compute_all()
+    buffer = store['EMA_9']
+    TechnicalIndicators(data, store=store).compute_all()
+
+    assert store['EMA_9'] is buffer
+
+
+def test_short_history_drops_stale_emas(random_data):
+    store = IndicatorStore(0)
+    strategy = EMACrossStrategy(9, 21)
+
+    store.reset(100)
+    strategy.calculate_indicators(random_data(100), store)
+    assert 'EMA_FAST' in store
+
+    store.reset(10)
+    strategy.calculate_indicators(random_data(10), store)
+    assert strategy.generate_signal(store) == "HOLD"
+    assert 'EMA_FAST' not in store
@@ -0,0 +1,95 @@
+# Arquivo: tests/test_kernels.py
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import kernels
+from core.indicators import TechnicalIndicators
+
+# Testa sempre o NumPy puro e, se instalado, o backend compilado
+BACKENDS = ['numpy'] + (['numba'] if kernels.NUMBA_AVAILABLE else [])
+
+INDICATOR_COLUMNS = [
+    'EMA_9', 'EMA_21', 'EMA_50', 'ATR_14', 'BB_Middle', 'BB_StdDev', 'BB_Upper', 'BB_Lower',
+    'RSI', 'MACD', 'MACD_Signal', 'MACD_Hist', 'Volume_MA',
+]
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_compute_all_parity(backend, random_data):
+    """Todos os indicadores do backend de kernels batem com a implementação pandas."""
+    data = random_data()
+
+    expected = TechnicalIndicators(data).compute_all()
+    result = TechnicalIndicators(data, backend=backend).compute_all()
+
+    assert result.start_index == expected.start_index
+    start = expected.start_index
+    for column in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(result[column][start:], expected[column][start:], rtol=1e-9, atol=1e-7, err_msg=column)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('span', [2, 9, 50])
+def test_ema_parity(backend, span, random_data):
+    values = random_data()['close']
+    expected = values.ewm(span=span, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(kernels.ema(values.to_numpy(), span, backend=backend), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_ema_skips_leading_nan(backend):
+    values = np.array([np.nan, np.nan, 1.0, 2.0, 3.0])
+    expected = pd.Series(values).ewm(span=3, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(kernels.ema(values, 3, backend=backend), expected)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_true_range_parity(backend, random_data):
+    data = random_data()
+    prev_close = data['close'].shift(1)
+    expected = pd.DataFrame({
+        'tr1': data['high'] - data['low'],
+        'tr2': abs(data['high'] - prev_close),
+        'tr3': abs(data['low'] - prev_close),
+    }).max(axis=1).to_numpy()
+
+    result = kernels.true_range(data['high'].to_numpy(), data['low'].to_numpy(), data['close'].to_numpy(), backend=backend)
+    np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('window', [1, 5, 20])
+def test_rolling_parity(backend, window, random_data):
+    values = random_data()['close']
+    np.testing.assert_allclose(
+        kernels.rolling_mean(values.to_numpy(), window, backend=backend),
+        values.rolling(window=window).mean().to_numpy(), rtol=1e-9,
+    )
+    np.testing.assert_allclose(
+        kernels.rolling_std(values.to_numpy(), window, backend=backend),
+        values.rolling(window=window).std().to_numpy(), rtol=1e-6, atol=1e-9,
+    )
+
+
+def test_short_series_and_output_buffer():
+    out = np.empty(3)
+    result = kernels.rolling_mean(np.array([1.0, 2.0, 3.0]), 5, out=out, backend='numpy')
+    assert result is out
+    assert np.isnan(result).all()
+
+    with pytest.raises(ValueError):
+        kernels.ema(np.ones(4), 3, out=np.empty(2))
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        kernels.resolve_backend('cuda')
+    with pytest.raises(ValueError):
+        TechnicalIndicators(pd.DataFrame({'close': np.arange(10.0)}), backend='cuda')
@@ -0,0 +1,84 @@
+# Arquivo: tests/test_market_cache.py
+
+import sys
+import os
+import numpy as np
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mt5.simulator import SimulatedMT5, install, uninstall
+from mt5.market_cache import MARKET_CACHE, MarketCache, TTLCache
+from mt5.mt5_connector import MT5Connector
+from mt5.order_handler import OrderHandler
+from utils.config import CONFIG
+
+SYMBOL = CONFIG.get('GLOBAL.SYMBOL')
+
+
+@pytest.fixture
+def sim(random_data):
+    simulator = SimulatedMT5()
+    simulator.add_symbol(SYMBOL, random_data(bars=800), start=300)
+    install(simulator)
+    simulator.initialize()
+    yield simulator
+    uninstall()
+
+
+def test_ttl_cache_expires_and_counts():
+    now = [0.0]
+    cache = TTLCache(ttl=0.5, clock=lambda: now[0])
+    loads = []
+
+    assert cache.get('x', lambda: loads.append(1) or 'a') == 'a'
+    assert cache.get('x', lambda: 'b') == 'a'
+    now[0] = 0.6
+    assert cache.get('x', lambda: 'c') == 'c'
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    assert cache.get('y', lambda: None) is None
+    assert cache.get('y', lambda: 'd') == 'd'  # None não fica em cache
+
+
+def test_order_reuses_cached_spec_and_tick(sim):
+    handler = OrderHandler(MT5Connector(login=1, password='x', server='SIM'))
+    MARKET_CACHE.reset_stats()
+
+    calls = sim.calls
+    for _ in range(5):
+        handler.build_market_request(sim.ORDER_TYPE_BUY, 1, 30, 40, 'TESTE')
+    assert sim.calls - calls == 2  # Um symbol_info e um symbol_info_tick no total
+
+    sim.advance()  # Novo candle: o relógio do simulador passa do TTL do tick
+    request = handler.build_market_request(sim.ORDER_TYPE_BUY, 1, 30, 40, 'TESTE')
+    assert request['price'] == sim.symbol_info_tick(SYMBOL).ask
+
+    stats = MARKET_CACHE.stats()
+    assert stats['spec_misses'] == 1 and stats['spec_hits'] == 5
+    assert stats['tick_misses'] == 2 and stats['tick_hits'] == 4
+
+
+def test_incremental_rates_match_full_fetch(sim):
+    cache = MarketCache(refresh_bars=3)
+    for _ in range(20):
+        rates = cache.rates(SYMBOL, sim.TIMEFRAME_M5, 300)
+        np.testing.assert_array_equal(rates, sim.copy_rates_from_pos(SYMBOL, sim.TIMEFRAME_M5, 0, 300))
+        sim.advance()
+    assert cache.rates_full == 1 and cache.rates_incremental == 19
+
+    # Lacuna maior que a janela incremental: busca a janela inteira de novo
+    sim.advance(10)
+    rates = cache.rates(SYMBOL, sim.TIMEFRAME_M5, 300)
+    np.testing.assert_array_equal(rates, sim.copy_rates_from_pos(SYMBOL, sim.TIMEFRAME_M5, 0, 300))
+    assert cache.rates_full == 2
+
+
+def test_reconnect_invalidates_cache(sim):
+    MARKET_CACHE.symbol_info(SYMBOL)
+    MARKET_CACHE.reset_stats()
+    MT5Connector(login=1, password='x', server='SIM').connect()
+
+    MARKET_CACHE.symbol_info(SYMBOL)
+    assert MARKET_CACHE.stats()['spec_misses'] == 1
@@ -0,0 +1,116 @@
+# Arquivo: tests/test_mt5_simulator.py
+
+import sys
+import os
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mt5.simulator import SimulatedMT5, install, uninstall
+from mt5.mt5_connector import MT5Connector, resolve_timeframe
+from mt5.order_handler import OrderHandler
+from mt5.broker import MT5Broker
+from core.trade_executor import TradeExecutor
+from utils.config import CONFIG
+
+SYMBOL = CONFIG.get('GLOBAL.SYMBOL')
+
+
+@pytest.fixture
+def sim(random_data):
+    simulator = SimulatedMT5(login=1001, password='senha', server='SIM')
+    simulator.add_symbol(SYMBOL, random_data(bars=2000), timeframe=SimulatedMT5.TIMEFRAME_M5, start=300)
+    install(simulator)
+    yield simulator
+    uninstall()
+
+
+@pytest.fixture
+def connector(sim):
+    connector = MT5Connector(login=1001, password='senha', server='SIM')
+    connector.retry_delay = 0
+    return connector
+
+
+def test_connector_reads_rates_from_replay(sim, connector):
+    assert connector.connect()
+    assert connector.check_connection()
+
+    rates = connector.get_market_data(resolve_timeframe('MT5.TIMEFRAME_M5'), count=10)
+    assert len(rates) == 10
+    assert rates['close'].iloc[-1] == sim.symbol_info_tick(SYMBOL).bid
+
+    sim.advance()
+    assert connector.get_market_data(sim.TIMEFRAME_M5, count=10).index[-1] > rates.index[-1]
+
+
+def test_wrong_credentials_fail_login(sim):
+    connector = MT5Connector(login=1001, password='errada', server='SIM')
+    connector.retry_delay = 0
+    assert sim.initialize()
+    assert not sim.login(connector.login, connector.password, connector.server)
+    assert sim.last_error()[0] == sim.RES_E_AUTH_FAILED
+
+
+def test_order_lifecycle_and_retcodes(sim, connector):
+    connector.connect()
+    tick = sim.symbol_info_tick(SYMBOL)
+    bad = sim.order_send({'action': sim.TRADE_ACTION_DEAL, 'symbol': SYMBOL, 'volume': 1.0,
+                          'type': sim.ORDER_TYPE_BUY, 'sl': tick.ask + 10})
+    assert bad.retcode == sim.TRADE_RETCODE_INVALID_STOPS
+    assert sim.order_check({'action': sim.TRADE_ACTION_DEAL, 'symbol': SYMBOL, 'volume': 0.5,
+                            'type': sim.ORDER_TYPE_BUY}).retcode == sim.TRADE_RETCODE_INVALID_VOLUME
+
+    result = sim.order_send({'action': sim.TRADE_ACTION_DEAL, 'symbol': SYMBOL, 'volume': 2.0,
+                             'type': sim.ORDER_TYPE_BUY, 'sl': tick.ask - 1e6, 'tp': tick.ask + 1e6})
+    assert result.retcode == sim.TRADE_RETCODE_DONE
+    assert result.price == tick.ask
+    assert sim.positions_total() == 1
+
+    position = sim.positions_get(symbol=SYMBOL)[0]
+    close = OrderHandler(connector).close_position(position)
+    assert close.retcode == sim.TRADE_RETCODE_DONE
+    assert sim.positions_total() == 0
+    assert [d.entry for d in sim.history_deals_get(position=position.ticket)] == [sim.DEAL_ENTRY_IN, sim.DEAL_ENTRY_OUT]
+
+
+def test_stop_loss_is_matched_against_bar_low(sim, connector):
+    connector.connect()
+    tick = sim.symbol_info_tick(SYMBOL)
+    sl = tick.ask - 20
+    sim.order_send({'action': sim.TRADE_ACTION_DEAL, 'symbol': SYMBOL, 'volume': 1.0,
+                    'type': sim.ORDER_TYPE_BUY, 'sl': sl, 'tp': tick.ask + 1e6})
+
+    feed = sim.feeds[SYMBOL]
+    while sim.positions_total() and sim.advance():
+        pass
+
+    deal = sim.deals[-1]
+    assert deal.reason == sim.DEAL_REASON_SL
+    assert feed.data.low[feed.cursor] <= sl
+    assert deal.price <= sl
+
+
+def test_disconnected_terminal_returns_none(sim, connector):
+    connector.connect()
+    sim.connected = False
+    assert sim.symbol_info_tick(SYMBOL) is None
+    assert connector.send_order_request({'action': sim.TRADE_ACTION_DEAL, 'symbol': SYMBOL,
+                                         'volume': 1.0, 'type': sim.ORDER_TYPE_BUY}, retry=1) is None
+    assert sim.last_error()[0] == sim.RES_E_INTERNAL_FAIL_CONNECT
+
+
+def test_trade_executor_runs_on_simulator(sim, connector):
+    executor = TradeExecutor(symbol=SYMBOL, timeframe='MT5.TIMEFRAME_M5',
+                             broker=MT5Broker(connector))
+    assert executor.connect()
+
+    for _ in range(500):
+        executor.run_cycle(bars_to_fetch=300)
+        sim.advance()
+
+    # Entradas e saídas passaram pelo OrderHandler/MT5Connector até o motor do simulador
+    assert any(d.entry == sim.DEAL_ENTRY_IN for d in sim.deals)
+    assert any(d.entry == sim.DEAL_ENTRY_OUT for d in sim.deals)
+    assert sim.balance != 100000.0
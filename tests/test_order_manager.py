@@ -0,0 +1,137 @@
+# Arquivo: tests/test_order_manager.py
+
+import sys
+import os
+import time
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mt5.simulator import SimulatedMT5, install, uninstall
+from mt5.mt5_connector import MT5Connector
+from mt5.order_handler import OrderHandler
+from mt5.order_manager import OrderManager, RateLimiter, DONE, REJECTED
+from mt5.broker import MT5Broker
+from utils.config import CONFIG
+
+SYMBOL = CONFIG.get('GLOBAL.SYMBOL')
+OTHER = 'WDOQ25'
+
+
+@pytest.fixture
+def handler(random_data):
+    sim = SimulatedMT5()
+    sim.add_symbol(SYMBOL, random_data(bars=500), start=300)
+    sim.add_symbol(OTHER, random_data(bars=500, seed=11), start=300)
+    install(sim)
+    connector = MT5Connector(login=1, password='x', server='SIM')
+    connector.retry_delay = 0
+    connector.connect()
+    yield OrderHandler(connector)
+    uninstall()
+
+
+def count_calls(monkeypatch, sim, name):
+    calls = []
+    original = getattr(sim, name)
+    monkeypatch.setattr(sim, name, lambda *a, **k: calls.append(a) or original(*a, **k))
+    return calls
+
+
+def test_rate_limiter_spaces_orders_after_burst():
+    limiter = RateLimiter(rate=50, burst=2)
+    start = time.monotonic()
+    waits = [limiter.acquire() for _ in range(6)]
+    assert waits[:2] == [0.0, 0.0]
+    assert time.monotonic() - start >= 0.07
+
+
+def test_burst_across_symbols_and_in_flight_table(handler, monkeypatch):
+    sim = sys.modules['MetaTrader5']
+    spec_calls = count_calls(monkeypatch, sim, 'symbol_info')
+    manager = OrderManager(handler, max_orders_per_second=100)
+
+    first = manager.submit('BUY', 1, 30, 40)
+    second = manager.submit('SELL', 1, 30, 40, symbol=OTHER)
+    duplicate = manager.submit('BUY', 1, 30, 40)
+
+    # Nada foi enviado ainda: as ordens estão na tabela de ordens em andamento
+    assert duplicate.status == REJECTED
+    assert set(manager.in_flight) == {first.order_id, second.order_id}
+    assert sim.positions_total() == 0
+
+    assert manager.process_pending() == 2
+    assert first.status == DONE and second.status == DONE
+    assert manager.in_flight == {}
+    assert {p['symbol'] for p in manager.positions.values()} == {SYMBOL, OTHER}
+    assert all(p['magic'] == handler.magic_number for p in manager.positions.values())
+
+    close = manager.close(first.ticket)
+    manager.process_pending()
+    assert close.status == DONE
+    assert first.ticket not in manager.positions
+    assert manager.submit('SELL', 1, 30, 40).status != REJECTED
+    manager.process_pending()
+
+    # Especificação do símbolo lida uma vez por símbolo (cache), não por ordem
+    assert len(spec_calls) == 2
+
+
+def test_order_check_rejects_before_sending(handler):
+    manager = OrderManager(handler)
+    order = manager.submit('BUY', 0.5, 30, 40)
+    manager.process_pending()
+
+    assert order.status == REJECTED
+    assert order.retcode == SimulatedMT5.TRADE_RETCODE_INVALID_VOLUME
+    assert manager.stats['sent'] == 0
+
+
+def test_worker_thread_and_sync_positions(handler):
+    manager = OrderManager(handler).start()
+    try:
+        order = manager.submit('BUY', 2, 30, 40)
+        assert order.wait(timeout=5)
+        assert order.status == DONE
+    finally:
+        manager.stop()
+
+    manager.positions = {}
+    assert list(manager.sync_positions()) == [order.ticket]
+
+
+def test_broker_counts_queued_order_as_position(handler):
+    manager = OrderManager(handler)
+    broker = MT5Broker(handler.connector, handler, order_manager=manager)
+
+    assert broker.send_order(SYMBOL, 'BUY', 1, 10000.0, 9970.0, 10040.0, 30, 40)
+    assert broker.get_position()['ticket'] is None  # Ainda enfileirada
+    manager.process_pending()
+    assert broker.get_position()['ticket'] is not None
+
+
+def test_modify_and_partial_close_through_the_queue(handler):
+    manager = OrderManager(handler)
+    broker = MT5Broker(handler.connector, handler, order_manager=manager)
+    broker.send_order(SYMBOL, 'BUY', 3, 10000.0, 9970.0, 10040.0, 30, 40)
+    manager.process_pending()
+    position = broker.get_position()
+
+    # Modificação e parcial não contam como exposição nova nem bloqueiam a fila
+    sl_price = round(position['entry_price'] - 50)  # Símbolo sem casas decimais
+    assert broker.modify_position(sl_price)
+    broker.close_position('PARCIAL', volume=1)
+    assert manager.pending_for(SYMBOL) is None
+    assert manager.process_pending() == 2
+
+    position = broker.get_position()
+    assert position['sl_price'] == sl_price
+    assert position['volume'] == 2
+    assert manager.positions[position['ticket']]['volume'] == 2
+    assert manager.stats['done'] == 3
+
+    # SL acima do BID é recusado como no servidor
+    assert broker.modify_position(position['entry_price'] + 1e6)
+    manager.process_pending()
+    assert manager.stats['rejected'] == 1
@@ -0,0 +1,168 @@
+# Arquivo: tests/test_position_manager.py
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.position_manager import PositionManager, STOP_HIT, TAKE_PROFIT, STOP_MOVED, PARTIAL_EXIT
+from core.backtester import Backtester
+from mt5.simulator import SimulatedMT5, install, uninstall
+from mt5.mt5_connector import MT5Connector
+from mt5.order_handler import OrderHandler
+from mt5.broker import MT5Broker
+from core.trade_executor import TradeExecutor
+from utils.config import CONFIG, Settings
+
+SYMBOL = CONFIG.get('GLOBAL.SYMBOL')
+
+
+def test_break_even_trailing_and_partial_per_tick():
+    manager = PositionManager(break_even_points=10, break_even_offset=2, trailing_points=15,
+                              trailing_start_points=20, partial_points=12)
+    manager.open("SELL", 1000.0, 1030.0, 900.0)
+
+    assert manager.update(995.0) == 0
+    assert manager.update(990.0) == STOP_MOVED  # Break-even: entrada - 2
+    assert manager.stop_price == 998.0
+    assert manager.update(988.0) == PARTIAL_EXIT
+    assert manager.update(980.0) == STOP_MOVED  # Trailing a 15 do melhor preço
+    assert manager.stop_price == 995.0
+    assert manager.update(990.0) == 0  # Recuo não mexe no stop nem repete a parcial
+    assert manager.update(995.0) == STOP_HIT and manager.exit_reason == "STOP_MOVEL"
+
+    static = PositionManager()
+    static.open("BUY", 1000.0, 970.0, 1040.0)
+    assert not static.enabled
+    assert [static.update(p) for p in (1039.0, 1040.0)] == [0, TAKE_PROFIT]
+    assert static.update(970.0) == STOP_HIT and static.exit_reason == "SL"
+
+
+def test_stop_curve_matches_tick_updates():
+    manager = PositionManager(break_even_points=8, trailing_points=12, trailing_start_points=16)
+    prices = 1000 + np.cumsum(np.random.default_rng(3).normal(0.5, 4, 300))
+    manager.open("BUY", 1000.0, 900.0, 1e9)
+
+    expected = []
+    for price in prices:
+        expected.append(manager.stop)
+        manager.update(price)
+    best = np.maximum.accumulate(np.maximum(prices, 1000.0))
+    curve = manager.stop_curve(1000.0, 900.0, np.concatenate(([1000.0], best[:-1])))
+    assert np.allclose(curve, expected)
+
+
+def test_modifications_are_coalesced():
+    manager = PositionManager(trailing_points=10, modify_step_points=5, modify_interval=1.0)
+    manager.open("BUY", 1000.0, 980.0, 2000.0)
+
+    sent = []
+    for now, price in enumerate(np.arange(1001.0, 1061.0), start=1):
+        manager.update(price)
+        sl_price = manager.pending_stop(now * 0.25)
+        if sl_price is not None:
+            manager.stop_sent(sl_price, now * 0.25)
+            sent.append(sl_price)
+    # 60 movimentos do stop viraram poucos envios, cada um >= 5 pontos e >= 1 s depois do anterior
+    assert 5 <= len(sent) <= 15
+    assert np.all(np.diff(sent) >= 5)
+    assert manager.stop_price - sent[-1] < 5
+
+
+def test_backtester_management_matches_tick_loop(random_data):
+    data = random_data(bars=6000)
+    plain = Backtester(data, sl_points=20, tp_points=40, ema_fast=5, ema_slow=12).run()
+    assert Backtester(data, sl_points=20, tp_points=40, ema_fast=5, ema_slow=12,
+                      management=PositionManager()).run()['net_profit'] == plain['net_profit']
+
+    manager = PositionManager(break_even_points=8, trailing_points=15, trailing_start_points=12, partial_points=10)
+    tester = Backtester(data, sl_points=20, tp_points=40, ema_fast=5, ema_slow=12, management=manager)
+    tester.run()
+    trades = pd.DataFrame(tester.trades)
+    assert {'PARCIAL', 'STOP_MOVEL'} <= set(trades['reason'])
+    assert (trades.groupby('entry_time')['fraction'].sum() == 1.0).all()
+
+    # Cada trade refeito candle a candle com o update O(1) do robô sai no mesmo candle e motivo
+    close, position = tester.data.close, {int(t): i for i, t in enumerate(tester.data.time)}
+    for entry_time, legs in trades.groupby('entry_time', sort=False):
+        i = position[int(entry_time.timestamp())]
+        entry, d = float(close[i]), 1 if legs['type'].iloc[0] == "BUY" else -1
+        manager.open(legs['type'].iloc[0], entry, entry - d * 20, entry + d * 40)
+        exits = []
+        for k in range(i + 1, len(close)):
+            actions = manager.update(float(close[k]))
+            if actions & PARTIAL_EXIT:
+                exits.append((k, "PARCIAL"))
+            if actions & (STOP_HIT | TAKE_PROFIT):
+                exits.append((k, "TP" if actions & TAKE_PROFIT else manager.exit_reason))
+                break
+        else:
+            exits.append((len(close) - 1, "ENCERRAMENTO"))
+        assert exits == [(position[int(t.timestamp())], r) for t, r in zip(legs['exit_time'], legs['reason'])]
+
+
+@pytest.fixture
+def trend_sim():
+    """Alta de 60 pontos seguida de queda: o trailing tem de travar o lucro."""
+    prices = np.concatenate([np.full(301, 1000.0), 1000 + np.arange(1.0, 61.0), 1060 - np.arange(1.0, 61.0)])
+    data = pd.DataFrame({'open': prices, 'high': prices + 1, 'low': prices - 1, 'close': prices,
+                         'tick_volume': 100},
+                        index=pd.date_range('2025-01-02', periods=len(prices), freq='5min', name='time'))
+    sim = SimulatedMT5(login=1, password='x', server='SIM')
+    sim.add_symbol(SYMBOL, data, timeframe=SimulatedMT5.TIMEFRAME_M5, start=300, spread_points=0)
+    install(sim)
+    yield sim
+    uninstall()
+
+
+def test_executor_trails_on_ticks_with_coalesced_sltp(trend_sim, monkeypatch):
+    sim = trend_sim
+    requests = []
+    original = sim.order_send
+    monkeypatch.setattr(sim, 'order_send', lambda request: requests.append(request['action']) or original(request))
+
+    connector = MT5Connector(login=1, password='x', server='SIM')
+    connector.retry_delay = 0
+    executor = TradeExecutor(symbol=SYMBOL, timeframe='MT5.TIMEFRAME_M5', broker=MT5Broker(connector))
+    executor.connect()
+    executor.position_manager = PositionManager(trailing_points=10, partial_points=20, point=1.0,
+                                                modify_step_points=5)
+    OrderHandler(connector).open_buy(2.0, 50, 500)
+
+    ticks = 0
+    while sim.positions_total() and sim.advance():
+        assert executor.on_tick()
+        ticks += 1
+
+    exits = [d for d in sim.deals if d.entry == sim.DEAL_ENTRY_OUT]
+    assert [d.volume for d in exits] == [1.0, 1.0]
+    assert exits[0].comment == 'PARCIAL' and exits[0].price == 1020.0
+    assert exits[1].price >= 1045.0  # Lucro travado pelo trailing
+    modifications = requests.count(sim.TRADE_ACTION_SLTP)
+    assert 5 <= modifications <= 12 < ticks
+
+
+def test_live_and_backtest_managers_give_the_same_stop(trend_sim):
+    """Os mesmos pontos viram o mesmo stop em preço no robô (ponto do símbolo) e no backtest."""
+    from main import _management
+
+    connector = MT5Connector(login=1, password='x', server='SIM')
+    connector.retry_delay = 0
+    executor = TradeExecutor(symbol=SYMBOL, timeframe='MT5.TIMEFRAME_M5', broker=MT5Broker(connector))
+    executor.connect()
+    raw = CONFIG.settings.raw
+    executor.apply_config(Settings({**raw, 'MANAGEMENT': {**raw.get('MANAGEMENT', {}), 'BREAK_EVEN_POINTS': 8,
+                                                          'TRAILING_POINTS': 15}}))
+    assert executor.point == 1.0 != CONFIG.risk.point_value  # Preço por ponto, não R$ por ponto
+
+    live, backtest = executor.position_manager, _management(break_even=8, trailing=15)
+    for manager in (live, backtest):
+        manager.open("BUY", 1000.0, 980.0, 1100.0)
+    for price in (1005.0, 1010.0, 1030.0, 1020.0):
+        assert live.update(price) == backtest.update(price)
+        assert live.stop_price == backtest.stop_price
+    assert backtest.stop_price == 1015.0
@@ -0,0 +1,49 @@
+# Arquivo: tests/test_replay.py
+
+import sys
+import os
+import time
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.replay import ReplayClock, run_replay
+from mt5.simulator import SimulatedMT5
+from utils.clock import ClockStopped
+
+
+def test_replay_runs_live_loop_over_history(random_data):
+    # Candles de 1 minuto e ciclo de 60 s: um ciclo por candle
+    report = run_replay(random_data(bars=800), check_interval=60, window=300)
+
+    assert report['bars'] == 501
+    assert report['cycles'] == report['bars']
+    assert report['simulated_seconds'] >= 500 * 60
+    assert report['total_trades'] > 0
+    assert 0 < report['cpu_ms_p50'] <= report['cpu_ms_max']
+
+
+def test_shorter_interval_repeats_cycles_within_a_bar(random_data):
+    report = run_replay(random_data(bars=400), check_interval=10, window=300)
+    assert report['cycles'] == pytest.approx(report['bars'] * 6, abs=6)
+
+
+def test_clock_advances_simulator_and_stops_at_end():
+    sim = SimulatedMT5()
+    bars = pd.DataFrame({'open': 1000.0, 'high': 1001.0, 'low': 999.0, 'close': 1000.0, 'tick_volume': 100},
+                        index=pd.date_range('2025-01-01', periods=5, freq='min', name='time'))
+    sim.add_symbol('WINQ25', bars, timeframe=1)
+    clock = ReplayClock(sim, speed=1000)
+
+    start = time.perf_counter()
+    clock.sleep(60)
+    assert time.perf_counter() - start >= 0.05
+    assert sim.feeds['WINQ25'].cursor == 1
+
+    clock.sleep(180)
+    assert sim.finished()
+    with pytest.raises(ClockStopped):
+        clock.sleep(60)
+    assert len(clock.cycle_cpu) == 3
@@ -0,0 +1,57 @@
+# Arquivo: tests/test_report.py
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.report import neighborhood_stats, robustness_scores, surface, write_report, submit_report
+from core.optimizer import build_grid, run_optimization
+
+
+def test_isolated_peak_scores_below_plateau():
+    grid = np.zeros((7, 7))
+    grid[1, 1] = 5.0             # Pico isolado
+    grid[4:7, 4:7] = 3.0         # Platô
+    grid[0, 6] = np.nan          # Combinação inválida
+    mean, std, low = neighborhood_stats(grid)
+    assert mean[5, 5] == 3.0 and std[5, 5] == 0.0
+    assert (mean - std)[5, 5] > (mean - std)[1, 1]
+    assert np.isnan(mean[0, 6]) and low[0, 5] == 0.0
+
+
+def test_robustness_follows_parameter_grid():
+    results = pd.DataFrame(build_grid([5, 9, 12], [20, 26, 30], [15, 20], [30, 40]))
+    results['profit_factor'] = 1.0 + (results['ema_fast'] == 9) * 0.5
+    results.loc[0, 'profit_factor'] = np.inf  # Sem perdas: fora da média
+    scores = robustness_scores(results)
+    assert scores.index.equals(results.index)
+    assert np.isnan(scores.loc[0, 'robust_score'])
+    assert scores.loc[results['ema_fast'] == 9, 'neighbors_mean'].min() > 1.0
+    table = surface(results, 'ema_fast', 'ema_slow')
+    assert list(table.columns) == [5, 9, 12] and list(table.index) == [20, 26, 30]
+
+
+def test_report_from_optimizer_results(tmp_path, random_data):
+    grid = build_grid([5, 9], [20, 26], [20, 30], [40, 60])
+    results = run_optimization(random_data(bars=1500), grid)
+    assert results[['ema_fast', 'ema_slow', 'sl_points', 'tp_points']].to_dict('records') == grid
+
+    paths = submit_report(results, str(tmp_path)).result(timeout=60)
+    with open(paths['html'], encoding='utf-8') as f:
+        page = f.read()
+    assert page.count('class="heat"') == 4 and 'Top 20 por robustez' in page
+    assert len(pd.read_csv(paths['csv'])) == len(grid)
+    assert 'robust_score' not in results.columns  # O relatório trabalha numa cópia
+
+
+def test_png_is_rendered_headless(tmp_path):
+    pytest.importorskip('matplotlib')
+    results = pd.DataFrame(build_grid([5, 9, 12], [20, 26], [15, 20], [30, 40]))
+    results['profit_factor'] = np.random.default_rng(0).random(len(results))
+    paths = write_report(results, str(tmp_path))
+    assert os.path.getsize(paths['png']) > 0
@@ -0,0 +1,99 @@
+# Arquivo: tests/test_resampler.py
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import kernels
+from core.data_loader import MarketData
+from core.resampler import (timeframe_seconds, resample, resample_many, align, htf_ema,
+                            MultiTimeframeAggregator)
+from core.signal_confirmer import SignalConfirmer
+from core.filters import TrendFilter
+from core.indicator_store import IndicatorStore
+from core.backtester import Backtester
+
+
+def test_timeframe_names():
+    assert timeframe_seconds('H1') == timeframe_seconds('MT5.TIMEFRAME_H1') == timeframe_seconds(16385) == 3600
+    assert timeframe_seconds(5) == 300
+    with pytest.raises(ValueError):
+        timeframe_seconds('H2')
+
+
+def test_resample_matches_pandas(random_data):
+    df = random_data(bars=5000)
+    expected = df.resample('15min').agg({'open': 'first', 'high': 'max', 'low': 'min',
+                                          'close': 'last', 'tick_volume': 'sum'}).dropna()
+    bars = resample_many(MarketData.from_dataframe(df), ['M5', 'M15', 'H1', 'D1'])
+
+    m15 = bars['M15'].to_dataframe()
+    assert list(bars) == ['M5', 'M15', 'H1', 'D1']
+    np.testing.assert_allclose(m15[['open', 'high', 'low', 'close']].to_numpy(),
+                               expected[['open', 'high', 'low', 'close']].to_numpy())
+    np.testing.assert_array_equal(m15['tick_volume'].to_numpy(), expected['tick_volume'].to_numpy())
+    assert m15.index.equals(expected.index.rename('time'))
+
+
+def test_aligned_values_have_no_lookahead(random_data):
+    data = MarketData.from_dataframe(random_data(bars=3000))
+    aligned = htf_ema(data, 'H1', 10)
+
+    # Truncar o histórico no candle i não muda o valor visto em i
+    for i in (59, 60, 61, 119, 500, 1777, 2999):
+        truncated = htf_ema(data.slice(0, i + 1), 'H1', 10)
+        np.testing.assert_equal(truncated[-1], aligned[i])
+    assert np.isnan(aligned[:59]).all() and not np.isnan(aligned[59])
+
+
+def test_live_updates_match_historical_mode(random_data):
+    data = MarketData.from_dataframe(random_data(bars=3000))
+    warm = 1000
+    mtf = MultiTimeframeAggregator.from_history(data.slice(0, warm), ['M5', 'H1'], ema_periods=[5])
+    expected = {tf: htf_ema(data, tf, 5) for tf in ('M5', 'H1')}
+
+    for i in range(warm, len(data)):
+        mtf.update(data.time[i], data.open[i], data.high[i], data.low[i], data.close[i], data.tick_volume[i])
+        for tf in ('M5', 'H1'):
+            assert mtf.ema(tf, 5) == pytest.approx(expected[tf][i], rel=1e-12)
+
+    h1 = resample(data, 'H1')
+    assert mtf.last_closed['H1'][4] == h1.close[-1]
+
+
+def test_confirmer_uses_higher_timeframe_trend(random_data):
+    df = random_data(bars=6000)
+    confirmer = SignalConfirmer(trend_timeframe='H1')
+    store = confirmer.calculate_confirmation_indicators(df)
+
+    assert confirmer.trend_column == 'EMA_50_H1'
+    data = MarketData.from_dataframe(df)
+    np.testing.assert_array_equal(store['EMA_50_H1'], htf_ema(data, 'H1', 50))
+    assert store.start_index == 59
+    assert confirmer.lookback_bars('MT5.TIMEFRAME_M5') == 51 * 12
+
+    metrics = Backtester(df, sl_points=20, tp_points=40, ema_fast=9, ema_slow=26, trend_timeframe='H1').run()
+    assert metrics['total_trades'] > 0
+
+
+def test_incremental_trend_follows_the_live_window(random_data):
+    data = MarketData.from_dataframe(random_data(bars=3000))
+    expected = htf_ema(data, 'H1', 10)
+    confirmer = SignalConfirmer(long_trend_period=10, trend_timeframe='H1', incremental=True)
+    trend = confirmer.pipeline.find(TrendFilter)
+
+    # Janela deslizante de 300 candles como a do robô; o último candle ainda está em formação
+    live = None
+    for i in range(299, len(data), 7):
+        window = data.slice(max(0, i - 299), i + 1)
+        store = IndicatorStore(len(window))
+        trend.compute(window, store)
+        assert store['EMA_10_H1'][-1] == pytest.approx(expected[i], rel=1e-12)
+        assert store.start_index == len(window) - 1
+        live = live or trend._live
+    assert trend._live is live  # Aquecido uma vez, depois só os candles fechados novos
@@ -0,0 +1,91 @@
+# Arquivo: tests/test_research.py
+
+import sys
+import os
+import subprocess
+import numpy as np
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.data_loader import MarketData, ingest_csv
+from core.backtester import Backtester
+from core.optimizer import build_grid, run_optimization
+from core.walk_forward import fold_bounds, walk_forward, evaluate_window, filter_warmup
+from utils.perf import pin_threads, THREAD_ENV_VARS
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_ingest_csv_writes_memory_mapped_columns(tmp_path, random_data):
+    data = random_data(bars=2 * 1440, start='2025-03-03')
+    csv = str(tmp_path / 'bars.csv')
+    data.to_csv(csv)
+    assert ingest_csv(csv, str(tmp_path / 'ds'), chunk_rows=1000, compact=True) == len(data)
+
+    loaded = MarketData.load(str(tmp_path / 'ds'))
+    assert isinstance(loaded.close, np.memmap) and loaded.close.dtype == np.float32
+    assert np.array_equal(loaded.time, MarketData.from_dataframe(data).time)
+    assert not [name for name in os.listdir(tmp_path / 'ds') if name.endswith('.bin')]
+
+    data.iloc[::-1].to_csv(csv)
+    with pytest.raises(ValueError):
+        ingest_csv(csv, str(tmp_path / 'reversed'), chunk_rows=1000)
+
+
+def test_walk_forward_tests_only_after_training(market_data):
+    data = market_data(bars=12 * 1440, start='2025-03-03')
+    folds = fold_bounds(data.time, train_days=6, test_days=3)
+    assert [(a, b, c, d) for a, b, c, d in folds] == [(0, 6 * 1440, 6 * 1440, 9 * 1440),
+                                                      (3 * 1440, 9 * 1440, 9 * 1440, 12 * 1440)]
+
+    grid = build_grid([5, 9], [20], [20, 30], [40])
+    result = walk_forward(data, grid, train_days=6, test_days=3)
+    assert list(result['fold']) == [0, 1] and (result['oos_total_trades'] > 0).all()
+    assert (result['test_start'] > result['train_start']).all()
+
+    params = {key: int(result.loc[0, key]) for key in ('ema_fast', 'ema_slow', 'sl_points', 'tp_points')}
+    metrics = evaluate_window(data, params, 6 * 1440, 9 * 1440)
+    assert metrics['total_trades'] == result.loc[0, 'oos_total_trades']
+
+
+def test_sweeps_confirm_trend_on_the_higher_timeframe(market_data):
+    data = market_data(bars=12 * 1440, start='2025-03-03')
+    grid = build_grid([5], [20], [20], [40])
+    expected = Backtester(data, trend_timeframe='H1', **grid[0]).run()
+
+    results = run_optimization(data, grid, trend_timeframe='H1')
+    assert results.loc[0, 'net_profit'] == expected['net_profit']
+    assert results.loc[0, 'total_trades'] != Backtester(data, **grid[0]).run()['total_trades']
+
+    result = walk_forward(data, grid, train_days=6, test_days=3, trend_timeframe='H1')
+    metrics = evaluate_window(data, grid[0], 6 * 1440, 9 * 1440, trend_timeframe='H1')
+    assert metrics['total_trades'] == result.loc[0, 'oos_total_trades']
+    assert metrics['total_trades'] != evaluate_window(data, grid[0], 6 * 1440, 9 * 1440)['total_trades']
+    # Aquecimento em candles M1: a EMA do H1 precisa de 60 candles de base por candle de tendência
+    assert filter_warmup(data.time, 'H1') == 60 * filter_warmup(data.time) + 60
+
+
+def test_pin_threads_respects_environment(monkeypatch):
+    for name in THREAD_ENV_VARS:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv('OMP_NUM_THREADS', '4')
+    values = pin_threads(1)
+    assert values['OMP_NUM_THREADS'] == '4' and values['OPENBLAS_NUM_THREADS'] == '1'
+    assert pin_threads(2, override=True)['OMP_NUM_THREADS'] == '2'
+
+
+def test_research_cli_runs_headless(tmp_path):
+    env = {key: value for key, value in os.environ.items() if key not in THREAD_ENV_VARS}
+    env['PYTHONPATH'] = ROOT
+    code = ("import sys, os, research; "
+            "research.main(['optimize', '--bars', '600', '--workers', '1', '--ema-fast', '5', '--ema-slow', '12', "
+            "'--sl', '20', '--tp', '40,60', '--report', 'out']); "
+            "assert 'MetaTrader5' not in sys.modules; print(os.environ['OPENBLAS_NUM_THREADS'])")
+    done = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=env, capture_output=True, text=True,
+                          timeout=120)
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.strip().endswith('1')
+    assert len(pd.read_csv(tmp_path / 'out' / 'results.csv')) == 2
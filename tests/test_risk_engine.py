@@ -0,0 +1,111 @@
+# Arquivo: tests/test_risk_engine.py
+
+import sys
+import os
+import numpy as np
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.trade_executor as trade_executor
+from core.risk_engine import RiskEngine, ExposureBook
+from core.risk_manager import RiskManager
+from core.backtester import Backtester
+from mt5.simulator import SimulatedMT5, install, uninstall
+from mt5.mt5_connector import MT5Connector
+from mt5.broker import MT5Broker
+from utils.config import CONFIG, RiskSettings, ConfigError
+
+RISK = RiskSettings(max_risk_per_trade=100.0, point_value=0.20, max_volume_limit=5)
+
+
+def test_vectorized_sizing_matches_scalar_risk_manager():
+    engine = RiskEngine(30, 40, risk=RISK, book=ExposureBook())
+    sl_points = np.arange(1, 2000)
+    volumes = engine.size_array(sl_points)
+    expected = [RiskManager(sl, 40, risk=RISK).calculate_volume() for sl in sl_points[::97]]
+    assert list(volumes[::97]) == expected
+
+
+def test_atr_stops_keep_reward_ratio():
+    risk = RiskSettings(atr_stop_multiplier=2.0)
+    engine = RiskEngine(30, 60, risk=risk, book=ExposureBook())
+    sl, tp = engine.stops_array([np.nan, 10.0, 24.6])
+    assert list(sl) == [30, 20, 49]
+    assert list(tp) == [60, 40, 98]
+    assert engine.stops(None) == (30, 60)
+    with pytest.raises(ConfigError):
+        RiskSettings(daily_loss_limit=-1)
+    with pytest.raises(ValueError):
+        RiskEngine(0, 60, risk=risk, book=ExposureBook())  # Sem SL não há proporção para o TP
+
+
+def test_daily_loss_limit_blocks_rest_of_day():
+    risk = RiskSettings(max_risk_per_trade=100.0, point_value=1.0, max_volume_limit=1, daily_loss_limit=50.0)
+    engine = RiskEngine(30, 40, risk=risk, book=ExposureBook())
+    days = ['d1', 'd1', 'd1', 'd1', 'd2', 'd2']
+    pnl = [-30, -30, 100, 10, -60, 5]
+    # Dia 1: após -60 o limite (-50) é atingido e os dois trades seguintes ficam de fora
+    assert list(engine.size_trades([30] * 6, days, pnl)) == [1, 1, 0, 0, 1, 0]
+
+
+def test_open_risk_is_shared_across_symbols():
+    risk = RiskSettings(max_risk_per_trade=100.0, point_value=1.0, max_volume_limit=5,
+                        max_open_risk=120.0, daily_loss_limit=40.0)
+    book = ExposureBook()
+    win = RiskEngine(20, 40, risk=risk, book=book)
+    wdo = RiskEngine(20, 40, risk=risk, book=book)
+
+    assert win.size_order('WIN', 20, day='d1') == 5
+    win.on_open('WIN', 5, 20)  # R$ 100 em risco
+    assert wdo.size_order('WDO', 20, day='d1') == 1
+    wdo.on_open('WDO', 1, 20)
+    assert win.size_order('PETR4', 20, day='d1') == 0
+
+    win.on_close('WIN', -45.0, day='d1')
+    assert wdo.size_order('PETR4', 20, day='d1') == 0  # Limite diário atingido
+    assert wdo.size_order('PETR4', 20, day='d2') == 5   # Novo dia, sem WIN aberto
+
+
+def test_backtester_sizes_trades_from_atr_stops(random_data):
+    data = random_data(bars=3000)
+    engine = RiskEngine(20, 40, risk=RiskSettings(max_risk_per_trade=10.0, point_value=0.2,
+                                                  max_volume_limit=10, atr_stop_multiplier=3.0),
+                        book=ExposureBook())
+    tester = Backtester(data, sl_points=20, tp_points=40, ema_fast=9, ema_slow=26, risk_engine=engine)
+    metrics = tester.run()
+
+    assert metrics['total_trades'] > 0
+    trades = tester.trades
+    assert len({t['sl_points'] for t in trades}) > 1
+    for trade in trades:
+        assert trade['volume'] == engine.size_array([trade['sl_points']])[0]
+        assert trade['pnl_real'] == pytest.approx(trade['pnl_points'] * 0.2 * trade['volume'])
+    assert metrics['final_balance'] == pytest.approx(tester.initial_balance + sum(t['pnl_real'] for t in trades))
+
+
+def test_executor_sizes_each_order(monkeypatch, random_data):
+    sim = SimulatedMT5()
+    sim.add_symbol(CONFIG.get('GLOBAL.SYMBOL'), random_data(bars=1200), start=300)
+    install(sim)
+    try:
+        connector = MT5Connector(login=1, password='x', server='SIM')
+        connector.retry_delay = 0
+        book = ExposureBook()
+        executor = trade_executor.TradeExecutor(CONFIG.get('GLOBAL.SYMBOL'), 'MT5.TIMEFRAME_M5',
+                                                broker=MT5Broker(connector), risk_book=book)
+        executor.risk_manager = RiskEngine(30, 40, risk=RiskSettings(max_risk_per_trade=50.0, point_value=1.0,
+                                                                     max_volume_limit=10, atr_stop_multiplier=2.0),
+                                           book=book)
+        executor.connect()
+        for _ in range(800):
+            executor.run_cycle()
+            sim.advance()
+    finally:
+        uninstall()
+
+    volumes = [d.volume for d in sim.deals if d.entry == sim.DEAL_ENTRY_IN]
+    assert volumes and all(1 <= v <= 10 for v in volumes)
+    # Posição aberta registrada no livro de exposição; fechadas liberam o risco
+    assert bool(book.open_risk) == (sim.positions_total() > 0)
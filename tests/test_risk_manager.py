@@ -5,11 +5,15 @@ import os
 # Adiciona o diretório raiz do projeto ao path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from core.risk_manager import RISK_MANAGER
+from utils.config import RiskSettings
+from core.risk_manager import RiskManager
 
-def test_risk_calculation(sl_points: int, expected_volume: int, test_name: str):
+# Parâmetros de risco do teste pela seção RISK tipada (R$ 10.00, R$ 0.30/ponto, 5 contratos)
+RISK = RiskSettings(max_risk_per_trade=10.00, point_value=0.30, max_volume_limit=5)
+
+def check_risk_calculation(sl_points: int, expected_volume: int, test_name: str):
     """Executa um teste e verifica se o volume calculado é o esperado."""
-    calculated_volume = RISK_MANAGER.calculate_volume(sl_points)
+    calculated_volume = RiskManager(sl_points, sl_points, risk=RISK).calculate_volume()
     
     print(f"\n--- Teste: {test_name} ---")
     print(f"SL (pontos): {sl_points}")
@@ -35,22 +39,22 @@ def run_risk_manager_tests():
     # Teste 1: SL de 100 pontos
     # Risco por Contrato = 100 * R$ 0.30 = R$ 30.00
     # Volume = R$ 10.00 / R$ 30.00 = 0.33 -> Arredonda para 0
-    test_risk_calculation(100, 0, "Teste 1: 100 pontos SL")
+    check_risk_calculation(100, 0, "Teste 1: 100 pontos SL")
     
     # Teste 2: SL de 20 pontos
     # Risco por Contrato = 20 * R$ 0.30 = R$ 6.00
     # Volume = R$ 10.00 / R$ 6.00 = 1.66 -> Arredonda para 2
-    test_risk_calculation(20, 2, "Teste 2: 20 pontos SL")
+    check_risk_calculation(20, 2, "Teste 2: 20 pontos SL")
 
     # Teste 3: SL de 250 pontos
     # Risco por Contrato = 250 * R$ 0.30 = R$ 75.00 (Excede R$ 10.00)
     # Volume = 0.13 -> Arredonda para 0
-    test_risk_calculation(250, 0, "Teste 3: 250 pontos SL")
+    check_risk_calculation(250, 0, "Teste 3: 250 pontos SL")
     
     # Teste 4: SL de 500 pontos
     # Risco por Contrato = 500 * R$ 0.30 = R$ 150.00 (Excede R$ 10.00)
     # Volume = 0.06 -> Arredonda para 0
-    test_risk_calculation(500, 0, "Teste 4: 500 pontos SL (Risco muito alto, Volume 0)")
+    check_risk_calculation(500, 0, "Teste 4: 500 pontos SL (Risco muito alto, Volume 0)")
 
 
 if __name__ == "__main__":
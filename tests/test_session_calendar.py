@@ -0,0 +1,120 @@
+# Arquivo: tests/test_session_calendar.py
+
+import sys
+import os
+from datetime import date
+import numpy as np
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.trade_executor as trade_executor
+from core.session_calendar import (SessionCalendar, b3_holidays, IN_SESSION, ENTRY_ALLOWED, AUCTION, FORCE_FLAT)
+from core.backtester import Backtester
+from mt5.simulator import SimulatedMT5, install, uninstall
+from mt5.mt5_connector import MT5Connector
+from mt5.broker import MT5Broker
+from utils.config import CONFIG, SessionSettings, ConfigError
+
+
+def epoch(text: str) -> int:
+    return int(pd.Timestamp(text).timestamp())
+
+
+def test_b3_holidays_include_moveable_dates():
+    holidays = b3_holidays(2025)
+    for day in (date(2025, 3, 3), date(2025, 3, 4), date(2025, 4, 18), date(2025, 6, 19), date(2025, 11, 20)):
+        assert day in holidays
+    assert date(2024, 2, 13) in b3_holidays(2024)  # Terça de Carnaval
+
+
+def test_index_classifies_bars_by_close_time():
+    calendar = SessionCalendar(holidays=['2025-03-07'])
+    time = np.array([epoch(t) for t in (
+        '2025-03-05 08:54', '2025-03-05 08:59', '2025-03-05 09:04', '2025-03-05 09:05',
+        '2025-03-05 17:29', '2025-03-05 18:09', '2025-03-05 18:26',
+        '2025-03-06 12:00', '2025-03-07 12:00', '2025-03-08 12:00', '2025-03-04 12:00')])
+    index = calendar.index(time, bar_seconds=60)
+
+    # Candle de 08:59 fecha às 09:00: já é pregão; o de 09:04 fecha às 09:05 e libera entradas
+    assert index[0] == (epoch('2025-03-05') // 86400, 9 * 60 + 30, AUCTION)
+    assert index[1][2] == IN_SESSION
+    assert index[2][2] == IN_SESSION | ENTRY_ALLOWED
+    assert index[4][2] == IN_SESSION                     # 17:30: fim das entradas
+    assert index[5][2] == IN_SESSION | FORCE_FLAT        # 18:10: zeragem
+    assert index[5][1] == 15
+    assert index[6][2] == AUCTION | FORCE_FLAT           # Call de fechamento; último candle do dia
+    assert index.session_id[7] == epoch('2025-03-06') // 86400
+    # Feriado extra, sábado e terça de Carnaval: sem pregão
+    assert (index.session_id[8:] == -1).all() and (index.minutes_to_close[8:] == -1).all()
+    assert calendar.status(time[3], 60) == index[3]
+
+
+def test_index_has_no_lookahead_unless_last_bar_flat_is_enabled():
+    # Dia encurtado nos dados: os candles acabam às 13:00
+    time = np.array([epoch('2025-03-05 12:00') + 60 * i for i in range(60)] +
+                    [epoch('2025-03-06 12:00') + 60 * i for i in range(60)])
+    index = SessionCalendar().index(time, bar_seconds=60)
+    for k in (30, 59, 60, 119):
+        np.testing.assert_array_equal(SessionCalendar().index(time[:k + 1], bar_seconds=60).flags, index.flags[:k + 1])
+    assert not index.force_flat.any()
+
+    flagged = SessionCalendar(flat_last_bar=True).index(time, bar_seconds=60)
+    assert list(np.flatnonzero(flagged.force_flat)) == [59, 119]
+    assert not flagged.entry_allowed[[59, 119]].any()
+
+
+def test_backtest_enters_in_window_and_flattens_each_day(random_data):
+    data = random_data(bars=7 * 1440, start='2025-03-03')  # Semana com madrugadas, fim de semana e Carnaval
+    calendar = SessionCalendar()
+    tester = Backtester(data, sl_points=40, tp_points=400, ema_fast=5, ema_slow=12, session=calendar)
+    metrics = tester.run()
+    trades = pd.DataFrame(tester.trades)
+
+    assert metrics['total_trades'] > 0 and metrics['rejected_hours'] > 0
+    minutes = trades['entry_time'].dt.hour * 60 + trades['entry_time'].dt.minute
+    assert ((minutes >= 9 * 60 + 4) & (minutes < 17 * 60 + 30)).all()
+    assert (trades['entry_time'].dt.date == trades['exit_time'].dt.date).all()
+    assert not trades['entry_time'].dt.date.isin([date(2025, 3, 3), date(2025, 3, 4), date(2025, 3, 8)]).any()
+    assert (trades['reason'] == 'FIM_DO_PREGAO').any()
+    assert (trades.loc[trades['reason'] == 'FIM_DO_PREGAO', 'exit_time'].dt.hour >= 18).all()
+
+    # Índice pré-calculado (compartilhado pelo otimizador) dá o mesmo resultado
+    shared = Backtester(data, sl_points=40, tp_points=400, ema_fast=5, ema_slow=12,
+                        session=calendar.index(tester.data.time)).run()
+    assert shared['net_profit'] == metrics['net_profit']
+
+
+def test_executor_respects_entry_window_and_flat_time(random_data):
+    data = random_data(bars=1440, start='2025-03-05 10:00')
+    sim = SimulatedMT5()
+    sim.add_symbol(CONFIG.get('GLOBAL.SYMBOL'), data, timeframe=1, start=300)
+    install(sim)
+    try:
+        connector = MT5Connector(login=1, password='x', server='SIM')
+        connector.retry_delay = 0
+        executor = trade_executor.TradeExecutor(CONFIG.get('GLOBAL.SYMBOL'), 'MT5.TIMEFRAME_M1',
+                                                broker=MT5Broker(connector))
+        executor.session = SessionCalendar(last_entry='16:30', flat_time='17:00')
+        executor.risk_manager.tp_points = 10_000  # Só o SL ou a zeragem encerram
+        executor.connect()
+        for _ in range(200):
+            executor.run_cycle()
+            sim.advance()
+    finally:
+        uninstall()
+
+    entries = [d.time for d in sim.deals if d.entry == sim.DEAL_ENTRY_IN]
+    exits = [d.time for d in sim.deals if d.entry != sim.DEAL_ENTRY_IN]
+    assert entries and all(t + 60 <= epoch('2025-03-05 16:30') for t in entries)
+    assert sim.positions_total() == 0 and max(exits) + 60 <= epoch('2025-03-05 17:01')
+
+
+def test_session_settings_validation():
+    assert SessionSettings().enabled is False
+    with pytest.raises(ConfigError):
+        SessionSettings(last_entry='18:20', flat_time='18:10')
+    with pytest.raises(ConfigError):
+        SessionSettings(open_time='9h')
@@ -0,0 +1,98 @@
+# Arquivo: tests/test_signal_index.py
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.backtester import Backtester
+from core.optimizer import build_grid, run_optimization
+from core.session_calendar import SessionCalendar
+from core.signal_index import SignalIndex, SignalIndexCache
+
+
+def close_on_stops(tester: Backtester, i: int):
+    """SL/TP da posição ativa no fechamento do candle ``i``."""
+    price, pos = tester.data.close[i], tester.position
+    direction = 1 if pos['type'] == "BUY" else -1
+    if (price - pos['sl_price']) * direction <= 0:
+        tester._close_position(i, "SL")
+    elif (price - pos['tp_price']) * direction >= 0:
+        tester._close_position(i, "TP")
+
+
+def reference_trades(tester: Backtester) -> list:
+    """Loop candle a candle (referência) sobre os arrays densos do índice."""
+    start = tester.prepare()
+    primary, flags = tester.signal_index.dense()
+    force_flat = tester._force_flat
+    for i in range(start, len(tester.data)):
+        if tester.position:
+            close_on_stops(tester, i)
+        if tester.position and force_flat is not None and force_flat[i]:
+            tester._close_position(i, "FIM_DO_PREGAO")
+            continue
+        if not tester.position and primary[i] != 0 and flags[i] == 0:
+            tester._execute_trade(i, "BUY" if primary[i] > 0 else "SELL")
+    if tester.position:
+        tester._close_position(len(tester.data) - 1, "ENCERRAMENTO")
+    return tester.trades
+
+
+@pytest.mark.parametrize('options', [{}, {'session': SessionCalendar()}])
+def test_event_driven_backtest_matches_bar_loop(options, market_data):
+    data = market_data()
+    tester = Backtester(data, sl_points=20, tp_points=40, ema_fast=5, ema_slow=12, **options)
+    tester.run()
+    expected = reference_trades(Backtester(data, sl_points=20, tp_points=40, ema_fast=5, ema_slow=12, **options))
+    assert len(tester.trades) > 20
+    assert pd.DataFrame(tester.trades).equals(pd.DataFrame(expected))
+
+
+@pytest.mark.parametrize('options', [{}, {'trend_timeframe': 'M15'}, {'session': SessionCalendar()}])
+def test_index_has_no_lookahead(options, market_data):
+    data = market_data()
+    full = Backtester(data, 20, 40, 5, 12, **options)
+    full.prepare()
+    cut = 4000
+    prefix = Backtester(data.slice(0, cut), 20, 40, 5, 12, **options)
+    prefix.prepare()
+    keep = full.signal_index.bars < cut - 1  # O último candle do recorte pode ser o fim do pregão só no recorte
+    assert np.array_equal(prefix.signal_index.bars[:keep.sum()], full.signal_index.bars[keep])
+    assert np.array_equal(prefix.signal_index.flags[:keep.sum()], full.signal_index.flags[keep])
+
+
+def test_index_is_shared_across_stops_and_cached_on_disk(tmp_path, market_data):
+    data = market_data(bars=3000)
+    base = Backtester(data, sl_points=20, tp_points=40, ema_fast=5, ema_slow=12)
+    base.run()
+    shared = Backtester(data, sl_points=30, tp_points=60, ema_fast=5, ema_slow=12, signal_index=base.signal_index)
+    fresh = Backtester(data, sl_points=30, tp_points=60, ema_fast=5, ema_slow=12)
+    assert shared.run() == fresh.run()
+    assert 'EMA_FAST' not in shared.indicators  # Nada recalculado
+
+    path = str(tmp_path / 'index.npz')
+    base.signal_index.save(path)
+    loaded = SignalIndex.load(path)
+    assert np.array_equal(loaded.bars, base.signal_index.bars) and loaded.start == base.signal_index.start
+
+    grid = build_grid([5, 9], [20], [20, 30], [40, 60])
+    cache = str(tmp_path / 'signals')
+    first = run_optimization(data, grid, signal_cache=cache)
+    assert len(os.listdir(cache)) == 2  # Um índice por par de EMAs
+    again = run_optimization(data, grid, signal_cache=cache)
+    pd.testing.assert_frame_equal(first.drop(columns=['worker_pid', 'peak_rss_mb']),
+                                  again.drop(columns=['worker_pid', 'peak_rss_mb']))
+    cached = SignalIndexCache(cache)
+    assert cached.get(os.listdir(cache)[0][:-4]) is not None and cached.hits == 1
+
+    # Outra confirmação de tendência sobre os mesmos dados e EMAs: índices novos, não os gravados
+    trend = run_optimization(data, grid, signal_cache=cache, trend_timeframe='H1')
+    assert len(os.listdir(cache)) == 4
+    pd.testing.assert_frame_equal(trend.drop(columns=['worker_pid', 'peak_rss_mb']),
+                                  run_optimization(data, grid, trend_timeframe='H1').drop(
+                                      columns=['worker_pid', 'peak_rss_mb']))
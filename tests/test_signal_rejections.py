@@ -0,0 +1,68 @@
+# Arquivo: tests/test_signal_rejections.py
+
+import sys
+import os
+import logging
+import numpy as np
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.signal_confirmer import (SignalConfirmer, REJECT_TREND, REJECT_VOLUME, REJECT_NO_DATA,
+                                   describe_rejection)
+from core.backtester import Backtester
+
+
+def test_vectorized_flags_match_scalar(random_data):
+    data = random_data(bars=2000)
+    confirmer = SignalConfirmer(volume_filter_percent=0.1)
+    confirmer.calculate_confirmation_indicators(data)
+    signals = np.random.default_rng(1).choice([-1, 0, 1], size=len(data))
+
+    flags = confirmer.rejection_flags(signals)
+    names = {1: 'BUY', -1: 'SELL'}
+    for i in np.flatnonzero(signals):
+        assert flags[i] == confirmer.rejection_flags_at(i, names[signals[i]])
+    assert (flags[signals == 0] == 0).all()
+    assert flags[0] == REJECT_NO_DATA or signals[0] == 0
+    assert describe_rejection(REJECT_TREND | REJECT_VOLUME) == 'tendência, volume'
+
+
+def test_backtest_is_silent_and_counts_rejections(caplog, random_data):
+    tester = Backtester(random_data(bars=3000), sl_points=20, tp_points=40, ema_fast=5, ema_slow=12)
+    tester.confirmer.volume_filter_percent = 0.2
+    with caplog.at_level(logging.INFO, logger='XP_MT5_BOT'):
+        metrics = tester.run()
+
+    assert not [r for r in caplog.records if 'rejeitada' in r.getMessage() or 'confirmado' in r.getMessage()]
+    assert metrics['signals'] == np.count_nonzero(tester.signals) > 0
+    assert metrics['accepted'] + np.count_nonzero(tester.rejections) == metrics['signals']
+    assert metrics['rejected_trend'] == np.count_nonzero(tester.rejections & REJECT_TREND) > 0
+    assert metrics['rejected_volume'] == np.count_nonzero(tester.rejections & REJECT_VOLUME) > 0
+    assert metrics['accepted'] >= metrics['total_trades']
+
+    report = tester.rejection_report()
+    assert len(report) == metrics['signals']
+    assert set(report['reason']) >= {'aceito', 'volume'}
+
+
+def test_live_confirmation_logs_reasons_on_demand(caplog, random_data):
+    data = random_data(bars=200)
+    confirmer = SignalConfirmer()
+    store = confirmer.calculate_confirmation_indicators(data)
+
+    with caplog.at_level(logging.INFO, logger='XP_MT5_BOT'):
+        for _ in range(3):
+            confirmer.confirm_signal(data.iloc[:20], 'BUY', store)
+        result = confirmer.confirm_signal(data, 'BUY', store)
+        confirmer.confirm_signal(data, 'HOLD', store)
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert sum('Dados insuficientes' in m for m in messages) == 1
+    assert confirmer.stats.by_flag[REJECT_NO_DATA] == 3
+    if result == 'HOLD':
+        assert 'Compra rejeitada' in messages[-1] and '❌' in messages[-1]
+    else:
+        assert 'confirmado' in messages[-1]
+    assert confirmer.stats.signals == 4
@@ -0,0 +1,144 @@
+# Arquivo: tests/test_state_journal.py
+
+import sys
+import os
+import time
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.trade_executor as trade_executor
+from core.state_journal import StateJournal, POSITION, POSITION_CLOSED, ORDER
+from mt5.simulator import SimulatedMT5, install, uninstall
+from mt5.mt5_connector import MT5Connector
+from mt5.broker import MT5Broker
+from utils.config import CONFIG
+
+POSITION_DATA = {'symbol': 'WINQ25', 'type': 'BUY', 'entry_price': 10000.0, 'volume': 1,
+                 'sl_price': 9970.0, 'tp_price': 10040.0}
+
+
+def test_records_are_batched_and_replayed(tmp_path):
+    path = str(tmp_path / 'journal.jsonl')
+    journal = StateJournal(path, flush_interval=0.01).start()
+    journal.record(ORDER, signal='BUY', accepted=True)
+    journal.record(POSITION, position=POSITION_DATA)
+    journal.stop()
+
+    assert journal.written == 2
+    state = StateJournal.read(path)
+    assert state.position == POSITION_DATA
+    assert state.orders == 1
+
+    # Queda no meio de uma escrita: a linha incompleta é ignorada
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"kind": "position_clo')
+    assert StateJournal.read(path).position == POSITION_DATA
+
+
+def test_record_does_not_wait_for_disk(tmp_path, monkeypatch):
+    journal = StateJournal(str(tmp_path / 'journal.jsonl'))
+    monkeypatch.setattr(os, 'fsync', lambda fd: time.sleep(0.2))
+    journal.start()
+    journal.record(ORDER, signal='BUY')
+    time.sleep(0.1)  # A thread de escrita está no fsync
+
+    start = time.perf_counter()
+    for _ in range(100):
+        journal.record(ORDER, signal='SELL')
+    assert time.perf_counter() - start < 0.05
+    journal.stop()
+    assert StateJournal.read(journal.path).orders == 101
+
+
+def test_failed_batch_is_written_on_next_flush(tmp_path, monkeypatch):
+    journal = StateJournal(str(tmp_path / 'journal.jsonl'))
+    journal.record(ORDER, signal='BUY', accepted=True)
+    journal.record(POSITION, position=POSITION_DATA)
+    journal.record(ORDER, signal='SELL', price=object())  # Não serializável: descartado com log
+
+    write = StateJournal._write
+    monkeypatch.setattr(journal, '_write', lambda batch: (_ for _ in ()).throw(OSError('disco cheio')))
+    with pytest.raises(OSError):
+        journal.flush()
+    monkeypatch.setattr(journal, '_write', lambda batch: write(journal, batch))
+    journal.record(POSITION_CLOSED, position=POSITION_DATA, reason='TP')
+    journal.flush()
+
+    state = StateJournal.read(journal.path)
+    assert state.records == 3 and state.orders == 1 and state.position is None
+    assert state.last_seq == 4
+
+
+def test_compact_keeps_state_and_numbering(tmp_path):
+    journal = StateJournal(str(tmp_path / 'journal.jsonl'))
+    journal.record(POSITION, position=POSITION_DATA)
+    journal.record(POSITION_CLOSED, position=POSITION_DATA, reason='TP')
+    journal.record(POSITION, position=dict(POSITION_DATA, type='SELL'))
+    journal.flush()
+
+    journal.compact()
+    with open(journal.path, encoding='utf-8') as f:
+        assert len(f.readlines()) == 1
+    state = StateJournal(journal.path).recover()
+    assert state.position['type'] == 'SELL'
+    assert state.last_seq == 3
+
+
+def test_executor_restores_simulated_position_after_crash(tmp_path, monkeypatch):
+    path = str(tmp_path / 'journal.jsonl')
+    first = StateJournal(path)
+    first.record(POSITION, position=POSITION_DATA)
+    first.flush()
+
+    monkeypatch.setattr(trade_executor, 'ACTIVE_POSITION', None)
+    executor = trade_executor.TradeExecutor('WINQ25', 5, journal=StateJournal(path))
+    executor.recover()
+
+    assert trade_executor.ACTIVE_POSITION == POSITION_DATA
+    assert executor.position_open
+
+    # Risco aberto pelo stop real da posição restaurada (30 pontos), sem zerar ao sair
+    risk = executor.risk_manager
+    assert risk.book.open_risk['WINQ25'] == pytest.approx(30 * risk.point_value)
+    assert not executor.close_on_exit
+    assert trade_executor.TradeExecutor('WINQ25', 5).close_on_exit
+
+
+def test_recover_books_risk_from_the_atr_stop(tmp_path, monkeypatch):
+    path = str(tmp_path / 'journal.jsonl')
+    first = StateJournal(path)
+    first.record(POSITION, position=dict(POSITION_DATA, sl_price=9880.0, volume=2))
+    first.flush()
+
+    monkeypatch.setattr(trade_executor, 'ACTIVE_POSITION', None)
+    executor = trade_executor.TradeExecutor('WINQ25', 5, journal=StateJournal(path))
+    executor.recover()
+    assert executor.risk_manager.book.open_risk['WINQ25'] == pytest.approx(2 * 120 * executor.risk_manager.point_value)
+
+
+def test_executor_journals_broker_side_closes(tmp_path, random_data):
+    sim = SimulatedMT5()
+    sim.add_symbol(CONFIG.get('GLOBAL.SYMBOL'), random_data(bars=1200), start=300)
+    install(sim)
+    try:
+        connector = MT5Connector(login=1, password='x', server='SIM')
+        connector.retry_delay = 0
+        journal = StateJournal(str(tmp_path / 'journal.jsonl'))
+        executor = trade_executor.TradeExecutor(CONFIG.get('GLOBAL.SYMBOL'), 'MT5.TIMEFRAME_M5',
+                                                broker=MT5Broker(connector), journal=journal)
+        executor.connect()
+        for _ in range(800):
+            executor.run_cycle()
+            sim.advance()
+        journal.flush()
+    finally:
+        uninstall()
+
+    opened = sum(d.entry == sim.DEAL_ENTRY_IN for d in sim.deals)
+    state = StateJournal.read(journal.path)
+    assert state.orders == opened
+    assert executor.last_indicators is not None and 'EMA_FAST' in executor.last_indicators
+    # Posição no journal igual à do servidor ao fim do replay
+    assert (state.position is None) == (sim.positions_total() == 0)
@@ -0,0 +1,67 @@
+# Arquivo: tests/test_streaming_backtest.py
+
+import sys
+import os
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.backtester import Backtester
+from core.streaming_backtest import StreamingBacktester
+from core.data_loader import MarketData, iter_periods, iter_csv_chunks
+from core.history_store import HistoryStore
+from core.session_calendar import SessionCalendar
+
+METRICS = ('total_trades', 'net_profit', 'win_rate', 'signals', 'accepted', 'rejected_trend', 'rejected_volume')
+
+
+def test_iter_periods_splits_on_day_and_month_boundaries(market_data):
+    data = market_data(bars=3 * 1440)
+    days = list(iter_periods(data, 'D'))
+    assert [len(day) for day in days] == [1440, 1440, 1440]
+    assert all(day.time[0] % 86400 == 0 for day in days)
+    assert len(list(iter_periods(data, 'M'))) == 1
+    assert MarketData.concat(days).time.tolist() == data.time.tolist()
+
+
+def test_iter_csv_chunks_reads_in_blocks(tmp_path, market_data):
+    data = market_data(bars=2500)
+    path = str(tmp_path / 'bars.csv')
+    data.to_dataframe().to_csv(path)
+    chunks = list(iter_csv_chunks(path, chunk_rows=1000))
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    joined = MarketData.concat(chunks)
+    assert joined.time.tolist() == data.time.tolist()
+    assert joined.close == pytest.approx(data.close)
+
+
+@pytest.mark.parametrize('options', [{}, {'trend_timeframe': 'M15'}, {'session': SessionCalendar()}])
+def test_streaming_matches_full_backtest(options, market_data):
+    data = market_data(bars=12000)
+    full = Backtester(data, sl_points=20, tp_points=40, ema_fast=5, ema_slow=12, **options).run()
+
+    for chunks in (iter_periods(data, 'D'), (data.slice(i, i + 777) for i in range(0, len(data), 777))):
+        streamed = StreamingBacktester(sl_points=20, tp_points=40, ema_fast=5, ema_slow=12, **options).run(chunks)
+        for key in METRICS:
+            assert streamed[key] == pytest.approx(full[key]), key
+        assert streamed['bars'] == len(data)
+
+
+def test_trades_are_written_per_chunk(tmp_path, market_data):
+    data = market_data(bars=4000)
+    history = HistoryStore(str(tmp_path / 'history'), flush_seconds=3600)
+    path = str(tmp_path / 'trades.csv')
+    tester = StreamingBacktester(sl_points=20, tp_points=40, ema_fast=5, ema_slow=12, trades_path=path, history=history)
+    metrics = tester.run(iter_periods(data, 'D'))
+
+    assert tester.tester.trades == []  # Nada acumulado em memória
+    trades = pd.read_csv(path)
+    assert len(trades) == metrics['total_trades'] and metrics['chunks'] == 3
+    assert trades['pnl_real'].sum() == pytest.approx(metrics['net_profit'])
+
+    history.close()
+    stored = history.read('trades')
+    assert len(stored) == metrics['total_trades'] and set(stored['run_id']) == {tester.run_id}
+    assert history.read('runs')['source'].tolist() == ['streaming']
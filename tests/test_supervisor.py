@@ -0,0 +1,112 @@
+# Arquivo: tests/test_supervisor.py
+
+import sys
+import os
+import time
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mt5.simulator import SimulatedMT5, install, uninstall
+from mt5.mt5_connector import MT5Connector
+from mt5.order_handler import OrderHandler
+from mt5.order_manager import OrderManager
+from mt5.market_cache import MARKET_CACHE
+from mt5.supervisor import ConnectionSupervisor
+from utils.backoff import backoff_delay
+from utils.config import CONFIG
+
+SYMBOL = CONFIG.get('GLOBAL.SYMBOL')
+
+
+@pytest.fixture
+def sim(random_data):
+    simulator = SimulatedMT5(login=1, password='x', server='SIM')
+    simulator.add_symbol(SYMBOL, random_data(bars=500), start=300)
+    install(simulator)
+    yield simulator
+    uninstall()
+
+
+@pytest.fixture
+def connector(sim):
+    connector = MT5Connector(login=1, password='x', server='SIM')
+    connector.retry_delay = 0
+    assert connector.connect()
+    return connector
+
+
+def wait_until(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_backoff_grows_with_jitter_and_cap():
+    for attempt in range(10):
+        delay = backoff_delay(attempt, base=0.25, cap=2.0)
+        expected = min(2.0, 0.25 * 2 ** attempt)
+        assert expected / 2 <= delay <= expected
+
+
+def test_drop_is_detected_and_session_resynced(sim, connector):
+    manager = OrderManager(OrderHandler(connector))
+    supervisor = ConnectionSupervisor(connector, order_manager=manager, base_backoff=0.0)
+    resynced = []
+    supervisor.subscribe(lambda: resynced.append(True))
+
+    order = manager.submit('BUY', 1, 30, 40)
+    manager.process_pending()
+    assert supervisor.check()
+
+    sim.connected = False
+    assert not supervisor.check()
+    assert not supervisor.is_connected
+    assert supervisor.stats['drops'] == 1
+
+    # Durante a queda a posição foi fechada no servidor; o cache tinha dados antigos
+    MARKET_CACHE.symbol_info(SYMBOL)
+    sim.positions.clear()
+    sim.connected = True
+    assert supervisor.check()
+
+    assert supervisor.is_connected
+    assert resynced == [True]
+    assert order.ticket not in manager.positions
+    assert supervisor.stats['reconnects'] == 1
+    assert supervisor.stats['last_reconnect_seconds'] is not None
+    MARKET_CACHE.reset_stats()
+    MARKET_CACHE.symbol_info(SYMBOL)
+    assert MARKET_CACHE.stats()['spec_misses'] == 1
+
+
+def test_failed_attempts_back_off(sim, connector):
+    supervisor = ConnectionSupervisor(connector, base_backoff=10.0)
+    sim.connected = False
+    supervisor.check()
+    assert supervisor.stats['failed_attempts'] == 1
+
+    # Dentro da janela de backoff nenhuma nova tentativa é feita
+    calls = sim.calls
+    supervisor.check()
+    assert supervisor.stats['failed_attempts'] == 1
+    assert sim.calls == calls
+
+
+def test_background_thread_detects_drop_within_a_second(sim, connector):
+    supervisor = ConnectionSupervisor(connector, heartbeat_interval=0.05, base_backoff=0.02).start()
+    try:
+        sim.connected = False
+        start = time.monotonic()
+        assert wait_until(lambda: not supervisor.is_connected)
+        assert time.monotonic() - start < 1.0
+
+        sim.connected = True
+        assert wait_until(lambda: supervisor.is_connected)
+        assert supervisor.reconnect_latencies and supervisor.reconnect_latencies[0] < 1.0
+    finally:
+        supervisor.stop()
@@ -0,0 +1,137 @@
+# Arquivo: tests/test_tick_store.py
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.tick_store import TickStore
+from core.bar_builder import BarBuilder, TimeBarBuilder, VolumeBarBuilder, RangeBarBuilder, build_bars, TICK_FLAG_LAST
+from mt5.simulator import SimulatedMT5, TICK_DTYPE, install, uninstall
+from mt5.tick_feed import download_ticks
+
+START = int(pd.Timestamp('2025-03-10 09:00').timestamp())
+
+
+def create_ticks(n: int = 200_000, seed: int = 3) -> np.ndarray:
+    """Ticks sintéticos de WIN (2 dias): negócios em múltiplos de 5 pontos e atualizações só de bid/ask."""
+    rng = np.random.default_rng(seed)
+    ticks = np.zeros(n, dtype=TICK_DTYPE)
+    ticks['time_msc'] = START * 1000 + np.cumsum(rng.integers(50, 300, n))
+    ticks['time_msc'][n // 2:] += 86_400_000  # Segundo dia
+    ticks['time'] = ticks['time_msc'] // 1000
+    last = 120000 + 5 * np.cumsum(rng.integers(-1, 2, n))
+    trade = rng.random(n) < 0.7
+    ticks['last'] = np.where(trade, last, 0.0)
+    ticks['bid'], ticks['ask'] = last - 5, last
+    ticks['volume'] = np.where(trade, rng.integers(1, 20, n), 0)
+    ticks['volume_real'] = ticks['volume']
+    ticks['flags'] = np.where(trade, TICK_FLAG_LAST | 16, 6)
+    return ticks
+
+
+def trades_frame(ticks: np.ndarray) -> pd.DataFrame:
+    trades = ticks[(ticks['flags'] & TICK_FLAG_LAST) != 0]
+    return pd.DataFrame({'price': trades['last'], 'volume': trades['volume_real']},
+                        index=pd.to_datetime(trades['time_msc'], unit='ms'))
+
+
+@pytest.fixture
+def stored(tmp_path):
+    ticks = create_ticks()
+    sim = SimulatedMT5()
+    sim.add_ticks('WINJ25', ticks)
+    install(sim)
+    try:
+        sim.initialize()
+        store = TickStore(str(tmp_path))
+        end = int(ticks['time'][-1])
+        # Download interrompido no meio e retomado: nenhum tick duplicado ou perdido
+        download_ticks(store, 'WINJ25', START, START + 3 * 3600, window_seconds=600)
+        download_ticks(store, 'WINJ25', START, end, window_seconds=600)
+    finally:
+        uninstall()
+    return store, ticks
+
+
+def test_ticks_round_trip_in_chunks(stored):
+    store, ticks = stored
+    assert store.count('WINJ25') == len(ticks)
+    assert store.days('WINJ25') == ['2025-03-10', '2025-03-11']
+
+    chunks = list(store.iter_chunks('WINJ25', chunk_size=30_000))
+    assert max(len(chunk['time_msc']) for chunk in chunks) == 30_000
+    np.testing.assert_array_equal(np.concatenate([c['time_msc'] for c in chunks]), ticks['time_msc'])
+    np.testing.assert_array_equal(np.concatenate([c['last'] for c in chunks]), ticks['last'])
+
+
+def test_download_resumes_inside_a_second(tmp_path):
+    ticks = create_ticks(20_000)
+    # Vários ticks no mesmo milissegundo na virada de uma janela de 600 s
+    boundary = int(np.searchsorted(ticks['time_msc'], (START + 600) * 1000))
+    ticks['time_msc'][boundary - 2:boundary + 2] = (START + 600) * 1000 - 1
+    ticks['time'] = ticks['time_msc'] // 1000
+    sim = SimulatedMT5()
+    sim.add_ticks('WINJ25', ticks)
+    install(sim)
+    try:
+        sim.initialize()
+        store = TickStore(str(tmp_path))
+        store.append('WINJ25', ticks[:1234])  # Download anterior parou no meio de um segundo
+        assert ticks['time'][1233] == ticks['time'][1234]
+        download_ticks(store, 'WINJ25', START, int(ticks['time'][-1]), window_seconds=600)
+    finally:
+        uninstall()
+    stored = np.concatenate([chunk['time_msc'] for chunk in store.iter_chunks('WINJ25')])
+    np.testing.assert_array_equal(stored, ticks['time_msc'])
+
+
+def test_interrupted_append_is_repaired(tmp_path):
+    store = TickStore(str(tmp_path))
+    ticks = create_ticks(1000)[:400]
+    store.append('WINJ25', ticks[:200])
+    day_dir = os.path.join(str(tmp_path), 'WINJ25', store.days('WINJ25')[0])
+    with open(os.path.join(day_dir, 'time_msc.bin'), 'ab') as f:
+        f.write(b'\x00' * 12)  # Queda no meio da escrita de uma coluna
+    assert store.count('WINJ25') == 200
+
+    store.append('WINJ25', ticks[200:])
+    chunk = next(store.iter_chunks('WINJ25'))
+    np.testing.assert_array_equal(chunk['time_msc'], ticks['time_msc'])
+    np.testing.assert_array_equal(chunk['bid'], ticks['bid'])
+
+
+def test_streamed_time_bars_match_pandas(stored):
+    store, ticks = stored
+    bars = build_bars(store.iter_chunks('WINJ25', chunk_size=7_777), TimeBarBuilder('M1')).to_dataframe()
+
+    trades = trades_frame(ticks)
+    expected = trades['price'].resample('1min').ohlc().dropna()
+    expected['volume'] = trades['volume'].resample('1min').sum()
+    np.testing.assert_array_equal(bars.index.to_numpy(), expected.index.to_numpy())
+    np.testing.assert_allclose(bars[['open', 'high', 'low', 'close']].to_numpy(),
+                               expected[['open', 'high', 'low', 'close']].to_numpy())
+    np.testing.assert_allclose(bars['tick_volume'].to_numpy(), expected['volume'].to_numpy())
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'auto'])
+def test_volume_and_range_bars_are_chunk_independent(stored, backend):
+    store, ticks = stored
+    whole = build_bars([ticks], VolumeBarBuilder(500, backend=backend))
+    streamed = build_bars(store.iter_chunks('WINJ25', chunk_size=5_000), VolumeBarBuilder(500, backend=backend))
+    for column in ('time', 'open', 'high', 'low', 'close', 'tick_volume'):
+        np.testing.assert_array_equal(getattr(streamed, column), getattr(whole, column))
+    assert (whole.tick_volume[:-1] >= 500).all()
+    assert whole.tick_volume.sum() == trades_frame(ticks)['volume'].sum()
+
+    whole = build_bars([ticks], RangeBarBuilder(50, backend=backend))
+    streamed = build_bars(store.iter_chunks('WINJ25', chunk_size=3_333), RangeBarBuilder(50, backend=backend))
+    np.testing.assert_array_equal(streamed.close, whole.close)
+    np.testing.assert_array_equal(streamed.time, whole.time)
+    assert ((whole.high - whole.low)[:-1] >= 50).all()
+    with pytest.raises(TypeError):
+        BarBuilder(backend=backend)  # Classe base abstrata: cada tipo de candle define ``_segments``
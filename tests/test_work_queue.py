@@ -0,0 +1,77 @@
+# Arquivo: tests/test_work_queue.py
+
+import sys
+import os
+import time
+import multiprocessing
+import pandas as pd
+import pytest
+
+# Adiciona o diretório raiz do projeto ao path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.work_queue import WorkQueue, run_worker, PENDING, LEASED, DONE, FAILED
+from core.optimizer import build_grid, run_optimization
+from core.data_loader import MarketData
+from core.history_store import HistoryStore
+
+METRICS = ['total_trades', 'net_profit', 'win_rate', 'profit_factor']
+
+
+def test_lease_retry_and_dedup(tmp_path):
+    queue = WorkQueue(str(tmp_path), lease_seconds=0.2, max_attempts=2)
+    # A fila só guarda os dados: candles constantes bastam
+    data = MarketData.from_dataframe(pd.DataFrame(
+        {'open': 1000.0, 'high': 1001.0, 'low': 999.0, 'close': 1000.0, 'tick_volume': 100},
+        index=pd.date_range('2025-01-01', periods=100, freq='min', name='time')))
+    grid = [{'ema_fast': 5, 'ema_slow': 12}, {'ema_fast': 9, 'ema_slow': 21}, {'ema_fast': 5, 'ema_slow': 12}]
+    sweep = queue.submit(data, grid)
+    assert queue.submit(data, grid, sweep_id=sweep) == sweep
+    assert queue.progress(sweep) == {PENDING: 2, LEASED: 0, DONE: 0, FAILED: 0}  # Repetidas viram uma tarefa
+
+    first = queue.lease('a')
+    second = queue.lease('b')
+    assert first.task_id != second.task_id and queue.lease('c') is None
+
+    # Worker 'a' some: o lease expira e 'c' pega a tarefa
+    time.sleep(0.3)
+    queue.renew(second.task_id, 'b')
+    retry = queue.lease('c')
+    assert retry.task_id == first.task_id and retry.attempts == 2
+    assert queue.complete(retry.task_id, 'c', {'net_profit': 1.0})
+    assert not queue.complete(first.task_id, 'a', {'net_profit': 2.0})  # Resultado atrasado é descartado
+    assert queue.results(sweep)[first.task_id] == {'net_profit': 1.0}
+
+    # Erro na segunda (e última) tentativa: tarefa falha de vez
+    queue.fail(second.task_id, 'b', 'ValueError: x')
+    assert queue.lease('b').task_id == second.task_id
+    queue.fail(second.task_id, 'b', 'ValueError: y')
+    assert queue.progress(sweep)[FAILED] == 1 and queue.errors(sweep) == {second.task_id: 'ValueError: y'}
+
+
+def test_distributed_sweep_matches_local(tmp_path, random_data):
+    data = random_data(bars=1500)
+    grid = build_grid([5, 9], [20, 26], [20], [40, 60])
+    local = run_optimization(data, grid)
+
+    history = HistoryStore(str(tmp_path / 'history'), flush_seconds=3600)
+    distributed = run_optimization(data, grid, workers=3, queue=str(tmp_path / 'queue'), history=history)
+    pd.testing.assert_frame_equal(distributed[METRICS], local[METRICS])
+    assert distributed['run_id'].notna().all()
+    assert distributed['worker'].str.len().gt(0).all()
+    assert len(history.read('runs')) == len(grid)
+
+
+def test_external_worker_joins_sweep(tmp_path, random_data):
+    root = str(tmp_path)
+    data = random_data(bars=800)
+    grid = build_grid([5, 9], [20], [20, 30], [40])
+    # Worker "de outra máquina" já esperando pela fila antes da varredura ser publicada
+    worker = multiprocessing.Process(target=run_worker, args=(root,), kwargs={'idle_timeout': 5, 'poll_interval': 0.05})
+    worker.start()
+    try:
+        results = run_optimization(data, grid, workers=0, queue=root, sweep_id='externo')
+    finally:
+        worker.join(timeout=10)
+    assert results['total_trades'].notna().all() and not worker.is_alive()
+    assert WorkQueue(root).progress('externo')[DONE] == len(grid)
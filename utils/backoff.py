@@ -0,0 +1,12 @@
+# Arquivo: utils/backoff.py
+
+import random
+
+
+def backoff_delay(attempt: int, base: float = 0.25, cap: float = 30.0) -> float:
+    """
+    Espera (s) antes da retentativa ``attempt`` (0, 1, 2...): exponencial limitada a ``cap``,
+    sorteada entre metade e o total do valor para que vários clientes não reconectem juntos.
+    """
+    delay = min(cap, base * (2 ** attempt))
+    return random.uniform(delay / 2, delay)
@@ -0,0 +1,20 @@
+# Arquivo: utils/clock.py
+
+import time
+
+
+class ClockStopped(Exception):
+    """Sinaliza ao loop do executor que o relógio terminou (ex.: fim do histórico no replay)."""
+
+
+class SystemClock:
+    """Relógio real usado em produção: ``sleep`` espera de verdade."""
+
+    def now(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -1,36 +1,427 @@
 # Arquivo: utils/config.py
 
-import yaml
 import os
+import threading
 import logging
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from typing import Callable, List
 
-logger = logging.getLogger('XP_MT5_BOT') 
+logger = logging.getLogger('XP_MT5_BOT')
 
-CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.yaml')
-CONFIG = {}
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CONFIG_PATH = os.path.join(ROOT_DIR, 'config.yaml')
+ENV_PATH = os.path.join(ROOT_DIR, '.env')
 
-def load_config():
-    """Carrega as configurações do arquivo config.yaml."""
-    global CONFIG
+# Credenciais lidas do .env / variáveis de ambiente (nunca do config.yaml)
+CREDENTIAL_KEYS = ('MT5_LOGIN', 'MT5_PASSWORD', 'MT5_SERVER')
+
+
+class ConfigError(ValueError):
+    """Configuração inválida (tipo errado ou valor fora do permitido)."""
+
+
+# --- SEÇÕES TIPADAS (imutáveis: uma nova configuração é sempre um objeto novo) ---
+
+@dataclass(frozen=True, slots=True)
+class GlobalSettings:
+    symbol: str = 'WINQ25'
+    timeframe: str = 'MT5.TIMEFRAME_M5'
+    magic_number: int = 12345
+    deviation: int = 10
+    log_level: str = 'INFO'
+    live_trading: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class RiskSettings:
+    max_risk_per_trade: float = 100.0
+    point_value: float = 0.20
+    max_volume_limit: int = 5
+    atr_period: int = 14
+    # Stops dinâmicos: SL = ATR x multiplicador (0 = SL_POINTS fixo da estratégia)
+    atr_stop_multiplier: float = 0.0
+    # Perda máxima realizada no dia, em R$ (0 = sem limite)
+    daily_loss_limit: float = 0.0
+    # Risco aberto máximo somando todos os ativos, em R$ até o stop (0 = sem limite)
+    max_open_risk: float = 0.0
+
+    def __post_init__(self):
+        if self.max_risk_per_trade <= 0:
+            raise ConfigError(f"RISK.MAX_RISK_PER_TRADE deve ser positivo (recebido {self.max_risk_per_trade}).")
+        if self.point_value <= 0:
+            raise ConfigError(f"RISK.POINT_VALUE deve ser positivo (recebido {self.point_value}).")
+        if self.max_volume_limit < 1:
+            raise ConfigError(f"RISK.MAX_VOLUME_LIMIT deve ser >= 1 (recebido {self.max_volume_limit}).")
+        if self.atr_period < 1:
+            raise ConfigError(f"RISK.ATR_PERIOD deve ser >= 1 (recebido {self.atr_period}).")
+        for key in ('atr_stop_multiplier', 'daily_loss_limit', 'max_open_risk'):
+            if getattr(self, key) < 0:
+                raise ConfigError(f"RISK.{key.upper()} não pode ser negativo (recebido {getattr(self, key)}).")
+
+
+@dataclass(frozen=True, slots=True)
+class StrategySettings:
+    ema_short_period: int = 12
+    ema_long_period: int = 20
+    sl_points: int = 30
+    tp_points: int = 40
+    # Timeframe do filtro de tendência ('H1', 'D1'...; vazio = mesmo timeframe do robô)
+    trend_timeframe: str = ''
+
+    def __post_init__(self):
+        if not 0 < self.ema_short_period < self.ema_long_period:
+            raise ConfigError(
+                f"STRATEGY: EMA_SHORT_PERIOD ({self.ema_short_period}) deve ser positivo e menor "
+                f"que EMA_LONG_PERIOD ({self.ema_long_period})."
+            )
+        if self.sl_points <= 0 or self.tp_points <= 0:
+            raise ConfigError(f"STRATEGY: SL_POINTS/TP_POINTS devem ser positivos ({self.sl_points}/{self.tp_points}).")
+
+
+@dataclass(frozen=True, slots=True)
+class ExecutionSettings:
+    check_interval_seconds: float = 10.0
+    # Consulta do último tick entre ciclos para a gestão da posição (0 = só a cada ciclo)
+    tick_interval_seconds: float = 0.0
+
+    def __post_init__(self):
+        if self.tick_interval_seconds < 0:
+            raise ConfigError(f"EXECUTION.TICK_INTERVAL_SECONDS não pode ser negativo (recebido {self.tick_interval_seconds}).")
+
+
+@dataclass(frozen=True, slots=True)
+class SessionSettings:
+    # Calendário de pregão da B3 (horário do servidor): janela de entradas e zeragem do day trade
+    enabled: bool = False
+    open_time: str = '09:00'
+    close_time: str = '18:25'
+    entry_start: str = '09:05'
+    last_entry: str = '17:30'
+    flat_time: str = '18:10'
+    # Feriados extras (AAAA-MM-DD separados por vírgula); os nacionais da B3 já são conhecidos
+    holidays: str = ''
+    # Zerar também no último candle de cada pregão nos dados (backtest; usa o candle seguinte)
+    flat_last_bar: bool = False
+
+    def __post_init__(self):
+        times = {key: getattr(self, key) for key in ('open_time', 'entry_start', 'last_entry', 'flat_time', 'close_time')}
+        for key, value in times.items():
+            hours, _, minutes = value.partition(':')
+            if not (hours.isdigit() and minutes.isdigit() and int(hours) < 24 and int(minutes) < 60):
+                raise ConfigError(f"SESSION.{key.upper()} deve estar no formato HH:MM (recebido {value!r}).")
+        ordered = [int(v[:-3]) * 60 + int(v[-2:]) for v in times.values()]
+        if ordered != sorted(ordered):
+            raise ConfigError("SESSION: horários devem seguir OPEN_TIME <= ENTRY_START <= LAST_ENTRY "
+                              "<= FLAT_TIME <= CLOSE_TIME.")
+
+
+@dataclass(frozen=True, slots=True)
+class ManagementSettings:
+    # Gestão da posição aberta, em pontos (0 = desligado): break-even, trailing stop e saída parcial
+    break_even_points: int = 0
+    break_even_offset: int = 0
+    trailing_points: int = 0
+    trailing_start_points: int = 0
+    partial_points: int = 0
+    partial_fraction: float = 0.5
+    # Agrupamento das modificações de SL enviadas à corretora (TRADE_ACTION_SLTP)
+    modify_step_points: int = 5
+    modify_interval_seconds: float = 1.0
+
+    def __post_init__(self):
+        for key in ('break_even_points', 'break_even_offset', 'trailing_points', 'trailing_start_points',
+                    'partial_points', 'modify_step_points', 'modify_interval_seconds'):
+            if getattr(self, key) < 0:
+                raise ConfigError(f"MANAGEMENT.{key.upper()} não pode ser negativo (recebido {getattr(self, key)}).")
+        if not 0 < self.partial_fraction < 1:
+            raise ConfigError(f"MANAGEMENT.PARTIAL_FRACTION deve estar entre 0 e 1 (recebido {self.partial_fraction}).")
+        if self.break_even_points and self.break_even_offset >= self.break_even_points:
+            raise ConfigError("MANAGEMENT: BREAK_EVEN_OFFSET deve ser menor que BREAK_EVEN_POINTS.")
+
+
+SECTIONS = {
+    'GLOBAL': ('global_', GlobalSettings),
+    'RISK': ('risk', RiskSettings),
+    'STRATEGY': ('strategy', StrategySettings),
+    'EXECUTION': ('execution', ExecutionSettings),
+    'SESSION': ('session', SessionSettings),
+    'MANAGEMENT': ('management', ManagementSettings),
+}
+
+
+def _coerce(value, kind, key: str):
+    """Converte o valor do YAML para o tipo do campo, com erro claro se não for possível."""
+    if value is None or isinstance(value, kind):
+        return value
     try:
-        # ⚠️ CORREÇÃO APLICADA AQUI: Adicionando encoding='utf-8'
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            CONFIG = yaml.safe_load(f)
-        
-        if CONFIG is None:
-            CONFIG = {}
-            logger.error(f"Arquivo config.yaml vazio ou inválido em: {CONFIG_PATH}")
-            return
-            
+        if kind is bool:
+            if isinstance(value, str):
+                return value.strip().lower() in ('1', 'true', 'yes', 'sim', 'on')
+            return bool(value)
+        if kind is int and isinstance(value, float) and not value.is_integer():
+            raise ValueError(value)
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ConfigError(f"{key}: valor {value!r} não pode ser convertido para {kind.__name__}.") from None
+
+
+def _build_section(name: str, cls, raw_section) -> object:
+    raw_section = raw_section or {}
+    if not isinstance(raw_section, dict):
+        raise ConfigError(f"Seção {name} deve ser um mapeamento (recebido {type(raw_section).__name__}).")
+
+    kwargs = {}
+    for field in fields(cls):
+        key = field.name.upper()
+        if key in raw_section and raw_section[key] is not None:
+            kwargs[field.name] = _coerce(raw_section[key], field.type, f"{name}.{key}")
+    return cls(**kwargs)
+
+
+def _flatten(data: dict, prefix: str = '') -> dict:
+    """{'GLOBAL': {'SYMBOL': x}} -> {'GLOBAL.SYMBOL': x} (inclui as seções intermediárias)."""
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        flat[path] = value
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+    return flat
+
+
+class Settings:
+    """
+    Snapshot imutável e validado da configuração.
+
+    As seções tipadas (``global_``, ``risk``, ``strategy``, ``execution``, ``session``, ``management``) dão acesso
+    por atributo em O(1); ``flat`` resolve chaves pontuadas ('GLOBAL.SYMBOL') sem
+    percorrer o dicionário a cada leitura.
+    """
+
+    __slots__ = ('raw', 'flat', 'global_', 'risk', 'strategy', 'execution', 'session', 'management')
+
+    def __init__(self, raw: dict):
+        if not isinstance(raw, dict):
+            raise ConfigError("O config.yaml deve conter um mapeamento de seções.")
+        self.raw = raw
+        self.flat = _flatten(raw)
+        for section, (attr, cls) in SECTIONS.items():
+            setattr(self, attr, _build_section(section, cls, raw.get(section)))
+
+
+class Config(Mapping):
+    """
+    Configuração global, carregada apenas no primeiro acesso (importar este módulo não lê o YAML).
+
+    - Mapping compatível com o uso antigo: ``CONFIG['STRATEGY']['SL_POINTS']``, ``CONFIG.get('RISK', {})``;
+    - chaves pontuadas: ``CONFIG.get('GLOBAL.SYMBOL')``;
+    - seções tipadas: ``CONFIG.risk.point_value``, ``CONFIG.strategy.sl_points``;
+    - credenciais do .env: ``CONFIG.MT5_LOGIN``.
+
+    ``reload`` troca o snapshot de forma atômica (uma atribuição de referência): quem
+    guardou ``CONFIG.settings`` continua lendo uma configuração consistente.
+    """
+
+    def __init__(self, path: str = CONFIG_PATH):
+        self.path = path
+        self._settings = None
+        self._listeners: List[Callable] = []
+        self._env_loaded = False
+
+    # --- Carga e troca ---
+
+    @property
+    def settings(self) -> Settings:
+        settings = self._settings
+        if settings is None:
+            settings = self.reload()
+        return settings
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._settings is not None
+
+    def parse(self) -> Settings:
+        """Lê e valida o arquivo sem instalá-lo."""
+        import yaml  # Import adiado: só é necessário quando a configuração é lida
+
+        try:
+            # ⚠️ CORREÇÃO APLICADA AQUI: Adicionando encoding='utf-8'
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f)
+        except FileNotFoundError:
+            logger.critical(f"Arquivo de configuração não encontrado em: {self.path}")
+            raise
+        except Exception as e:
+            # O erro de decode original será capturado aqui (e.g., 'charmap' codec...)
+            logger.critical(f"Erro ao ler config.yaml: {e}")
+            raise
+
+        if data is None:
+            logger.error(f"Arquivo config.yaml vazio ou inválido em: {self.path}")
+            data = {}
+        return Settings(data)
+
+    def reload(self) -> Settings:
+        """Relê o arquivo, valida e instala o novo snapshot (notificando os listeners)."""
+        settings = self.parse()
+        self.install(settings)
         logger.info("Configurações carregadas com sucesso.")
-        
-    except FileNotFoundError:
-        logger.critical(f"Arquivo de configuração não encontrado em: {CONFIG_PATH}")
-        raise
-    except Exception as e:
-        # O erro de decode original será capturado aqui (e.g., 'charmap' codec...)
-        logger.critical(f"Erro ao ler config.yaml: {e}") 
-        raise
-
-# Carrega as configurações imediatamente na inicialização do módulo
-load_config()
\ No newline at end of file
+        return settings
+
+    def install(self, settings: Settings):
+        previous = self._settings
+        self._settings = settings
+        if previous is not None:
+            for listener in list(self._listeners):
+                try:
+                    listener(settings)
+                except Exception as e:
+                    logger.error(f"Erro ao aplicar nova configuração em {listener}: {e}")
+
+    def subscribe(self, listener: Callable[[Settings], None]):
+        """Registra uma função chamada a cada recarga com o novo Settings."""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[Settings], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def to_dict(self) -> dict:
+        """Retorna o dicionário interpretado (útil para enviar a workers)."""
+        return self.settings.raw
+
+    # --- Acesso ---
+
+    def __getitem__(self, key):
+        settings = self.settings
+        try:
+            return settings.raw[key]
+        except KeyError:
+            return settings.flat[key]
+
+    def __iter__(self):
+        return iter(self.settings.raw)
+
+    def __len__(self) -> int:
+        return len(self.settings.raw)
+
+    def __contains__(self, key) -> bool:
+        return key in self.settings.flat
+
+    def __repr__(self) -> str:
+        state = 'não carregada' if self._settings is None else repr(self._settings.raw)
+        return f"Config({state})"
+
+    @property
+    def global_(self) -> GlobalSettings:
+        return self.settings.global_
+
+    @property
+    def risk(self) -> RiskSettings:
+        return self.settings.risk
+
+    @property
+    def strategy(self) -> StrategySettings:
+        return self.settings.strategy
+
+    @property
+    def execution(self) -> ExecutionSettings:
+        return self.settings.execution
+
+    @property
+    def session(self) -> SessionSettings:
+        return self.settings.session
+
+    @property
+    def management(self) -> ManagementSettings:
+        return self.settings.management
+
+    def __getattr__(self, name):
+        # Só é chamado para atributos inexistentes: credenciais do .env
+        if name in CREDENTIAL_KEYS:
+            return self._credential(name)
+        raise AttributeError(f"Configuração sem o atributo {name!r}")
+
+    def _credential(self, name: str) -> str:
+        if not self._env_loaded:
+            try:
+                from dotenv import load_dotenv
+                load_dotenv(ENV_PATH)
+            except ImportError:
+                pass  # Sem python-dotenv, usa apenas as variáveis de ambiente
+            self._env_loaded = True
+
+        value = os.environ.get(name)
+        if not value:
+            raise EnvironmentError(f"Credencial {name} não definida no .env nem nas variáveis de ambiente.")
+        return value
+
+
+CONFIG = Config()
+
+
+def load_config() -> Settings:
+    """Carrega (ou recarrega) as configurações do arquivo config.yaml."""
+    return CONFIG.reload()
+
+
+def set_config(data: dict):
+    """Instala uma configuração já interpretada (ex.: enviada pelo processo principal a um worker)."""
+    CONFIG.install(Settings(dict(data)))
+
+
+class ConfigWatcher:
+    """
+    Observa o config.yaml e recarrega a configuração quando o arquivo muda.
+
+    Um arquivo inválido é rejeitado (o snapshot anterior continua ativo). A checagem é
+    um ``os.stat`` por intervalo, em uma thread daemon.
+    """
+
+    def __init__(self, config: Config = CONFIG, interval: float = 1.0):
+        self.config = config
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_mtime = self._mtime()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.config.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def check(self) -> bool:
+        """Recarrega se o arquivo mudou. Retorna True se uma nova configuração foi instalada."""
+        mtime = self._mtime()
+        if mtime is None or mtime == self._last_mtime:
+            return False
+        self._last_mtime = mtime
+
+        try:
+            settings = self.config.parse()
+        except Exception as e:
+            logger.error(f"Nova configuração rejeitada, mantendo a anterior: {e}")
+            return False
+
+        self.config.install(settings)
+        logger.warning(f"🔄 Configuração recarregada de {self.config.path}.")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='ConfigWatcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
@@ -0,0 +1,32 @@
+# Arquivo: utils/lazy_import.py
+
+import importlib
+
+
+class LazyModule:
+    """
+    Proxy que importa o módulo apenas no primeiro acesso a um atributo.
+
+    Ex.: ``mt5 = LazyModule('MetaTrader5')`` permite importar o conector em
+    máquinas sem o MetaTrader5 (Linux, workers de otimização, testes).
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def reset(self):
+        """Descarta o módulo carregado (o próximo acesso importa de novo, ex.: após trocar por um simulador)."""
+        self._module = None
@@ -5,19 +5,23 @@ import os
 import sys # Necessário para StreamHandler
 from datetime import datetime
 
-# Cria o diretório de logs se ele não existir
 LOG_DIR = 'logs'
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
 
-# Nome do arquivo de log com timestamp
-LOG_FILENAME = os.path.join(
-    LOG_DIR,
-    f'bot_log_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
-)
+# Definido por setup_logger(): importar este módulo não cria diretórios nem arquivos
+LOG_FILENAME = None
 
 def setup_logger():
     """Configura o logger principal para console (UTF-8) e arquivo (UTF-8)."""
+    global LOG_FILENAME
+
+    # Cria o diretório de logs se ele não existir
+    os.makedirs(LOG_DIR, exist_ok=True)
+
+    # Nome do arquivo de log com timestamp
+    LOG_FILENAME = os.path.join(
+        LOG_DIR,
+        f'bot_log_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+    )
     
     # 1. Cria o objeto logger
     logger = logging.getLogger('XP_MT5_BOT')
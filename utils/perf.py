@@ -0,0 +1,40 @@
+# Arquivo: utils/perf.py
+
+import os
+import sys
+
+# Pools de threads de BLAS/OpenMP/numba. Com vários processos de otimização por máquina,
+# cada um abrindo N threads, a CPU fica sobrecarregada: nos workers o certo é 1 thread.
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'BLIS_NUM_THREADS',
+                   'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS', 'NUMBA_NUM_THREADS')
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """Pico de memória residente (RSS) do processo atual em MB, ou 0.0 se indisponível."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta em KB; macOS em bytes
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except (ImportError, AttributeError):
+        return 0.0
+
+
+def pin_threads(threads: int = 1, override: bool = False) -> dict:
+    """
+    Limita as threads de BLAS/OpenMP/numba do processo (e dos processos filhos). Só tem efeito
+    pleno antes de o NumPy ser importado: chame no início do programa. Variáveis já definidas
+    no ambiente são respeitadas, a menos que ``override``. Retorna os valores em vigor.
+    """
+    for name in THREAD_ENV_VARS:
+        if override or not os.environ.get(name):
+            os.environ[name] = str(threads)
+    return {name: os.environ[name] for name in THREAD_ENV_VARS}